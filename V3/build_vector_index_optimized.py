@@ -1,128 +1,506 @@
 #!/usr/bin/env python
 # coding: utf-8
 
+"""
+Cria o índice vetorial FAISS dos textos processados.
+
+Os chunks são lidos arquivo por arquivo (sem carregar a biblioteca inteira na
+memória), identificados pelo hash do conteúdo e codificados em paralelo por um
+pool de processos, cada um com sua cópia do modelo. A cada lote concluído, os
+vetores são acrescentados ao checkpoint e os IDs dos chunks ao manifesto, de modo
+que uma execução interrompida continua de onde parou e uma reconstrução só
+codifica os chunks novos. Chunks idênticos são codificados uma única vez.
+
+O índice final é salvo no formato do FAISS.save_local do LangChain
+(index.faiss e index.pkl), lido pela busca semântica da API.
+
+O tipo do índice é configurável: flat (busca exata), ivf-flat, ivf-pq (vetores
+com quantização por produto) e hnsw, com armazenamento float32 ou int8 (exceto
+ivf-pq). Os parâmetros de busca padrão (nprobe, efSearch) são gravados em
+index_params.json e podem ser trocados na API sem reconstruir o índice. Com
+--report, o comando mede o recall@10 e a latência de cada valor desses
+parâmetros em relação à busca exata.
+
+Uso:
+    python build_vector_index_optimized.py [--texts-dir DIR] [--output DIR] [--workers N] [--batch-size N] [--restart]
+        [--index-type flat|ivf-flat|ivf-pq|hnsw] [--storage float32|int8] [--nlist N] [--pq-m N] [--hnsw-m N]
+        [--nprobe N] [--ef-search N] [--report]
+"""
+
+import argparse
+import hashlib
+import json
+import math
 import os
+import pickle
+import shutil
 import time
-import gc
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import SentenceTransformerEmbeddings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
 
 # --- Configurações Otimizadas ---
-PROCESSED_TEXTS_DIR = "/home/ubuntu/processed_texts"
-FAISS_INDEX_PATH = "/home/ubuntu/astrology_faiss_index_optimized"
+PROCESSED_TEXTS_DIR = os.getenv("PROCESSED_TEXTS_DIR", "/home/ubuntu/processed_texts")
+FAISS_INDEX_PATH = os.getenv("FAISS_INDEX_PATH", "/home/ubuntu/astrology_faiss_index_optimized")
 # Modelo de embedding mais leve
 EMBEDDING_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
 CHUNK_SIZE = 500 # Chunks menores
 CHUNK_OVERLAP = 50 # Sobreposição menor
-BATCH_SIZE = 500 # Processar N chunks por vez
+BATCH_SIZE = 256 # Chunks enviados de uma vez a cada processo
+WORKERS = max(1, (os.cpu_count() or 1) // 2) # Processos de embedding
+
+# Tipo do índice FAISS
+INDEX_TYPES = ("flat", "ivf-flat", "ivf-pq", "hnsw")
+INDEX_TYPE = "flat"
+STORAGE = "float32" # float32 ou int8 (quantização escalar de 8 bits)
+HNSW_M = 32 # Vizinhos por nó do grafo HNSW
+DEFAULT_EF_SEARCH = 64
+TRAINING_POINTS_PER_LIST = 64 # Vetores de treino por lista invertida (ou centróide do PQ)
+INDEX_PARAMS_FILE = "index_params.json" # Tipo e parâmetros de busca do índice salvo
+REPORT_FILE = "report.json" # Relatório de recall e latência
+REPORT_QUERIES = 1000
+REPORT_K = 10
+
+# Arquivos do checkpoint (em <saída>.checkpoint)
+CHECKPOINT_CONFIG = "config.json" # Modelo e parâmetros usados nos vetores
+CHECKPOINT_VECTORS = "vectors.f32" # Vetores concluídos, na ordem do manifesto
+CHECKPOINT_MANIFEST = "manifest.jsonl" # Um chunk concluído por linha (id, fonte, texto)
+CHECKPOINT_FAILED = "failed.jsonl" # Lotes que falharam (refeitos na próxima execução)
 
 # --- Funções Auxiliares ---
-def load_documents(directory):
-    """Carrega documentos de texto de um diretório."""
-    print(f"Carregando documentos de: {directory}")
-    loader = DirectoryLoader(directory, glob="**/*.txt", loader_cls=TextLoader, loader_kwargs={"encoding": "utf-8"}, show_progress=True, use_multithreading=True)
-    documents = loader.load()
-    print(f"Total de documentos carregados: {len(documents)}")
-    documents = [doc for doc in documents if doc.page_content.strip()]
-    print(f"Documentos não vazios: {len(documents)}")
-    return documents
-
-def split_documents(documents):
-    """Divide os documentos em chunks menores."""
-    print(f"Dividindo documentos em chunks (size={CHUNK_SIZE}, overlap={CHUNK_OVERLAP})...")
+def iter_chunks(directory):
+    """
+    Gera os chunks dos textos, um arquivo por vez.
+
+    Cada chunk é uma tupla (id, fonte, texto), com o id igual ao hash SHA-256 do texto.
+    """
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
-    chunks = text_splitter.split_documents(documents)
-    print(f"Total de chunks criados: {len(chunks)}")
-    return chunks
-
-def initialize_embeddings():
-    """Inicializa o modelo de embedding."""
-    print(f"Inicializando modelo de embedding: {EMBEDDING_MODEL}")
-    model_kwargs = {"device": "cpu"}
-    encode_kwargs = {"normalize_embeddings": False} # Normalização pode ser feita pelo FAISS se necessário
-    embeddings = SentenceTransformerEmbeddings(
-        model_name=EMBEDDING_MODEL,
-        model_kwargs=model_kwargs,
-        encode_kwargs=encode_kwargs
+    for root, _, filenames in sorted(os.walk(directory)):
+        for filename in sorted(filenames):
+            if not filename.endswith(".txt"):
+                continue
+            path = os.path.join(root, filename)
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+            if not content.strip():
+                continue
+            for text in text_splitter.split_text(content):
+                chunk_id = hashlib.sha256(text.encode("utf-8")).hexdigest()
+                yield chunk_id, path, text
+
+def iter_batches(chunks, completed, batch_size, current, stats):
+    """
+    Agrupa em lotes os chunks que ainda precisam ser codificados.
+
+    Chunks repetidos (mesmo hash) e já presentes no manifesto são pulados. Os IDs
+    de todos os chunks atuais são acrescentados a `current` (usado para excluir do
+    índice os chunks de textos removidos) e as contagens, a `stats`.
+    """
+    batch = []
+    for chunk_id, source, text in chunks:
+        stats["chunks"] += 1
+        if chunk_id in current:
+            stats["duplicates"] += 1
+            continue
+        current[chunk_id] = None
+        if chunk_id in completed:
+            stats["reused"] += 1
+            continue
+        batch.append((chunk_id, source, text))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+_worker_model = None
+
+def _init_worker(model_name, threads):
+    """Carrega o modelo uma vez em cada processo do pool."""
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # Dividir os núcleos entre os processos em vez de cada um usar todos
+    torch.set_num_threads(threads)
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+
+def _embed_batch(texts):
+    """Codifica um lote de textos no processo do pool."""
+    vectors = _worker_model.encode(texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=False)
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+class Checkpoint:
+    """Vetores e manifesto dos chunks já codificados."""
+
+    def __init__(self, directory, config):
+        self.directory = directory
+        self.config = config
+        self.vectors_path = os.path.join(directory, CHECKPOINT_VECTORS)
+        self.manifest_path = os.path.join(directory, CHECKPOINT_MANIFEST)
+        self.failed_path = os.path.join(directory, CHECKPOINT_FAILED)
+        self.completed = {}
+        self.dimension = None
+
+        config_path = os.path.join(directory, CHECKPOINT_CONFIG)
+        if os.path.exists(config_path):
+            with open(config_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if {k: v for k, v in saved.items() if k != "dimension"} != config:
+                print(f"Checkpoint em {directory} foi criado com outra configuração; recomeçando.")
+                shutil.rmtree(directory)
+            else:
+                self.dimension = saved.get("dimension")
+
+        os.makedirs(directory, exist_ok=True)
+        self._write_config()
+        self._load_manifest()
+        # Os lotes que falharam na execução anterior voltam a ser processados
+        open(self.failed_path, "w").close()
+
+    def _write_config(self):
+        config = dict(self.config, dimension=self.dimension)
+        with open(os.path.join(self.directory, CHECKPOINT_CONFIG), "w", encoding="utf-8") as f:
+            json.dump(config, f)
+
+    def _load_manifest(self):
+        """Lê o manifesto e descarta vetores gravados sem a linha correspondente."""
+        entries = 0
+        if os.path.exists(self.manifest_path):
+            valid_size = 0
+            with open(self.manifest_path, "rb") as f:
+                for line in f:
+                    # Uma linha sem quebra no final foi interrompida no meio da gravação
+                    if not line.endswith(b"\n"):
+                        break
+                    entry = json.loads(line)
+                    self.completed[entry["id"]] = entries
+                    entries += 1
+                    valid_size += len(line)
+            with open(self.manifest_path, "r+b") as f:
+                f.truncate(valid_size)
+
+        if self.dimension is not None and os.path.exists(self.vectors_path):
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(entries * self.dimension * 4)
+
+    def append(self, batch, vectors):
+        """Grava os vetores de um lote e, em seguida, as linhas do manifesto."""
+        if self.dimension is None:
+            self.dimension = int(vectors.shape[1])
+            self._write_config()
+
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        lines = []
+        for chunk_id, source, text in batch:
+            self.completed[chunk_id] = len(self.completed)
+            lines.append(json.dumps({"id": chunk_id, "source": source, "text": text}, ensure_ascii=False) + "\n")
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record_failure(self, batch, error):
+        """Registra um lote que falhou; ele não entra no manifesto e é refeito depois."""
+        with open(self.failed_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ids": [chunk_id for chunk_id, _, _ in batch], "error": str(error)}) + "\n")
+
+    def vectors(self):
+        """Mapeia em memória os vetores concluídos."""
+        if self.dimension is None or not self.completed:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.completed), self.dimension))
+
+    def entries(self):
+        """Gera as linhas do manifesto, na ordem dos vetores."""
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+def embed_chunks(texts_dir, checkpoint, workers, batch_size):
+    """
+    Codifica em paralelo os chunks que não estão no checkpoint.
+
+    Retorna os IDs dos chunks atuais (na ordem dos textos) e o número de lotes que falharam.
+    """
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    current = {}
+    stats = {"chunks": 0, "duplicates": 0, "reused": 0}
+    batches = iter_batches(iter_chunks(texts_dir), checkpoint.completed, batch_size, current, stats)
+    failed = 0
+    done = 0
+    start_time = time.time()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(EMBEDDING_MODEL, threads)) as pool:
+        pending = {}
+        exhausted = False
+        while pending or not exhausted:
+            # Manter no máximo dois lotes por processo em andamento
+            while not exhausted and len(pending) < 2 * workers:
+                batch = next(batches, None)
+                if batch is None:
+                    exhausted = True
+                    break
+                pending[pool.submit(_embed_batch, [text for _, _, text in batch])] = batch
+
+            if not pending:
+                break
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                batch = pending.pop(future)
+                try:
+                    checkpoint.append(batch, future.result())
+                    done += len(batch)
+                except Exception as e:
+                    print(f"Erro ao codificar um lote de {len(batch)} chunks: {e}")
+                    checkpoint.record_failure(batch, e)
+                    failed += 1
+
+            elapsed = time.time() - start_time
+            print(f"\r{done} chunks codificados ({done / max(elapsed, 1e-9):.1f}/s)", end="", flush=True)
+
+    print()
+    print(
+        f"Chunks: {stats['chunks']} no total, {stats['duplicates']} repetidos, "
+        f"{stats['reused']} reaproveitados do checkpoint, {done} codificados em {time.time() - start_time:.2f} segundos."
     )
-    return embeddings
+    return list(current), failed
 
-def create_and_save_faiss_index_batched(chunks, embeddings, index_path):
-    """Cria embeddings e salva o índice FAISS processando em lotes."""
-    if not chunks:
-        print("Nenhum chunk para processar.")
-        return
+def index_factory_string(index_type, storage, count, dimension, nlist=None, pq_m=None, hnsw_m=HNSW_M):
+    """
+    Monta a descrição do índice para faiss.index_factory.
 
-    print(f"Criando índice FAISS em lotes de {BATCH_SIZE} chunks...")
-    vectorstore = None
-    total_chunks = len(chunks)
-    start_time_total = time.time()
+    Retorna a descrição e os parâmetros de busca padrão do tipo escolhido.
+    """
+    codec = "SQ8" if storage == "int8" else "Flat"
+
+    if index_type == "flat":
+        return codec, {}
+
+    if index_type == "hnsw":
+        description = f"HNSW{hnsw_m}" + (",SQ8" if storage == "int8" else "")
+        return description, {"efSearch": DEFAULT_EF_SEARCH}
+
+    # Número de listas invertidas: ~4·√n, com pelo menos 39 vetores de treino por lista
+    if nlist is None:
+        nlist = int(4 * math.sqrt(count))
+    nlist = max(1, min(nlist, count // 39 or 1))
+    nprobe = max(1, min(nlist, nlist // 16 or 1))
+
+    if index_type == "ivf-flat":
+        return f"IVF{nlist},{codec}", {"nprobe": nprobe}
+
+    # ivf-pq: subvetores de 8 dimensões e até 256 centróides por subvetor
+    if pq_m is None:
+        pq_m = max(1, dimension // 8)
+    while dimension % pq_m:
+        pq_m -= 1
+    nbits = max(1, min(8, int(math.log2(max(2, count // 39)))))
+    return f"IVF{nlist},PQ{pq_m}x{nbits}", {"nprobe": nprobe}
+
+def build_faiss_index(vectors, positions, description, search_params):
+    """
+    Cria, treina e preenche o índice FAISS.
+
+    O treino usa uma amostra aleatória dos vetores; a inclusão é feita em blocos
+    para não copiar todos os vetores do checkpoint para a memória de uma vez.
+    """
+    import faiss
+
+    index = faiss.index_factory(vectors.shape[1], description, faiss.METRIC_L2)
+
+    if not index.is_trained:
+        lists = faiss.extract_index_ivf(index).nlist if "IVF" in description else 256
+        sample_size = min(len(positions), max(TRAINING_POINTS_PER_LIST * lists, TRAINING_POINTS_PER_LIST * 256))
+        sample = np.sort(np.random.default_rng(0).choice(positions, size=sample_size, replace=False))
+        print(f"Treinando índice {description} com {sample_size} vetores...")
+        start_time = time.time()
+        index.train(np.ascontiguousarray(vectors[sample]))
+        print(f"Treino concluído em {time.time() - start_time:.2f} segundos.")
 
-    for i in range(0, total_chunks, BATCH_SIZE):
-        batch_chunks = chunks[i:min(i + BATCH_SIZE, total_chunks)]
-        batch_num = (i // BATCH_SIZE) + 1
-        print(f"\nProcessando lote {batch_num}/{ (total_chunks + BATCH_SIZE - 1) // BATCH_SIZE } (chunks {i+1}-{min(i + BATCH_SIZE, total_chunks)} de {total_chunks})...")
-        start_time_batch = time.time()
+    for i in range(0, len(positions), 65536):
+        index.add(np.ascontiguousarray(vectors[positions[i:i + 65536]]))
 
+    apply_search_params(index, search_params)
+    return index
+
+def apply_search_params(index, search_params):
+    """Ajusta nprobe/efSearch do índice (parâmetros que não se aplicam são ignorados)."""
+    import faiss
+
+    parameter_space = faiss.ParameterSpace()
+    for name, value in search_params.items():
         try:
-            if vectorstore is None:
-                # Cria o índice com o primeiro lote
-                print("Inicializando índice FAISS com o primeiro lote...")
-                vectorstore = FAISS.from_documents(batch_chunks, embeddings)
-                print("Índice inicializado.")
-            else:
-                # Adiciona os lotes subsequentes ao índice existente
-                print("Adicionando lote ao índice FAISS existente...")
-                vectorstore.add_documents(batch_chunks)
-                print("Lote adicionado.")
-
-            end_time_batch = time.time()
-            print(f"Lote {batch_num} processado em {end_time_batch - start_time_batch:.2f} segundos.")
-
-        except Exception as e:
-            print(f"Erro ao processar o lote {batch_num}: {e}")
-            # Opcional: decidir se quer parar ou continuar com os próximos lotes
-            # raise e # Descomente para parar em caso de erro
-            print("Pulando para o próximo lote devido ao erro.")
-            continue # Continua para o próximo lote
-        finally:
-             # Limpar memória após cada lote (pode ajudar)
-             del batch_chunks
-             gc.collect()
-             time.sleep(1) # Pequena pausa
-
-    if vectorstore:
-        end_time_total = time.time()
-        print(f"\nProcessamento de todos os lotes concluído em {end_time_total - start_time_total:.2f} segundos.")
-        print(f"Salvando índice FAISS final em: {index_path}")
-        vectorstore.save_local(index_path)
-        print("Índice FAISS salvo com sucesso.")
+            parameter_space.set_index_parameter(index, name, value)
+        except RuntimeError:
+            pass
+
+def recall_latency_report(index, vectors, positions, search_params, queries=REPORT_QUERIES, k=REPORT_K):
+    """
+    Mede recall@k e latência por consulta para vários valores de nprobe/efSearch.
+
+    As consultas são vetores sorteados do próprio índice; a referência é a busca
+    exata (força bruta). A latência é medida com uma thread, como em uma requisição.
+    """
+    import faiss
+
+    rng = np.random.default_rng(1)
+    sample = np.sort(rng.choice(positions, size=min(queries, len(positions)), replace=False))
+    query_vectors = np.ascontiguousarray(vectors[sample])
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    for i in range(0, len(positions), 65536):
+        exact.add(np.ascontiguousarray(vectors[positions[i:i + 65536]]))
+    _, truth = exact.search(query_vectors, k)
+
+    if "nprobe" in search_params:
+        nlist = faiss.extract_index_ivf(index).nlist
+        grid = [("nprobe", value) for value in (1, 2, 4, 8, 16, 32, 64, 128, 256) if value <= nlist]
+    elif "efSearch" in search_params:
+        grid = [("efSearch", value) for value in (16, 32, 64, 128, 256, 512)]
     else:
-        print("Nenhum índice FAISS foi criado devido a erros ou falta de chunks.")
+        grid = [(None, None)]
+
+    threads = faiss.omp_get_max_threads()
+    faiss.omp_set_num_threads(1)
+    rows = []
+    try:
+        for name, value in grid:
+            if name is not None:
+                apply_search_params(index, {name: value})
+            start_time = time.perf_counter()
+            _, found = index.search(query_vectors, k)
+            elapsed = time.perf_counter() - start_time
+            recall = np.mean([len(set(row_found) & set(row_truth)) / k for row_found, row_truth in zip(found, truth)])
+            rows.append({
+                "parameter": name,
+                "value": value,
+                f"recall@{k}": round(float(recall), 4),
+                "latency_ms": round(1000 * elapsed / len(query_vectors), 4),
+            })
+    finally:
+        faiss.omp_set_num_threads(threads)
+        apply_search_params(index, search_params)
+
+    return {
+        "index": index_description(index),
+        "vectors": int(index.ntotal),
+        "queries": int(len(query_vectors)),
+        "index_bytes": int(faiss.serialize_index(index).nbytes),
+        "exact_bytes": int(exact.ntotal * exact.d * 4),
+        "results": rows,
+    }
+
+def index_description(index):
+    """Nome da classe do índice FAISS (ex: IndexIVFPQ)."""
+    import faiss
+    return type(faiss.downcast_index(index)).__name__
+
+def print_report(report):
+    """Imprime o relatório de recall e latência em forma de tabela."""
+    print(
+        f"\nRelatório ({report['index']}, {report['vectors']} vetores, {report['queries']} consultas, "
+        f"{report['index_bytes'] / 2**20:.1f} MiB; busca exata: {report['exact_bytes'] / 2**20:.1f} MiB)"
+    )
+    for row in report["results"]:
+        recall = next(value for key, value in row.items() if key.startswith("recall@"))
+        label = f"{row['parameter']}={row['value']}" if row["parameter"] else "padrão"
+        print(f"  {label:<14} recall {recall:.3f}   {row['latency_ms']:.3f} ms/consulta")
+
+def save_faiss_index(checkpoint, chunk_ids, index_path, index_type=INDEX_TYPE, storage=STORAGE,
+                     nlist=None, pq_m=None, hnsw_m=HNSW_M, search_overrides=None, report=False):
+    """
+    Monta o índice FAISS com os vetores dos chunks atuais e salva no formato do LangChain.
+    """
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_core.documents import Document
+
+    positions = [checkpoint.completed[chunk_id] for chunk_id in chunk_ids if chunk_id in checkpoint.completed]
+    if not positions:
+        print("Nenhum chunk codificado; índice não foi salvo.")
+        return
+
+    wanted = set(positions)
+    documents = {}
+    for position, entry in enumerate(checkpoint.entries()):
+        if position in wanted:
+            documents[position] = Document(page_content=entry["text"], metadata={"source": entry["source"]})
+
+    vectors = checkpoint.vectors()
+    description, search_params = index_factory_string(
+        index_type, storage, len(positions), checkpoint.dimension, nlist=nlist, pq_m=pq_m, hnsw_m=hnsw_m
+    )
+    search_params.update({name: value for name, value in (search_overrides or {}).items() if name in search_params and value})
+    print(f"Construindo índice FAISS {description} com {len(positions)} vetores...")
+    index = build_faiss_index(vectors, positions, description, search_params)
+
+    docstore = InMemoryDocstore({str(position): documents[position] for position in positions})
+    index_to_docstore_id = {i: str(position) for i, position in enumerate(positions)}
+
+    # Gravar ao lado e trocar no final, para não deixar um índice pela metade
+    temp_path = f"{index_path}.tmp"
+    os.makedirs(temp_path, exist_ok=True)
+    faiss.write_index(index, os.path.join(temp_path, "index.faiss"))
+    with open(os.path.join(temp_path, "index.pkl"), "wb") as f:
+        pickle.dump((docstore, index_to_docstore_id), f)
+    with open(os.path.join(temp_path, INDEX_PARAMS_FILE), "w", encoding="utf-8") as f:
+        json.dump({"index_type": index_type, "storage": storage, "factory": description, "search_params": search_params}, f, indent=2)
+    if report:
+        result = recall_latency_report(index, vectors, positions, search_params)
+        print_report(result)
+        with open(os.path.join(temp_path, REPORT_FILE), "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if os.path.exists(index_path):
+        shutil.rmtree(index_path)
+    os.replace(temp_path, index_path)
+    print(f"Índice FAISS salvo em {index_path}: {index.ntotal} vetores.")
 
 # --- Execução Principal ---
 if __name__ == "__main__":
-    print("--- Iniciando criação OTIMIZADA do índice vetorial (lotes, modelo leve) ---")
-    
-    # 1. Carregar documentos
-    docs = load_documents(PROCESSED_TEXTS_DIR)
-    
-    if not docs:
-        print("Nenhum documento encontrado. Abortando.")
-    else:
-        # 2. Dividir em chunks (menores)
-        doc_chunks = split_documents(docs)
-        
-        if not doc_chunks:
-            print("Nenhum chunk foi criado. Abortando.")
-        else:
-            # 3. Inicializar embeddings (modelo mais leve)
-            embeddings_model = initialize_embeddings()
-            
-            # 4. Criar e salvar índice FAISS em lotes
-            create_and_save_faiss_index_batched(doc_chunks, embeddings_model, FAISS_INDEX_PATH)
-            
-    print("--- Processo de criação do índice OTIMIZADO concluído ---")
+    parser = argparse.ArgumentParser(description="Cria o índice vetorial FAISS dos textos processados.")
+    parser.add_argument("--texts-dir", default=PROCESSED_TEXTS_DIR, help="Diretório dos textos processados")
+    parser.add_argument("--output", default=FAISS_INDEX_PATH, help="Diretório do índice FAISS")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Número de processos de embedding")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Chunks por lote")
+    parser.add_argument("--restart", action="store_true", help="Descarta o checkpoint e codifica tudo de novo")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=INDEX_TYPE, help="Tipo do índice FAISS")
+    parser.add_argument("--storage", choices=("float32", "int8"), default=STORAGE, help="Armazenamento dos vetores (ignorado em ivf-pq)")
+    parser.add_argument("--nlist", type=int, help="Listas invertidas dos índices IVF (padrão: ~4·√n)")
+    parser.add_argument("--pq-m", type=int, help="Subvetores do ivf-pq (padrão: dimensão / 8)")
+    parser.add_argument("--hnsw-m", type=int, default=HNSW_M, help="Vizinhos por nó do HNSW")
+    parser.add_argument("--nprobe", type=int, help="nprobe padrão gravado com o índice (IVF)")
+    parser.add_argument("--ef-search", type=int, help="efSearch padrão gravado com o índice (HNSW)")
+    parser.add_argument("--report", action="store_true", help="Mede recall@10 e latência para vários nprobe/efSearch")
+    args = parser.parse_args()
+
+    print("--- Iniciando criação OTIMIZADA do índice vetorial (paralelo, retomável) ---")
+    start_time_total = time.time()
+
+    checkpoint_dir = f"{args.output}.checkpoint"
+    if args.restart and os.path.exists(checkpoint_dir):
+        shutil.rmtree(checkpoint_dir)
+    checkpoint = Checkpoint(checkpoint_dir, {
+        "model": EMBEDDING_MODEL,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+    })
+    if checkpoint.completed:
+        print(f"Retomando do checkpoint {checkpoint_dir}: {len(checkpoint.completed)} chunks já codificados.")
+
+    chunk_ids, failed = embed_chunks(args.texts_dir, checkpoint, max(1, args.workers), max(1, args.batch_size))
+    save_faiss_index(
+        checkpoint, chunk_ids, args.output, index_type=args.index_type, storage=args.storage,
+        nlist=args.nlist, pq_m=args.pq_m, hnsw_m=args.hnsw_m,
+        search_overrides={"nprobe": args.nprobe, "efSearch": args.ef_search}, report=args.report
+    )
+    if failed:
+        print(f"{failed} lotes falharam (ver {checkpoint.failed_path}); execute novamente para refazê-los.")
 
+    print(f"--- Processo de criação do índice OTIMIZADO concluído em {time.time() - start_time_total:.2f} segundos ---")
@@ -6,18 +6,23 @@ Este módulo contém os endpoints relacionados ao cálculo de direções de arco
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+import numpy as np
 
 from ..schemas.models import DirectionRequest, DirectionResponse, HouseSystemType, LanguageType
 from ..core.calculations import (
-    create_astrological_subject,
+    get_natal_subject,
     get_planet_data,
     get_houses_data,
     calculate_solar_arc_directions,
-    get_aspects_data
+    build_aspect_data
 )
+from ..core.aspects import find_aspects
+from ..core.ephemeris_backends import get_backend
+from ..core.cache import get_cache_key
+from ..core.executor import run_compute
 from ..core.utils import validate_date, validate_timezone, validate_time
-from ..interpretations.text_search import get_planet_interpretation
-from ..interpretations.translations import translate_sign, translate_aspect, translate_planet
+from ..interpretations.text_search import get_interpretations, planet_interpretation_query
+from ..interpretations.translations import translate_sign
 from ..security import verify_api_key
 
 # Criar o router
@@ -71,6 +76,136 @@ def calculate_house_position(longitude: float, house_cusps: List[float]) -> int:
     
     return 1  # Default para a primeira casa se algo der errado
 
+def build_solar_arc(request: DirectionRequest) -> DirectionResponse:
+    """
+    Calcula as direções de arco solar já validadas (executado fora do loop de eventos).
+
+    Args:
+        request (DirectionRequest): Dados para o cálculo das direções.
+
+    Returns:
+        DirectionResponse: Dados das direções calculadas.
+    """
+    natal = request.natal_chart
+    direction_date = request.direction_date
+
+    # Usar valores padrão para house_system e language se não fornecidos
+    house_system: HouseSystemType = natal.house_system or "Placidus"
+    language: LanguageType = request.language or "pt"
+    
+    # Obter o objeto AstrologicalSubject do mapa natal (reaproveitado entre requisições)
+    natal_subject = get_natal_subject(
+        name=natal.name if natal.name else "NatalChart",
+        year=natal.year,
+        month=natal.month,
+        day=natal.day,
+        hour=natal.hour,
+        minute=natal.minute,
+        longitude=natal.longitude,
+        latitude=natal.latitude,
+        tz_str=natal.tz_str,
+        house_system=house_system
+    )
+    
+    # Calcular as direções de arco solar
+    direction_date_obj = datetime(
+        direction_date.year,
+        direction_date.month,
+        direction_date.day
+    )
+    
+    solar_arc, directed_positions = calculate_solar_arc_directions(natal_subject, direction_date_obj)
+    
+    # Obter dados das casas natais
+    houses = get_houses_data(natal_subject, language)
+    
+    # Criar um mapa com as posições direcionadas
+    directed_planets = {}
+    
+    for planet_name, planet_data in get_planet_data(natal_subject, language).items():
+        # Copiar os dados do planeta natal
+        directed_planet = planet_data.copy()
+        
+        # Atualizar a longitude com a posição direcionada
+        if planet_name in directed_positions:
+            longitude = directed_positions[planet_name]
+            directed_planet.longitude = longitude
+            
+            # Calcular o novo signo
+            sign_num = int(longitude / 30) + 1
+            sign = get_sign_name(sign_num)
+            directed_planet.sign = translate_sign(sign, language)
+            directed_planet.sign_original = sign
+            directed_planet.sign_num = sign_num
+            
+            # Atualizar a casa
+            house_cusps = [float(h.longitude) for h in houses.values()]
+            directed_planet.house = calculate_house_position(longitude, house_cusps)
+        
+        directed_planets[planet_name] = directed_planet
+    
+    # Calcular aspectos entre planetas direcionados e natais
+    natal_positions = get_backend().positions_at(natal_subject.julian_day)
+    directed_bodies = [body for body in natal_positions.bodies if body in directed_positions]
+    
+    # Os pontos direcionados avançam todos no ritmo do arco solar,
+    # enquanto os natais permanecem fixos
+    hits = find_aspects(
+        [directed_positions[body] for body in directed_bodies],
+        natal_positions.longitude,
+        speed1=np.ones(len(directed_bodies)),
+        speed2=np.zeros(len(natal_positions))
+    )
+    all_aspects = build_aspect_data(
+        hits, directed_bodies, natal_positions.bodies, "directed", "natal", language
+    )
+    
+    # Gerar interpretações se solicitado
+    interpretations = None
+    if request.include_interpretations:
+        interpretations = {
+            "planets": {},
+            "aspects": []
+        }
+        
+        # Buscar as interpretações de planetas e aspectos em um único lote
+        queries = {}
+        for planet_name, planet_data in directed_planets.items():
+            queries[("planets", planet_name)] = planet_interpretation_query(planet_name, planet_data.sign, planet_data.house)
+        for i, aspect in enumerate(all_aspects):
+            queries[("aspects", i)] = planet_interpretation_query(
+                f"{aspect.p1_name_original} {aspect.aspect_original} {aspect.p2_name_original}", "", 0
+            )
+        texts = get_interpretations(queries, language)
+        
+        # Interpretações dos planetas
+        for planet_name in directed_planets:
+            interp = texts.get(("planets", planet_name))
+            if interp:
+                interpretations["planets"][planet_name] = interp
+        
+        # Interpretações dos aspectos
+        for i, aspect in enumerate(all_aspects):
+            interp = texts.get(("aspects", i))
+            if interp:
+                interpretations["aspects"].append({
+                    "p1": aspect.p1_name_original,
+                    "p2": aspect.p2_name_original,
+                    "aspect": aspect.aspect_original,
+                    "text": interp
+                })
+    
+    # Construir resposta
+    return DirectionResponse(
+        input_data=request,
+        directed_planets=directed_planets,
+        natal_houses=houses,
+        direction_value=solar_arc,
+        aspects=all_aspects,
+        house_system=house_system,
+        interpretations=interpretations
+    )
+
 @router.post("/solar-arc", response_model=DirectionResponse)
 async def calculate_solar_arc(request: DirectionRequest):
     """
@@ -102,124 +237,13 @@ async def calculate_solar_arc(request: DirectionRequest):
         if not validate_date(direction_date.year, direction_date.month, direction_date.day):
             raise HTTPException(status_code=400, detail="Data de direção inválida")
             
-        # Usar valores padrão para house_system e language se não fornecidos
-        house_system: HouseSystemType = natal.house_system or "Placidus"
-        language: LanguageType = request.language or "pt"
-        
-        # Criar o objeto AstrologicalSubject para o mapa natal
-        natal_subject = create_astrological_subject(
-            name=natal.name if natal.name else "NatalChart",
-            year=natal.year,
-            month=natal.month,
-            day=natal.day,
-            hour=natal.hour,
-            minute=natal.minute,
-            longitude=natal.longitude,
-            latitude=natal.latitude,
-            tz_str=natal.tz_str,
-            house_system=house_system
-        )
-        
-        # Calcular as direções de arco solar
-        direction_date_obj = datetime(
-            direction_date.year,
-            direction_date.month,
-            direction_date.day
-        )
-        
-        solar_arc, directed_positions = calculate_solar_arc_directions(natal_subject, direction_date_obj)
-        
-        # Obter dados das casas natais
-        houses = get_houses_data(natal_subject, language)
-        
-        # Criar um mapa com as posições direcionadas
-        directed_planets = {}
-        
-        for planet_name, planet_data in get_planet_data(natal_subject, language).items():
-            # Copiar os dados do planeta natal
-            directed_planet = planet_data.copy()
-            
-            # Atualizar a longitude com a posição direcionada
-            if planet_name in directed_positions:
-                longitude = directed_positions[planet_name]
-                directed_planet.longitude = longitude
-                
-                # Calcular o novo signo
-                sign_num = int(longitude / 30) + 1
-                sign = get_sign_name(sign_num)
-                directed_planet.sign = translate_sign(sign, language)
-                directed_planet.sign_original = sign
-                directed_planet.sign_num = sign_num
-                
-                # Atualizar a casa
-                house_cusps = [float(h.longitude) for h in houses.values()]
-                directed_planet.house = calculate_house_position(longitude, house_cusps)
-            
-            directed_planets[planet_name] = directed_planet
-        
-        # Calcular aspectos entre planetas direcionados e natais
-        natal_planets = get_planet_data(natal_subject, language)
-        all_aspects = []
-        
-        for d_planet, d_data in directed_planets.items():
-            for n_planet, n_data in natal_planets.items():
-                # Calcular aspecto (simplificado)
-                diff = abs(d_data.longitude - n_data.longitude) % 360
-                for aspect_angle, aspect_name in [(0, "Conjunction"), (60, "Sextile"), 
-                                              (90, "Square"), (120, "Trine"), (180, "Opposition")]:
-                    if abs(diff - aspect_angle) <= 8:  # Orbe de 8 graus
-                        all_aspects.append({
-                            "p1_name": translate_planet(d_planet, language),
-                            "p1_name_original": d_planet,
-                            "p1_owner": "directed",
-                            "p2_name": translate_planet(n_planet, language),
-                            "p2_name_original": n_planet,
-                            "p2_owner": "natal",
-                            "aspect": translate_aspect(aspect_name, language),
-                            "aspect_original": aspect_name,
-                            "orbit": abs(diff - aspect_angle)
-                        })
-        
-        # Gerar interpretações se solicitado
-        interpretations = None
-        if request.include_interpretations:
-            interpretations = {
-                "planets": {},
-                "aspects": []
-            }
-            
-            # Interpretações dos planetas
-            for planet_name, planet_data in directed_planets.items():
-                # Usar a função get_planet_interpretation com valores não-nulos
-                interp = get_planet_interpretation(planet_name, planet_data.sign, planet_data.house, language)
-                if interp:
-                    interpretations["planets"][planet_name] = interp
-            
-            # Interpretações dos aspectos
-            for aspect in all_aspects:
-                p1_name = aspect["p1_name_original"]
-                p2_name = aspect["p2_name_original"]
-                aspect_name = aspect["aspect_original"]
-                # Usar a função get_aspect_interpretation com valores não-nulos
-                interp = get_planet_interpretation(f"{p1_name} {aspect_name} {p2_name}", "", 0, language)
-                if interp:
-                    interpretations["aspects"].append({
-                        "p1": p1_name,
-                        "p2": p2_name,
-                        "aspect": aspect_name,
-                        "text": interp
-                    })
-        
-        # Construir resposta
-        return DirectionResponse(
-            input_data=request,
-            directed_planets=directed_planets,
-            natal_houses=houses,
-            direction_value=solar_arc,
-            aspects=all_aspects,
-            house_system=house_system,
-            interpretations=interpretations
+        return await run_compute(
+            "solar_arc", build_solar_arc, request,
+            key=get_cache_key("solar_arc", **request.model_dump())
         )
+
+    except HTTPException:
+        raise
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Query
-from typing import List, Dict, Any
-from ..interpretations.text_search import simple_text_search
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Dict, Any, Literal, Optional
+from ..core.cache import get_cache_key
+from ..core.executor import run_compute
+from ..interpretations.semantic_search import interpret_search, semantic_search_available, semantic_search_error
 
 # Criar o router
 router = APIRouter(
@@ -9,9 +11,31 @@ router = APIRouter(
 )
 
 @router.get("/interpret", response_model=List[Dict[str, Any]])
-async def interpret_text(query: str = Query(..., title="Search Query", description="Text to search in interpretations")):
+async def interpret_text(
+    query: str = Query(..., title="Search Query", description="Text to search in interpretations"),
+    mode: Literal["keyword", "semantic", "hybrid"] = Query("keyword", title="Search Mode", description="keyword (BM25), semantic (vector index) or hybrid (reciprocal rank fusion of both)"),
+    limit: int = Query(5, ge=1, le=50, title="Limit", description="Maximum number of results"),
+    snippet_length: Optional[int] = Query(None, ge=20, le=5000, title="Snippet Length", description="Return a highlighted snippet of at most this many characters instead of the whole paragraph")
+):
     """
-    Realiza uma busca textual simples nos arquivos de interpretação e retorna os trechos encontrados.
+    Realiza uma busca nos arquivos de interpretação e retorna os trechos encontrados.
+
+    O modo "keyword" usa o índice BM25, "semantic" usa o índice vetorial do V3 e
+    "hybrid" combina os dois. Sem o índice vetorial, "hybrid" volta para "keyword".
     """
-    results = simple_text_search(query)
-    return results
\ No newline at end of file
+    try:
+        # A primeira verificação carrega o índice vetorial e o modelo, fora do loop de eventos
+        if mode != "keyword" and not await run_compute("interpret", semantic_search_available):
+            if mode == "semantic":
+                raise HTTPException(status_code=503, detail=semantic_search_error())
+            mode = "keyword"
+
+        results = await run_compute(
+            "interpret", interpret_search, query, mode, limit, snippet_length,
+            key=get_cache_key("interpret", query=query, mode=mode, limit=limit, snippet_length=snippet_length)
+        )
+        return results
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar interpretações: {str(e)}")
@@ -4,18 +4,33 @@ Router para os endpoints de mapa natal.
 Este módulo contém os endpoints relacionados ao cálculo de mapas natais.
 """
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
+from typing import List, Optional, Tuple
+import asyncio
+import math
+import os
 
-from ..schemas.models import NatalChartRequest, NatalChartResponse
+from ..schemas.models import (
+    NatalChartRequest, NatalChartResponse,
+    NatalChartBatchRequest, NatalChartBatchResponse, NatalChartBatchItem
+)
 from ..core.calculations import (
-    create_astrological_subject,
+    get_natal_subject,
     get_planet_data,
     get_houses_data,
     get_aspects_data
 )
+from ..core.cache import get_cache_key, get_or_compute
+from ..core.executor import run_compute, PROCESS_POOL_WORKERS
 from ..core.utils import validate_date, validate_timezone, validate_time
 from ..security import verify_api_key
 
+# Número máximo de itens aceitos em um lote
+MAX_BATCH_ITEMS = int(os.getenv("NATAL_BATCH_MAX_ITEMS", "10000"))
+
+# Número de tarefas por processo do pool; mais tarefas equilibram melhor a carga,
+# menos tarefas reduzem o custo de serialização
+BATCH_CHUNKS_PER_WORKER = 4
+
 # Criar o router
 router = APIRouter(
     prefix="/api/v1",
@@ -23,33 +38,40 @@ router = APIRouter(
     dependencies=[Depends(verify_api_key)],
 )
 
-@router.post("/natal_chart", response_model=NatalChartResponse)
-async def calculate_natal_chart(request: NatalChartRequest):
+def validate_natal_request(request: NatalChartRequest) -> Optional[str]:
     """
-    Calcula um mapa natal com base nos dados fornecidos.
-    
+    Valida os dados de entrada de um mapa natal.
+
+    Args:
+        request (NatalChartRequest): Dados para o cálculo do mapa natal.
+
+    Returns:
+        Optional[str]: Mensagem de erro ou None se os dados forem válidos.
+    """
+    if not validate_date(request.year, request.month, request.day):
+        return "Data inválida"
+
+    if not validate_time(request.hour, request.minute):
+        return "Hora inválida"
+
+    if not validate_timezone(request.tz_str):
+        return "Fuso horário inválido"
+
+    return None
+
+def build_natal_chart(request: NatalChartRequest) -> NatalChartResponse:
+    """
+    Calcula um mapa natal já validado, reaproveitando a resposta do cache.
+
     Args:
         request (NatalChartRequest): Dados para o cálculo do mapa natal.
-        
+
     Returns:
         NatalChartResponse: Dados do mapa natal calculado.
-        
-    Raises:
-        HTTPException: Se ocorrer um erro durante o cálculo.
     """
-    try:
-        # Validar os dados de entrada
-        if not validate_date(request.year, request.month, request.day):
-            raise HTTPException(status_code=400, detail="Data inválida")
-        
-        if not validate_time(request.hour, request.minute):
-            raise HTTPException(status_code=400, detail="Hora inválida")
-        
-        if not validate_timezone(request.tz_str):
-            raise HTTPException(status_code=400, detail="Fuso horário inválido")
-        
-        # Criar o objeto AstrologicalSubject
-        subject = create_astrological_subject(
+    def compute() -> NatalChartResponse:
+        # Obter o objeto AstrologicalSubject (reaproveitado entre requisições)
+        subject = get_natal_subject(
             name=request.name if request.name else "NatalChart",
             year=request.year,
             month=request.month,
@@ -61,16 +83,16 @@ async def calculate_natal_chart(request: NatalChartRequest):
             tz_str=request.tz_str,
             house_system=request.house_system
         )
-        
+
         # Obter os dados dos planetas
         planets = get_planet_data(subject, request.language)
-        
+
         # Obter os dados das casas
         houses = get_houses_data(subject, request.language)
-        
+
         # Obter os dados dos aspectos
-        aspects = get_aspects_data(subject, request.language)
-        
+        aspects = get_aspects_data(subject, language=request.language)
+
         # Criar a resposta
         response = NatalChartResponse(
             input_data=request,
@@ -82,15 +104,128 @@ async def calculate_natal_chart(request: NatalChartRequest):
             house_system=request.house_system,
             interpretations=None  # Implementação futura
         )
-        
+
         return response
-        
+
+    # Reaproveitar a resposta do cache, calculando-a uma única vez entre chamadas simultâneas
+    return get_or_compute(get_cache_key("natal_chart", **request.model_dump()), compute)
+
+def build_natal_chart_chunk(
+    chunk: List[Tuple[int, NatalChartRequest]]
+) -> List[NatalChartBatchItem]:
+    """
+    Calcula um trecho de um lote de mapas natais (executado no pool de processos).
+
+    Erros de um item são registrados no próprio item, sem interromper o trecho.
+
+    Args:
+        chunk (List[Tuple[int, NatalChartRequest]]): Itens com sua posição no lote.
+
+    Returns:
+        List[NatalChartBatchItem]: Resultados dos itens, na mesma ordem.
+    """
+    results = []
+
+    for index, item in chunk:
+        error = validate_natal_request(item)
+        if error:
+            results.append(NatalChartBatchItem(index=index, error=error))
+            continue
+
+        try:
+            results.append(NatalChartBatchItem(index=index, result=build_natal_chart(item)))
+        except Exception as e:
+            results.append(NatalChartBatchItem(index=index, error=f"Erro ao calcular mapa natal: {str(e)}"))
+
+    return results
+
+@router.post("/natal_chart", response_model=NatalChartResponse)
+async def calculate_natal_chart(request: NatalChartRequest):
+    """
+    Calcula um mapa natal com base nos dados fornecidos.
+
+    Args:
+        request (NatalChartRequest): Dados para o cálculo do mapa natal.
+
+    Returns:
+        NatalChartResponse: Dados do mapa natal calculado.
+
+    Raises:
+        HTTPException: Se ocorrer um erro durante o cálculo.
+    """
+    try:
+        # Validar os dados de entrada
+        error = validate_natal_request(request)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+
+        return await run_compute(
+            "natal_chart", build_natal_chart, request,
+            key=get_cache_key("natal_chart", **request.model_dump())
+        )
+
+    except HTTPException:
+        raise
+
     except Exception as e:
         # Logar o erro
         print(f"Erro ao calcular mapa natal: {str(e)}")
-        
+
         # Retornar erro ao cliente
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao calcular mapa natal: {str(e)}"
         )
+
+@router.post("/natal_chart/batch", response_model=NatalChartBatchResponse)
+async def calculate_natal_chart_batch(request: NatalChartBatchRequest):
+    """
+    Calcula mapas natais em lote, distribuindo o trabalho entre os processos do pool.
+
+    Os resultados são retornados na ordem da requisição. Um item inválido ou com
+    erro de cálculo é reportado no próprio item, sem falhar o lote inteiro.
+
+    Args:
+        request (NatalChartBatchRequest): Itens a calcular.
+
+    Returns:
+        NatalChartBatchResponse: Resultados por item.
+
+    Raises:
+        HTTPException: Se o lote exceder o tamanho máximo ou o pool falhar.
+    """
+    if len(request.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"O lote excede o máximo de {MAX_BATCH_ITEMS} itens"
+        )
+
+    try:
+        # Dividir o lote em trechos para reduzir o custo de comunicação entre processos
+        indexed = list(enumerate(request.items))
+        chunk_size = max(1, math.ceil(len(indexed) / (PROCESS_POOL_WORKERS * BATCH_CHUNKS_PER_WORKER)))
+        chunks = [indexed[i:i + chunk_size] for i in range(0, len(indexed), chunk_size)]
+
+        chunk_results = await asyncio.gather(*[
+            run_compute("natal_chart_batch", build_natal_chart_chunk, chunk, pool="process")
+            for chunk in chunks
+        ])
+
+        results = [item for chunk in chunk_results for item in chunk]
+        failed = sum(1 for item in results if item.error is not None)
+
+        return NatalChartBatchResponse(
+            results=results,
+            succeeded=len(results) - failed,
+            failed=failed
+        )
+
+    except Exception as e:
+        # Logar o erro
+        print(f"Erro ao calcular lote de mapas natais: {str(e)}")
+
+        # Retornar erro ao cliente
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao calcular lote de mapas natais: {str(e)}"
+        )
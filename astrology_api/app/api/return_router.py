@@ -8,14 +8,16 @@ from typing import Dict, List, Optional, Any
 
 from ..schemas.models import ReturnRequest, ReturnResponse
 from ..core.calculations import (
-    create_astrological_subject,
-    get_planet_data,
-    get_houses_data,
-    get_return_chart,
+    get_natal_subject,
+    get_return_chart_cached,
+    get_snapshot_planet_data,
+    get_snapshot_houses_data,
     get_aspects_data
 )
+from ..core.cache import get_cache_key
+from ..core.executor import run_compute
 from ..core.utils import validate_date, validate_timezone, validate_time
-from ..interpretations.text_search import get_planet_interpretation
+from ..interpretations.text_search import get_interpretations, planet_interpretation_query
 from ..security import verify_api_key
 
 # Criar o router
@@ -25,6 +27,116 @@ router = APIRouter(
     dependencies=[Depends(verify_api_key)],
 )
 
+def build_return_chart(request: ReturnRequest, return_type: str) -> ReturnResponse:
+    """
+    Calcula um retorno solar ou lunar já validado (executado fora do loop de eventos).
+
+    Args:
+        request (ReturnRequest): Dados para o cálculo do retorno.
+        return_type (str): Tipo de retorno ("solar" ou "lunar").
+
+    Returns:
+        ReturnResponse: Dados do retorno calculado.
+    """
+    natal = request.natal_chart
+
+    # Obter o objeto AstrologicalSubject do mapa natal (reaproveitado entre requisições)
+    natal_subject = get_natal_subject(
+        name=natal.name if natal.name else "NatalChart",
+        year=natal.year,
+        month=natal.month,
+        day=natal.day,
+        hour=natal.hour,
+        minute=natal.minute,
+        longitude=natal.longitude,
+        latitude=natal.latitude,
+        tz_str=natal.tz_str,
+        house_system=natal.house_system
+    )
+    
+    # Calcular o retorno (instantâneo compacto, reaproveitado do cache quando possível)
+    return_snapshot = get_return_chart_cached(
+        natal_subject, 
+        request.return_year,
+        return_month=request.return_month if return_type == "lunar" else None,
+        return_type=return_type,
+        location_longitude=request.location_longitude if request.location_longitude is not None else natal.longitude,
+        location_latitude=request.location_latitude if request.location_latitude is not None else natal.latitude,
+        location_tz_str=request.location_tz_str if request.location_tz_str is not None else natal.tz_str
+    )
+    
+    # Obter os dados dos planetas do retorno
+    return_planets = get_snapshot_planet_data(return_snapshot, request.language)
+    
+    # Obter os dados das casas do retorno
+    return_houses = get_snapshot_houses_data(return_snapshot, request.language)
+    
+    # Obter os aspectos entre planetas do retorno e natais
+    aspects = []
+    if request.include_natal_comparison:
+        aspects = get_aspects_data(
+            return_snapshot, 
+            natal_subject, 
+            request.language, 
+            cross_aspects=True,
+            subject_owner="return"
+        )
+    
+    # Obter interpretações, se solicitado
+    interpretations = None
+    if request.include_interpretations:
+        interpretations = {
+            "planets": {},
+            "houses": {},
+            "aspects": []
+        }
+        
+        # Buscar as interpretações de planetas, casas e aspectos em um único lote
+        queries = {}
+        for planet_key, planet_data in return_planets.items():
+            queries[("planets", planet_key)] = planet_interpretation_query(planet_data.name, planet_data.sign, planet_data.house)
+        for house_num, house_data in return_houses.items():
+            queries[("houses", house_num)] = planet_interpretation_query(f"Casa {house_num}", house_data.sign, 0)
+        for i, aspect in enumerate(aspects):
+            queries[("aspects", i)] = planet_interpretation_query(f"{aspect.p1_name} {aspect.aspect} {aspect.p2_name}", "", 0)
+        texts = get_interpretations(queries, request.language)
+        
+        # Interpretações dos planetas do retorno
+        for planet_key in return_planets:
+            interp = texts.get(("planets", planet_key))
+            if interp:
+                interpretations["planets"][planet_key] = interp
+        
+        # Interpretações das casas
+        for house_num in return_houses:
+            interp = texts.get(("houses", house_num))
+            if interp:
+                interpretations["houses"][house_num] = interp
+        
+        # Interpretações dos aspectos
+        for i, aspect in enumerate(aspects):
+            interp = texts.get(("aspects", i))
+            if interp:
+                interpretations["aspects"].append({
+                    "p1": aspect.p1_name,
+                    "p2": aspect.p2_name,
+                    "aspect": aspect.aspect,
+                    "interpretation": interp
+                })
+    
+    # Criar a resposta
+    response = ReturnResponse(
+        input_data=request,
+        return_planets=return_planets,
+        return_houses=return_houses,
+        return_date=return_snapshot.utc_datetime.strftime("%Y-%m-%d %H:%M:%S"),
+        aspects=aspects,
+        house_system=natal.house_system,
+        interpretations=interpretations
+    )
+    
+    return response
+
 @router.post("/solar-return", response_model=ReturnResponse)
 async def calculate_solar_return(request: ReturnRequest):
     """
@@ -56,100 +168,13 @@ async def calculate_solar_return(request: ReturnRequest):
         if return_year < 1900 or return_year > 2100:
             raise HTTPException(status_code=400, detail="Ano de retorno fora do intervalo válido (1900-2100)")
         
-        # Criar o objeto AstrologicalSubject para o mapa natal
-        natal_subject = create_astrological_subject(
-            name=natal.name if natal.name else "NatalChart",
-            year=natal.year,
-            month=natal.month,
-            day=natal.day,
-            hour=natal.hour,
-            minute=natal.minute,
-            longitude=natal.longitude,
-            latitude=natal.latitude,
-            tz_str=natal.tz_str,
-            house_system=natal.house_system
-        )
-        
-        # Calcular o retorno solar
-        return_subject = get_return_chart(
-            natal_subject, 
-            return_year,
-            return_type="solar",
-            location_longitude=request.location_longitude if request.location_longitude is not None else natal.longitude,
-            location_latitude=request.location_latitude if request.location_latitude is not None else natal.latitude,
-            location_tz_str=request.location_tz_str if request.location_tz_str is not None else natal.tz_str
+        return await run_compute(
+            "solar_return", build_return_chart, request, "solar",
+            key=get_cache_key("solar_return", **request.model_dump())
         )
-        
-        # Obter os dados dos planetas do retorno
-        return_planets = get_planet_data(return_subject, request.language)
-        
-        # Obter os dados das casas do retorno
-        return_houses = get_houses_data(return_subject, request.language)
-        
-        # Obter os aspectos entre planetas do retorno e natais
-        aspects = []
-        if request.include_natal_comparison:
-            aspects = get_aspects_data(
-                return_subject, 
-                natal_subject, 
-                request.language, 
-                cross_aspects=True
-            )
-        
-        # Obter interpretações, se solicitado
-        interpretations = None
-        if request.include_interpretations:
-            interpretations = {
-                "planets": {},
-                "houses": {},
-                "aspects": []
-            }
-            
-            # Interpretações dos planetas do retorno
-            for planet_key, planet_data in return_planets.items():
-                planet_name = planet_data.name
-                sign = planet_data.sign
-                house = planet_data.house
-                
-                interp = get_planet_interpretation(planet_name, sign, house, request.language)
-                if interp:
-                    interpretations["planets"][planet_key] = interp
-            
-            # Interpretações das casas
-            for house_num, house_data in return_houses.items():
-                sign = house_data.sign
-                
-                interp = get_planet_interpretation(f"Casa {house_num}", sign, 0, request.language)
-                if interp:
-                    interpretations["houses"][house_num] = interp
-            
-            # Interpretações dos aspectos
-            for aspect in aspects:
-                p1_name = aspect.p1_name
-                p2_name = aspect.p2_name
-                aspect_name = aspect.aspect
-                
-                interp = get_planet_interpretation(f"{p1_name} {aspect_name} {p2_name}", "", 0, request.language)
-                if interp:
-                    interpretations["aspects"].append({
-                        "p1": p1_name,
-                        "p2": p2_name,
-                        "aspect": aspect_name,
-                        "interpretation": interp
-                    })
-        
-        # Criar a resposta
-        response = ReturnResponse(
-            input_data=request,
-            return_planets=return_planets,
-            return_houses=return_houses,
-            return_date=return_subject.utc_datetime.strftime("%Y-%m-%d %H:%M:%S"),
-            aspects=aspects,
-            house_system=natal.house_system,
-            interpretations=interpretations
-        )
-        
-        return response
+
+    except HTTPException:
+        raise
         
     except Exception as e:
         # Logar o erro
@@ -196,101 +221,13 @@ async def calculate_lunar_return(request: ReturnRequest):
         if return_month is not None and (return_month < 1 or return_month > 12):
             raise HTTPException(status_code=400, detail="Mês de retorno inválido (1-12)")
         
-        # Criar o objeto AstrologicalSubject para o mapa natal
-        natal_subject = create_astrological_subject(
-            name=natal.name if natal.name else "NatalChart",
-            year=natal.year,
-            month=natal.month,
-            day=natal.day,
-            hour=natal.hour,
-            minute=natal.minute,
-            longitude=natal.longitude,
-            latitude=natal.latitude,
-            tz_str=natal.tz_str,
-            house_system=natal.house_system
+        return await run_compute(
+            "lunar_return", build_return_chart, request, "lunar",
+            key=get_cache_key("lunar_return", **request.model_dump())
         )
-        
-        # Calcular o retorno lunar
-        return_subject = get_return_chart(
-            natal_subject, 
-            return_year,
-            return_month=return_month,
-            return_type="lunar",
-            location_longitude=request.location_longitude if request.location_longitude is not None else natal.longitude,
-            location_latitude=request.location_latitude if request.location_latitude is not None else natal.latitude,
-            location_tz_str=request.location_tz_str if request.location_tz_str is not None else natal.tz_str
-        )
-        
-        # Obter os dados dos planetas do retorno
-        return_planets = get_planet_data(return_subject, request.language)
-        
-        # Obter os dados das casas do retorno
-        return_houses = get_houses_data(return_subject, request.language)
-        
-        # Obter os aspectos entre planetas do retorno e natais
-        aspects = []
-        if request.include_natal_comparison:
-            aspects = get_aspects_data(
-                return_subject, 
-                natal_subject, 
-                request.language, 
-                cross_aspects=True
-            )
-        
-        # Obter interpretações, se solicitado
-        interpretations = None
-        if request.include_interpretations:
-            interpretations = {
-                "planets": {},
-                "houses": {},
-                "aspects": []
-            }
-            
-            # Interpretações dos planetas do retorno
-            for planet_key, planet_data in return_planets.items():
-                planet_name = planet_data.name
-                sign = planet_data.sign
-                house = planet_data.house
-                
-                interp = get_planet_interpretation(planet_name, sign, house, request.language)
-                if interp:
-                    interpretations["planets"][planet_key] = interp
-            
-            # Interpretações das casas
-            for house_num, house_data in return_houses.items():
-                sign = house_data.sign
-                
-                interp = get_planet_interpretation(f"Casa {house_num}", sign, 0, request.language)
-                if interp:
-                    interpretations["houses"][house_num] = interp
-            
-            # Interpretações dos aspectos
-            for aspect in aspects:
-                p1_name = aspect.p1_name
-                p2_name = aspect.p2_name
-                aspect_name = aspect.aspect
-                
-                interp = get_planet_interpretation(f"{p1_name} {aspect_name} {p2_name}", "", 0, request.language)
-                if interp:
-                    interpretations["aspects"].append({
-                        "p1": p1_name,
-                        "p2": p2_name,
-                        "aspect": aspect_name,
-                        "interpretation": interp
-                    })
-        
-        # Criar a resposta
-        response = ReturnResponse(
-            input_data=request,
-            return_planets=return_planets,
-            return_houses=return_houses,
-            return_date=return_subject.utc_datetime.strftime("%Y-%m-%d %H:%M:%S"),
-            aspects=aspects,
-            house_system=natal.house_system,
-            interpretations=interpretations
-        )
-        
-        return response
+
+    except HTTPException:
+        raise
         
     except Exception as e:
         # Logar o erro
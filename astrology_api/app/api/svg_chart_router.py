@@ -13,7 +13,9 @@ from ..schemas.models import (
     SVGChartRequest, SVGChartResponse, 
     SVGChartBase64Response
 )
-from ..core.calculations import create_astrological_subject
+from ..core.calculations import create_astrological_subject, get_natal_subject
+from ..core.cache import get_cache_key
+from ..core.executor import run_compute
 from ..core.utils import svg_to_base64, validate_date, validate_timezone, validate_time
 from ..security import verify_api_key
 
@@ -24,6 +26,91 @@ router = APIRouter(
     dependencies=[Depends(verify_api_key)],
 )
 
+def build_svg_chart(request: SVGChartRequest) -> str:
+    """
+    Gera o conteúdo SVG de um gráfico já validado (executado fora do loop de eventos).
+    
+    Args:
+        request (SVGChartRequest): Dados para a geração do gráfico SVG.
+        
+    Returns:
+        str: Conteúdo SVG do gráfico gerado.
+    """
+    natal_req = request.natal_chart
+    
+    # Criar o objeto AstrologicalSubject para o mapa de trânsito, se necessário
+    transit_subject = None
+    if request.transit_chart and request.chart_type in ["transit", "combined"]:
+        transit_req = request.transit_chart
+        transit_subject = create_astrological_subject(
+            name="TransitChart",
+            year=transit_req.year,
+            month=transit_req.month,
+            day=transit_req.day,
+            hour=transit_req.hour,
+            minute=transit_req.minute,
+            longitude=transit_req.longitude,
+            latitude=transit_req.latitude,
+            tz_str=transit_req.tz_str,
+            house_system=transit_req.house_system
+        )
+    
+    # Obter o objeto AstrologicalSubject do mapa natal (reaproveitado entre requisições)
+    natal_subject = get_natal_subject(
+        name=natal_req.name if natal_req.name else "NatalChart",
+        year=natal_req.year,
+        month=natal_req.month,
+        day=natal_req.day,
+        hour=natal_req.hour,
+        minute=natal_req.minute,
+        longitude=natal_req.longitude,
+        latitude=natal_req.latitude,
+        tz_str=natal_req.tz_str,
+        house_system=natal_req.house_system
+    )
+    
+    # Definir o tipo de gráfico para o Kerykeion
+    chart_type = "Natal"
+    if request.chart_type == "transit":
+        chart_type = "Transit"
+    elif request.chart_type == "combined":
+        chart_type = "Composite"  # ou "Combined", dependendo da versão do Kerykeion
+    
+    # Criar um diretório temporário para salvar o SVG
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Definir o nome do arquivo temporário
+        temp_file = os.path.join(temp_dir, "chart.svg")
+        
+        # Criar o gerador de gráficos SVG
+        chart_svg_generator = KerykeionChartSVG(
+            natal_subject,
+            second_obj=transit_subject,
+            chart_type=chart_type,
+            new_output_directory=temp_dir,
+            filename="chart.svg",
+            # Outras opções podem ser adicionadas aqui, dependendo da versão do Kerykeion
+            # Exemplo: aspectarian, houses_system, black_bg, etc.
+        )
+        
+        # Gerar o SVG
+        chart_svg_generator.makeSVG()
+        
+        # Ler o conteúdo SVG
+        svg_content = ""
+        if hasattr(chart_svg_generator, 'svg_string') and chart_svg_generator.svg_string:
+            svg_content = chart_svg_generator.svg_string
+        else:
+            try:
+                with open(temp_file, 'r', encoding='utf-8') as f:
+                    svg_content = f.read()
+            except FileNotFoundError:
+                raise HTTPException(
+                    status_code=500,
+                    detail="Erro ao gerar gráfico SVG: arquivo SVG não encontrado"
+                )
+        
+        return svg_content
+
 @router.post("/svg_chart", response_class=Response)
 async def generate_svg_chart(request: SVGChartRequest):
     """
@@ -51,7 +138,6 @@ async def generate_svg_chart(request: SVGChartRequest):
             raise HTTPException(status_code=400, detail="Fuso horário natal inválido")
         
         # Validar os dados de entrada do mapa de trânsito, se fornecido
-        transit_subject = None
         if request.transit_chart and request.chart_type in ["transit", "combined"]:
             transit_req = request.transit_chart
             if not validate_date(transit_req.year, transit_req.month, transit_req.day):
@@ -62,80 +148,20 @@ async def generate_svg_chart(request: SVGChartRequest):
             
             if not validate_timezone(transit_req.tz_str):
                 raise HTTPException(status_code=400, detail="Fuso horário de trânsito inválido")
-            
-            # Criar o objeto AstrologicalSubject para o mapa de trânsito
-            transit_subject = create_astrological_subject(
-                name="TransitChart",
-                year=transit_req.year,
-                month=transit_req.month,
-                day=transit_req.day,
-                hour=transit_req.hour,
-                minute=transit_req.minute,
-                longitude=transit_req.longitude,
-                latitude=transit_req.latitude,
-                tz_str=transit_req.tz_str,
-                house_system=transit_req.house_system
-            )
-        
-        # Criar o objeto AstrologicalSubject para o mapa natal
-        natal_subject = create_astrological_subject(
-            name=natal_req.name if natal_req.name else "NatalChart",
-            year=natal_req.year,
-            month=natal_req.month,
-            day=natal_req.day,
-            hour=natal_req.hour,
-            minute=natal_req.minute,
-            longitude=natal_req.longitude,
-            latitude=natal_req.latitude,
-            tz_str=natal_req.tz_str,
-            house_system=natal_req.house_system
+        
+        svg_content = await run_compute(
+            "svg_chart", build_svg_chart, request,
+            key=get_cache_key("svg_chart", **request.model_dump())
         )
         
-        # Definir o tipo de gráfico para o Kerykeion
-        chart_type = "Natal"
-        if request.chart_type == "transit":
-            chart_type = "Transit"
-        elif request.chart_type == "combined":
-            chart_type = "Composite"  # ou "Combined", dependendo da versão do Kerykeion
-        
-        # Criar um diretório temporário para salvar o SVG
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Definir o nome do arquivo temporário
-            temp_file = os.path.join(temp_dir, "chart.svg")
-            
-            # Criar o gerador de gráficos SVG
-            chart_svg_generator = KerykeionChartSVG(
-                natal_subject,
-                second_obj=transit_subject,
-                chart_type=chart_type,
-                new_output_directory=temp_dir,
-                filename="chart.svg",
-                # Outras opções podem ser adicionadas aqui, dependendo da versão do Kerykeion
-                # Exemplo: aspectarian, houses_system, black_bg, etc.
-            )
-            
-            # Gerar o SVG
-            chart_svg_generator.makeSVG()
-            
-            # Ler o conteúdo SVG
-            svg_content = ""
-            if hasattr(chart_svg_generator, 'svg_string') and chart_svg_generator.svg_string:
-                svg_content = chart_svg_generator.svg_string
-            else:
-                try:
-                    with open(temp_file, 'r', encoding='utf-8') as f:
-                        svg_content = f.read()
-                except FileNotFoundError:
-                    raise HTTPException(
-                        status_code=500,
-                        detail="Erro ao gerar gráfico SVG: arquivo SVG não encontrado"
-                    )
-            
-            # Retornar o conteúdo SVG
-            return Response(
-                content=svg_content,
-                media_type="image/svg+xml"
-            )
+        # Retornar o conteúdo SVG
+        return Response(
+            content=svg_content,
+            media_type="image/svg+xml"
+        )
+        
+    except HTTPException:
+        raise
         
     except Exception as e:
         # Logar o erro
@@ -11,7 +11,9 @@ import os
 import base64
 
 from ..schemas.models import SVGChartRequest, SVGChartBase64Response
-from ..core.calculations import create_astrological_subject
+from ..core.calculations import create_astrological_subject, get_natal_subject
+from ..core.cache import get_cache_key
+from ..core.executor import run_compute
 from ..core.utils import validate_date, validate_timezone, validate_time
 from ..security import verify_api_key
 from ..svg.svg_generator_fixed import SVGChartGenerator
@@ -22,6 +24,62 @@ router = APIRouter(
     dependencies=[Depends(verify_api_key)],
 )
 
+def build_svg_chart(request: SVGChartRequest) -> str:
+    """
+    Gera o conteúdo SVG de um gráfico já validado (executado fora do loop de eventos).
+    """
+    natal_req = request.natal_chart
+
+    # Converter house_system para string
+    house_system_str = str(natal_req.house_system) if natal_req.house_system else "Placidus"
+    
+    # Obter subject do mapa natal (reaproveitado entre requisições)
+    natal_subject = get_natal_subject(
+        name=natal_req.name if natal_req.name else "NatalChart",
+        year=natal_req.year,
+        month=natal_req.month,
+        day=natal_req.day,
+        hour=natal_req.hour,
+        minute=natal_req.minute,
+        longitude=natal_req.longitude,
+        latitude=natal_req.latitude,
+        tz_str=natal_req.tz_str,
+        house_system=house_system_str
+    )
+
+    # Criar subject para trânsitos se necessário
+    transit_subject = None
+    if request.transit_chart and request.chart_type in ["transit", "combined"]:
+        trans_req = request.transit_chart
+
+        transit_system_str = str(trans_req.house_system) if trans_req.house_system else "Placidus"
+        
+        transit_subject = create_astrological_subject(
+            name="Transit",
+            year=trans_req.year,
+            month=trans_req.month,
+            day=trans_req.day,
+            hour=trans_req.hour,
+            minute=trans_req.minute,
+            longitude=trans_req.longitude,
+            latitude=trans_req.latitude,
+            tz_str=trans_req.tz_str,
+            house_system=transit_system_str
+        )
+
+    # Criar o gerador de SVG
+    svg_generator = SVGChartGenerator(natal_subject, transit_subject)
+
+    # Gerar o SVG
+    svg_content = svg_generator.generate_svg(
+        chart_type=request.chart_type,
+        show_aspects=request.show_aspects,
+        language=request.language,
+        theme=request.theme
+    )
+
+    return svg_content
+
 @router.post("/svg_chart", 
     response_class=Response,
     responses={
@@ -45,55 +103,16 @@ async def generate_svg_chart(request: SVGChartRequest):
         validate_time(natal_req.hour, natal_req.minute)
         validate_timezone(natal_req.tz_str)
 
-        # Converter house_system para string
-        house_system_str = str(natal_req.house_system) if natal_req.house_system else "Placidus"
-        
-        # Criar subject para o mapa natal
-        natal_subject = create_astrological_subject(
-            name=natal_req.name if natal_req.name else "NatalChart",
-            year=natal_req.year,
-            month=natal_req.month,
-            day=natal_req.day,
-            hour=natal_req.hour,
-            minute=natal_req.minute,
-            longitude=natal_req.longitude,
-            latitude=natal_req.latitude,
-            tz_str=natal_req.tz_str,
-            house_system=house_system_str
-        )
-
-        # Criar subject para trânsitos se necessário
-        transit_subject = None
         if request.transit_chart and request.chart_type in ["transit", "combined"]:
             trans_req = request.transit_chart
             validate_date(trans_req.year, trans_req.month, trans_req.day)
             validate_time(trans_req.hour, trans_req.minute)
             validate_timezone(trans_req.tz_str)
 
-            transit_system_str = str(trans_req.house_system) if trans_req.house_system else "Placidus"
-            
-            transit_subject = create_astrological_subject(
-                name="Transit",
-                year=trans_req.year,
-                month=trans_req.month,
-                day=trans_req.day,
-                hour=trans_req.hour,
-                minute=trans_req.minute,
-                longitude=trans_req.longitude,
-                latitude=trans_req.latitude,
-                tz_str=trans_req.tz_str,
-                house_system=transit_system_str
-            )
-
-        # Criar o gerador de SVG
-        svg_generator = SVGChartGenerator(natal_subject, transit_subject)
-
-        # Gerar o SVG
-        svg_content = svg_generator.generate_svg(
-            chart_type=request.chart_type,
-            show_aspects=request.show_aspects,
-            language=request.language,
-            theme=request.theme
+        # Gerar o SVG fora do loop de eventos
+        svg_content = await run_compute(
+            "svg_chart", build_svg_chart, request,
+            key=get_cache_key("svg_chart", **request.model_dump())
         )
 
         # Retornar o SVG
@@ -103,6 +122,8 @@ async def generate_svg_chart(request: SVGChartRequest):
             headers={"Content-Disposition": f"inline; filename=chart_{natal_req.name or 'astrology'}.svg"}
         )
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
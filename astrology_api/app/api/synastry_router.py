@@ -8,12 +8,14 @@ from typing import Dict, List, Optional
 
 from ..schemas.models import SynastryRequest, SynastryResponse, HouseSystemType, LanguageType
 from ..core.calculations import (
-    create_astrological_subject,
+    get_natal_subject,
     get_planet_data,
     get_synastry_aspects_data
 )
+from ..core.cache import get_cache_key
+from ..core.executor import run_compute
 from ..core.utils import validate_date, validate_timezone, validate_time
-from ..interpretations.text_search import get_aspect_interpretation
+from ..interpretations.text_search import aspect_interpretation_query, get_interpretations
 from ..security import verify_api_key
 
 # Criar o router
@@ -23,6 +25,94 @@ router = APIRouter(
     dependencies=[Depends(verify_api_key)],
 )
 
+def build_synastry(request: SynastryRequest) -> SynastryResponse:
+    """
+    Calcula a sinastria já validada (executado fora do loop de eventos).
+
+    Args:
+        request (SynastryRequest): Dados para o cálculo da sinastria.
+
+    Returns:
+        SynastryResponse: Dados da sinastria calculada.
+    """
+    chart1 = request.chart1
+    chart2 = request.chart2
+
+    # Usar valores padrão se não fornecidos
+    house_system1: HouseSystemType = chart1.house_system or "Placidus"
+    house_system2: HouseSystemType = chart2.house_system or "Placidus"
+    language: LanguageType = request.language or "pt"
+    
+    # Obter os objetos AstrologicalSubject (reaproveitados entre requisições)
+    subject1 = get_natal_subject(
+        name=chart1.name if chart1.name else "Chart1",
+        year=chart1.year,
+        month=chart1.month,
+        day=chart1.day,
+        hour=chart1.hour,
+        minute=chart1.minute,
+        longitude=chart1.longitude,
+        latitude=chart1.latitude,
+        tz_str=chart1.tz_str,
+        house_system=house_system1
+    )
+    
+    subject2 = get_natal_subject(
+        name=chart2.name if chart2.name else "Chart2",
+        year=chart2.year,
+        month=chart2.month,
+        day=chart2.day,
+        hour=chart2.hour,
+        minute=chart2.minute,
+        longitude=chart2.longitude,
+        latitude=chart2.latitude,
+        tz_str=chart2.tz_str,
+        house_system=house_system2
+    )
+    
+    # Obter os dados dos planetas para ambos os mapas
+    planets1 = get_planet_data(subject1, language)
+    planets2 = get_planet_data(subject2, language)
+    
+    # Obter os aspectos entre os planetas dos dois mapas
+    aspects = get_synastry_aspects_data(subject1, subject2, language)
+    
+    # Obter interpretações dos aspectos, se solicitado
+    interpretations = None
+    if request.include_interpretations:
+        interpretations = {
+            "aspects": []
+        }
+        
+        # Buscar as interpretações de todos os aspectos em um único lote
+        texts = get_interpretations(
+            {i: aspect_interpretation_query(aspect.p1_name, aspect.p2_name, aspect.aspect) for i, aspect in enumerate(aspects)},
+            request.language
+        )
+        
+        for i, aspect in enumerate(aspects):
+            interp = texts.get(i)
+            if interp:
+                interpretations["aspects"].append({
+                    "p1": aspect.p1_name,
+                    "p2": aspect.p2_name,
+                    "aspect": aspect.aspect,
+                    "interpretation": interp
+                })
+    
+    # Criar a resposta
+    response = SynastryResponse(
+        input_data=request,
+        chart1_planets=planets1,
+        chart2_planets=planets2,
+        aspects=aspects,
+        chart1_house_system=chart1.house_system,
+        chart2_house_system=chart2.house_system,
+        interpretations=interpretations
+    )
+    
+    return response
+
 @router.post("/synastry", response_model=SynastryResponse)
 async def calculate_synastry(request: SynastryRequest):
     """
@@ -60,78 +150,13 @@ async def calculate_synastry(request: SynastryRequest):
         if not validate_timezone(chart2.tz_str):
             raise HTTPException(status_code=400, detail="Fuso horário do segundo mapa inválido")
         
-        # Usar valores padrão se não fornecidos
-        house_system1: HouseSystemType = chart1.house_system or "Placidus"
-        house_system2: HouseSystemType = chart2.house_system or "Placidus"
-        language: LanguageType = request.language or "pt"
-        
-        # Criar os objetos AstrologicalSubject
-        subject1 = create_astrological_subject(
-            name=chart1.name if chart1.name else "Chart1",
-            year=chart1.year,
-            month=chart1.month,
-            day=chart1.day,
-            hour=chart1.hour,
-            minute=chart1.minute,
-            longitude=chart1.longitude,
-            latitude=chart1.latitude,
-            tz_str=chart1.tz_str,
-            house_system=house_system1
-        )
-        
-        subject2 = create_astrological_subject(
-            name=chart2.name if chart2.name else "Chart2",
-            year=chart2.year,
-            month=chart2.month,
-            day=chart2.day,
-            hour=chart2.hour,
-            minute=chart2.minute,
-            longitude=chart2.longitude,
-            latitude=chart2.latitude,
-            tz_str=chart2.tz_str,
-            house_system=house_system2
+        return await run_compute(
+            "synastry", build_synastry, request,
+            key=get_cache_key("synastry", **request.model_dump())
         )
-        
-        # Obter os dados dos planetas para ambos os mapas
-        planets1 = get_planet_data(subject1, language)
-        planets2 = get_planet_data(subject2, language)
-        
-        # Obter os aspectos entre os planetas dos dois mapas
-        aspects = get_synastry_aspects_data(subject1, subject2, language)
-        
-        # Obter interpretações dos aspectos, se solicitado
-        interpretations = None
-        if request.include_interpretations:
-            interpretations = {
-                "aspects": []
-            }
-            
-            for aspect in aspects:
-                p1_name = aspect.p1_name
-                p2_name = aspect.p2_name
-                aspect_name = aspect.aspect
-                
-                interp = get_aspect_interpretation(p1_name, p2_name, aspect_name, request.language)
-                if interp:
-                    interpretations["aspects"].append({
-                        "p1": p1_name,
-                        "p2": p2_name,
-                        "aspect": aspect_name,
-                        "interpretation": interp
-                    })
-        
-        # Criar a resposta
-        response = SynastryResponse(
-            input_data=request,
-            chart1_planets=planets1,
-            chart2_planets=planets2,
-            aspects=aspects,
-            chart1_house_system=chart1.house_system,
-            chart2_house_system=chart2.house_system,
-            interpretations=interpretations
-        )
-        
-        return response
+
+    except HTTPException:
+        raise
         
     except Exception as e:
         # Logar o erro
@@ -0,0 +1,65 @@
+"""
+Router para os endpoints de sistema.
+
+Este módulo contém os endpoints de monitoramento da execução dos cálculos, do cache
+e do índice de busca das interpretações.
+"""
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, Dict
+
+from ..core.cache import get_cache_stats
+from ..core.executor import get_executor_metrics
+from ..interpretations.text_search import get_search_index_stats, refresh_search_index
+from ..security import verify_api_key
+
+# Criar o router
+router = APIRouter(
+    prefix="/api/v1/system",
+    tags=["System"],
+    dependencies=[Depends(verify_api_key)],
+)
+
+@router.get("/executor", response_model=Dict[str, Any])
+async def executor_metrics():
+    """
+    Retorna a configuração dos pools de execução e as métricas de fila por endpoint.
+
+    Returns:
+        Dict[str, Any]: Número de workers de cada pool e, por endpoint, o tipo de pool,
+            o limite de concorrência, a fila atual, a maior fila observada, os cálculos
+            em execução, concluídos e com falha, e os tempos acumulados de espera e execução.
+    """
+    return get_executor_metrics()
+
+@router.get("/cache", response_model=Dict[str, Any])
+async def cache_stats():
+    """
+    Retorna os contadores dos caches em memória e em disco.
+
+    Returns:
+        Dict[str, Any]: Para a memória, entradas, bytes, limites, acertos, falhas,
+            taxa de acerto, remoções por LRU e expirações; para o disco, acertos e falhas.
+    """
+    return get_cache_stats()
+
+@router.get("/search-index", response_model=Dict[str, Any])
+async def search_index_stats():
+    """
+    Retorna informações sobre a versão atual do índice de busca das interpretações.
+
+    Returns:
+        Dict[str, Any]: Versão, origem, parágrafos, termos, ocorrências e arquivos indexados.
+    """
+    return get_search_index_stats()
+
+@router.post("/search-index/refresh", response_model=Dict[str, Any])
+async def refresh_search_index_now():
+    """
+    Reindexa imediatamente os textos processados adicionados, alterados ou removidos.
+
+    Returns:
+        Dict[str, Any]: Se uma nova versão foi publicada e as informações do índice.
+    """
+    updated = await run_in_threadpool(refresh_search_index)
+    return {"updated": updated, **get_search_index_stats()}
@@ -4,20 +4,40 @@ Router para os endpoints de trânsitos.
 Este módulo contém os endpoints relacionados ao cálculo de trânsitos planetários.
 """
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List, Tuple
+from datetime import datetime
+import json
+
+import pytz
 
 from ..schemas.models import (
     TransitRequest, TransitResponse,
-    TransitsToNatalRequest, TransitsToNatalResponse
+    TransitsToNatalRequest, TransitsToNatalResponse,
+    TransitCalendarRequest, TransitCalendarEvent
 )
 from ..core.calculations import (
-    create_astrological_subject,
+    get_natal_subject,
     get_planet_data,
-    get_houses_data,
-    get_aspects_data,
-    get_aspects_between_subjects
+    get_kerykeion_house_system_code,
+    get_snapshot_planet_data,
+    get_aspects_between_positions
+)
+from ..core.aspects import MAJOR_ASPECTS
+from ..core.cache import get_cache_key
+from ..core.ephemeris import (
+    BODY_IDS, BODY_NAMES, MAJOR_PLANETS,
+    datetime_from_julian_day, julian_day_from_datetime
+)
+from ..core.ephemeris_backends import get_backend
+from ..core.executor import run_compute
+from ..core.sky import get_sky, sky_snapshot
+from ..core.transit_calendar import (
+    CALENDAR_CHUNK_DAYS, DEFAULT_TRANSIT_BODIES,
+    calendar_chunks, find_transit_events, natal_points_from_positions
 )
 from ..core.utils import validate_date, validate_timezone, validate_time
+from ..interpretations.translations import translate_aspect, translate_planet
 from ..security import verify_api_key
 
 # Criar o router
@@ -27,6 +47,112 @@ router = APIRouter(
     dependencies=[Depends(verify_api_key)],
 )
 
+def transit_julian_day(request: TransitRequest) -> float:
+    """Converte a data e hora locais do trânsito para dia juliano (UT)."""
+    local = datetime(request.year, request.month, request.day, request.hour, request.minute)
+    return julian_day_from_datetime(pytz.timezone(request.tz_str).localize(local).astimezone(pytz.utc))
+
+def build_transit_chart(request: TransitRequest) -> TransitResponse:
+    """
+    Calcula um mapa de trânsito já validado (executado fora do loop de eventos).
+
+    Os planetas vêm do céu do minuto UT, compartilhado entre todos os locais;
+    apenas as casas são calculadas para o local da requisição.
+
+    Args:
+        request (TransitRequest): Dados para o cálculo do mapa de trânsito.
+
+    Returns:
+        TransitResponse: Dados do mapa de trânsito calculado.
+    """
+    snapshot = sky_snapshot(
+        transit_julian_day(request),
+        request.latitude,
+        request.longitude,
+        get_kerykeion_house_system_code(request.house_system or "Placidus"),
+        "TransitChart",
+        request.tz_str
+    )
+    
+    # Obter os dados dos planetas (com as casas do local)
+    planets = get_snapshot_planet_data(snapshot, request.language)
+    
+    # Criar a resposta
+    response = TransitResponse(
+        input_data=request,
+        planets=planets,
+        house_system=request.house_system,
+        interpretations=None  # Implementação futura
+    )
+    
+    return response
+
+def build_transits_to_natal(request: TransitsToNatalRequest) -> TransitsToNatalResponse:
+    """
+    Calcula os trânsitos sobre um mapa natal já validado (executado fora do loop de eventos).
+
+    Args:
+        request (TransitsToNatalRequest): Dados para o cálculo dos trânsitos sobre o mapa natal.
+
+    Returns:
+        TransitsToNatalResponse: Dados dos trânsitos sobre o mapa natal.
+    """
+    natal_req = request.natal
+    transit_req = request.transit
+
+    # Obter o objeto AstrologicalSubject do mapa natal (reaproveitado entre requisições)
+    natal_subject = get_natal_subject(
+        name=natal_req.name if natal_req.name else "NatalChart",
+        year=natal_req.year,
+        month=natal_req.month,
+        day=natal_req.day,
+        hour=natal_req.hour,
+        minute=natal_req.minute,
+        longitude=natal_req.longitude,
+        latitude=natal_req.latitude,
+        tz_str=natal_req.tz_str,
+        house_system=natal_req.house_system
+    )
+    
+    # Céu do minuto do trânsito, compartilhado entre locais, com as casas do local do trânsito
+    transit_jd = transit_julian_day(transit_req)
+    transit_snapshot = sky_snapshot(
+        transit_jd,
+        transit_req.latitude,
+        transit_req.longitude,
+        get_kerykeion_house_system_code(transit_req.house_system or "Placidus"),
+        "TransitChart",
+        transit_req.tz_str
+    )
+    
+    # Obter os dados dos planetas natais
+    natal_planets = get_planet_data(natal_subject, natal_req.language)
+    
+    # Obter os dados dos planetas de trânsito
+    transit_planets = get_snapshot_planet_data(transit_snapshot, transit_req.language)
+    
+    # Obter os aspectos entre os planetas natais e de trânsito
+    aspects = get_aspects_between_positions(
+        get_backend().positions_at(natal_subject.julian_day),
+        get_sky(transit_jd),
+        "natal",
+        "transit",
+        transit_req.language
+    )
+    
+    # Criar a resposta
+    response = TransitsToNatalResponse(
+        input_data=request,
+        natal_planets=natal_planets,
+        transit_planets=transit_planets,
+        aspects=aspects,
+        natal_house_system=natal_req.house_system,
+        transit_house_system=transit_req.house_system,
+        interpretations=None  # Implementação futura
+    )
+    
+    return response
+
 @router.post("/transit_chart", response_model=TransitResponse)
 async def calculate_transit_chart(request: TransitRequest):
     """
@@ -52,32 +178,13 @@ async def calculate_transit_chart(request: TransitRequest):
         if not validate_timezone(request.tz_str):
             raise HTTPException(status_code=400, detail="Fuso horário inválido")
         
-        # Criar o objeto AstrologicalSubject
-        subject = create_astrological_subject(
-            name="TransitChart",
-            year=request.year,
-            month=request.month,
-            day=request.day,
-            hour=request.hour,
-            minute=request.minute,
-            longitude=request.longitude,
-            latitude=request.latitude,
-            tz_str=request.tz_str,
-            house_system=request.house_system
+        return await run_compute(
+            "transit_chart", build_transit_chart, request,
+            key=get_cache_key("transit_chart", **request.model_dump())
         )
-        
-        # Obter os dados dos planetas
-        planets = get_planet_data(subject, request.language)
-        
-        # Criar a resposta
-        response = TransitResponse(
-            input_data=request,
-            planets=planets,
-            house_system=request.house_system,
-            interpretations=None  # Implementação futura
-        )
-        
-        return response
+
+    except HTTPException:
+        raise
         
     except Exception as e:
         # Logar o erro
@@ -126,61 +233,13 @@ async def calculate_transits_to_natal(request: TransitsToNatalRequest):
         if not validate_timezone(transit_req.tz_str):
             raise HTTPException(status_code=400, detail="Fuso horário de trânsito inválido")
         
-        # Criar o objeto AstrologicalSubject para o mapa natal
-        natal_subject = create_astrological_subject(
-            name=natal_req.name if natal_req.name else "NatalChart",
-            year=natal_req.year,
-            month=natal_req.month,
-            day=natal_req.day,
-            hour=natal_req.hour,
-            minute=natal_req.minute,
-            longitude=natal_req.longitude,
-            latitude=natal_req.latitude,
-            tz_str=natal_req.tz_str,
-            house_system=natal_req.house_system
+        return await run_compute(
+            "transits_to_natal", build_transits_to_natal, request,
+            key=get_cache_key("transits_to_natal", **request.model_dump())
         )
-        
-        # Criar o objeto AstrologicalSubject para o mapa de trânsito
-        transit_subject = create_astrological_subject(
-            name="TransitChart",
-            year=transit_req.year,
-            month=transit_req.month,
-            day=transit_req.day,
-            hour=transit_req.hour,
-            minute=transit_req.minute,
-            longitude=transit_req.longitude,
-            latitude=transit_req.latitude,
-            tz_str=transit_req.tz_str,
-            house_system=transit_req.house_system
-        )
-        
-        # Obter os dados dos planetas natais
-        natal_planets = get_planet_data(natal_subject, natal_req.language)
-        
-        # Obter os dados dos planetas de trânsito
-        transit_planets = get_planet_data(transit_subject, transit_req.language)
-        
-        # Obter os aspectos entre os planetas natais e de trânsito
-        aspects = get_aspects_between_subjects(
-            natal_subject,
-            transit_subject,
-            "natal",
-            "transit",
-            transit_req.language
-        )
-        
-        # Criar a resposta
-        response = TransitsToNatalResponse(
-            input_data=request,
-            natal_planets=natal_planets,
-            transit_planets=transit_planets,
-            aspects=aspects,
-            natal_house_system=natal_req.house_system,
-            transit_house_system=transit_req.house_system,
-            interpretations=None  # Implementação futura
-        )
-        
-        return response
+
+    except HTTPException:
+        raise
         
     except Exception as e:
         # Logar o erro
@@ -191,3 +250,144 @@ async def calculate_transits_to_natal(request: TransitsToNatalRequest):
             status_code=500,
             detail=f"Erro ao calcular trânsitos sobre mapa natal: {str(e)}"
         )
+
+def calendar_natal_points(request: TransitCalendarRequest) -> Tuple[List[str], List[float]]:
+    """
+    Calcula os pontos natais do calendário de trânsitos: os corpos e, opcionalmente, os ângulos.
+
+    Args:
+        request (TransitCalendarRequest): Dados do calendário, já validados.
+
+    Returns:
+        Tuple[List[str], List[float]]: Nomes originais (em inglês) e longitudes dos pontos.
+    """
+    natal_req = request.natal
+    natal_bodies = list(request.natal_bodies or MAJOR_PLANETS)
+    local = datetime(natal_req.year, natal_req.month, natal_req.day, natal_req.hour, natal_req.minute)
+    natal_jd = julian_day_from_datetime(pytz.timezone(natal_req.tz_str).localize(local).astimezone(pytz.utc))
+
+    names = [BODY_NAMES[body] for body in natal_bodies]
+    angles: List[float] = []
+    if request.include_angles:
+        cusps = get_backend().houses(natal_jd, natal_req.latitude, natal_req.longitude, get_kerykeion_house_system_code(natal_req.house_system or "Placidus"))
+        angles = [float(cusps[0]), float(cusps[9])]
+        names += ["Ascendant", "Midheaven"]
+
+    return names, natal_points_from_positions(natal_jd, natal_bodies, angles)
+
+def format_calendar_event(event: Dict[str, float], point_names: List[str], tz: pytz.BaseTzInfo, language: str) -> TransitCalendarEvent:
+    """
+    Converte um evento calculado em uma linha da resposta do calendário.
+
+    Args:
+        event (Dict[str, float]): Evento retornado por find_transit_events.
+        point_names (List[str]): Nomes originais dos pontos natais.
+        tz (pytz.BaseTzInfo): Fuso horário do calendário.
+        language (str): Idioma dos nomes.
+
+    Returns:
+        TransitCalendarEvent: Evento formatado.
+    """
+    date_utc = datetime_from_julian_day(event["jd"])
+    planet = BODY_NAMES[event["body"]]
+    point = point_names[event["point"]]
+    aspect = MAJOR_ASPECTS.names[event["aspect"]]
+    return TransitCalendarEvent(
+        date_utc=date_utc.isoformat(),
+        date_local=date_utc.astimezone(tz).isoformat(),
+        event=event["event"],
+        transit_planet=translate_planet(planet, language),
+        transit_planet_original=planet,
+        natal_point=translate_planet(point, language),
+        natal_point_original=point,
+        aspect=translate_aspect(aspect, language),
+        aspect_original=aspect,
+        aspect_degrees=float(MAJOR_ASPECTS.angles[event["aspect"]]),
+        transit_longitude=round(event["longitude"], 4),
+        retrograde=event["speed"] < 0
+    )
+
+@router.post("/transits_to_natal/calendar", response_class=StreamingResponse)
+async def calculate_transit_calendar(request: TransitCalendarRequest):
+    """
+    Calcula o calendário de trânsitos sobre um mapa natal em um intervalo de datas.
+
+    Para cada aspecto entre um corpo em trânsito e um ponto natal são retornados os
+    instantes de entrada no orbe, de aspecto exato e de saída do orbe, incluindo os
+    retornos causados por movimento retrógrado. Os eventos são enviados em ordem
+    cronológica, um objeto JSON por linha (NDJSON), à medida que cada bloco de
+    CALENDAR_CHUNK_DAYS dias é calculado.
+
+    Args:
+        request (TransitCalendarRequest): Dados do mapa natal e do intervalo.
+
+    Returns:
+        StreamingResponse: Eventos (TransitCalendarEvent) em NDJSON.
+
+    Raises:
+        HTTPException: Se os dados de entrada forem inválidos ou ocorrer um erro no cálculo.
+    """
+    try:
+        # Validar os dados de entrada do mapa natal
+        natal_req = request.natal
+        if not validate_date(natal_req.year, natal_req.month, natal_req.day):
+            raise HTTPException(status_code=400, detail="Data natal inválida")
+
+        if not validate_time(natal_req.hour, natal_req.minute):
+            raise HTTPException(status_code=400, detail="Hora natal inválida")
+
+        if not validate_timezone(natal_req.tz_str):
+            raise HTTPException(status_code=400, detail="Fuso horário natal inválido")
+
+        # Validar o intervalo do calendário
+        if not validate_date(request.start_year, request.start_month, request.start_day):
+            raise HTTPException(status_code=400, detail="Data de início inválida")
+
+        tz_str = request.tz_str or natal_req.tz_str
+        if not validate_timezone(tz_str):
+            raise HTTPException(status_code=400, detail="Fuso horário do calendário inválido")
+
+        transit_bodies = tuple(request.transit_bodies or DEFAULT_TRANSIT_BODIES)
+        for body in transit_bodies + tuple(request.natal_bodies or ()):
+            if body not in BODY_IDS:
+                raise HTTPException(status_code=400, detail=f"Corpo não suportado: {body}")
+
+        point_names, natal_points = await run_compute("transit_calendar", calendar_natal_points, request)
+        tz = pytz.timezone(tz_str)
+        start = tz.localize(datetime(request.start_year, request.start_month, request.start_day))
+        jd_start = julian_day_from_datetime(start.astimezone(pytz.utc))
+        jd_end = jd_start + request.days
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        # Logar o erro
+        print(f"Erro ao calcular calendário de trânsitos: {str(e)}")
+
+        # Retornar erro ao cliente
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao calcular calendário de trânsitos: {str(e)}"
+        )
+
+    async def stream_events() -> AsyncIterator[str]:
+        try:
+            for number, (chunk_start, chunk_end) in enumerate(calendar_chunks(jd_start, jd_end, CALENDAR_CHUNK_DAYS)):
+                events = await run_compute(
+                    "transit_calendar", find_transit_events,
+                    natal_points, chunk_start, chunk_end, transit_bodies, MAJOR_ASPECTS, request.step_days, number == 0,
+                    key=get_cache_key(
+                        "transit_calendar", natal_points=natal_points, start=chunk_start, end=chunk_end,
+                        bodies=transit_bodies, step_days=request.step_days, include_active=number == 0
+                    )
+                )
+                for event in events:
+                    yield format_calendar_event(event, point_names, tz, request.language).model_dump_json() + "\n"
+
+        except Exception as e:
+            # A resposta já começou: o erro é enviado como a última linha
+            print(f"Erro ao calcular calendário de trânsitos: {str(e)}")
+            yield json.dumps({"error": f"Erro ao calcular calendário de trânsitos: {str(e)}"}) + "\n"
+
+    return StreamingResponse(stream_events(), media_type="application/x-ndjson")
@@ -0,0 +1,129 @@
+"""
+Módulo de cálculo vetorizado de aspectos para a aplicação AstroAPI.
+
+Este módulo calcula, de uma só vez com NumPy, a matriz N×M de distâncias angulares
+entre dois vetores de longitudes e a compara com uma tabela de aspectos e orbes.
+Os aspectos natais, de trânsito, de sinastria e de direções usam o mesmo motor,
+o que mantém os resultados consistentes entre os endpoints.
+"""
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+class AspectTable:
+    """
+    Tabela de aspectos com ângulos e orbes.
+
+    Attributes:
+        names (Tuple[str, ...]): Nomes originais (em inglês) dos aspectos.
+        angles (np.ndarray): Ângulo exato de cada aspecto em graus.
+        orbs (np.ndarray): Orbe máximo de cada aspecto em graus.
+    """
+    __slots__ = ("names", "angles", "orbs")
+
+    def __init__(self, names: Sequence[str], angles: Sequence[float], orbs: Sequence[float]) -> None:
+        if not len(names) == len(angles) == len(orbs):
+            raise ValueError("A tabela de aspectos precisa de um ângulo e um orbe por aspecto")
+        self.names = tuple(names)
+        self.angles = np.asarray(angles, dtype=np.float64)
+        self.orbs = np.asarray(orbs, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+# Aspectos principais e seus orbes
+MAJOR_ASPECTS = AspectTable(
+    names=("Conjunction", "Opposition", "Trine", "Square", "Sextile"),
+    angles=(0, 180, 120, 90, 60),
+    orbs=(8, 8, 6, 6, 4),
+)
+
+# Formato dos aspectos encontrados
+ASPECT_DTYPE = np.dtype([
+    ("i", np.int32),          # Índice do ponto no primeiro vetor
+    ("j", np.int32),          # Índice do ponto no segundo vetor
+    ("aspect", np.int16),     # Índice do aspecto na tabela
+    ("angle", np.float64),    # Ângulo exato do aspecto
+    ("orbit", np.float64),    # Distância ao ângulo exato
+    ("diff", np.float64),     # Distância angular entre os pontos (0-180)
+    ("applying", np.bool_),   # Se o aspecto está se aplicando
+])
+
+def angular_distance(lon1: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    Calcula a matriz de distâncias angulares assinadas, em [-180, 180).
+
+    Args:
+        lon1 (np.ndarray): Longitudes do primeiro conjunto (N).
+        lon2 (np.ndarray): Longitudes do segundo conjunto (M).
+
+    Returns:
+        np.ndarray: Matriz N×M com lon2[j] - lon1[i] normalizado.
+    """
+    lon1 = np.asarray(lon1, dtype=np.float64)
+    lon2 = np.asarray(lon2, dtype=np.float64)
+    return (lon2[np.newaxis, :] - lon1[:, np.newaxis] + 180.0) % 360.0 - 180.0
+
+def find_aspects(
+    lon1: Sequence[float],
+    lon2: Sequence[float],
+    speed1: Optional[Sequence[float]] = None,
+    speed2: Optional[Sequence[float]] = None,
+    table: AspectTable = MAJOR_ASPECTS,
+    unique_pairs: bool = False
+) -> np.ndarray:
+    """
+    Encontra todos os aspectos entre dois vetores de longitudes.
+
+    Cada par (i, j) recebe no máximo um aspecto, o de menor orbe. Quando as
+    velocidades são informadas, o aspecto é marcado como aplicativo se o orbe
+    estiver diminuindo.
+
+    Args:
+        lon1 (Sequence[float]): Longitudes do primeiro conjunto (N).
+        lon2 (Sequence[float]): Longitudes do segundo conjunto (M).
+        speed1 (Optional[Sequence[float]]): Velocidades do primeiro conjunto.
+        speed2 (Optional[Sequence[float]]): Velocidades do segundo conjunto.
+        table (AspectTable): Tabela de aspectos e orbes. Padrão é MAJOR_ASPECTS.
+        unique_pairs (bool): Se True, considera apenas i < j (aspectos dentro
+            de um mesmo mapa, com lon1 e lon2 iguais).
+
+    Returns:
+        np.ndarray: Array estruturado com dtype ASPECT_DTYPE, ordenado por (i, j).
+    """
+    signed = angular_distance(lon1, lon2)
+    diff = np.abs(signed)
+
+    # Orbe de cada par para cada aspecto: N×M×K
+    orbit = np.abs(diff[..., np.newaxis] - table.angles)
+    orbit = np.where(orbit <= table.orbs, orbit, np.inf)
+
+    best = np.argmin(orbit, axis=2)
+    best_orbit = np.take_along_axis(orbit, best[..., np.newaxis], axis=2)[..., 0]
+    hit = np.isfinite(best_orbit)
+    if unique_pairs:
+        hit &= np.triu(np.ones_like(hit), k=1)
+
+    i, j = np.nonzero(hit)
+    result = np.empty(len(i), dtype=ASPECT_DTYPE)
+    result["i"] = i
+    result["j"] = j
+    result["aspect"] = best[i, j]
+    result["angle"] = table.angles[best[i, j]]
+    result["orbit"] = best_orbit[i, j]
+    result["diff"] = diff[i, j]
+
+    if speed1 is not None and speed2 is not None:
+        # Taxa de variação da distância e, a partir dela, do orbe
+        relative_speed = np.asarray(speed2, dtype=np.float64)[j] - np.asarray(speed1, dtype=np.float64)[i]
+        diff_rate = np.sign(signed[i, j]) * relative_speed
+        orbit_rate = np.sign(result["diff"] - result["angle"]) * diff_rate
+        result["applying"] = orbit_rate < 0
+    else:
+        result["applying"] = False
+
+    return result
+
+def aspect_names(hits: np.ndarray, table: AspectTable = MAJOR_ASPECTS) -> Tuple[str, ...]:
+    """Retorna os nomes originais dos aspectos encontrados."""
+    return tuple(table.names[k] for k in hits["aspect"])
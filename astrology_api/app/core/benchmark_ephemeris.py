@@ -0,0 +1,96 @@
+"""
+Comando de comparação dos backends de efemérides.
+
+Uso (a partir do diretório astrology_api):
+    python -m app.core.benchmark_ephemeris [--backends NOME ...] [--samples 2000] [--start-year 1900] [--end-year 2100] [--bodies CORPO ...] [--repeat 3]
+
+Avalia os mesmos instantes sorteados em cada backend, em lote (uma chamada a
+positions com todos os instantes) e um instante por vez (positions_at), e informa
+o tempo por instante e o maior erro de longitude contra o backend "swiss".
+"""
+from typing import Dict, List, Optional, Sequence
+import argparse
+import time
+
+import numpy as np
+import swisseph as swe
+
+from ..core.ephemeris import BODY_IDS, DEFAULT_BODIES
+from ..core.ephemeris_backends import available_backends, get_backend
+
+def _best_time(func, repeat: int) -> float:
+    """Menor tempo, em segundos, de `repeat` execuções da função."""
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started_at)
+    return best
+
+def benchmark_backends(
+    names: Sequence[str],
+    jds: np.ndarray,
+    bodies: Sequence[str] = DEFAULT_BODIES,
+    reference: str = "swiss",
+    repeat: int = 3
+) -> Dict[str, Dict[str, float]]:
+    """
+    Mede o tempo e o erro de cada backend nos mesmos instantes.
+
+    Args:
+        names (Sequence[str]): Nomes dos backends.
+        jds (np.ndarray): Dias julianos (UT) avaliados.
+        bodies (Sequence[str]): Chaves dos corpos. Padrão é DEFAULT_BODIES.
+        reference (str): Backend usado como referência do erro.
+        repeat (int): Execuções de cada medida (vale a mais rápida).
+
+    Returns:
+        Dict[str, Dict[str, float]]: Por backend, microssegundos por instante em lote e
+            um a um, e o maior erro de longitude contra a referência (segundos de arco).
+    """
+    bodies = tuple(bodies)
+    expected, _, _ = get_backend(reference).positions(jds, bodies)
+
+    report: Dict[str, Dict[str, float]] = {}
+    for name in names:
+        backend = get_backend(name)
+        longitude, _, _ = backend.positions(jds, bodies)
+        errors = np.abs((longitude - expected + 180.0) % 360.0 - 180.0) * 3600
+
+        batch = _best_time(lambda: backend.positions(jds, bodies), repeat)
+        single = _best_time(lambda: [backend.positions_at(float(jd), bodies) for jd in jds], repeat)
+        report[name] = {
+            "batch_us": batch / len(jds) * 1e6,
+            "single_us": single / len(jds) * 1e6,
+            "max_arcsec": float(errors.max()) if errors.size else 0.0,
+        }
+    return report
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Compara os backends de efemérides e imprime o relatório.
+
+    Args:
+        argv (Optional[List[str]]): Argumentos da linha de comando. Padrão é sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Compara os backends de efemérides.")
+    parser.add_argument("--backends", nargs="+", default=available_backends(), help="Backends comparados")
+    parser.add_argument("--samples", type=int, default=2000, help="Instantes sorteados")
+    parser.add_argument("--start-year", type=int, default=1900, help="Primeiro ano do sorteio")
+    parser.add_argument("--end-year", type=int, default=2100, help="Último ano do sorteio (incluído)")
+    parser.add_argument("--bodies", nargs="+", choices=sorted(BODY_IDS), default=list(DEFAULT_BODIES), help="Corpos avaliados")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções de cada medida")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do sorteio")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    jds = np.sort(rng.uniform(swe.julday(args.start_year, 1, 1, 0.0), swe.julday(args.end_year + 1, 1, 1, 0.0), args.samples))
+    report = benchmark_backends(args.backends, jds, args.bodies, repeat=args.repeat)
+
+    print(f"{len(jds)} instantes, {len(args.bodies)} corpos (microssegundos por instante; erro em segundos de arco)")
+    print(f"{'backend':<12} {'lote':>10} {'um a um':>10} {'erro máx':>10}")
+    for name, row in report.items():
+        print(f"{name:<12} {row['batch_us']:>10.2f} {row['single_us']:>10.2f} {row['max_arcsec']:>10.5f}")
+
+if __name__ == "__main__":
+    main()
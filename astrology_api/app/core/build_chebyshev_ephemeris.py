@@ -0,0 +1,191 @@
+"""
+Comando de construção offline das efemérides de Chebyshev.
+
+Uso (a partir do diretório astrology_api):
+    python -m app.core.build_chebyshev_ephemeris [--output ARQUIVO] [--start-year 1900] [--end-year 2100] [--bodies CORPO ...] [--workers N] [--validate N] [--validate-only]
+
+Para cada corpo e segmento, amostra o Swiss Ephemeris nos nós de Chebyshev, ajusta
+a série de longitude e latitude por mínimos quadrados e mede o erro em pontos
+intermediários. Com --validate N, compara N instantes sorteados com o Swiss
+Ephemeris e informa o erro máximo de cada corpo; com --validate-only, apenas
+valida um arquivo já gravado.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import argparse
+import os
+import time
+
+import numpy as np
+import swisseph as swe
+from numpy.polynomial import chebyshev
+
+from ..core.build_ephemeris_table import sample_positions_parallel
+from ..core.chebyshev import (
+    COMPONENTS, ChebyshevEphemeris, ChebyshevSeries, load_chebyshev_ephemeris, write_chebyshev_ephemeris
+)
+from ..core.ephemeris import BODY_IDS, CHEBYSHEV_EPHEMERIS_PATH, EPHEMERIS_TABLE_TOLERANCE
+from ..core.ephemeris_table import LATITUDE, LONGITUDE, LONGITUDE_SPEED
+
+# Tamanho do segmento (dias) e grau da série de cada corpo. Segmentos de até 16 dias
+# acompanham os termos de curto período da nutação; a Lua e Mercúrio precisam de
+# segmentos menores, e o nodo verdadeiro oscila com período de poucos dias.
+SEGMENTS: Dict[str, Tuple[float, int]] = {
+    "moon": (4.0, 13),
+    "mercury": (8.0, 12),
+    "true_node": (2.0, 10),
+}
+DEFAULT_SEGMENT: Tuple[float, int] = (16.0, 12)
+
+# Pontos de conferência do erro em cada segmento
+CHECK_POINTS = 8
+
+def fit_series(
+    body: str,
+    jd_start: float,
+    jd_end: float,
+    segment_days: float,
+    degree: int,
+    pool: Optional[Executor] = None
+) -> ChebyshevSeries:
+    """
+    Ajusta as séries de Chebyshev de um corpo em segmentos consecutivos.
+
+    Args:
+        body (str): Chave do corpo.
+        jd_start (float): Dia juliano (UT) inicial.
+        jd_end (float): Dia juliano (UT) final (coberto pelo último segmento).
+        segment_days (float): Duração de cada segmento em dias.
+        degree (int): Grau das séries.
+        pool (Optional[Executor]): Pool de processos para calcular as amostras em paralelo.
+
+    Returns:
+        ChebyshevSeries: Coeficientes e erro de cada segmento.
+    """
+    body_id = BODY_IDS[body]
+    segments = int(np.ceil((jd_end - jd_start) / segment_days))
+    starts = jd_start + np.arange(segments) * segment_days
+
+    # Nós de Chebyshev (o dobro do número de coeficientes) em cada segmento
+    nodes = np.cos(np.pi * (np.arange(2 * (degree + 1)) + 0.5) / (2 * (degree + 1)))
+    jds = (starts[:, np.newaxis] + (nodes + 1.0) / 2.0 * segment_days).ravel()
+    samples = sample_positions_parallel(body_id, jds, pool).reshape(segments, len(nodes), -1)
+
+    # Longitude contínua dentro de cada segmento (sem o salto de 360° para 0°)
+    longitude = np.degrees(np.unwrap(np.radians(samples[:, :, LONGITUDE]), axis=1))
+    values = np.concatenate((longitude, samples[:, :, LATITUDE]), axis=0).T
+    coefficients = chebyshev.chebfit(nodes, values, degree).T.reshape(COMPONENTS, segments, degree + 1)
+    series = ChebyshevSeries(jd_start, segment_days, np.ascontiguousarray(coefficients.transpose(1, 0, 2)), np.zeros(segments, dtype=np.float32))
+
+    # Erro em pontos intermediários de cada segmento
+    check = (np.arange(CHECK_POINTS) + 0.5) / CHECK_POINTS
+    check_jds = (starts[:, np.newaxis] + check * segment_days).ravel()
+    expected = sample_positions_parallel(body_id, check_jds, pool)
+    found_longitude, found_latitude, _, _ = series.evaluate(check_jds)
+    errors = np.maximum(
+        np.abs((found_longitude - expected[:, LONGITUDE] + 180.0) % 360.0 - 180.0),
+        np.abs(found_latitude - expected[:, LATITUDE])
+    )
+    series.errors = errors.reshape(segments, CHECK_POINTS).max(axis=1).astype(np.float32)
+    return series
+
+def validate_ephemeris(
+    ephemeris: ChebyshevEphemeris,
+    samples: int = 2000,
+    tolerance: float = EPHEMERIS_TABLE_TOLERANCE,
+    seed: int = 0
+) -> Dict[str, Dict[str, float]]:
+    """
+    Compara as efemérides de Chebyshev com o Swiss Ephemeris em instantes sorteados.
+
+    Args:
+        ephemeris (ChebyshevEphemeris): Efemérides a validar.
+        samples (int): Instantes sorteados por corpo.
+        tolerance (float): Tolerância, em graus, com que as efemérides são usadas.
+        seed (int): Semente do sorteio.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Por corpo, erros máximo, mediano e no percentil 99
+            da longitude (segundos de arco), erro máximo da velocidade (graus/dia), a
+            fração dos instantes atendidos dentro da tolerância e o erro máximo entre eles.
+    """
+    rng = np.random.default_rng(seed)
+    report: Dict[str, Dict[str, float]] = {}
+    for body, series in ephemeris.series.items():
+        jds = np.sort(rng.uniform(series.jd_start, series.jd_end, samples))
+        longitude, _, speed, segment_errors = series.evaluate(jds)
+        expected = sample_positions_parallel(BODY_IDS[body], jds, None)
+        errors = np.abs((longitude - expected[:, LONGITUDE] + 180.0) % 360.0 - 180.0) * 3600
+        served = segment_errors <= tolerance
+        report[body] = {
+            "max_arcsec": float(errors.max()),
+            "median_arcsec": float(np.median(errors)),
+            "p99_arcsec": float(np.percentile(errors, 99)),
+            "max_speed_error": float(np.abs(speed - expected[:, LONGITUDE_SPEED]).max()),
+            "served_fraction": float(np.mean(served)),
+            "served_max_arcsec": float(errors[served].max()) if served.any() else 0.0,
+        }
+    return report
+
+def print_validation(report: Dict[str, Dict[str, float]]) -> None:
+    """Imprime o relatório de validate_ephemeris."""
+    print(
+        f"{'corpo':<12} {'máx':>10} {'mediano':>12} {'p99':>10} {'velocidade':>11} {'atendidos':>10} {'máx atendidos':>14}"
+        "  (segundos de arco; velocidade em graus/dia)"
+    )
+    for body, row in report.items():
+        print(
+            f"{body:<12} {row['max_arcsec']:>10.5f} {row['median_arcsec']:>12.6f} {row['p99_arcsec']:>10.5f} "
+            f"{row['max_speed_error']:>11.2e} {row['served_fraction']:>10.1%} {row['served_max_arcsec']:>14.5f}"
+        )
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Constrói as efemérides de Chebyshev e grava o arquivo binário.
+
+    Args:
+        argv (Optional[List[str]]): Argumentos da linha de comando. Padrão é sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Constrói as efemérides em polinômios de Chebyshev.")
+    parser.add_argument("--output", default=CHEBYSHEV_EPHEMERIS_PATH, help="Arquivo das efemérides a gravar")
+    parser.add_argument("--start-year", type=int, default=1900, help="Primeiro ano")
+    parser.add_argument("--end-year", type=int, default=2100, help="Último ano (incluído)")
+    parser.add_argument("--bodies", nargs="+", choices=sorted(BODY_IDS), default=list(BODY_IDS), help="Corpos incluídos")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos usados no cálculo das amostras")
+    parser.add_argument("--validate", type=int, default=2000, help="Instantes sorteados por corpo na validação (0 desativa)")
+    parser.add_argument("--validate-only", action="store_true", help="Apenas valida o arquivo já gravado")
+    args = parser.parse_args(argv)
+
+    if not args.validate_only:
+        jd_start = swe.julday(args.start_year, 1, 1, 0.0)
+        jd_end = swe.julday(args.end_year + 1, 1, 1, 0.0)
+
+        series = {}
+        pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+        try:
+            for body in args.bodies:
+                started_at = time.perf_counter()
+                segment_days, degree = SEGMENTS.get(body, DEFAULT_SEGMENT)
+                series[body] = fit_series(body, jd_start, jd_end, segment_days, degree, pool)
+                print(
+                    f"{body}: {len(series[body].coefficients)} segmentos de {segment_days:g} dias, grau {degree}, "
+                    f"erro máximo {series[body].errors.max() * 3600:.4f}\" ({time.perf_counter() - started_at:.2f}s)"
+                )
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        write_chebyshev_ephemeris(
+            args.output, series,
+            {"start_year": args.start_year, "end_year": args.end_year, "swisseph_version": swe.version}
+        )
+
+    ephemeris = load_chebyshev_ephemeris(args.output)
+    size = sum(s.coefficients.nbytes + s.errors.nbytes for s in ephemeris.series.values())
+    print(f"Efemérides em {args.output}: {len(ephemeris.series)} corpos, {size / 2 ** 20:.1f} MiB")
+
+    if args.validate > 0:
+        print_validation(validate_ephemeris(ephemeris, args.validate))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Comando de construção offline da tabela de efemérides.
+
+Uso (a partir do diretório astrology_api):
+    python -m app.core.build_ephemeris_table [--output ARQUIVO] [--start-year 1900] [--end-year 2100] [--dtype float64|float32] [--bodies CORPO ...] [--workers N]
+
+Calcula no Swiss Ephemeris as posições de cada corpo em uma grade regular (um dia
+para os planetas, uma hora para a Lua) e, para cada intervalo da grade, o erro da
+interpolação no ponto médio, e grava a tabela que os workers mapeiam em memória.
+As amostras são calculadas em blocos distribuídos entre processos (a Lua, com
+amostras horárias, responde pela maior parte do tempo).
+Com float32 a tabela ocupa metade do espaço; o erro medido já inclui o
+arredondamento dos valores gravados.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional
+import argparse
+import os
+import time
+
+import numpy as np
+import swisseph as swe
+
+from ..core.ephemeris import BODY_IDS, EPHEMERIS_TABLE_PATH, SWISSEPH_FLAGS, ensure_ephemeris_path
+from ..core.ephemeris_table import (
+    LATITUDE, LONGITUDE, VALUE_COLUMNS, EphemerisSeries, load_ephemeris_table, write_ephemeris_table
+)
+
+# Passo da grade em dias: a Lua anda ~13°/dia e precisa de amostras horárias
+MOON_STEP_DAYS = 1.0 / 24
+DEFAULT_STEP_DAYS = 1.0
+
+# Instantes calculados por tarefa enviada aos processos
+SAMPLE_BLOCK_SIZE = 50000
+
+DTYPES = {"float64": "<f8", "float32": "<f4"}
+
+def sample_positions(body_id: int, jds: np.ndarray) -> np.ndarray:
+    """
+    Calcula longitude, latitude e velocidades de um corpo em vários instantes.
+
+    Args:
+        body_id (int): Identificador do corpo no Swiss Ephemeris.
+        jds (np.ndarray): Dias julianos (UT).
+
+    Returns:
+        np.ndarray: Valores (n, 4) na ordem das colunas da tabela.
+    """
+    ensure_ephemeris_path()
+    values = np.empty((len(jds), VALUE_COLUMNS), dtype=np.float64)
+    for i, jd in enumerate(jds.tolist()):
+        position, _ = swe.calc_ut(jd, body_id, SWISSEPH_FLAGS)
+        values[i] = (position[0], position[1], position[3], position[4])
+    return values
+
+def sample_positions_parallel(body_id: int, jds: np.ndarray, pool: Optional[Executor]) -> np.ndarray:
+    """Calcula as posições (ver sample_positions) em blocos, no pool de processos se houver um."""
+    if pool is None or len(jds) <= SAMPLE_BLOCK_SIZE:
+        return sample_positions(body_id, jds)
+    blocks = [jds[start:start + SAMPLE_BLOCK_SIZE] for start in range(0, len(jds), SAMPLE_BLOCK_SIZE)]
+    return np.concatenate(list(pool.map(sample_positions, [body_id] * len(blocks), blocks)))
+
+def build_series(
+    body: str,
+    jd_start: float,
+    jd_end: float,
+    step: float,
+    dtype: str,
+    pool: Optional[Executor] = None
+) -> EphemerisSeries:
+    """
+    Amostra um corpo na grade e mede o erro da interpolação em cada intervalo.
+
+    Args:
+        body (str): Chave do corpo.
+        jd_start (float): Dia juliano (UT) inicial.
+        jd_end (float): Dia juliano (UT) final (incluído na grade).
+        step (float): Passo da grade em dias.
+        dtype (str): Tipo dos valores gravados.
+        pool (Optional[Executor]): Pool de processos para calcular as amostras em paralelo.
+
+    Returns:
+        EphemerisSeries: Amostras e erros do corpo.
+    """
+    body_id = BODY_IDS[body]
+    count = int(np.ceil((jd_end - jd_start) / step)) + 1
+    jds = jd_start + np.arange(count) * step
+    values = sample_positions_parallel(body_id, jds, pool).astype(dtype)
+
+    # Erro no meio de cada intervalo, onde o da interpolação de Hermite é máximo
+    middles = jds[:-1] + step / 2
+    expected = sample_positions_parallel(body_id, middles, pool)
+    series = EphemerisSeries(jd_start, step, values, np.zeros(count - 1, dtype=np.float32))
+    longitude, latitude, _, _ = series.interpolate(middles)
+    errors = np.maximum(
+        np.abs((longitude - expected[:, LONGITUDE] + 180.0) % 360.0 - 180.0),
+        np.abs(latitude - expected[:, LATITUDE])
+    )
+    series.errors = errors.astype(np.float32)
+    return series
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Constrói a tabela e grava o arquivo binário.
+
+    Args:
+        argv (Optional[List[str]]): Argumentos da linha de comando. Padrão é sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Constrói a tabela de efemérides pré-calculadas.")
+    parser.add_argument("--output", default=EPHEMERIS_TABLE_PATH, help="Arquivo da tabela a gravar")
+    parser.add_argument("--start-year", type=int, default=1900, help="Primeiro ano da tabela")
+    parser.add_argument("--end-year", type=int, default=2100, help="Último ano da tabela (incluído)")
+    parser.add_argument("--dtype", choices=sorted(DTYPES), default="float64", help="Tipo dos valores gravados")
+    parser.add_argument("--bodies", nargs="+", choices=sorted(BODY_IDS), default=list(BODY_IDS), help="Corpos incluídos")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos usados no cálculo das amostras")
+    args = parser.parse_args(argv)
+
+    jd_start = swe.julday(args.start_year, 1, 1, 0.0)
+    jd_end = swe.julday(args.end_year + 1, 1, 1, 0.0)
+    dtype = DTYPES[args.dtype]
+
+    series = {}
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    try:
+        for body in args.bodies:
+            started_at = time.perf_counter()
+            step = MOON_STEP_DAYS if body == "moon" else DEFAULT_STEP_DAYS
+            series[body] = build_series(body, jd_start, jd_end, step, dtype, pool)
+            errors = series[body].errors
+            print(
+                f"{body}: {len(series[body].values)} amostras, erro máximo {errors.max() * 3600:.4f}\", "
+                f"mediano {np.median(errors) * 3600:.6f}\" ({time.perf_counter() - started_at:.2f}s)"
+            )
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    write_ephemeris_table(
+        args.output, series, dtype,
+        {"start_year": args.start_year, "end_year": args.end_year, "swisseph_version": swe.version}
+    )
+    table = load_ephemeris_table(args.output)
+    size = sum(s.values.nbytes + s.errors.nbytes for s in table.series.values())
+    print(f"Tabela gravada em {args.output}: {len(table.series)} corpos, {size / 2 ** 20:.1f} MiB")
+
+if __name__ == "__main__":
+    main()
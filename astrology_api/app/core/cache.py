@@ -3,14 +3,33 @@ Módulo para cache de cálculos astrológicos.
 
 Este módulo implementa um sistema de cache para cálculos astrológicos frequentes,
 reduzindo o tempo de resposta para requisições repetidas.
+
+O cache tem dois níveis: um cache em memória limitado (LRU, com limite de entradas
+e de bytes) e um cache em disco em um único arquivo SQLite, com a data de expiração
+indexada e gravações em lote. Uma thread de manutenção remove periodicamente as
+entradas expiradas dos dois níveis e compacta o arquivo.
+
+Cálculos com cache devem usar get_or_compute, que garante que chamadas
+simultâneas com a mesma chave aguardem um único cálculo (single-flight).
 """
-from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, Optional, Tuple
+import multiprocessing.util
+import sqlite3
+import threading
 import time
 import pickle
 import os
 import hashlib
 import json
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - indisponível no Windows
+    fcntl = None
+
 # Diretório para armazenar o cache
 CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "cache")
 
@@ -18,12 +37,458 @@ CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file_
 if not os.path.exists(CACHE_DIR):
     os.makedirs(CACHE_DIR)
 
-# Cache em memória para acesso rápido
-MEMORY_CACHE = {}
-
 # Tempo de expiração do cache em segundos (24 horas)
 CACHE_EXPIRATION = 24 * 60 * 60
 
+# Limites do cache em memória
+MEMORY_CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "10000"))
+MEMORY_CACHE_MAX_BYTES = int(os.getenv("CACHE_MEMORY_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Arquivo do cache em disco
+DISK_CACHE_PATH = os.getenv("CACHE_DISK_PATH", os.path.join(CACHE_DIR, "cache.sqlite3"))
+
+# Gravações em disco são acumuladas e feitas em uma única transação quando o lote
+# atinge este tamanho ou quando a gravação pendente mais antiga atinge este intervalo
+DISK_CACHE_BATCH_SIZE = int(os.getenv("CACHE_DISK_BATCH_SIZE", "64"))
+DISK_CACHE_FLUSH_INTERVAL = float(os.getenv("CACHE_DISK_FLUSH_INTERVAL", "1.0"))
+
+# Fração de páginas livres do arquivo a partir da qual ele é compactado
+DISK_CACHE_COMPACT_RATIO = float(os.getenv("CACHE_DISK_COMPACT_RATIO", "0.25"))
+
+# Coordenação entre processos: com CACHE_PROCESS_LOCKS=1, um mesmo cálculo com
+# cache não é repetido por processos diferentes ao mesmo tempo (requer fcntl)
+CACHE_PROCESS_LOCKS = os.getenv("CACHE_PROCESS_LOCKS", "0") == "1" and fcntl is not None
+CACHE_LOCK_DIR = os.path.join(CACHE_DIR, "locks")
+
+# Número de arquivos de lock; as chaves são distribuídas entre eles por hash
+CACHE_LOCK_STRIPES = int(os.getenv("CACHE_LOCK_STRIPES", "64"))
+
+# Intervalo, em segundos, entre as limpezas automáticas de entradas expiradas
+CACHE_SWEEP_INTERVAL = int(os.getenv("CACHE_SWEEP_INTERVAL", "300"))
+
+class MemoryCache:
+    """
+    Cache em memória com expiração e remoção LRU (menos usado recentemente).
+
+    O tamanho de cada entrada é o tamanho da sua forma serializada, que já é
+    calculada para o cache em disco. Quando o número de entradas ou o total de
+    bytes excede o limite, as entradas usadas há mais tempo são removidas.
+    Todas as operações são protegidas por um lock, pois o cache é acessado
+    pelas threads do pool de execução.
+
+    Attributes:
+        max_entries (int): Número máximo de entradas.
+        max_bytes (int): Total máximo de bytes.
+        expiration (float): Tempo de vida de cada entrada em segundos.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, expiration: float) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.expiration = expiration
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Recupera um valor, marcando-o como usado recentemente.
+
+        Args:
+            key (str): Chave do cache.
+
+        Returns:
+            Optional[Any]: Valor ou None se não encontrado ou expirado.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            timestamp, _, value = entry
+            if time.time() - timestamp >= self.expiration:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, size: int) -> None:
+        """
+        Armazena um valor, removendo as entradas menos usadas se necessário.
+
+        Args:
+            key (str): Chave do cache.
+            value (Any): Valor a ser armazenado.
+            size (int): Tamanho aproximado do valor em bytes.
+        """
+        # Um valor maior que o limite inteiro esvaziaria o cache sem proveito
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.time(), size, value)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Remove uma entrada, se existir."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def expire(self) -> int:
+        """
+        Remove as entradas expiradas.
+
+        Returns:
+            int: Número de entradas removidas.
+        """
+        cutoff = time.time() - self.expiration
+        with self._lock:
+            expired = [key for key, (timestamp, _, _) in self._entries.items() if timestamp <= cutoff]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            Dict[str, Any]: Entradas, bytes, limites, acertos, falhas, remoções e expirações.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key: str) -> None:
+        """Remove uma entrada (o lock já deve estar adquirido)."""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+class DiskCache:
+    """
+    Cache em disco em um único arquivo SQLite.
+
+    Cada entrada guarda o valor serializado e o instante de expiração, que é
+    indexado para que a limpeza de entradas expiradas não precise percorrer o
+    arquivo inteiro. As gravações ficam em um buffer e são feitas em lote, em
+    uma única transação. Cada processo abre sua própria conexão (o arquivo é
+    compartilhado pelos processos do pool de execução, em modo WAL).
+
+    Attributes:
+        path (str): Caminho do arquivo SQLite.
+        expiration (float): Tempo de vida de cada entrada em segundos.
+        batch_size (int): Número de gravações pendentes que dispara a gravação do lote.
+        flush_interval (float): Idade máxima, em segundos, de uma gravação pendente.
+    """
+
+    def __init__(self, path: str, expiration: float, batch_size: int, flush_interval: float) -> None:
+        self.path = path
+        self.expiration = expiration
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._pending: Dict[str, Tuple[float, bytes]] = {}
+        self._pending_since = 0.0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retorna a conexão do processo atual, abrindo-a se necessário."""
+        if self._conn_pid != os.getpid():
+            # Após um fork, a conexão herdada não pode ser usada e o buffer
+            # herdado pertence ao processo pai
+            if self._conn is not None:
+                self._pending = {}
+            self._conn = None
+
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value BLOB NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Recupera o valor serializado de uma entrada.
+
+        Args:
+            key (str): Chave do cache.
+
+        Returns:
+            Optional[bytes]: Valor serializado ou None se não encontrado ou expirado.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            pending = self._pending.get(key)
+            if pending is not None and pending[0] > now:
+                self.hits += 1
+                return pending[1]
+
+            row = conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, data: bytes) -> None:
+        """
+        Agenda a gravação de uma entrada, gravando o lote se ele estiver cheio ou antigo.
+
+        Args:
+            key (str): Chave do cache.
+            data (bytes): Valor serializado.
+        """
+        now = time.time()
+        with self._lock:
+            self._connection()
+            if not self._pending:
+                self._pending_since = now
+            self._pending[key] = (now + self.expiration, data)
+
+            if len(self._pending) >= self.batch_size or now - self._pending_since >= self.flush_interval:
+                self.flush()
+
+    def delete(self, key: str) -> None:
+        """Remove uma entrada, se existir."""
+        with self._lock:
+            self._pending.pop(key, None)
+            self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def flush(self) -> None:
+        """Grava as entradas pendentes em uma única transação."""
+        with self._lock:
+            if not self._pending:
+                return
+
+            rows = [(key, expires_at, data) for key, (expires_at, data) in self._pending.items()]
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)", rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            self.writes += len(rows)
+            self._pending.clear()
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        with self._lock:
+            self._pending.clear()
+            self._connection().execute("DELETE FROM cache")
+
+    def expire(self) -> int:
+        """
+        Remove as entradas expiradas usando o índice de expiração.
+
+        Returns:
+            int: Número de entradas removidas.
+        """
+        with self._lock:
+            cursor = self._connection().execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            return cursor.rowcount
+
+    def compact(self, min_free_ratio: float = 0.0) -> bool:
+        """
+        Compacta o arquivo, devolvendo ao sistema o espaço das entradas removidas.
+
+        Args:
+            min_free_ratio (float): Fração mínima de páginas livres para compactar.
+
+        Returns:
+            bool: True se o arquivo foi compactado.
+        """
+        with self._lock:
+            conn = self._connection()
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            free_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+            if not page_count or free_count / page_count < min_free_ratio:
+                return False
+
+            self.flush()
+            conn.execute("VACUUM")
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            Dict[str, Any]: Acertos, falhas, gravações, gravações pendentes e tamanho do arquivo.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "pending_writes": len(self._pending),
+                "file_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            }
+
+class SingleFlight:
+    """
+    Agrupa chamadas simultâneas com a mesma chave em um único cálculo.
+
+    A primeira chamada (líder) executa a função; as que chegam enquanto ela está
+    em andamento aguardam o mesmo resultado (ou a mesma exceção).
+
+    Attributes:
+        leaders (int): Número de cálculos executados.
+        followers (int): Número de chamadas que reaproveitaram um cálculo em andamento.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        Executa a função uma única vez por chave entre as chamadas simultâneas.
+
+        Args:
+            key (str): Chave do cálculo.
+            func (Callable[[], Any]): Função que calcula o valor.
+
+        Returns:
+            Any: Valor calculado.
+        """
+        if self._pid != os.getpid():
+            # Cálculos em andamento herdados do processo pai nunca terminarão aqui
+            self._calls = {}
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna os contadores de cálculos e de chamadas agrupadas."""
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
+
+# Cache em memória para acesso rápido
+MEMORY_CACHE = MemoryCache(MEMORY_CACHE_MAX_ENTRIES, MEMORY_CACHE_MAX_BYTES, CACHE_EXPIRATION)
+
+# Cache em disco
+DISK_CACHE = DiskCache(DISK_CACHE_PATH, CACHE_EXPIRATION, DISK_CACHE_BATCH_SIZE, DISK_CACHE_FLUSH_INTERVAL)
+
+# Cálculos com cache em andamento
+CACHE_FLIGHTS = SingleFlight()
+
+# Caches em memória adicionais (ex: objetos que não devem ir para o disco),
+# incluídos na limpeza periódica e nas estatísticas
+NAMED_MEMORY_CACHES: Dict[str, MemoryCache] = {}
+
+_sweeper: Optional[threading.Thread] = None
+_sweeper_stop = threading.Event()
+
+def create_memory_cache(name: str, max_entries: int, max_bytes: int, expiration: float = CACHE_EXPIRATION) -> MemoryCache:
+    """
+    Cria um cache apenas em memória, registrado na limpeza periódica e nas estatísticas.
+    
+    Args:
+        name (str): Nome do cache nas estatísticas.
+        max_entries (int): Número máximo de entradas.
+        max_bytes (int): Total máximo de bytes.
+        expiration (float): Tempo de vida de cada entrada em segundos.
+        
+    Returns:
+        MemoryCache: Cache criado.
+    """
+    cache = MemoryCache(max_entries, max_bytes, expiration)
+    NAMED_MEMORY_CACHES[name] = cache
+    return cache
+
 def get_cache_key(prefix: str, **kwargs) -> str:
     """
     Gera uma chave de cache baseada nos parâmetros.
@@ -56,40 +521,30 @@ def get_from_cache(key: str) -> Optional[Any]:
         Optional[Any]: Valor do cache ou None se não encontrado ou expirado.
     """
     # Verificar primeiro no cache em memória
-    if key in MEMORY_CACHE:
-        timestamp, value = MEMORY_CACHE[key]
-        
-        # Verificar se o cache expirou
-        if time.time() - timestamp < CACHE_EXPIRATION:
-            return value
-        else:
-            # Remover do cache em memória se expirou
-            del MEMORY_CACHE[key]
+    value = MEMORY_CACHE.get(key)
+    if value is not None:
+        return value
     
     # Verificar no cache em disco
-    cache_file = os.path.join(CACHE_DIR, f"{key}.pickle")
-    if os.path.exists(cache_file):
-        # Verificar a data de modificação do arquivo
-        mod_time = os.path.getmtime(cache_file)
-        
-        # Verificar se o cache expirou
-        if time.time() - mod_time < CACHE_EXPIRATION:
-            try:
-                with open(cache_file, 'rb') as f:
-                    value = pickle.load(f)
-                
-                # Atualizar o cache em memória
-                MEMORY_CACHE[key] = (time.time(), value)
-                
-                return value
-            except:
-                # Em caso de erro ao carregar o cache, remover o arquivo
-                os.remove(cache_file)
-        else:
-            # Remover o arquivo se expirou
-            os.remove(cache_file)
+    try:
+        data = DISK_CACHE.get(key)
+    except sqlite3.Error:
+        return None
+    
+    if data is None:
+        return None
+    
+    try:
+        value = pickle.loads(data)
+    except Exception:
+        # Em caso de erro ao carregar o cache, remover a entrada
+        DISK_CACHE.delete(key)
+        return None
     
-    return None
+    # Atualizar o cache em memória
+    MEMORY_CACHE.set(key, value, len(data))
+    
+    return value
 
 def save_to_cache(key: str, value: Any) -> None:
     """
@@ -99,56 +554,186 @@ def save_to_cache(key: str, value: Any) -> None:
         key (str): Chave do cache.
         value (Any): Valor a ser armazenado.
     """
+    # Serializar uma única vez; o tamanho serializado é usado como tamanho da entrada
+    try:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        # Valores não serializáveis não são armazenados
+        return
+    
     # Salvar no cache em memória
-    MEMORY_CACHE[key] = (time.time(), value)
+    MEMORY_CACHE.set(key, value, len(data))
     
     # Salvar no cache em disco
-    cache_file = os.path.join(CACHE_DIR, f"{key}.pickle")
     try:
-        with open(cache_file, 'wb') as f:
-            pickle.dump(value, f)
-    except:
+        DISK_CACHE.set(key, data)
+    except sqlite3.Error:
         # Em caso de erro ao salvar, apenas ignorar
         pass
 
+@contextmanager
+def _process_lock(key: str) -> Iterator[None]:
+    """
+    Adquire o lock entre processos de uma chave, se CACHE_PROCESS_LOCKS estiver ativo.
+    
+    As chaves são distribuídas entre CACHE_LOCK_STRIPES arquivos, para não criar
+    um arquivo por chave.
+    """
+    if not CACHE_PROCESS_LOCKS:
+        yield
+        return
+    
+    os.makedirs(CACHE_LOCK_DIR, exist_ok=True)
+    stripe = int(hashlib.sha256(key.encode()).hexdigest()[:8], 16) % CACHE_LOCK_STRIPES
+    with open(os.path.join(CACHE_LOCK_DIR, f"{stripe}.lock"), "a+b") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def prepare_pool_process() -> None:
+    """
+    Prepara o cache em um processo do pool de execução (usado como initializer do pool).
+
+    Os processos do pool não têm a thread de manutenção que grava os lotes
+    pendentes: cada gravação em disco passa a ser feita imediatamente, para que os
+    outros processos a encontrem, e o que ainda estiver pendente é gravado quando
+    o processo termina.
+    """
+    DISK_CACHE.batch_size = 1
+    multiprocessing.util.Finalize(None, DISK_CACHE.flush, exitpriority=10)
+
+def get_or_compute(key: str, compute: Callable[[], Any]) -> Any:
+    """
+    Recupera um valor do cache ou o calcula uma única vez.
+    
+    Chamadas simultâneas com a mesma chave aguardam o mesmo cálculo em vez de
+    repeti-lo. No processo principal o resultado entra no lote de gravações em
+    disco; nos processos do pool ele é gravado imediatamente (ver
+    prepare_pool_process), para que os outros processos o encontrem. Com
+    CACHE_PROCESS_LOCKS ativo, o cálculo também é coordenado entre os processos
+    por um lock de arquivo, e o resultado é gravado em disco antes de liberá-lo.
+    
+    Args:
+        key (str): Chave do cache (ver get_cache_key).
+        compute (Callable[[], Any]): Função que calcula o valor.
+        
+    Returns:
+        Any: Valor do cache ou calculado.
+    """
+    value = get_from_cache(key)
+    if value is not None:
+        return value
+    
+    def compute_and_save() -> Any:
+        with _process_lock(key):
+            if CACHE_PROCESS_LOCKS:
+                # Outro processo pode ter calculado enquanto aguardávamos o lock
+                cached = get_from_cache(key)
+                if cached is not None:
+                    return cached
+            
+            result = compute()
+            save_to_cache(key, result)
+            
+            if CACHE_PROCESS_LOCKS:
+                try:
+                    DISK_CACHE.flush()
+                except sqlite3.Error:
+                    pass
+            
+            return result
+    
+    return CACHE_FLIGHTS.do(key, compute_and_save)
+
 def clear_cache() -> None:
     """
     Limpa todo o cache.
     """
     # Limpar cache em memória
     MEMORY_CACHE.clear()
+    for cache in NAMED_MEMORY_CACHES.values():
+        cache.clear()
     
     # Limpar cache em disco
-    for filename in os.listdir(CACHE_DIR):
-        file_path = os.path.join(CACHE_DIR, filename)
-        try:
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-        except:
-            pass
+    DISK_CACHE.clear()
 
 def clear_expired_cache() -> None:
     """
     Limpa apenas o cache expirado.
     """
-    current_time = time.time()
-    
     # Limpar cache em memória
-    keys_to_remove = []
-    for key, (timestamp, _) in MEMORY_CACHE.items():
-        if current_time - timestamp >= CACHE_EXPIRATION:
-            keys_to_remove.append(key)
-    
-    for key in keys_to_remove:
-        del MEMORY_CACHE[key]
+    MEMORY_CACHE.expire()
+    for cache in NAMED_MEMORY_CACHES.values():
+        cache.expire()
     
     # Limpar cache em disco
-    for filename in os.listdir(CACHE_DIR):
-        file_path = os.path.join(CACHE_DIR, filename)
+    DISK_CACHE.flush()
+    DISK_CACHE.expire()
+
+def compact_cache() -> bool:
+    """
+    Remove as entradas expiradas do disco e compacta o arquivo se ele tiver
+    espaço livre suficiente.
+
+    Returns:
+        bool: True se o arquivo foi compactado.
+    """
+    clear_expired_cache()
+    return DISK_CACHE.compact(DISK_CACHE_COMPACT_RATIO)
+
+def _sweep_expired_cache() -> None:
+    """Remove periodicamente as entradas expiradas e grava os lotes pendentes."""
+    next_sweep = time.time() + CACHE_SWEEP_INTERVAL
+
+    while not _sweeper_stop.wait(DISK_CACHE_FLUSH_INTERVAL):
         try:
-            if os.path.isfile(file_path):
-                mod_time = os.path.getmtime(file_path)
-                if current_time - mod_time >= CACHE_EXPIRATION:
-                    os.remove(file_path)
-        except:
-            pass
+            DISK_CACHE.flush()
+            if time.time() >= next_sweep:
+                compact_cache()
+                next_sweep = time.time() + CACHE_SWEEP_INTERVAL
+        except sqlite3.Error as e:
+            print(f"Erro na manutenção do cache: {str(e)}")
+
+def start_cache_maintenance() -> None:
+    """
+    Inicia a thread que grava os lotes pendentes e remove periodicamente as
+    entradas expiradas da memória e do disco.
+    """
+    global _sweeper
+
+    if _sweeper is not None and _sweeper.is_alive():
+        return
+
+    _sweeper_stop.clear()
+    _sweeper = threading.Thread(target=_sweep_expired_cache, name="cache-sweeper", daemon=True)
+    _sweeper.start()
+
+def stop_cache_maintenance() -> None:
+    """
+    Encerra a thread de manutenção do cache e grava as entradas pendentes.
+    """
+    global _sweeper
+
+    _sweeper_stop.set()
+    if _sweeper is not None:
+        _sweeper.join()
+        _sweeper = None
+
+    DISK_CACHE.flush()
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Retorna os contadores dos caches em memória e em disco.
+
+    Returns:
+        Dict[str, Any]: Estatísticas por nível de cache e por cache registrado
+            com create_memory_cache.
+    """
+    return {
+        "memory": MEMORY_CACHE.stats(),
+        "disk": DISK_CACHE.stats(),
+        "single_flight": CACHE_FLIGHTS.stats(),
+        **{name: cache.stats() for name, cache in NAMED_MEMORY_CACHES.items()},
+    }
@@ -2,10 +2,12 @@
 Módulo de cálculos astrológicos para a aplicação AstroAPI.
 """
 from kerykeion import AstrologicalSubject
-from typing import Dict, List, Optional, Union, Literal, cast
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, Literal
 from datetime import datetime, timedelta
 import logging
-import math
+import os
+import numpy as np
+import pytz
 
 from ..schemas.models import (
     PlanetData, HouseCuspData, AspectData, 
@@ -13,12 +15,33 @@ from ..schemas.models import (
     LanguageType
 )
 from ..interpretations.translations import (
-    translate_planet, translate_sign, translate_aspect, translate_house
+    translate_planet, translate_sign, translate_aspect
 )
-from ..core.cache import get_cache_key, get_from_cache, save_to_cache
+from ..core.cache import CACHE_EXPIRATION, SingleFlight, create_memory_cache, get_cache_key, get_or_compute
+from ..core.ephemeris import BODY_KEYS, BODY_NAMES, MAJOR_PLANETS, BodyPositions, datetime_from_julian_day
+from ..core.ephemeris_backends import get_backend
+from ..core.aspects import find_aspects, aspect_names
+from ..core.returns import RETURN_BODIES, find_return_julian_day, return_search_start
+from ..core.snapshot import SNAPSHOT_VERSION, ChartSnapshot, sign_of, snapshot_from_subject, take_snapshot
 
 logger = logging.getLogger(__name__)
 
+# Mapas natais já calculados, reaproveitados entre requisições. Ficam apenas em
+# memória, pois o AstrologicalSubject depende da versão do Kerykeion.
+NATAL_SUBJECT_CACHE_MAX_ENTRIES = int(os.getenv("NATAL_SUBJECT_CACHE_MAX_ENTRIES", "1024"))
+NATAL_SUBJECT_CACHE_TTL = int(os.getenv("NATAL_SUBJECT_CACHE_TTL", str(CACHE_EXPIRATION)))
+
+# Tamanho aproximado de um AstrologicalSubject, usado na contabilidade do cache
+NATAL_SUBJECT_SIZE_ESTIMATE = 8 * 1024
+
+NATAL_SUBJECT_CACHE = create_memory_cache(
+    "natal_subjects",
+    NATAL_SUBJECT_CACHE_MAX_ENTRIES,
+    NATAL_SUBJECT_CACHE_MAX_ENTRIES * NATAL_SUBJECT_SIZE_ESTIMATE,
+    NATAL_SUBJECT_CACHE_TTL
+)
+NATAL_SUBJECT_FLIGHTS = SingleFlight()
+
 def get_kerykeion_house_system_code(house_system: HouseSystemType) -> str:
     """Converte o nome do sistema de casas para o código usado pelo Kerykeion."""
     return HOUSE_SYSTEM_MAP.get(house_system, "P")
@@ -61,49 +84,143 @@ def create_astrological_subject(
         logger.error(f"Erro ao criar objeto AstrologicalSubject: {str(e)}")
         raise ValueError(f"Erro ao criar objeto AstrologicalSubject: {str(e)}")
 
+def get_natal_subject(
+    name: str,
+    year: int,
+    month: int,
+    day: int,
+    hour: int,
+    minute: int,
+    longitude: float,
+    latitude: float,
+    tz_str: str,
+    house_system: HouseSystemType = "Placidus"
+) -> AstrologicalSubject:
+    """
+    Retorna o AstrologicalSubject de um mapa natal, reaproveitando o já calculado.
+    
+    A chave é formada pelos dados de nascimento normalizados (coordenadas
+    arredondadas a 1e-6 grau), pelo fuso horário e pelo sistema de casas, de modo
+    que o mesmo mapa é calculado uma vez por período de validade do cache, e não
+    uma vez por requisição. O objeto retornado é compartilhado e não deve ser alterado.
+    
+    Args:
+        name (str): Nome do mapa.
+        year (int): Ano de nascimento.
+        month (int): Mês de nascimento.
+        day (int): Dia de nascimento.
+        hour (int): Hora de nascimento.
+        minute (int): Minuto de nascimento.
+        longitude (float): Longitude do local de nascimento.
+        latitude (float): Latitude do local de nascimento.
+        tz_str (str): Fuso horário do local de nascimento.
+        house_system (HouseSystemType): Sistema de casas. Defaults to "Placidus".
+        
+    Returns:
+        AstrologicalSubject: Objeto AstrologicalSubject do mapa natal.
+    """
+    cache_key = get_cache_key(
+        "natal_subject",
+        name=str(name).strip(),
+        year=int(year),
+        month=int(month),
+        day=int(day),
+        hour=int(hour),
+        minute=int(minute),
+        longitude=round(float(longitude), 6),
+        latitude=round(float(latitude), 6),
+        tz_str=str(tz_str),
+        house_system=get_kerykeion_house_system_code(house_system or "Placidus")
+    )
+    
+    subject = NATAL_SUBJECT_CACHE.get(cache_key)
+    if subject is not None:
+        return subject
+    
+    def create_and_save() -> AstrologicalSubject:
+        created = create_astrological_subject(
+            name, year, month, day, hour, minute, longitude, latitude, tz_str, house_system
+        )
+        NATAL_SUBJECT_CACHE.set(cache_key, created, NATAL_SUBJECT_SIZE_ESTIMATE)
+        return created
+    
+    # Requisições simultâneas para o mesmo mapa aguardam um único cálculo
+    return NATAL_SUBJECT_FLIGHTS.do(cache_key, create_and_save)
+
 def get_planet_data(subject: AstrologicalSubject, language: LanguageType = "pt") -> Dict[str, PlanetData]:
     """
     Obtém dados dos planetas de um AstrologicalSubject.
     
+    Os dados vêm do instantâneo do mapa (posições, velocidades e casas calculadas
+    diretamente pelas efemérides), e não dos atributos do subject, que mudam entre
+    versões do Kerykeion.
+    
     Args:
         subject (AstrologicalSubject): Sujeito astrológico
         language (LanguageType): Idioma para nomes traduzidos. Defaults to "pt".
         
     Returns:
-        Dict[str, PlanetData]: Dicionário com dados dos planetas
+        Dict[str, PlanetData]: Dicionário com dados dos planetas, pela chave do corpo (ex: "sun")
+    """
+    return get_snapshot_planet_data(snapshot_from_subject(subject), language)
+
+def get_houses_data(subject: AstrologicalSubject, language: LanguageType = "pt") -> Dict[str, HouseCuspData]:
+    """
+    Obtém dados das casas de um AstrologicalSubject.
+    
+    Args:
+        subject (AstrologicalSubject): Sujeito astrológico
+        language (LanguageType): Idioma para nomes traduzidos. Defaults to "pt".
+        
+    Returns:
+        Dict[str, HouseCuspData]: Dicionário com dados das casas
+    """
+    return get_snapshot_houses_data(snapshot_from_subject(subject), language)
+
+def get_snapshot_planet_data(snapshot: ChartSnapshot, language: LanguageType = "pt") -> Dict[str, PlanetData]:
+    """
+    Obtém dados dos planetas de um instantâneo de mapa.
+    
+    Args:
+        snapshot (ChartSnapshot): Instantâneo do mapa
+        language (LanguageType): Idioma para nomes traduzidos. Defaults to "pt".
+        
+    Returns:
+        Dict[str, PlanetData]: Dicionário com dados dos planetas, pela chave do corpo (ex: "sun")
     """
     planets_data = {}
     
     # Garantir que language não é None
     language = language or "pt"
     
-    for planet in subject.planets:
-        name = planet.name
-        translated_name = translate_planet(name, language)
-        sign = planet.sign
-        translated_sign = translate_sign(sign, language)
+    houses = snapshot.body_houses()
+    
+    for i, body in enumerate(snapshot.bodies):
+        name = BODY_NAMES.get(body, body)
+        longitude, latitude, speed = (float(value) for value in snapshot.positions[i])
+        sign, sign_num = sign_of(longitude)
         
-        planets_data[name] = PlanetData(
-            name=translated_name,
+        planets_data[body] = PlanetData(
+            name=translate_planet(name, language),
             name_original=name,
-            longitude=planet.longitude,
-            latitude=planet.latitude,
-            sign=translated_sign,
+            longitude=longitude,
+            latitude=latitude,
+            sign=translate_sign(sign, language),
             sign_original=sign,
-            sign_num=planet.sign_num,
-            house=planet.house,
-            retrograde=planet.retrograde,
-            speed=planet.speed
+            sign_num=sign_num,
+            house=int(houses[i]),
+            retrograde=speed < 0,
+            speed=speed
         )
     
     return planets_data
 
-def get_houses_data(subject: AstrologicalSubject, language: LanguageType = "pt") -> Dict[str, HouseCuspData]:
+def get_snapshot_houses_data(snapshot: ChartSnapshot, language: LanguageType = "pt") -> Dict[str, HouseCuspData]:
     """
-    Obtém dados das casas de um AstrologicalSubject.
+    Obtém dados das casas de um instantâneo de mapa.
     
     Args:
-        subject (AstrologicalSubject): Sujeito astrológico
+        snapshot (ChartSnapshot): Instantâneo do mapa
         language (LanguageType): Idioma para nomes traduzidos. Defaults to "pt".
         
     Returns:
@@ -114,118 +231,125 @@ def get_houses_data(subject: AstrologicalSubject, language: LanguageType = "pt")
     # Garantir que language não é None
     language = language or "pt"
     
-    for i, house in enumerate(subject.houses, start=1):
-        sign = house.sign
-        translated_sign = translate_sign(sign, language)
+    for i, cusp in enumerate(snapshot.cusps, start=1):
+        longitude = float(cusp)
+        sign, sign_num = sign_of(longitude)
         
         houses_data[str(i)] = HouseCuspData(
             number=i,
-            sign=translated_sign,
+            sign=translate_sign(sign, language),
             sign_original=sign,
-            sign_num=house.sign_num,
-            longitude=house.longitude
+            sign_num=sign_num,
+            longitude=longitude
         )
     
     return houses_data
 
 def calculate_aspect(point1_long: float, point2_long: float) -> Optional[Dict[str, Union[str, float]]]:
     """Calcula o aspecto entre dois pontos baseado em suas longitudes."""
-    # Diferença entre as longitudes
-    diff = abs(point1_long - point2_long)
-    if diff > 180:
-        diff = 360 - diff
-        
-    # Definição dos aspectos e seus orbes
-    aspects = {
-        "Conjunction": {"angle": 0, "orb": 8},
-        "Opposition": {"angle": 180, "orb": 8},
-        "Trine": {"angle": 120, "orb": 6},
-        "Square": {"angle": 90, "orb": 6},
-        "Sextile": {"angle": 60, "orb": 4}
+    hits = find_aspects([point1_long], [point2_long])
+    if not len(hits):
+        return None
+    
+    return {
+        "aspect": aspect_names(hits)[0],
+        "orbit": float(hits[0]["orbit"]),
+        "angle": float(hits[0]["angle"]),
+        "diff": float(hits[0]["diff"])
     }
-    
-    # Verificar cada aspecto possível
-    for aspect_name, aspect_data in aspects.items():
-        orbit = abs(diff - aspect_data["angle"])
-        if orbit <= aspect_data["orb"]:
-            return {
-                "aspect": aspect_name,
-                "orbit": orbit,
-                "angle": aspect_data["angle"],
-                "diff": diff
-            }
-            
-    return None
 
-def get_aspects_data(subject: AstrologicalSubject, language: LanguageType = "pt") -> List[AspectData]:
-    """Calcula os aspectos entre planetas em um mapa."""
+def build_aspect_data(
+    hits: np.ndarray,
+    bodies1: Sequence[str],
+    bodies2: Sequence[str],
+    owner1: str,
+    owner2: str,
+    language: LanguageType = "pt"
+) -> List[AspectData]:
+    """
+    Converte os aspectos encontrados pelo motor vetorizado em objetos AspectData.
+    
+    Args:
+        hits (np.ndarray): Aspectos retornados por find_aspects.
+        bodies1 (Sequence[str]): Chaves dos corpos do primeiro vetor.
+        bodies2 (Sequence[str]): Chaves dos corpos do segundo vetor.
+        owner1 (str): Proprietário dos pontos do primeiro vetor (ex: "natal").
+        owner2 (str): Proprietário dos pontos do segundo vetor (ex: "transit").
+        language (LanguageType): Idioma para nomes traduzidos. Defaults to "pt".
+        
+    Returns:
+        List[AspectData]: Lista de aspectos.
+    """
+    language = language or "pt"
     result = []
-    processed = set()
     
+    for hit, aspect_name in zip(hits, aspect_names(hits)):
+        p1_name = BODY_NAMES.get(bodies1[hit["i"]], bodies1[hit["i"]])
+        p2_name = BODY_NAMES.get(bodies2[hit["j"]], bodies2[hit["j"]])
+        
+        result.append(AspectData(
+            p1_name=translate_planet(p1_name, language),
+            p1_name_original=p1_name,
+            p1_owner=owner1,
+            p2_name=translate_planet(p2_name, language),
+            p2_name_original=p2_name,
+            p2_owner=owner2,
+            aspect=translate_aspect(aspect_name, language),
+            aspect_original=aspect_name,
+            orbit=round(float(hit["orbit"]), 4),
+            aspect_degrees=round(float(hit["angle"]), 4),
+            diff=round(float(hit["diff"]), 4),
+            applying=bool(hit["applying"])
+        ))
+    
+    return result
+
+def get_aspects_data(
+    subject: Union[AstrologicalSubject, ChartSnapshot],
+    other_subject: Optional[Union[AstrologicalSubject, ChartSnapshot]] = None,
+    language: LanguageType = "pt",
+    cross_aspects: bool = False,
+    subject_owner: str = "natal",
+    other_owner: str = "natal"
+) -> List[AspectData]:
+    """
+    Calcula os aspectos entre planetas em um mapa ou entre dois mapas.
+    
+    Args:
+        subject (Union[AstrologicalSubject, ChartSnapshot]): Sujeito astrológico ou instantâneo do mapa.
+        other_subject (Optional[Union[AstrologicalSubject, ChartSnapshot]]): Segundo mapa, usado quando cross_aspects é True.
+        language (LanguageType): Idioma para nomes traduzidos. Defaults to "pt".
+        cross_aspects (bool): Se True, calcula os aspectos entre os planetas dos dois mapas.
+        subject_owner (str): Proprietário dos planetas do primeiro mapa. Defaults to "natal".
+        other_owner (str): Proprietário dos planetas do segundo mapa. Defaults to "natal".
+        
+    Returns:
+        List[AspectData]: Lista de aspectos.
+    """
     try:
-        # Lista de planetas principais para aspectos
-        planet_attrs = [
-            'sun', 'moon', 'mercury', 'venus', 'mars', 'jupiter', 'saturn',
-            'uranus', 'neptune', 'pluto'
-        ]
+        backend = get_backend()
+        positions1 = backend.positions_at(subject.julian_day, MAJOR_PLANETS)
+        
+        if cross_aspects and other_subject is not None:
+            positions2 = backend.positions_at(other_subject.julian_day, MAJOR_PLANETS)
+            hits = find_aspects(
+                positions1.longitude, positions2.longitude,
+                positions1.speed, positions2.speed
+            )
+            return build_aspect_data(hits, positions1.bodies, positions2.bodies, subject_owner, other_owner, language)
+        
+        # Aspectos dentro do mesmo mapa: apenas pares distintos
+        hits = find_aspects(
+            positions1.longitude, positions1.longitude,
+            positions1.speed, positions1.speed,
+            unique_pairs=True
+        )
+        return build_aspect_data(hits, positions1.bodies, positions1.bodies, subject_owner, subject_owner, language)
         
-        # Calcular aspectos entre todos os pares de planetas
-        for i, p1_attr in enumerate(planet_attrs):
-            if not hasattr(subject, p1_attr):
-                continue
-                
-            planet1 = getattr(subject, p1_attr)
-            if not planet1 or not hasattr(planet1, 'longitude'):
-                continue
-                
-            for p2_attr in planet_attrs[i+1:]:
-                if not hasattr(subject, p2_attr):
-                    continue
-                    
-                planet2 = getattr(subject, p2_attr)
-                if not planet2 or not hasattr(planet2, 'longitude'):
-                    continue
-                    
-                # Calcular o aspecto
-                aspect_info = calculate_aspect(planet1.longitude, planet2.longitude)
-                if not aspect_info:
-                    continue
-                
-                # Criar chave única para o aspecto
-                aspect_key = tuple(sorted([p1_attr, p2_attr]))
-                if aspect_key in processed:
-                    continue
-                
-                processed.add(aspect_key)
-                
-                # Determinar se o aspecto está se aplicando
-                applying = False
-                if hasattr(planet1, 'motion') and hasattr(planet2, 'motion'):
-                    if hasattr(planet1.motion, 'speed') and hasattr(planet2.motion, 'speed'):
-                        applying = planet1.motion.speed > planet2.motion.speed
-                
-                # Criar o objeto AspectData
-                aspect_data = AspectData(
-                    p1_name=translate_planet(planet1.name, language),
-                    p1_name_original=planet1.name,
-                    p1_owner="natal",
-                    p2_name=translate_planet(planet2.name, language),
-                    p2_name_original=planet2.name,
-                    p2_owner="natal",
-                    aspect=translate_aspect(aspect_info["aspect"], language),
-                    aspect_original=aspect_info["aspect"],
-                    orbit=round(float(aspect_info["orbit"]), 4),
-                    aspect_degrees=round(float(aspect_info["angle"]), 4),
-                    diff=round(float(aspect_info["diff"]), 4),
-                    applying=applying
-                )
-                
-                result.append(aspect_data)
-                
     except Exception as e:
         logger.error(f"Erro ao calcular aspectos: {str(e)}")
         
-    return result
+    return []
 
 def get_aspects_between_charts(
     subject1: AstrologicalSubject, 
@@ -263,7 +387,7 @@ def get_aspects_between_charts(
                 orbit=float(aspect.orbit) if hasattr(aspect, 'orbit') else 0.0,
                 aspect_degrees=float(aspect.aspect_degrees) if hasattr(aspect, 'aspect_degrees') else 0.0,
                 diff=float(aspect.diff) if hasattr(aspect, 'diff') else 0.0,
-                applying=False  # Implementar lógica de applying/separating se necessário
+                applying=bool(getattr(aspect, 'applying', False))
             )
             
             result.append(aspect_data)
@@ -277,48 +401,34 @@ def calculate_aspects_between(subject1: AstrologicalSubject, subject2: Astrologi
     """Implementação alternativa para cálculo de aspectos entre mapas."""
     result = []
     
-    # Definir aspectos principais e seus orbes
-    aspects = {
-        "Conjunction": {"angle": 0, "orb": 8},
-        "Opposition": {"angle": 180, "orb": 8},
-        "Trine": {"angle": 120, "orb": 6},
-        "Square": {"angle": 90, "orb": 6},
-        "Sextile": {"angle": 60, "orb": 4}
-    }
-    
     try:
-        # Iterar sobre os planetas do primeiro mapa
-        for p1 in subject1.planets_list:
-            if not p1:
-                continue
-                
-            # Iterar sobre os planetas do segundo mapa
-            for p2 in subject2.planets_list:
-                if not p2:
-                    continue
-                    
-                # Calcular a diferença de longitude
-                diff = abs(p1.longitude - p2.longitude)
-                if diff > 180:
-                    diff = 360 - diff
-                    
-                # Verificar aspectos
-                for aspect_name, aspect_data in aspects.items():
-                    orbit = abs(diff - aspect_data["angle"])
-                    
-                    if orbit <= aspect_data["orb"]:
-                        # Criar um objeto de aspecto simples
-                        aspect = type("Aspect", (), {
-                            "p1": p1,
-                            "p2": p2,
-                            "aspect": aspect_name,
-                            "orbit": orbit,
-                            "aspect_degrees": aspect_data["angle"],
-                            "diff": diff
-                        })
-                        
-                        result.append(aspect)
-                        
+        # Obter apenas as posições dos planetas, sem recalcular casas e fase lunar
+        backend = get_backend()
+        positions1 = backend.positions_at(subject1.julian_day)
+        positions2 = backend.positions_at(subject2.julian_day)
+        
+        hits = find_aspects(
+            positions1.longitude, positions2.longitude,
+            positions1.speed, positions2.speed
+        )
+        
+        for hit, aspect_name in zip(hits, aspect_names(hits)):
+            body1 = positions1.bodies[hit["i"]]
+            body2 = positions2.bodies[hit["j"]]
+            
+            # Criar um objeto de aspecto simples
+            aspect = type("Aspect", (), {
+                "p1": type("Point", (), {"name": BODY_NAMES[body1], "longitude": float(positions1.longitude[hit["i"]])}),
+                "p2": type("Point", (), {"name": BODY_NAMES[body2], "longitude": float(positions2.longitude[hit["j"]])}),
+                "aspect": aspect_name,
+                "orbit": float(hit["orbit"]),
+                "aspect_degrees": float(hit["angle"]),
+                "diff": float(hit["diff"]),
+                "applying": bool(hit["applying"])
+            })
+            
+            result.append(aspect)
+            
     except Exception as e:
         logger.error(f"Erro ao calcular aspectos manualmente: {str(e)}")
         
@@ -346,56 +456,40 @@ def get_aspects_between_subjects(
     Returns:
         List[AspectData]: Lista com os dados dos aspectos entre os dois objetos.
     """
-    result = []
+    # Obter as posições dos planetas dos dois objetos
+    backend = get_backend()
+    positions1 = backend.positions_at(subject1.julian_day)
+    positions2 = backend.positions_at(subject2.julian_day)
     
-    # Obter os aspectos entre os dois objetos
-    raw_aspects = subject1.get_aspects_to(subject2)
-    
-    # Mapeamento de nomes de aspectos em português
-    aspect_names_pt = {
-        "Conjunction": "Conjunção",
-        "Opposition": "Oposição",
-        "Trine": "Trígono",
-        "Square": "Quadratura",
-        "Sextile": "Sextil",
-        "Quincunx": "Quincúncio",
-        "Semisextile": "Semisextil",
-        "Semisquare": "Semiquadratura",
-        "Sesquiquadrate": "Sesquiquadratura",
-        "Quintile": "Quintil",
-        "Biquintile": "Biquintil"
-    }
+    return get_aspects_between_positions(positions1, positions2, subject1_owner, subject2_owner, language)
+
+def get_aspects_between_positions(
+    positions1: BodyPositions,
+    positions2: BodyPositions,
+    positions1_owner: str = "natal",
+    positions2_owner: str = "transit",
+    language: str = "pt"
+) -> List[AspectData]:
+    """
+    Calcula os aspectos entre dois conjuntos de posições já calculadas (ex: o céu compartilhado de um minuto).
     
-    for asp in raw_aspects:
-        # Obter o nome do aspecto no idioma selecionado
-        aspect_name = asp.aspect_name
-        if language == "pt":
-            aspect_name = aspect_names_pt.get(asp.aspect_name, asp.aspect_name)
-        
-        # Determinar se o aspecto está se aplicando
-        applying = False
-        if hasattr(asp, 'applying'):
-            applying = asp.applying
-        
-        # Criar o objeto AspectData
-        aspect_data = AspectData(
-            p1_name=asp.p1_name if language == "pt" else asp.p1_name,
-            p1_name_original=asp.p1_name,
-            p1_owner=subject1_owner,
-            p2_name=asp.p2_name if language == "pt" else asp.p2_name,
-            p2_name_original=asp.p2_name,
-            p2_owner=subject2_owner,
-            aspect=aspect_name,
-            aspect_original=asp.aspect_name,
-            orbit=round(asp.orbit, 4),
-            aspect_degrees=round(asp.aspect_degrees, 4) if hasattr(asp, 'aspect_degrees') else 0.0,
-            diff=round(asp.diff, 4) if hasattr(asp, 'diff') else 0.0,
-            applying=applying
-        )
+    Args:
+        positions1 (BodyPositions): Posições do primeiro mapa (geralmente o natal).
+        positions2 (BodyPositions): Posições do segundo mapa (geralmente o de trânsito).
+        positions1_owner (str, opcional): Proprietário das primeiras posições. Padrão é "natal".
+        positions2_owner (str, opcional): Proprietário das segundas posições. Padrão é "transit".
+        language (str, opcional): Idioma para os textos. Padrão é "pt".
         
-        result.append(aspect_data)
+    Returns:
+        List[AspectData]: Lista com os dados dos aspectos entre os dois conjuntos.
+    """
+    # Calcular a matriz completa de aspectos entre os dois conjuntos
+    hits = find_aspects(
+        positions1.longitude, positions2.longitude,
+        positions1.speed, positions2.speed
+    )
     
-    return result
+    return build_aspect_data(hits, positions1.bodies, positions2.bodies, positions1_owner, positions2_owner, language)
 
 def get_synastry_aspects_data(subject1: AstrologicalSubject, subject2: AstrologicalSubject, language: str = "pt") -> List[AspectData]:
     """
@@ -409,101 +503,18 @@ def get_synastry_aspects_data(subject1: AstrologicalSubject, subject2: Astrologi
     Returns:
         List[AspectData]: Lista de aspectos entre os planetas dos dois mapas.
     """
-    aspects = []
-    
-    # Dicionário para mapear nomes de planetas em inglês para os do Kerykeion
-    planet_to_kerykeion = {
-        "Sun": "sun", "Moon": "moon", "Mercury": "mercury", "Venus": "venus",
-        "Mars": "mars", "Jupiter": "jupiter", "Saturn": "saturn",
-        "Uranus": "uranus", "Neptune": "neptune", "Pluto": "pluto",
-        "Mean_Node": "mean_node", "True_Node": "true_node", "Chiron": "chiron"
-    }
-    
-    # Obter planetas do primeiro mapa
-    planets1 = subject1.planets
-    
-    # Obter planetas do segundo mapa
-    planets2 = subject2.planets
-    
-    # Aspectos aceitos pelo Kerykeion
-    aspects_to_check = ["conjunction", "opposition", "trine", "square", "sextile"]
-    
-    # Orbes para cada tipo de aspecto
-    orbs = {
-        "conjunction": 8, "opposition": 8, "trine": 6,
-        "square": 6, "sextile": 4
-    }
-    
-    # Mapear aspectos
-    aspect_map = {
-        "conjunction": "Conjunction", "opposition": "Opposition",
-        "trine": "Trine", "square": "Square", "sextile": "Sextile"
-    }
+    # Obter as posições dos planetas dos dois mapas
+    backend = get_backend()
+    positions1 = backend.positions_at(subject1.julian_day)
+    positions2 = backend.positions_at(subject2.julian_day)
+    
+    # Calcular a matriz completa de aspectos entre os dois mapas
+    hits = find_aspects(
+        positions1.longitude, positions2.longitude,
+        positions1.speed, positions2.speed
+    )
     
-    # Calcular aspectos entre os planetas dos dois mapas
-    for p1_en, p1_key in planet_to_kerykeion.items():
-        if p1_key not in planets1:
-            continue
-        
-        p1_lon = planets1[p1_key]['position']['longitude']
-        
-        for p2_en, p2_key in planet_to_kerykeion.items():
-            if p2_key not in planets2:
-                continue
-            
-            p2_lon = planets2[p2_key]['position']['longitude']
-            
-            # Calcular a diferença em graus
-            diff = abs(p1_lon - p2_lon)
-            if diff > 180:
-                diff = 360 - diff
-            
-            # Verificar se há algum aspecto
-            for aspect_key, aspect_en in aspect_map.items():
-                aspect_degree = 0
-                if aspect_key == "conjunction":
-                    aspect_degree = 0
-                elif aspect_key == "opposition":
-                    aspect_degree = 180
-                elif aspect_key == "trine":
-                    aspect_degree = 120
-                elif aspect_key == "square":
-                    aspect_degree = 90
-                elif aspect_key == "sextile":
-                    aspect_degree = 60
-                
-                # Verificar se está dentro do orbe
-                orbit = abs(diff - aspect_degree)
-                if orbit <= orbs[aspect_key]:
-                    # Determinar se o aspecto está se aplicando ou separando
-                    applying = False
-                    if p1_lon < p2_lon:
-                        applying = planets1[p1_key]['position']['speed'] > planets2[p2_key]['position']['speed']
-                    else:
-                        applying = planets1[p1_key]['position']['speed'] < planets2[p2_key]['position']['speed']
-                    
-                    # Traduzir nomes
-                    p1_name = translate_planet(p1_en, language)
-                    p2_name = translate_planet(p2_en, language)
-                    aspect_name = translate_aspect(aspect_en, language)
-                    
-                    # Adicionar aspecto
-                    aspects.append(AspectData(
-                        p1_name=p1_name,
-                        p1_name_original=p1_en,
-                        p1_owner="chart1",
-                        p2_name=p2_name,
-                        p2_name_original=p2_en,
-                        p2_owner="chart2",
-                        aspect=aspect_name,
-                        aspect_original=aspect_en,
-                        orbit=orbit,
-                        aspect_degrees=aspect_degree,
-                        diff=diff,
-                        applying=applying
-                    ))
-    
-    return aspects
+    return build_aspect_data(hits, positions1.bodies, positions2.bodies, "chart1", "chart2", language)
 
 def get_progressed_chart(natal_subject: AstrologicalSubject, prog_year: int, prog_month: int, prog_day: int) -> AstrologicalSubject:
     """
@@ -550,11 +561,55 @@ def get_progressed_chart(natal_subject: AstrologicalSubject, prog_year: int, pro
         lng=natal_subject.lng,
         lat=natal_subject.lat,
         tz_str=natal_subject.tz_str,
-        house_system=natal_subject.house_system
+        houses_system_identifier=getattr(natal_subject, "houses_system_identifier", "P")
     )
     
     return progressed_subject
 
+def find_return_instant(
+    natal_subject: AstrologicalSubject,
+    return_year: int,
+    return_month: Optional[int],
+    return_type: Literal["solar", "lunar"],
+    location_tz: str
+) -> float:
+    """
+    Encontra o instante exato de um retorno solar ou lunar.
+    
+    Args:
+        natal_subject (AstrologicalSubject): Objeto AstrologicalSubject do mapa natal.
+        return_year (int): Ano para o qual calcular o retorno.
+        return_month (Optional[int]): Mês do retorno lunar. Padrão é o mês atual.
+        return_type (str): Tipo de retorno, "solar" ou "lunar".
+        location_tz (str): Fuso horário do local do retorno.
+        
+    Returns:
+        float: Dia juliano (UT) do retorno.
+    """
+    if return_type not in RETURN_BODIES:
+        raise ValueError(f"Tipo de retorno não suportado: {return_type}")
+    
+    # Se o mês não foi especificado, usar o mês atual (apenas para retorno lunar)
+    if return_month is None:
+        return_month = datetime.now().month
+    
+    # Longitude natal do Sol ou da Lua, calculada com as mesmas efemérides da busca
+    natal_longitude, _ = get_backend().longitude(natal_subject.julian_day, BODY_KEYS[RETURN_BODIES[return_type]])
+    
+    # Encontrar o instante exato do retorno avaliando apenas a longitude do corpo
+    jd_start = return_search_start(
+        return_type,
+        natal_subject.month,
+        natal_subject.day,
+        natal_subject.hour,
+        natal_subject.minute,
+        natal_subject.tz_str,
+        return_year,
+        return_month,
+        location_tz
+    )
+    return find_return_julian_day(natal_longitude, jd_start, return_type)
+
 def get_return_chart(
     natal_subject: AstrologicalSubject, 
     return_year: int, 
@@ -584,205 +639,30 @@ def get_return_chart(
     location_lat = location_latitude if location_latitude is not None else natal_subject.lat
     location_tz = location_tz_str if location_tz_str is not None else natal_subject.tz_str
     
-    if return_type == "solar":
-        # Para retorno solar, precisamos encontrar o momento exato em que o Sol retorna
-        # à mesma posição zodiacal do mapa natal
-        
-        # Obter a posição do Sol no mapa natal
-        natal_sun_position = natal_subject.planets["sun"]["position"]["longitude"]
-        
-        # Criar uma data aproximada para o retorno solar (próximo ao aniversário)
-        natal_month = natal_subject.month
-        natal_day = natal_subject.day
-        
-        # Data inicial para a busca
-        start_date = datetime(return_year, natal_month, natal_day)
-        
-        # Ajustar para 5 dias antes do aniversário
-        start_date = start_date - timedelta(days=5)
-        
-        # Criar um mapa para esta data inicial
-        temp_subject = AstrologicalSubject(
-            name=f"{natal_subject.name}_SolarReturn",
-            year=start_date.year,
-            month=start_date.month,
-            day=start_date.day,
-            hour=12,  # Meio-dia como hora inicial
-            minute=0,
-            city="",
-            lng=location_lng,
-            lat=location_lat,
-            tz_str=location_tz
-        )
-        
-        # Buscar iterativamente a data do retorno solar
-        for i in range(12):  # Verificar até 12 dias a partir da data inicial
-            temp_date = start_date + timedelta(days=i)
-            temp_subject = AstrologicalSubject(
-                name=f"{natal_subject.name}_SolarReturn",
-                year=temp_date.year,
-                month=temp_date.month,
-                day=temp_date.day,
-                hour=12,  # Meio-dia como hora inicial
-                minute=0,
-                city="",
-                lng=location_lng,
-                lat=location_lat,
-                tz_str=location_tz
-            )
-            
-            # Verificar a posição do Sol
-            current_sun_position = temp_subject.planets["sun"]["position"]["longitude"]
-            
-            # Se a posição atual é maior que a natal, significa que o retorno ocorreu
-            # entre este dia e o anterior
-            if current_sun_position > natal_sun_position and i > 0:
-                break
-        
-        # Refinar a hora exata do retorno
-        for hour in range(24):
-            temp_subject = AstrologicalSubject(
-                name=f"{natal_subject.name}_SolarReturn",
-                year=temp_date.year,
-                month=temp_date.month,
-                day=temp_date.day,
-                hour=hour,
-                minute=0,
-                city="",
-                lng=location_lng,
-                lat=location_lat,
-                tz_str=location_tz
-            )
-            
-            current_sun_position = temp_subject.planets["sun"]["position"]["longitude"]
-            
-            # Se a posição atual é maior ou igual à natal, encontramos a hora aproximada
-            if abs(current_sun_position - natal_sun_position) < 1.0:
-                # Refinar os minutos
-                for minute in range(0, 60, 5):
-                    temp_subject = AstrologicalSubject(
-                        name=f"{natal_subject.name}_SolarReturn",
-                        year=temp_date.year,
-                        month=temp_date.month,
-                        day=temp_date.day,
-                        hour=hour,
-                        minute=minute,
-                        city="",
-                        lng=location_lng,
-                        lat=location_lat,
-                        tz_str=location_tz
-                    )
-                    
-                    current_sun_position = temp_subject.planets["sun"]["position"]["longitude"]
-                    
-                    # Verificar se encontramos a posição exata
-                    if abs(current_sun_position - natal_sun_position) < 0.1:
-                        return temp_subject
-                
-                # Se não encontrou a posição exata, retorna a mais próxima
-                return temp_subject
-        
-        # Se não encontrou nas horas, retorna o mapa do meio-dia
-        return temp_subject
+    return_jd = find_return_instant(natal_subject, return_year, return_month, return_type, location_tz)
+    return_utc = datetime_from_julian_day(return_jd)
+    
+    # Construir um único mapa completo no minuto local mais próximo do retorno
+    return_local = (return_utc + timedelta(seconds=30)).astimezone(pytz.timezone(location_tz))
+    suffix = "SolarReturn" if return_type == "solar" else "LunarReturn"
+    return_subject = AstrologicalSubject(
+        name=f"{natal_subject.name}_{suffix}",
+        year=return_local.year,
+        month=return_local.month,
+        day=return_local.day,
+        hour=return_local.hour,
+        minute=return_local.minute,
+        city="",
+        lng=location_lng,
+        lat=location_lat,
+        tz_str=location_tz,
+        houses_system_identifier=getattr(natal_subject, "houses_system_identifier", "P")
+    )
     
-    elif return_type == "lunar":
-        # Para retorno lunar, precisamos encontrar o momento exato em que a Lua retorna
-        # à mesma posição zodiacal do mapa natal
-        
-        # Obter a posição da Lua no mapa natal
-        natal_moon_position = natal_subject.planets["moon"]["position"]["longitude"]
-        
-        # Se o mês não foi especificado, usar o mês atual
-        if return_month is None:
-            return_month = datetime.now().month
-        
-        # Data inicial para a busca (primeiro dia do mês)
-        start_date = datetime(return_year, return_month, 1)
-        
-        # Calcular cada dia do mês até encontrar o retorno lunar
-        for day in range(1, 29):  # A Lua completa um ciclo em aproximadamente 27.3 dias
-            temp_date = start_date + timedelta(days=day)
-            
-            temp_subject = AstrologicalSubject(
-                name=f"{natal_subject.name}_LunarReturn",
-                year=temp_date.year,
-                month=temp_date.month,
-                day=temp_date.day,
-                hour=12,  # Meio-dia como hora inicial
-                minute=0,
-                city="",
-                lng=location_lng,
-                lat=location_lat,
-                tz_str=location_tz
-            )
-            
-            # Verificar a posição da Lua
-            current_moon_position = temp_subject.planets["moon"]["position"]["longitude"]
-            
-            # Se a posição atual está próxima da natal, refinar a hora
-            if abs(current_moon_position - natal_moon_position) < 15:
-                # Refinar a hora exata do retorno
-                for hour in range(24):
-                    temp_subject = AstrologicalSubject(
-                        name=f"{natal_subject.name}_LunarReturn",
-                        year=temp_date.year,
-                        month=temp_date.month,
-                        day=temp_date.day,
-                        hour=hour,
-                        minute=0,
-                        city="",
-                        lng=location_lng,
-                        lat=location_lat,
-                        tz_str=location_tz
-                    )
-                    
-                    current_moon_position = temp_subject.planets["moon"]["position"]["longitude"]
-                    
-                    # Se a posição atual está mais próxima da natal, refinar os minutos
-                    if abs(current_moon_position - natal_moon_position) < 5:
-                        # Refinar os minutos
-                        for minute in range(0, 60, 5):
-                            temp_subject = AstrologicalSubject(
-                                name=f"{natal_subject.name}_LunarReturn",
-                                year=temp_date.year,
-                                month=temp_date.month,
-                                day=temp_date.day,
-                                hour=hour,
-                                minute=minute,
-                                city="",
-                                lng=location_lng,
-                                lat=location_lat,
-                                tz_str=location_tz
-                            )
-                            
-                            current_moon_position = temp_subject.planets["moon"]["position"]["longitude"]
-                            
-                            # Verificar se encontramos a posição exata
-                            if abs(current_moon_position - natal_moon_position) < 0.5:
-                                return temp_subject
-                        
-                        # Se não encontrou a posição exata, retorna a mais próxima
-                        return temp_subject
-                
-                # Se não encontrou nas horas, retorna o mapa do meio-dia
-                return temp_subject
-        
-        # Se não encontrou o retorno lunar no mês especificado, usar o primeiro dia do mês
-        return AstrologicalSubject(
-            name=f"{natal_subject.name}_LunarReturn",
-            year=return_year,
-            month=return_month,
-            day=1,
-            hour=12,
-            minute=0,
-            city="",
-            lng=location_lng,
-            lat=location_lat,
-            tz_str=location_tz
-        )
+    # Guardar o instante exato (com segundos) do retorno
+    return_subject.utc_datetime = return_utc
     
-    else:
-        raise ValueError(f"Tipo de retorno não suportado: {return_type}")
+    return return_subject
 
 def get_return_chart_cached(
     natal_subject: AstrologicalSubject, 
@@ -792,10 +672,13 @@ def get_return_chart_cached(
     location_longitude: Optional[float] = None,
     location_latitude: Optional[float] = None,
     location_tz_str: Optional[str] = None
-) -> AstrologicalSubject:
+) -> ChartSnapshot:
     """
     Calcula um mapa de retorno solar ou lunar com cache.
     
+    O cache guarda o instantâneo compacto do mapa (ChartSnapshot), e não o
+    AstrologicalSubject, para não depender da versão do Kerykeion.
+    
     Args:
         natal_subject (AstrologicalSubject): Objeto AstrologicalSubject do mapa natal.
         return_year (int): Ano para o qual calcular o retorno.
@@ -806,54 +689,54 @@ def get_return_chart_cached(
         location_tz_str (Optional[str]): Fuso horário do local do retorno.
         
     Returns:
-        AstrologicalSubject: Objeto AstrologicalSubject do mapa de retorno.
+        ChartSnapshot: Instantâneo do mapa de retorno, no instante exato do retorno.
     """
     # Gerar a chave de cache
     cache_key = get_cache_key(
         f"{return_type}_return",
+        version=SNAPSHOT_VERSION,
         natal_name=natal_subject.name,
-        natal_year=natal_subject.year,
+        natal_julian_day=natal_subject.julian_day,
         natal_month=natal_subject.month,
         natal_day=natal_subject.day,
-        natal_hour=natal_subject.hour,
-        natal_minute=natal_subject.minute,
+        natal_tz_str=natal_subject.tz_str,
         return_year=return_year,
         return_month=return_month,
-        location_longitude=location_longitude or natal_subject.lng,
-        location_latitude=location_latitude or natal_subject.lat,
-        location_tz_str=location_tz_str or natal_subject.tz_str
+        location_longitude=location_longitude if location_longitude is not None else natal_subject.lng,
+        location_latitude=location_latitude if location_latitude is not None else natal_subject.lat,
+        location_tz_str=location_tz_str or natal_subject.tz_str,
+        house_system=getattr(natal_subject, "houses_system_identifier", "P")
     )
     
-    # Verificar se existe no cache
-    cached_subject = get_from_cache(cache_key)
-    if cached_subject is not None:
-        return cached_subject
-    
-    # Se não estiver no cache, calcular
-    subject = get_return_chart(
-        natal_subject=natal_subject,
-        return_year=return_year,
-        return_month=return_month,
-        return_type=return_type,
-        location_longitude=location_longitude,
-        location_latitude=location_latitude,
-        location_tz_str=location_tz_str
-    )
-    
-    # Salvar no cache
-    save_to_cache(cache_key, subject)
+    def compute() -> ChartSnapshot:
+        # O instantâneo sai direto das efemérides no instante exato, sem construir um AstrologicalSubject
+        location_tz = location_tz_str or natal_subject.tz_str
+        return_jd = find_return_instant(natal_subject, return_year, return_month, return_type, location_tz)
+        suffix = "SolarReturn" if return_type == "solar" else "LunarReturn"
+        return take_snapshot(
+            return_jd,
+            location_latitude if location_latitude is not None else natal_subject.lat,
+            location_longitude if location_longitude is not None else natal_subject.lng,
+            getattr(natal_subject, "houses_system_identifier", "P"),
+            f"{natal_subject.name}_{suffix}",
+            location_tz
+        )
     
-    return subject
+    # Recuperar do cache ou calcular uma única vez entre chamadas simultâneas
+    return get_or_compute(cache_key, compute)
 
 def get_progressed_chart_cached(
     natal_subject: AstrologicalSubject, 
     prog_year: int, 
     prog_month: int, 
     prog_day: int
-) -> AstrologicalSubject:
+) -> ChartSnapshot:
     """
     Calcula o mapa progressado secundário com cache.
     
+    O cache guarda o instantâneo compacto do mapa (ChartSnapshot), e não o
+    AstrologicalSubject, para não depender da versão do Kerykeion.
+    
     Args:
         natal_subject (AstrologicalSubject): Objeto AstrologicalSubject do mapa natal.
         prog_year (int): Ano para o qual calcular a progressão.
@@ -861,39 +744,34 @@ def get_progressed_chart_cached(
         prog_day (int): Dia para o qual calcular a progressão.
         
     Returns:
-        AstrologicalSubject: Objeto AstrologicalSubject do mapa progressado.
+        ChartSnapshot: Instantâneo do mapa progressado.
     """
     # Gerar a chave de cache
     cache_key = get_cache_key(
         "progressed_chart",
+        version=SNAPSHOT_VERSION,
         natal_name=natal_subject.name,
-        natal_year=natal_subject.year,
-        natal_month=natal_subject.month,
-        natal_day=natal_subject.day,
-        natal_hour=natal_subject.hour,
-        natal_minute=natal_subject.minute,
-        prog_year=prog_year,
-        prog_month=prog_month,
-        prog_day=prog_day
-    )
-    
-    # Verificar se existe no cache
-    cached_subject = get_from_cache(cache_key)
-    if cached_subject is not None:
-        return cached_subject
-    
-    # Se não estiver no cache, calcular
-    subject = get_progressed_chart(
-        natal_subject=natal_subject,
+        natal_julian_day=natal_subject.julian_day,
+        natal_longitude=natal_subject.lng,
+        natal_latitude=natal_subject.lat,
+        natal_tz_str=natal_subject.tz_str,
+        house_system=getattr(natal_subject, "houses_system_identifier", "P"),
         prog_year=prog_year,
         prog_month=prog_month,
         prog_day=prog_day
     )
     
-    # Salvar no cache
-    save_to_cache(cache_key, subject)
+    def compute() -> ChartSnapshot:
+        subject = get_progressed_chart(
+            natal_subject=natal_subject,
+            prog_year=prog_year,
+            prog_month=prog_month,
+            prog_day=prog_day
+        )
+        return snapshot_from_subject(subject)
     
-    return subject
+    # Recuperar do cache ou calcular uma única vez entre chamadas simultâneas
+    return get_or_compute(cache_key, compute)
 
 def calculate_solar_arc_directions(
     natal_subject: AstrologicalSubject, 
@@ -926,10 +804,10 @@ def calculate_solar_arc_directions(
     # Calcular o arco solar (aproximadamente 1 grau por ano)
     solar_arc = years_diff
     
-    # Obter as posições dos planetas natais
+    # Obter as posições dos planetas natais diretamente das efemérides
     natal_positions = {}
-    for planet_key, planet_data in natal_subject.planets.items():
-        natal_positions[planet_key] = planet_data['position']['longitude']
+    for planet_key, (longitude, _, _) in get_backend().positions_at(natal_subject.julian_day).items():
+        natal_positions[planet_key] = longitude
     
     # Calcular as posições direcionadas (adicionar o arco solar)
     directed_positions = {}
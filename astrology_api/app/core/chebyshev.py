@@ -0,0 +1,196 @@
+"""
+Módulo das efemérides em polinômios de Chebyshev.
+
+Como nas efemérides do JPL, o tempo é dividido em segmentos de tamanho fixo por
+corpo (4 dias para a Lua, 8 para Mercúrio, 16 para os demais) e, em cada segmento,
+longitude e latitude são aproximadas por uma série de Chebyshev. A avaliação é
+vetorizada: milhares de instantes são avaliados de uma vez, com uma matriz de
+Vandermonde e um produto por segmento, em vez de uma chamada ao Swiss Ephemeris
+por instante. As velocidades vêm da derivada da série.
+
+Cada segmento guarda também o maior erro medido na construção contra o Swiss
+Ephemeris, para que o chamador recalcule os instantes em segmentos que não
+atendam à tolerância pedida.
+
+Formato (little-endian):
+    cabeçalho     magic, versão e tamanho dos metadados
+    metadados     JSON (por corpo, início, tamanho dos segmentos, grau e posições dos dados)
+    dados         por corpo, os coeficientes (segmentos, 2, grau + 1) e o erro de cada segmento
+"""
+from typing import Any, Dict, Optional, Tuple
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+CHEBYSHEV_MAGIC = b"ACHB"
+CHEBYSHEV_VERSION = 1
+
+_HEADER = struct.Struct("<4sHQ")
+
+# Componentes aproximadas em cada segmento
+LONGITUDE, LATITUDE = range(2)
+COMPONENTS = 2
+
+class ChebyshevSeries:
+    """
+    Séries de Chebyshev de um corpo em segmentos consecutivos.
+
+    Attributes:
+        jd_start (float): Dia juliano (UT) do início do primeiro segmento.
+        segment_days (float): Duração de cada segmento em dias.
+        coefficients (np.ndarray): Coeficientes (segmentos, 2, grau + 1) da longitude
+            (contínua dentro do segmento, sem redução a 0-360) e da latitude.
+        errors (np.ndarray): Maior erro medido em cada segmento, em graus.
+    """
+    __slots__ = ("jd_start", "segment_days", "coefficients", "errors", "jd_end", "_derivatives")
+
+    def __init__(self, jd_start: float, segment_days: float, coefficients: np.ndarray, errors: np.ndarray) -> None:
+        self.jd_start = jd_start
+        self.segment_days = segment_days
+        self.coefficients = coefficients
+        self.errors = errors
+        self.jd_end = jd_start + len(coefficients) * segment_days
+        self._derivatives: Optional[np.ndarray] = None
+
+    @property
+    def degree(self) -> int:
+        return self.coefficients.shape[2] - 1
+
+    def covers(self, jds: np.ndarray) -> bool:
+        """Indica se todos os instantes estão dentro dos segmentos."""
+        return not len(jds) or (jds.min() >= self.jd_start and jds.max() <= self.jd_end)
+
+    def evaluate(self, jds: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Avalia longitude, latitude e velocidade em vários instantes de uma vez.
+
+        Args:
+            jds (np.ndarray): Dias julianos (UT), dentro dos segmentos.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Longitudes (0-360),
+                latitudes, velocidades em longitude (graus/dia) e erro do segmento de
+                cada instante, em graus.
+
+        Raises:
+            ValueError: Se algum instante estiver fora dos segmentos.
+        """
+        jds = np.asarray(jds, dtype=np.float64)
+        if not self.covers(jds):
+            raise ValueError("Instante fora do intervalo das efemérides de Chebyshev")
+        if self._derivatives is None:
+            self._derivatives = chebyshev.chebder(np.asarray(self.coefficients[:, LONGITUDE], dtype=np.float64), axis=1)
+
+        position = (jds - self.jd_start) / self.segment_days
+        segment = np.minimum(position.astype(np.int64), len(self.coefficients) - 1)
+        x = 2.0 * (position - segment) - 1.0
+
+        # T_k(x) de cada instante, combinados com os coeficientes do seu segmento
+        basis = chebyshev.chebvander(x, self.degree)
+        values = np.einsum("nk,nck->nc", basis, self.coefficients[segment])
+        speed = np.einsum("nk,nk->n", basis[:, :-1], self._derivatives[segment]) * 2.0 / self.segment_days
+        return values[:, LONGITUDE] % 360.0, values[:, LATITUDE], speed, self.errors[segment].astype(np.float64)
+
+class ChebyshevEphemeris:
+    """
+    Efemérides de Chebyshev de vários corpos, mapeadas de um arquivo.
+
+    Attributes:
+        series (Dict[str, ChebyshevSeries]): Séries de cada corpo, pela chave usada na API.
+        metadata (Dict[str, Any]): Metadados gravados com as efemérides.
+    """
+    __slots__ = ("series", "metadata")
+
+    def __init__(self, series: Dict[str, ChebyshevSeries], metadata: Dict[str, Any]) -> None:
+        self.series = series
+        self.metadata = metadata
+
+    def __contains__(self, body: str) -> bool:
+        return body in self.series
+
+def write_chebyshev_ephemeris(path: str, series: Dict[str, ChebyshevSeries], metadata: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Grava as efemérides de Chebyshev.
+
+    O arquivo é gravado ao lado do destino e renomeado no final, como a tabela de efemérides.
+
+    Args:
+        path (str): Caminho do arquivo.
+        series (Dict[str, ChebyshevSeries]): Séries de cada corpo.
+        metadata (Optional[Dict[str, Any]]): Metadados adicionais.
+    """
+    bodies: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    for body, body_series in series.items():
+        segments, _, terms = body_series.coefficients.shape
+        bodies[body] = {
+            "jd_start": body_series.jd_start,
+            "segment_days": body_series.segment_days,
+            "segments": segments,
+            "degree": terms - 1,
+            "coefficients_offset": offset,
+            "errors_offset": offset + segments * COMPONENTS * terms * 8,
+        }
+        offset = bodies[body]["errors_offset"] + segments * 4
+        offset += -offset % 8
+
+    metadata_bytes = json.dumps(dict(metadata or {}, bodies=bodies)).encode("utf-8")
+    header = _HEADER.pack(CHEBYSHEV_MAGIC, CHEBYSHEV_VERSION, len(metadata_bytes))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp.{os.getpid()}"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        f.write(metadata_bytes)
+        f.write(b"\0" * (-(len(header) + len(metadata_bytes)) % 8))
+        for body_series in series.values():
+            coefficients = np.ascontiguousarray(body_series.coefficients, dtype="<f8")
+            errors = np.ascontiguousarray(body_series.errors, dtype="<f4")
+            f.write(coefficients.tobytes())
+            f.write(errors.tobytes())
+            f.write(b"\0" * (-(coefficients.nbytes + errors.nbytes) % 8))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def load_chebyshev_ephemeris(path: str) -> ChebyshevEphemeris:
+    """
+    Abre efemérides gravadas com write_chebyshev_ephemeris, mapeando o arquivo em memória.
+
+    Args:
+        path (str): Caminho do arquivo.
+
+    Returns:
+        ChebyshevEphemeris: Efemérides de Chebyshev.
+
+    Raises:
+        ValueError: Se o arquivo não for de efemérides de Chebyshev ou tiver outra versão do formato.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, metadata_size = _HEADER.unpack_from(mapped)
+    if magic != CHEBYSHEV_MAGIC:
+        raise ValueError(f"Arquivo não é de efemérides de Chebyshev: {path}")
+    if version != CHEBYSHEV_VERSION:
+        raise ValueError(f"Versão de efemérides de Chebyshev não suportada: {version}")
+
+    offset = _HEADER.size
+    metadata = json.loads(bytes(mapped[offset:offset + metadata_size]).decode("utf-8"))
+    offset += metadata_size
+    offset += -offset % 8
+
+    series: Dict[str, ChebyshevSeries] = {}
+    for body, info in metadata["bodies"].items():
+        segments, terms = info["segments"], info["degree"] + 1
+        coefficients = np.frombuffer(
+            mapped, dtype="<f8", count=segments * COMPONENTS * terms, offset=offset + info["coefficients_offset"]
+        ).reshape(segments, COMPONENTS, terms)
+        errors = np.frombuffer(mapped, dtype="<f4", count=segments, offset=offset + info["errors_offset"])
+        series[body] = ChebyshevSeries(info["jd_start"], info["segment_days"], coefficients, errors)
+
+    return ChebyshevEphemeris(series, metadata)
@@ -0,0 +1,334 @@
+"""
+Módulo de acesso direto às efemérides para a aplicação AstroAPI.
+
+Este módulo oferece um caminho rápido, apenas de posições, sobre o Swiss Ephemeris
+usado pelo Kerykeion. Buscas e varreduras que só precisam de longitudes e
+velocidades não precisam construir um AstrologicalSubject completo (casas,
+fase lunar, etc.).
+
+Se existir a tabela de efemérides pré-calculada (gerada com
+`python -m app.core.build_ephemeris_table`), as posições de 1900 a 2100 são
+interpoladas a partir dela sempre que o erro da interpolação estiver dentro da
+tolerância pedida, sem chamar o Swiss Ephemeris. Varreduras que precisam das
+posições em uma grade inteira de instantes usam positions_grid, que avalia as
+efemérides de Chebyshev (`python -m app.core.build_chebyshev_ephemeris`) de uma
+só vez para todos os instantes.
+"""
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+from datetime import datetime, timedelta
+from pathlib import Path
+import os
+import threading
+
+import kerykeion
+import numpy as np
+import pytz
+import swisseph as swe
+
+from ..core.chebyshev import ChebyshevEphemeris, load_chebyshev_ephemeris
+from ..core.ephemeris_table import EphemerisTable, load_ephemeris_table
+
+# Usar os mesmos arquivos de efemérides e flags do Kerykeion para que as
+# posições coincidam com as dos objetos AstrologicalSubject
+EPHEMERIS_FILES_PATH = str(Path(kerykeion.__file__).parent.absolute() / "sweph")
+SWISSEPH_FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED
+
+# O pyswisseph guarda o caminho dos arquivos por thread: cada thread que chama o
+# Swiss Ephemeris (como as do pool de execução) precisa configurá-lo
+_thread_state = threading.local()
+
+def ensure_ephemeris_path() -> None:
+    """Configura o caminho dos arquivos de efemérides na thread atual, uma vez por thread."""
+    if not getattr(_thread_state, "ephe_path_set", False):
+        swe.set_ephe_path(EPHEMERIS_FILES_PATH)
+        _thread_state.ephe_path_set = True
+
+ensure_ephemeris_path()
+
+# Identificadores dos corpos no Swiss Ephemeris, pelas chaves usadas na API
+BODY_IDS: Dict[str, int] = {
+    "sun": swe.SUN,
+    "moon": swe.MOON,
+    "mercury": swe.MERCURY,
+    "venus": swe.VENUS,
+    "mars": swe.MARS,
+    "jupiter": swe.JUPITER,
+    "saturn": swe.SATURN,
+    "uranus": swe.URANUS,
+    "neptune": swe.NEPTUNE,
+    "pluto": swe.PLUTO,
+    "mean_node": swe.MEAN_NODE,
+    "true_node": swe.TRUE_NODE,
+    "chiron": swe.CHIRON,
+    "mean_lilith": swe.MEAN_APOG,
+}
+
+# Nomes originais (em inglês) dos corpos, como usados nas traduções
+BODY_NAMES: Dict[str, str] = {
+    "sun": "Sun",
+    "moon": "Moon",
+    "mercury": "Mercury",
+    "venus": "Venus",
+    "mars": "Mars",
+    "jupiter": "Jupiter",
+    "saturn": "Saturn",
+    "uranus": "Uranus",
+    "neptune": "Neptune",
+    "pluto": "Pluto",
+    "mean_node": "Mean_Node",
+    "true_node": "True_Node",
+    "chiron": "Chiron",
+    "mean_lilith": "Lilith",
+}
+
+# Chaves dos corpos pelo identificador do Swiss Ephemeris
+BODY_KEYS: Dict[int, str] = {body_id: body for body, body_id in BODY_IDS.items()}
+
+# Tabela de efemérides pré-calculada (python -m app.core.build_ephemeris_table)
+EPHEMERIS_TABLE_PATH = os.getenv(
+    "EPHEMERIS_TABLE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "ephemeris", "ephemeris.table")
+)
+
+# Erro máximo aceito ao interpolar a tabela, em graus (configurado em segundos de arco; 0 desativa a tabela)
+EPHEMERIS_TABLE_TOLERANCE = float(os.getenv("EPHEMERIS_TABLE_TOLERANCE", "0.01")) / 3600
+
+# Efemérides de Chebyshev para avaliar grades de instantes (python -m app.core.build_chebyshev_ephemeris)
+CHEBYSHEV_EPHEMERIS_PATH = os.getenv(
+    "CHEBYSHEV_EPHEMERIS_PATH",
+    os.path.join(os.path.dirname(EPHEMERIS_TABLE_PATH), "chebyshev.ephem")
+)
+
+_ephemeris_table: Optional[EphemerisTable] = None
+_ephemeris_table_checked = False
+_chebyshev_ephemeris: Optional[ChebyshevEphemeris] = None
+_chebyshev_ephemeris_checked = False
+
+# Corpos calculados por padrão
+DEFAULT_BODIES: Tuple[str, ...] = (
+    "sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn",
+    "uranus", "neptune", "pluto", "mean_node", "true_node", "chiron"
+)
+
+# Planetas principais (sem nodos e Quíron), usados nos aspectos natais
+MAJOR_PLANETS: Tuple[str, ...] = DEFAULT_BODIES[:10]
+
+class BodyPositions:
+    """
+    Posições de um conjunto de corpos em um instante, em arrays NumPy.
+
+    Attributes:
+        jd (float): Dia juliano (UT) das posições.
+        bodies (Tuple[str, ...]): Chaves dos corpos, na ordem dos arrays.
+        longitude (np.ndarray): Longitudes eclípticas em graus.
+        latitude (np.ndarray): Latitudes eclípticas em graus.
+        speed (np.ndarray): Velocidades em longitude (graus/dia).
+    """
+    __slots__ = ("jd", "bodies", "longitude", "latitude", "speed")
+
+    def __init__(self, jd: float, bodies: Tuple[str, ...], longitude: np.ndarray, latitude: np.ndarray, speed: np.ndarray) -> None:
+        self.jd = jd
+        self.bodies = bodies
+        self.longitude = longitude
+        self.latitude = latitude
+        self.speed = speed
+
+    @property
+    def retrograde(self) -> np.ndarray:
+        """Máscara booleana dos corpos em movimento retrógrado."""
+        return self.speed < 0
+
+    def index(self, body: str) -> int:
+        """Retorna a posição de um corpo nos arrays."""
+        return self.bodies.index(body)
+
+    def __len__(self) -> int:
+        return len(self.bodies)
+
+    def __contains__(self, body: str) -> bool:
+        return body in self.bodies
+
+    def __getitem__(self, body: str) -> Tuple[float, float, float]:
+        """Retorna (longitude, latitude, velocidade) de um corpo."""
+        i = self.bodies.index(body)
+        return float(self.longitude[i]), float(self.latitude[i]), float(self.speed[i])
+
+    def items(self) -> Iterable[Tuple[str, Tuple[float, float, float]]]:
+        """Itera sobre (corpo, (longitude, latitude, velocidade))."""
+        for i, body in enumerate(self.bodies):
+            yield body, (float(self.longitude[i]), float(self.latitude[i]), float(self.speed[i]))
+
+def get_ephemeris_table() -> Optional[EphemerisTable]:
+    """
+    Retorna a tabela de efemérides pré-calculada, mapeada na primeira chamada.
+
+    Returns:
+        Optional[EphemerisTable]: A tabela, ou None se o arquivo não existir, for
+            inválido ou a tolerância configurada for 0.
+    """
+    global _ephemeris_table, _ephemeris_table_checked
+
+    if not _ephemeris_table_checked:
+        _ephemeris_table_checked = True
+        if EPHEMERIS_TABLE_TOLERANCE > 0 and os.path.exists(EPHEMERIS_TABLE_PATH):
+            try:
+                _ephemeris_table = load_ephemeris_table(EPHEMERIS_TABLE_PATH)
+            except Exception as e:
+                print(f"Erro ao carregar a tabela de efemérides {EPHEMERIS_TABLE_PATH}: {str(e)}")
+    return _ephemeris_table
+
+def get_chebyshev_ephemeris() -> Optional[ChebyshevEphemeris]:
+    """
+    Retorna as efemérides de Chebyshev, mapeadas na primeira chamada.
+
+    Returns:
+        Optional[ChebyshevEphemeris]: As efemérides, ou None se o arquivo não existir,
+            for inválido ou a tolerância configurada for 0.
+    """
+    global _chebyshev_ephemeris, _chebyshev_ephemeris_checked
+
+    if not _chebyshev_ephemeris_checked:
+        _chebyshev_ephemeris_checked = True
+        if EPHEMERIS_TABLE_TOLERANCE > 0 and os.path.exists(CHEBYSHEV_EPHEMERIS_PATH):
+            try:
+                _chebyshev_ephemeris = load_chebyshev_ephemeris(CHEBYSHEV_EPHEMERIS_PATH)
+            except Exception as e:
+                print(f"Erro ao carregar as efemérides de Chebyshev {CHEBYSHEV_EPHEMERIS_PATH}: {str(e)}")
+    return _chebyshev_ephemeris
+
+def swiss_position(jd: float, body: str) -> Tuple[float, float, float]:
+    """Longitude, latitude e velocidade de um corpo calculadas no Swiss Ephemeris."""
+    ensure_ephemeris_path()
+    position, _ = swe.calc_ut(jd, BODY_IDS[body], SWISSEPH_FLAGS)
+    return position[0], position[1], position[3]
+
+def _body_position(jd: float, body: str, table: Optional[EphemerisTable], tolerance: float) -> Tuple[float, float, float]:
+    """Longitude, latitude e velocidade de um corpo, pela tabela se ela atender à tolerância."""
+    found = table.lookup(body, jd, tolerance) if table is not None else None
+    if found is not None:
+        return found
+    return swiss_position(jd, body)
+
+def positions_at(jd: float, bodies: Optional[Sequence[str]] = None, tolerance: Optional[float] = None) -> BodyPositions:
+    """
+    Calcula longitude, latitude e velocidade dos corpos em um instante.
+
+    Args:
+        jd (float): Dia juliano (UT).
+        bodies (Optional[Sequence[str]]): Chaves dos corpos (ex: "sun", "moon").
+            Padrão é DEFAULT_BODIES.
+        tolerance (Optional[float]): Erro máximo aceito, em graus, para usar a tabela de
+            efemérides. Padrão é EPHEMERIS_TABLE_TOLERANCE; 0 sempre usa o Swiss Ephemeris.
+
+    Returns:
+        BodyPositions: Posições dos corpos.
+    """
+    bodies = tuple(bodies) if bodies is not None else DEFAULT_BODIES
+    data = np.empty((3, len(bodies)), dtype=np.float64)
+    table = get_ephemeris_table()
+    if tolerance is None:
+        tolerance = EPHEMERIS_TABLE_TOLERANCE
+
+    for i, body in enumerate(bodies):
+        if body not in BODY_IDS:
+            raise ValueError(f"Corpo não suportado: {body}")
+        data[0, i], data[1, i], data[2, i] = _body_position(jd, body, table, tolerance)
+
+    return BodyPositions(jd, bodies, data[0], data[1], data[2])
+
+def positions_grid(
+    jds: Sequence[float],
+    bodies: Optional[Sequence[str]] = None,
+    tolerance: Optional[float] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calcula longitude, latitude e velocidade dos corpos em vários instantes.
+
+    Com as efemérides de Chebyshev disponíveis, todos os instantes de um corpo são
+    avaliados em uma única operação vetorizada; apenas os instantes em segmentos
+    cujo erro passa da tolerância (e os corpos ou datas fora das efemérides) são
+    calculados um a um, como em positions_at.
+
+    Args:
+        jds (Sequence[float]): Dias julianos (UT).
+        bodies (Optional[Sequence[str]]): Chaves dos corpos. Padrão é DEFAULT_BODIES.
+        tolerance (Optional[float]): Erro máximo aceito, em graus, para usar as
+            efemérides pré-calculadas. Padrão é EPHEMERIS_TABLE_TOLERANCE; 0 sempre usa
+            o Swiss Ephemeris.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Longitudes, latitudes e velocidades,
+            cada uma com forma (instantes, corpos).
+    """
+    bodies = tuple(bodies) if bodies is not None else DEFAULT_BODIES
+    jds = np.asarray(jds, dtype=np.float64)
+    data = np.empty((3, len(jds), len(bodies)), dtype=np.float64)
+    if tolerance is None:
+        tolerance = EPHEMERIS_TABLE_TOLERANCE
+    ephemeris = get_chebyshev_ephemeris() if tolerance > 0 else None
+    table = get_ephemeris_table() if tolerance > 0 else None
+
+    for b, body in enumerate(bodies):
+        if body not in BODY_IDS:
+            raise ValueError(f"Corpo não suportado: {body}")
+        series = ephemeris.series.get(body) if ephemeris is not None else None
+        if series is not None and series.covers(jds):
+            data[0, :, b], data[1, :, b], data[2, :, b], errors = series.evaluate(jds)
+            pending = np.flatnonzero(errors > tolerance)
+        else:
+            pending = range(len(jds))
+        for i in pending:
+            data[0, i, b], data[1, i, b], data[2, i, b] = _body_position(float(jds[i]), body, table, tolerance)
+
+    return data[0], data[1], data[2]
+
+def houses_at(jd: float, latitude: float, longitude: float, house_system: str = "P") -> np.ndarray:
+    """
+    Calcula as cúspides das 12 casas em um instante e local.
+
+    Args:
+        jd (float): Dia juliano (UT).
+        latitude (float): Latitude geográfica.
+        longitude (float): Longitude geográfica.
+        house_system (str): Código do sistema de casas (ex: "P" para Placidus).
+
+    Returns:
+        np.ndarray: Longitudes eclípticas das cúspides 1 a 12.
+    """
+    ensure_ephemeris_path()
+    cusps, _ = swe.houses_ex(jd, latitude, longitude, house_system.encode("ascii"))
+    return np.asarray(cusps[:12], dtype=np.float64)
+
+def body_longitude(jd: float, body: int, tolerance: Optional[float] = None) -> Tuple[float, float]:
+    """
+    Calcula apenas a longitude e a velocidade de um corpo.
+
+    Args:
+        jd (float): Dia juliano (UT).
+        body (int): Identificador do corpo no Swiss Ephemeris.
+        tolerance (Optional[float]): Erro máximo aceito, em graus, para usar a tabela de
+            efemérides. Padrão é EPHEMERIS_TABLE_TOLERANCE; 0 sempre usa o Swiss Ephemeris.
+
+    Returns:
+        Tuple[float, float]: Longitude eclíptica (graus) e velocidade (graus/dia).
+    """
+    table = get_ephemeris_table()
+    if table is not None and body in BODY_KEYS:
+        found = table.lookup(BODY_KEYS[body], jd, EPHEMERIS_TABLE_TOLERANCE if tolerance is None else tolerance)
+        if found is not None:
+            return found[0], found[2]
+
+    ensure_ephemeris_path()
+    position, _ = swe.calc_ut(jd, body, SWISSEPH_FLAGS)
+    return position[0], position[3]
+
+def julian_day_from_datetime(dt_utc: datetime) -> float:
+    """Converte um datetime em UTC para dia juliano (UT)."""
+    hour = dt_utc.hour + dt_utc.minute / 60 + (dt_utc.second + dt_utc.microsecond / 1e6) / 3600
+    return swe.julday(dt_utc.year, dt_utc.month, dt_utc.day, hour)
+
+def datetime_from_julian_day(jd: float) -> datetime:
+    """Converte um dia juliano (UT) para um datetime em UTC, com precisão de segundos."""
+    year, month, day, hour = swe.revjul(jd)
+    base = datetime(year, month, day, tzinfo=pytz.utc)
+    return base + timedelta(seconds=round(hour * 3600))
@@ -0,0 +1,249 @@
+"""
+Módulo dos backends de efemérides.
+
+Os cálculos pedem posições e casas a um backend, sempre pelo mesmo contrato em
+lote: positions(jds, corpos) devolve arrays (instantes, corpos) de longitude,
+latitude e velocidade, e houses(jd, latitude, longitude, sistema) as cúspides das
+12 casas. Backends registrados:
+
+    swiss       Swiss Ephemeris, com os arquivos e flags do Kerykeion (sem aproximação)
+    table       tabela pré-calculada interpolada (python -m app.core.build_ephemeris_table)
+    chebyshev   séries de Chebyshev avaliadas em lote (python -m app.core.build_chebyshev_ephemeris)
+    auto        o caminho padrão do módulo ephemeris: Chebyshev nas grades, tabela nos
+                instantes isolados e Swiss Ephemeris quando nenhuma atende à tolerância
+
+Os backends aproximados calculam no Swiss Ephemeris os instantes fora dos arquivos
+ou com erro acima da tolerância, e equivalem ao "swiss" se os arquivos não existirem.
+
+O backend é escolhido por implantação com EPHEMERIS_BACKEND (padrão "auto") e pode
+ser trocado por endpoint com EPHEMERIS_BACKEND_<ENDPOINT> (ex:
+EPHEMERIS_BACKEND_SYNASTRY=swiss), usando o endpoint registrado por run_compute.
+Outros backends podem ser adicionados com register_backend e comparados com
+`python -m app.core.benchmark_ephemeris`.
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import os
+
+import numpy as np
+
+from ..core.ephemeris import (
+    BODY_IDS, DEFAULT_BODIES, EPHEMERIS_TABLE_TOLERANCE, BodyPositions, body_longitude,
+    get_chebyshev_ephemeris, get_ephemeris_table, houses_at, positions_at, positions_grid, swiss_position
+)
+from ..core.executor import current_endpoint
+
+# Backend usado quando nem o endpoint nem a implantação configuram outro
+DEFAULT_EPHEMERIS_BACKEND = os.getenv("EPHEMERIS_BACKEND", "auto")
+
+Positions = Tuple[np.ndarray, np.ndarray, np.ndarray]
+SeriesValues = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+class EphemerisBackend:
+    """
+    Interface dos backends de efemérides.
+
+    Subclasses implementam positions; houses, positions_at e longitude são derivados
+    dele e podem ser sobrescritos quando o backend tiver um caminho mais barato.
+
+    Attributes:
+        name (str): Nome do backend no registro.
+    """
+    name = ""
+
+    def positions(self, jds: Sequence[float], bodies: Optional[Sequence[str]] = None) -> Positions:
+        """
+        Calcula longitude, latitude e velocidade dos corpos em vários instantes.
+
+        Args:
+            jds (Sequence[float]): Dias julianos (UT).
+            bodies (Optional[Sequence[str]]): Chaves dos corpos. Padrão é DEFAULT_BODIES.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Longitudes, latitudes e velocidades,
+                cada uma com forma (instantes, corpos).
+
+        Raises:
+            ValueError: Se algum corpo não for suportado.
+        """
+        raise NotImplementedError
+
+    def houses(self, jd: float, latitude: float, longitude: float, house_system: str = "P") -> np.ndarray:
+        """
+        Calcula as cúspides das 12 casas em um instante e local.
+
+        Args:
+            jd (float): Dia juliano (UT).
+            latitude (float): Latitude geográfica.
+            longitude (float): Longitude geográfica.
+            house_system (str): Código do sistema de casas. Padrão é "P" (Placidus).
+
+        Returns:
+            np.ndarray: Longitudes eclípticas das cúspides 1 a 12.
+        """
+        return houses_at(jd, latitude, longitude, house_system)
+
+    def positions_at(self, jd: float, bodies: Optional[Sequence[str]] = None) -> BodyPositions:
+        """Posições dos corpos em um único instante (ver positions)."""
+        bodies = tuple(bodies) if bodies is not None else DEFAULT_BODIES
+        longitude, latitude, speed = self.positions([jd], bodies)
+        return BodyPositions(jd, bodies, longitude[0], latitude[0], speed[0])
+
+    def longitude(self, jd: float, body: str) -> Tuple[float, float]:
+        """Longitude e velocidade de um corpo em um instante, usadas nas buscas de raízes."""
+        longitude, _, speed = self.positions([jd], (body,))
+        return float(longitude[0, 0]), float(speed[0, 0])
+
+class SwissBackend(EphemerisBackend):
+    """Swiss Ephemeris em todos os instantes, sem tabela nem séries."""
+    name = "swiss"
+
+    def positions(self, jds: Sequence[float], bodies: Optional[Sequence[str]] = None) -> Positions:
+        return positions_grid(jds, bodies, tolerance=0)
+
+    def positions_at(self, jd: float, bodies: Optional[Sequence[str]] = None) -> BodyPositions:
+        return positions_at(jd, bodies, tolerance=0)
+
+    def longitude(self, jd: float, body: str) -> Tuple[float, float]:
+        return body_longitude(jd, BODY_IDS[body], tolerance=0)
+
+class AutoBackend(EphemerisBackend):
+    """Caminho padrão do módulo ephemeris: Chebyshev nas grades e tabela nos instantes isolados."""
+    name = "auto"
+
+    def __init__(self, tolerance: float = EPHEMERIS_TABLE_TOLERANCE) -> None:
+        self.tolerance = tolerance
+
+    def positions(self, jds: Sequence[float], bodies: Optional[Sequence[str]] = None) -> Positions:
+        return positions_grid(jds, bodies, self.tolerance)
+
+    def positions_at(self, jd: float, bodies: Optional[Sequence[str]] = None) -> BodyPositions:
+        return positions_at(jd, bodies, self.tolerance)
+
+    def longitude(self, jd: float, body: str) -> Tuple[float, float]:
+        return body_longitude(jd, BODY_IDS[body], self.tolerance)
+
+class PrecomputedBackend(EphemerisBackend):
+    """
+    Base dos backends que avaliam efemérides pré-calculadas em lote.
+
+    Subclasses implementam _evaluate para um corpo; os instantes com erro acima da
+    tolerância, e os corpos ou datas fora dos arquivos, são calculados no Swiss Ephemeris.
+    """
+
+    def __init__(self, tolerance: float = EPHEMERIS_TABLE_TOLERANCE) -> None:
+        self.tolerance = tolerance
+
+    def _evaluate(self, body: str, jds: np.ndarray) -> Optional[SeriesValues]:
+        """Longitudes, latitudes, velocidades e erros do corpo, ou None se os instantes não estiverem cobertos."""
+        raise NotImplementedError
+
+    def positions(self, jds: Sequence[float], bodies: Optional[Sequence[str]] = None) -> Positions:
+        bodies = tuple(bodies) if bodies is not None else DEFAULT_BODIES
+        jds = np.asarray(jds, dtype=np.float64)
+        data = np.empty((3, len(jds), len(bodies)), dtype=np.float64)
+
+        for b, body in enumerate(bodies):
+            if body not in BODY_IDS:
+                raise ValueError(f"Corpo não suportado: {body}")
+            values = self._evaluate(body, jds) if self.tolerance > 0 else None
+            if values is not None:
+                data[0, :, b], data[1, :, b], data[2, :, b], errors = values
+                pending = np.flatnonzero(errors > self.tolerance)
+            else:
+                pending = range(len(jds))
+            for i in pending:
+                data[0, i, b], data[1, i, b], data[2, i, b] = swiss_position(float(jds[i]), body)
+
+        return data[0], data[1], data[2]
+
+class TableBackend(PrecomputedBackend):
+    """Tabela pré-calculada com interpolação de Hermite."""
+    name = "table"
+
+    def _evaluate(self, body: str, jds: np.ndarray) -> Optional[SeriesValues]:
+        table = get_ephemeris_table()
+        series = table.series.get(body) if table is not None else None
+        if series is None or (len(jds) and (jds.min() < series.jd_start or jds.max() > series.jd_end)):
+            return None
+        return series.interpolate(jds)
+
+    def positions_at(self, jd: float, bodies: Optional[Sequence[str]] = None) -> BodyPositions:
+        return positions_at(jd, bodies, self.tolerance)
+
+    def longitude(self, jd: float, body: str) -> Tuple[float, float]:
+        return body_longitude(jd, BODY_IDS[body], self.tolerance)
+
+class ChebyshevBackend(PrecomputedBackend):
+    """Séries de Chebyshev avaliadas em lote."""
+    name = "chebyshev"
+
+    def _evaluate(self, body: str, jds: np.ndarray) -> Optional[SeriesValues]:
+        ephemeris = get_chebyshev_ephemeris()
+        series = ephemeris.series.get(body) if ephemeris is not None else None
+        if series is None or not series.covers(jds):
+            return None
+        return series.evaluate(jds)
+
+BackendFactory = Callable[[], EphemerisBackend]
+
+_backend_factories: Dict[str, BackendFactory] = {
+    SwissBackend.name: SwissBackend,
+    TableBackend.name: TableBackend,
+    ChebyshevBackend.name: ChebyshevBackend,
+    AutoBackend.name: AutoBackend,
+}
+_backends: Dict[str, EphemerisBackend] = {}
+
+def register_backend(name: str, factory: BackendFactory) -> None:
+    """
+    Registra (ou substitui) um backend de efemérides.
+
+    Args:
+        name (str): Nome usado em EPHEMERIS_BACKEND e EPHEMERIS_BACKEND_<ENDPOINT>.
+        factory (Callable[[], EphemerisBackend]): Função que cria o backend na primeira vez que ele é pedido.
+    """
+    _backend_factories[name] = factory
+    _backends.pop(name, None)
+
+def available_backends() -> List[str]:
+    """Retorna os nomes dos backends registrados."""
+    return list(_backend_factories)
+
+def get_backend_name(endpoint: Optional[str] = None) -> str:
+    """
+    Retorna o nome do backend configurado para um endpoint.
+
+    Args:
+        endpoint (Optional[str]): Nome do endpoint (como em run_compute).
+
+    Returns:
+        str: EPHEMERIS_BACKEND_<ENDPOINT>, se definido, ou o backend da implantação.
+    """
+    if endpoint:
+        configured = os.getenv(f"EPHEMERIS_BACKEND_{endpoint.upper()}")
+        if configured:
+            return configured
+    return DEFAULT_EPHEMERIS_BACKEND
+
+def get_backend(name: Optional[str] = None) -> EphemerisBackend:
+    """
+    Retorna um backend de efemérides, criando-o na primeira chamada.
+
+    Args:
+        name (Optional[str]): Nome do backend. Padrão é o configurado para o endpoint
+            em execução (ver get_backend_name).
+
+    Returns:
+        EphemerisBackend: O backend.
+
+    Raises:
+        ValueError: Se o backend não estiver registrado.
+    """
+    if name is None:
+        name = get_backend_name(current_endpoint())
+    backend = _backends.get(name)
+    if backend is None:
+        if name not in _backend_factories:
+            raise ValueError(f"Backend de efemérides não suportado: {name}")
+        backend = _backends[name] = _backend_factories[name]()
+    return backend
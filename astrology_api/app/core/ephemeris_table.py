@@ -0,0 +1,248 @@
+"""
+Módulo da tabela de efemérides pré-calculadas.
+
+A tabela guarda, para cada corpo, longitude, latitude e as respectivas velocidades
+em uma grade regular de instantes (um dia para os planetas, uma hora para a Lua)
+de 1900 a 2100, em um arquivo binário lido com mmap: todos os workers compartilham
+as mesmas páginas. Entre dois instantes da grade a posição é obtida por
+interpolação de Hermite cúbica (valores e derivadas nas duas pontas), que é
+ordens de grandeza mais barata que uma chamada ao Swiss Ephemeris.
+
+Para cada intervalo da grade a tabela guarda também o erro da interpolação,
+medido no ponto médio contra o Swiss Ephemeris durante a construção. A consulta
+só usa a tabela quando esse erro está dentro da tolerância pedida; perto das
+conjunções com o Sol (deflexão da luz) ou nas estações dos planetas mais rápidos o
+erro pode passar da tolerância e o chamador volta ao cálculo completo.
+
+Formato (little-endian):
+    cabeçalho     magic, versão e tamanho dos metadados
+    metadados     JSON (intervalo, tipo dos valores e, por corpo, passo, amostras e posições)
+    dados         por corpo, os valores (longitude, latitude, velocidades) e o erro de cada intervalo
+"""
+from typing import Any, Dict, Optional, Tuple
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+EPHEMERIS_TABLE_MAGIC = b"AETB"
+EPHEMERIS_TABLE_VERSION = 1
+
+_HEADER = struct.Struct("<4sHQ")
+
+# Colunas dos valores de cada amostra
+LONGITUDE, LATITUDE, LONGITUDE_SPEED, LATITUDE_SPEED = range(4)
+VALUE_COLUMNS = 4
+
+def hermite(
+    value0: np.ndarray, speed0: np.ndarray, value1: np.ndarray, speed1: np.ndarray, t: np.ndarray, step: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interpolação de Hermite cúbica entre duas amostras (escalares ou arrays).
+
+    Args:
+        value0 (np.ndarray): Valor na amostra inicial.
+        speed0 (np.ndarray): Derivada (por dia) na amostra inicial.
+        value1 (np.ndarray): Valor na amostra final.
+        speed1 (np.ndarray): Derivada (por dia) na amostra final.
+        t (np.ndarray): Posição entre as amostras, de 0 a 1.
+        step (float): Distância entre as amostras em dias.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Valor e derivada (por dia) interpolados.
+    """
+    t2 = t * t
+    t3 = t2 * t
+    delta = value1 - value0
+    value = value0 + (t3 - 2 * t2 + t) * step * speed0 + (3 * t2 - 2 * t3) * delta + (t3 - t2) * step * speed1
+    speed = (3 * t2 - 4 * t + 1) * speed0 + (6 * t - 6 * t2) * delta / step + (3 * t2 - 2 * t) * speed1
+    return value, speed
+
+class EphemerisSeries:
+    """
+    Amostras de um corpo em uma grade regular.
+
+    Attributes:
+        jd_start (float): Dia juliano (UT) da primeira amostra.
+        step (float): Distância entre amostras em dias.
+        values (np.ndarray): Amostras (n, 4): longitude, latitude e velocidades.
+        errors (np.ndarray): Erro estimado da interpolação em cada um dos n - 1 intervalos, em graus.
+    """
+    __slots__ = ("jd_start", "step", "values", "errors", "jd_end")
+
+    def __init__(self, jd_start: float, step: float, values: np.ndarray, errors: np.ndarray) -> None:
+        self.jd_start = jd_start
+        self.step = step
+        self.values = values
+        self.errors = errors
+        self.jd_end = jd_start + (len(values) - 1) * step
+
+    def lookup(self, jd: float, tolerance: float) -> Optional[Tuple[float, float, float]]:
+        """
+        Interpola a posição em um instante, se ele estiver na tabela e dentro da tolerância.
+
+        Args:
+            jd (float): Dia juliano (UT).
+            tolerance (float): Erro máximo aceito, em graus.
+
+        Returns:
+            Optional[Tuple[float, float, float]]: Longitude, latitude e velocidade em
+                longitude, ou None se o instante não puder ser atendido pela tabela.
+        """
+        if not self.jd_start <= jd <= self.jd_end:
+            return None
+        position = (jd - self.jd_start) / self.step
+        i = min(int(position), len(self.errors) - 1)
+        if self.errors[i] > tolerance:
+            return None
+
+        (lon0, lat0, speed0, lat_speed0), (lon1, lat1, speed1, lat_speed1) = self.values[i:i + 2].tolist()
+        t = position - i
+        lon1 = lon0 + (lon1 - lon0 + 180.0) % 360.0 - 180.0
+        longitude, speed = hermite(lon0, speed0, lon1, speed1, t, self.step)
+        latitude, _ = hermite(lat0, lat_speed0, lat1, lat_speed1, t, self.step)
+        return longitude % 360.0, latitude, speed
+
+    def interpolate(self, jds: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Interpola as posições em vários instantes de uma vez.
+
+        Args:
+            jds (np.ndarray): Dias julianos (UT), dentro do intervalo da tabela.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Longitudes, latitudes,
+                velocidades em longitude e erro estimado de cada instante, em graus.
+
+        Raises:
+            ValueError: Se algum instante estiver fora da tabela.
+        """
+        jds = np.asarray(jds, dtype=np.float64)
+        if len(jds) and (jds.min() < self.jd_start or jds.max() > self.jd_end):
+            raise ValueError("Instante fora do intervalo da tabela de efemérides")
+
+        position = (jds - self.jd_start) / self.step
+        i = np.minimum(position.astype(np.int64), len(self.errors) - 1)
+        t = position - i
+        first = self.values[i].astype(np.float64)
+        second = self.values[i + 1].astype(np.float64)
+
+        lon1 = first[:, LONGITUDE] + (second[:, LONGITUDE] - first[:, LONGITUDE] + 180.0) % 360.0 - 180.0
+        longitude, speed = hermite(first[:, LONGITUDE], first[:, LONGITUDE_SPEED], lon1, second[:, LONGITUDE_SPEED], t, self.step)
+        latitude, _ = hermite(first[:, LATITUDE], first[:, LATITUDE_SPEED], second[:, LATITUDE], second[:, LATITUDE_SPEED], t, self.step)
+        return longitude % 360.0, latitude, speed, self.errors[i].astype(np.float64)
+
+class EphemerisTable:
+    """
+    Tabela de efemérides de vários corpos, mapeada de um arquivo.
+
+    Attributes:
+        series (Dict[str, EphemerisSeries]): Amostras de cada corpo, pela chave usada na API.
+        metadata (Dict[str, Any]): Metadados gravados com a tabela.
+    """
+    __slots__ = ("series", "metadata")
+
+    def __init__(self, series: Dict[str, EphemerisSeries], metadata: Dict[str, Any]) -> None:
+        self.series = series
+        self.metadata = metadata
+
+    def __contains__(self, body: str) -> bool:
+        return body in self.series
+
+    def lookup(self, body: str, jd: float, tolerance: float) -> Optional[Tuple[float, float, float]]:
+        """Posição de um corpo pela tabela, ou None se ela não atender à tolerância (ver EphemerisSeries.lookup)."""
+        series = self.series.get(body)
+        return series.lookup(jd, tolerance) if series is not None else None
+
+def write_ephemeris_table(
+    path: str,
+    series: Dict[str, EphemerisSeries],
+    dtype: str = "<f8",
+    metadata: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Grava a tabela de efemérides.
+
+    O arquivo é gravado ao lado do destino e renomeado no final, para que os workers
+    nunca mapeiem uma tabela incompleta.
+
+    Args:
+        path (str): Caminho do arquivo da tabela.
+        series (Dict[str, EphemerisSeries]): Amostras de cada corpo.
+        dtype (str): Tipo dos valores gravados ("<f8" ou "<f4").
+        metadata (Optional[Dict[str, Any]]): Metadados adicionais.
+    """
+    itemsize = np.dtype(dtype).itemsize
+    bodies: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    for body, body_series in series.items():
+        count = len(body_series.values)
+        bodies[body] = {
+            "jd_start": body_series.jd_start,
+            "step": body_series.step,
+            "count": count,
+            "values_offset": offset,
+            "errors_offset": offset + count * VALUE_COLUMNS * itemsize,
+        }
+        offset = bodies[body]["errors_offset"] + (count - 1) * 4
+        offset += -offset % 8
+
+    metadata_bytes = json.dumps(dict(metadata or {}, dtype=dtype, bodies=bodies)).encode("utf-8")
+    header = _HEADER.pack(EPHEMERIS_TABLE_MAGIC, EPHEMERIS_TABLE_VERSION, len(metadata_bytes))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp.{os.getpid()}"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        f.write(metadata_bytes)
+        f.write(b"\0" * (-(len(header) + len(metadata_bytes)) % 8))
+        for body_series in series.values():
+            values = np.ascontiguousarray(body_series.values, dtype=dtype)
+            errors = np.ascontiguousarray(body_series.errors, dtype="<f4")
+            f.write(values.tobytes())
+            f.write(errors.tobytes())
+            f.write(b"\0" * (-(values.nbytes + errors.nbytes) % 8))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def load_ephemeris_table(path: str) -> EphemerisTable:
+    """
+    Abre uma tabela gravada com write_ephemeris_table, mapeando o arquivo em memória.
+
+    Args:
+        path (str): Caminho do arquivo da tabela.
+
+    Returns:
+        EphemerisTable: Tabela de efemérides.
+
+    Raises:
+        ValueError: Se o arquivo não for uma tabela de efemérides ou tiver outra versão do formato.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, metadata_size = _HEADER.unpack_from(mapped)
+    if magic != EPHEMERIS_TABLE_MAGIC:
+        raise ValueError(f"Arquivo não é uma tabela de efemérides: {path}")
+    if version != EPHEMERIS_TABLE_VERSION:
+        raise ValueError(f"Versão de tabela de efemérides não suportada: {version}")
+
+    offset = _HEADER.size
+    metadata = json.loads(bytes(mapped[offset:offset + metadata_size]).decode("utf-8"))
+    offset += metadata_size
+    offset += -offset % 8
+
+    dtype = np.dtype(metadata["dtype"])
+    series: Dict[str, EphemerisSeries] = {}
+    for body, info in metadata["bodies"].items():
+        count = info["count"]
+        values = np.frombuffer(
+            mapped, dtype=dtype, count=count * VALUE_COLUMNS, offset=offset + info["values_offset"]
+        ).reshape(count, VALUE_COLUMNS)
+        errors = np.frombuffer(mapped, dtype="<f4", count=count - 1, offset=offset + info["errors_offset"])
+        series[body] = EphemerisSeries(info["jd_start"], info["step"], values, errors)
+
+    return EphemerisTable(series, metadata)
@@ -0,0 +1,246 @@
+"""
+Módulo de execução de cálculos fora do loop de eventos.
+
+Os cálculos do Swiss Ephemeris e a geração de SVG são síncronos e consomem CPU.
+Este módulo mantém pools de threads e de processos compartilhados, limita a
+concorrência de cada endpoint e registra métricas de fila, para que um cálculo
+lento (como um retorno lunar) não bloqueie as demais requisições do worker.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Literal, Optional, Tuple
+import asyncio
+import os
+import threading
+import time
+
+from ..core.cache import prepare_pool_process
+
+PoolType = Literal["thread", "process"]
+
+# Número de processos do pool (padrão: um por núcleo)
+PROCESS_POOL_WORKERS = int(os.getenv("ASTRO_PROCESS_WORKERS", "0")) or (os.cpu_count() or 1)
+
+# Número de threads do pool (padrão do ThreadPoolExecutor)
+THREAD_POOL_WORKERS = int(os.getenv("ASTRO_THREAD_WORKERS", "0")) or min(32, (os.cpu_count() or 1) + 4)
+
+# Limite padrão de cálculos simultâneos por endpoint
+DEFAULT_ENDPOINT_CONCURRENCY = int(os.getenv("ASTRO_ENDPOINT_CONCURRENCY", "0")) or THREAD_POOL_WORKERS
+
+# Pool usado por padrão em cada endpoint. Endpoints que constroem vários objetos
+# AstrologicalSubject ou geram SVG vão para o pool de processos; os demais usam
+# threads, que não pagam o custo de serialização entre processos.
+# Pode ser sobrescrito com ASTRO_POOL_<ENDPOINT>=thread|process.
+ENDPOINT_POOLS: Dict[str, PoolType] = {
+    "solar_return": "process",
+    "lunar_return": "process",
+    "svg_chart": "process",
+}
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_pools_lock = threading.Lock()
+
+# Endpoint do cálculo em execução na thread ou no processo (ver current_endpoint)
+_current_endpoint: ContextVar[Optional[str]] = ContextVar("current_endpoint", default=None)
+
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+_inflight: Dict[str, "asyncio.Future[Any]"] = {}
+_metrics: Dict[str, Dict[str, float]] = {}
+_metrics_lock = threading.Lock()
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Retorna o pool de processos compartilhado, criando-o na primeira chamada.
+
+    Returns:
+        ProcessPoolExecutor: Pool de processos.
+    """
+    global _process_pool
+
+    if _process_pool is None:
+        with _pools_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(max_workers=PROCESS_POOL_WORKERS, initializer=prepare_pool_process)
+
+    return _process_pool
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """
+    Retorna o pool de threads compartilhado, criando-o na primeira chamada.
+
+    Returns:
+        ThreadPoolExecutor: Pool de threads.
+    """
+    global _thread_pool
+
+    if _thread_pool is None:
+        with _pools_lock:
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(
+                    max_workers=THREAD_POOL_WORKERS,
+                    thread_name_prefix="astro-compute"
+                )
+
+    return _thread_pool
+
+def get_endpoint_pool_type(endpoint: str) -> PoolType:
+    """Retorna o tipo de pool configurado para um endpoint."""
+    configured = os.getenv(f"ASTRO_POOL_{endpoint.upper()}")
+    if configured in ("thread", "process"):
+        return configured
+    return ENDPOINT_POOLS.get(endpoint, "thread")
+
+def get_endpoint_concurrency(endpoint: str) -> int:
+    """
+    Retorna o limite de cálculos simultâneos de um endpoint.
+
+    Pode ser configurado com ASTRO_CONCURRENCY_<ENDPOINT> (ex: ASTRO_CONCURRENCY_LUNAR_RETURN=2).
+    """
+    return int(os.getenv(f"ASTRO_CONCURRENCY_{endpoint.upper()}", "0")) or DEFAULT_ENDPOINT_CONCURRENCY
+
+def current_endpoint() -> Optional[str]:
+    """
+    Retorna o endpoint do cálculo em execução, para configurações por endpoint
+    (como o backend de efemérides).
+
+    Returns:
+        Optional[str]: Nome do endpoint, ou None fora de run_compute.
+    """
+    return _current_endpoint.get()
+
+def _call_for_endpoint(endpoint: str, func: Callable[..., Any], *args: Any) -> Any:
+    """Executa a função no pool com o endpoint registrado em current_endpoint."""
+    token = _current_endpoint.set(endpoint)
+    try:
+        return func(*args)
+    finally:
+        _current_endpoint.reset(token)
+
+def _get_semaphore(endpoint: str) -> asyncio.Semaphore:
+    """Retorna o semáforo que limita a concorrência de um endpoint."""
+    if endpoint not in _semaphores:
+        _semaphores[endpoint] = asyncio.Semaphore(get_endpoint_concurrency(endpoint))
+    return _semaphores[endpoint]
+
+def _update_metrics(endpoint: str, **deltas: float) -> None:
+    """Atualiza os contadores de um endpoint."""
+    with _metrics_lock:
+        metrics = _metrics.setdefault(endpoint, {
+            "queued": 0,
+            "running": 0,
+            "completed": 0,
+            "failed": 0,
+            "coalesced": 0,
+            "max_queue_depth": 0,
+            "total_wait_seconds": 0.0,
+            "total_run_seconds": 0.0,
+        })
+        for name, delta in deltas.items():
+            metrics[name] += delta
+        metrics["max_queue_depth"] = max(metrics["max_queue_depth"], metrics["queued"])
+
+async def _run_in_pool(endpoint: str, func: Callable[..., Any], args: Tuple[Any, ...], pool: Optional[PoolType]) -> Any:
+    """Aguarda uma vaga no limite do endpoint e executa a função no pool."""
+    pool_type = pool or get_endpoint_pool_type(endpoint)
+    executor: Executor = get_process_pool() if pool_type == "process" else get_thread_pool()
+    semaphore = _get_semaphore(endpoint)
+
+    queued_at = time.perf_counter()
+    _update_metrics(endpoint, queued=1)
+
+    async with semaphore:
+        started_at = time.perf_counter()
+        _update_metrics(endpoint, queued=-1, running=1, total_wait_seconds=started_at - queued_at)
+
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(executor, _call_for_endpoint, endpoint, func, *args)
+        except BaseException:
+            _update_metrics(endpoint, running=-1, failed=1, total_run_seconds=time.perf_counter() - started_at)
+            raise
+
+        _update_metrics(endpoint, running=-1, completed=1, total_run_seconds=time.perf_counter() - started_at)
+        return result
+
+async def run_compute(
+    endpoint: str,
+    func: Callable[..., Any],
+    *args: Any,
+    pool: Optional[PoolType] = None,
+    key: Optional[str] = None
+) -> Any:
+    """
+    Executa um cálculo síncrono fora do loop de eventos.
+
+    O cálculo aguarda uma vaga no limite de concorrência do endpoint e então roda
+    no pool de threads ou de processos. Funções enviadas ao pool de processos
+    precisam ser definidas no nível do módulo e receber argumentos serializáveis.
+
+    Se `key` for informada, chamadas simultâneas com a mesma chave compartilham um
+    único cálculo: a primeira o agenda e as demais aguardam o mesmo resultado, sem
+    ocupar vagas do endpoint. O cancelamento de uma chamada não cancela o cálculo
+    compartilhado.
+
+    Args:
+        endpoint (str): Nome do endpoint, usado nos limites e nas métricas.
+        func (Callable[..., Any]): Função a executar.
+        *args (Any): Argumentos da função.
+        pool (Optional[PoolType]): "thread" ou "process". Padrão é o configurado para o endpoint.
+        key (Optional[str]): Chave do cálculo (ex: obtida com get_cache_key) para agrupar chamadas idênticas.
+
+    Returns:
+        Any: Resultado da função.
+    """
+    if key is None:
+        return await _run_in_pool(endpoint, func, args, pool)
+
+    inflight_key = f"{endpoint}:{key}"
+    task = _inflight.get(inflight_key)
+    if task is None:
+        task = asyncio.ensure_future(_run_in_pool(endpoint, func, args, pool))
+        _inflight[inflight_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(inflight_key, None))
+    else:
+        _update_metrics(endpoint, coalesced=1)
+
+    return await asyncio.shield(task)
+
+def get_executor_metrics() -> Dict[str, Any]:
+    """
+    Retorna as métricas dos pools e de cada endpoint.
+
+    Returns:
+        Dict[str, Any]: Configuração dos pools e contadores por endpoint
+            (fila atual, em execução, concluídos, falhas, chamadas agrupadas
+            e tempos acumulados).
+    """
+    with _metrics_lock:
+        endpoints = {name: dict(values) for name, values in _metrics.items()}
+
+    for name, values in endpoints.items():
+        values["pool"] = get_endpoint_pool_type(name)
+        values["concurrency_limit"] = get_endpoint_concurrency(name)
+
+    return {
+        "thread_pool_workers": THREAD_POOL_WORKERS,
+        "process_pool_workers": PROCESS_POOL_WORKERS,
+        "endpoints": endpoints,
+    }
+
+def shutdown_pools() -> None:
+    """
+    Encerra os pools de execução, aguardando as tarefas em andamento.
+    """
+    global _process_pool, _thread_pool
+
+    with _pools_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=True)
+            _process_pool = None
+
+        if _thread_pool is not None:
+            _thread_pool.shutdown(wait=True)
+            _thread_pool = None
+
+    _semaphores.clear()
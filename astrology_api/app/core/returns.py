@@ -0,0 +1,145 @@
+"""
+Módulo de busca de retornos solares e lunares.
+
+Em vez de construir um AstrologicalSubject para cada dia, hora e minuto candidatos,
+este módulo avalia apenas a longitude do Sol ou da Lua no backend de efemérides, delimita
+o cruzamento com a posição natal e refina o instante com o método de Brent.
+"""
+from typing import Dict, Literal
+from datetime import datetime
+import logging
+
+import pytz
+import swisseph as swe
+from scipy.optimize import brentq
+
+from ..core.ephemeris import BODY_KEYS, julian_day_from_datetime
+from ..core.ephemeris_backends import EphemerisBackend, get_backend
+
+logger = logging.getLogger(__name__)
+
+ReturnType = Literal["solar", "lunar"]
+
+# Corpo do Swiss Ephemeris usado em cada tipo de retorno
+RETURN_BODIES: Dict[str, int] = {
+    "solar": swe.SUN,
+    "lunar": swe.MOON,
+}
+
+# Meia largura (em dias) do intervalo inicial em torno da estimativa do cruzamento.
+# O Sol anda ~1°/dia e a Lua até ~15°/dia, então a janela cobre com folga o erro
+# da estimativa sem atravessar a descontinuidade de ±180° da função de busca.
+BRACKET_HALF_WIDTH_DAYS: Dict[str, float] = {
+    "solar": 1.0,
+    "lunar": 0.25,
+}
+
+# Tolerância da solução em dias (0.01 segundo)
+ROOT_TOLERANCE_DAYS = 0.01 / 86400
+
+# Número máximo de expansões do intervalo antes de desistir
+MAX_BRACKET_EXPANSIONS = 20
+
+def _offset(jd: float, backend: EphemerisBackend, body: str, target_longitude: float) -> float:
+    """Distância angular do corpo à longitude alvo, normalizada para [-180, 180)."""
+    longitude, _ = backend.longitude(jd, body)
+    return (longitude - target_longitude + 180) % 360 - 180
+
+def find_return_julian_day(
+    target_longitude: float,
+    jd_start: float,
+    return_type: ReturnType = "solar"
+) -> float:
+    """
+    Encontra o primeiro instante a partir de `jd_start` em que o Sol ou a Lua
+    retorna à longitude alvo.
+
+    A busca usa a velocidade do corpo para estimar o cruzamento, delimita a raiz
+    em um intervalo pequeno e converge com o método de Brent. Uma busca típica
+    consome cerca de dez avaliações de efemérides.
+
+    Args:
+        target_longitude (float): Longitude natal do corpo.
+        jd_start (float): Dia juliano (UT) a partir do qual buscar.
+        return_type (str): Tipo de retorno, "solar" ou "lunar".
+
+    Returns:
+        float: Dia juliano (UT) exato do retorno.
+    """
+    if return_type not in RETURN_BODIES:
+        raise ValueError(f"Tipo de retorno não suportado: {return_type}")
+
+    backend = get_backend()
+    body = BODY_KEYS[RETURN_BODIES[return_type]]
+    half_width = BRACKET_HALF_WIDTH_DAYS[return_type]
+
+    # Estimar o cruzamento a partir da velocidade no instante inicial.
+    # Para o Sol a posição no aniversário está a ~1° da natal, então o retorno
+    # pode estar ligeiramente antes; para a Lua buscamos o próximo cruzamento.
+    longitude, speed = backend.longitude(jd_start, body)
+    if return_type == "solar":
+        distance = (target_longitude - longitude + 180) % 360 - 180
+    else:
+        distance = (target_longitude - longitude) % 360
+    guess = jd_start + distance / speed
+
+    # Um segundo passo corrige a variação de velocidade em percursos longos
+    longitude, speed = backend.longitude(guess, body)
+    guess += ((target_longitude - longitude + 180) % 360 - 180) / speed
+
+    # Delimitar a raiz: o corpo tem movimento direto, então a função cresce
+    # através de zero no cruzamento
+    low, high = guess - half_width, guess + half_width
+    f_low = _offset(low, backend, body, target_longitude)
+    f_high = _offset(high, backend, body, target_longitude)
+    for _ in range(MAX_BRACKET_EXPANSIONS):
+        if f_low < 0 <= f_high:
+            break
+        if f_low >= 0:
+            low -= half_width
+            f_low = _offset(low, backend, body, target_longitude)
+        if f_high < 0:
+            high += half_width
+            f_high = _offset(high, backend, body, target_longitude)
+
+    if not f_low < 0 <= f_high:
+        raise ValueError(f"Não foi possível delimitar o retorno {return_type}")
+
+    return brentq(
+        _offset, low, high,
+        args=(backend, body, target_longitude),
+        xtol=ROOT_TOLERANCE_DAYS
+    )
+
+def return_search_start(
+    return_type: ReturnType,
+    natal_month: int,
+    natal_day: int,
+    natal_hour: int,
+    natal_minute: int,
+    natal_tz_str: str,
+    return_year: int,
+    return_month: int,
+    location_tz_str: str
+) -> float:
+    """
+    Calcula o dia juliano (UT) de início da busca de um retorno.
+
+    Para retornos solares é o aniversário no ano do retorno, no horário natal.
+    Para retornos lunares é a meia-noite local do primeiro dia do mês.
+
+    Returns:
+        float: Dia juliano (UT) inicial.
+    """
+    if return_type == "solar":
+        # 29 de fevereiro cai em 28 de fevereiro em anos não bissextos
+        try:
+            local = datetime(return_year, natal_month, natal_day, natal_hour, natal_minute)
+        except ValueError:
+            local = datetime(return_year, natal_month, natal_day - 1, natal_hour, natal_minute)
+        tz = pytz.timezone(natal_tz_str)
+    else:
+        local = datetime(return_year, return_month, 1)
+        tz = pytz.timezone(location_tz_str)
+
+    return julian_day_from_datetime(tz.localize(local).astimezone(pytz.utc))
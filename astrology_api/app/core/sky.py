@@ -0,0 +1,99 @@
+"""
+Módulo do céu em um instante, compartilhado entre as requisições de trânsito.
+
+As posições geocêntricas dos corpos dependem apenas do instante, e não do local
+do observador. Os trânsitos são calculados em duas etapas: o céu do minuto UT
+(longitude, latitude e velocidade dos corpos), calculado uma vez e guardado em
+memória para todas as requisições daquele minuto, e as casas do local de cada
+requisição, que custam uma única chamada ao Swiss Ephemeris. Muitos usuários
+pedindo o mapa de "agora" em locais diferentes custam um cálculo de planetas por
+minuto.
+"""
+from typing import Optional, Sequence
+import os
+
+import numpy as np
+
+from ..core.cache import CACHE_EXPIRATION, SingleFlight, create_memory_cache, get_cache_key
+from ..core.ephemeris import DEFAULT_BODIES, BodyPositions
+from ..core.ephemeris_backends import get_backend
+from ..core.snapshot import ChartSnapshot
+
+# Céus já calculados, um por minuto UT (e por backend e conjunto de corpos)
+SKY_CACHE_MAX_ENTRIES = int(os.getenv("SKY_CACHE_MAX_ENTRIES", "4096"))
+SKY_CACHE_TTL = int(os.getenv("SKY_CACHE_TTL", str(CACHE_EXPIRATION)))
+
+# Tamanho aproximado de um céu (três arrays de 13 corpos e as chaves), usado na contabilidade do cache
+SKY_SIZE_ESTIMATE = 1024
+
+SKY_CACHE = create_memory_cache("sky", SKY_CACHE_MAX_ENTRIES, SKY_CACHE_MAX_ENTRIES * SKY_SIZE_ESTIMATE, SKY_CACHE_TTL)
+SKY_FLIGHTS = SingleFlight()
+
+# Minutos por dia, para arredondar o dia juliano ao minuto UT
+MINUTES_PER_DAY = 24 * 60
+
+def ut_minute(julian_day: float) -> int:
+    """Número do minuto UT que contém o dia juliano (o mais próximo, para absorver arredondamentos)."""
+    return int(round(julian_day * MINUTES_PER_DAY))
+
+def get_sky(julian_day: float, bodies: Optional[Sequence[str]] = None) -> BodyPositions:
+    """
+    Retorna as posições dos corpos no minuto UT do instante, calculando-as uma vez por minuto.
+
+    O instante é arredondado ao minuto UT, a resolução das requisições de trânsito;
+    as posições retornadas são as do início desse minuto. O objeto retornado é
+    compartilhado entre requisições e não deve ser alterado.
+
+    Args:
+        julian_day (float): Dia juliano (UT).
+        bodies (Optional[Sequence[str]]): Chaves dos corpos. Padrão é DEFAULT_BODIES.
+
+    Returns:
+        BodyPositions: Posições dos corpos no minuto.
+    """
+    bodies = tuple(bodies) if bodies is not None else DEFAULT_BODIES
+    backend = get_backend()
+    minute = ut_minute(julian_day)
+    cache_key = get_cache_key("sky", minute=minute, bodies=bodies, backend=backend.name)
+
+    sky = SKY_CACHE.get(cache_key)
+    if sky is not None:
+        return sky
+
+    def compute_and_save() -> BodyPositions:
+        computed = backend.positions_at(minute / MINUTES_PER_DAY, bodies)
+        SKY_CACHE.set(cache_key, computed, SKY_SIZE_ESTIMATE)
+        return computed
+
+    # Requisições simultâneas para o mesmo minuto aguardam um único cálculo
+    return SKY_FLIGHTS.do(cache_key, compute_and_save)
+
+def sky_snapshot(
+    julian_day: float,
+    latitude: float,
+    longitude: float,
+    house_system: str = "P",
+    name: str = "",
+    tz_str: str = "UTC",
+    bodies: Optional[Sequence[str]] = None
+) -> ChartSnapshot:
+    """
+    Monta o instantâneo de um mapa a partir do céu compartilhado do minuto e das casas do local.
+
+    Args:
+        julian_day (float): Dia juliano (UT).
+        latitude (float): Latitude geográfica.
+        longitude (float): Longitude geográfica.
+        house_system (str): Código do sistema de casas. Padrão é "P" (Placidus).
+        name (str): Nome do mapa.
+        tz_str (str): Fuso horário do mapa.
+        bodies (Optional[Sequence[str]]): Chaves dos corpos. Padrão é DEFAULT_BODIES.
+
+    Returns:
+        ChartSnapshot: Instantâneo do mapa, no início do minuto UT do instante.
+    """
+    sky = get_sky(julian_day, bodies)
+    positions = np.column_stack((sky.longitude, sky.latitude, sky.speed))
+    cusps = get_backend().houses(sky.jd, latitude, longitude, house_system)
+
+    return ChartSnapshot(sky.jd, latitude, longitude, house_system, sky.bodies, positions, cusps, name, tz_str)
@@ -0,0 +1,217 @@
+"""
+Módulo de instantâneos compactos de mapas para a aplicação AstroAPI.
+
+Um ChartSnapshot guarda apenas os números de um mapa (longitude, latitude e
+velocidade de cada corpo e as 12 cúspides) e alguns metadados, em um formato
+binário fixo e versionado. É o que vai para o cache e o que trafega entre os
+processos do pool, no lugar de objetos AstrologicalSubject serializados, que são
+grandes e dependem da versão do Kerykeion.
+"""
+from typing import Any, Optional, Sequence, Tuple
+from datetime import datetime
+import json
+import struct
+
+import numpy as np
+
+from ..core.ephemeris import BODY_IDS, DEFAULT_BODIES, datetime_from_julian_day, julian_day_from_datetime
+from ..core.ephemeris_backends import get_backend
+
+# Versão do formato binário; instantâneos de outra versão não são lidos
+SNAPSHOT_VERSION = 1
+
+# Ordem fixa dos corpos usada para codificá-los em um byte
+SNAPSHOT_BODIES: Tuple[str, ...] = tuple(BODY_IDS)
+
+# Cabeçalho: versão, dia juliano, latitude, longitude, sistema de casas,
+# número de corpos e tamanho dos metadados
+_HEADER = struct.Struct("<Hddd1sHH")
+
+# Nomes dos signos, na ordem do zodíaco
+ZODIAC_SIGNS: Tuple[str, ...] = (
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"
+)
+
+class ChartSnapshot:
+    """
+    Instantâneo compacto de um mapa.
+
+    Attributes:
+        julian_day (float): Dia juliano (UT) do mapa.
+        latitude (float): Latitude geográfica.
+        longitude (float): Longitude geográfica.
+        house_system (str): Código do sistema de casas (ex: "P").
+        bodies (Tuple[str, ...]): Chaves dos corpos, na ordem de `positions`.
+        positions (np.ndarray): Matriz N×3 com longitude, latitude e velocidade de cada corpo.
+        cusps (np.ndarray): Longitudes das cúspides das casas 1 a 12.
+        name (str): Nome do mapa.
+        tz_str (str): Fuso horário do mapa.
+    """
+    __slots__ = ("julian_day", "latitude", "longitude", "house_system", "bodies", "positions", "cusps", "name", "tz_str")
+
+    def __init__(
+        self,
+        julian_day: float,
+        latitude: float,
+        longitude: float,
+        house_system: str,
+        bodies: Tuple[str, ...],
+        positions: np.ndarray,
+        cusps: np.ndarray,
+        name: str = "",
+        tz_str: str = "UTC"
+    ) -> None:
+        self.julian_day = julian_day
+        self.latitude = latitude
+        self.longitude = longitude
+        self.house_system = house_system
+        self.bodies = bodies
+        self.positions = positions
+        self.cusps = cusps
+        self.name = name
+        self.tz_str = tz_str
+
+    @property
+    def utc_datetime(self) -> datetime:
+        """Instante do mapa em UTC."""
+        return datetime_from_julian_day(self.julian_day)
+
+    def body_houses(self) -> np.ndarray:
+        """
+        Calcula a casa (1-12) de cada corpo a partir das cúspides.
+
+        Returns:
+            np.ndarray: Número da casa de cada corpo, na ordem de `bodies`.
+        """
+        widths = (np.roll(self.cusps, -1) - self.cusps) % 360.0
+        offsets = (self.positions[:, 0, np.newaxis] - self.cusps[np.newaxis, :]) % 360.0
+        return np.argmax(offsets < widths, axis=1) + 1
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializa o instantâneo no formato binário versionado.
+
+        Returns:
+            bytes: Cabeçalho, códigos dos corpos, posições, cúspides e metadados.
+        """
+        metadata = json.dumps({"name": self.name, "tz_str": self.tz_str}).encode("utf-8")
+        codes = bytes(SNAPSHOT_BODIES.index(body) for body in self.bodies)
+        header = _HEADER.pack(
+            SNAPSHOT_VERSION,
+            self.julian_day,
+            self.latitude,
+            self.longitude,
+            self.house_system.encode("ascii"),
+            len(self.bodies),
+            len(metadata)
+        )
+        return b"".join((
+            header,
+            codes,
+            np.ascontiguousarray(self.positions, dtype="<f8").tobytes(),
+            np.ascontiguousarray(self.cusps, dtype="<f8").tobytes(),
+            metadata
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ChartSnapshot":
+        """
+        Lê um instantâneo serializado com to_bytes.
+
+        Args:
+            data (bytes): Instantâneo serializado.
+
+        Returns:
+            ChartSnapshot: Instantâneo lido.
+
+        Raises:
+            ValueError: Se a versão do formato for diferente da atual.
+        """
+        version, julian_day, latitude, longitude, house_system, count, metadata_size = _HEADER.unpack_from(data)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Versão de instantâneo não suportada: {version}")
+
+        offset = _HEADER.size
+        bodies = tuple(SNAPSHOT_BODIES[code] for code in data[offset:offset + count])
+        offset += count
+        positions = np.frombuffer(data, dtype="<f8", count=count * 3, offset=offset).reshape(count, 3)
+        offset += count * 3 * 8
+        cusps = np.frombuffer(data, dtype="<f8", count=12, offset=offset)
+        offset += 12 * 8
+        metadata = json.loads(data[offset:offset + metadata_size].decode("utf-8"))
+
+        return cls(
+            julian_day, latitude, longitude, house_system.decode("ascii"),
+            bodies, positions, cusps, metadata["name"], metadata["tz_str"]
+        )
+
+    def __reduce__(self) -> Tuple[Any, Tuple[bytes]]:
+        # Serializar no formato compacto também no cache e entre processos
+        return (ChartSnapshot.from_bytes, (self.to_bytes(),))
+
+def take_snapshot(
+    julian_day: float,
+    latitude: float,
+    longitude: float,
+    house_system: str = "P",
+    name: str = "",
+    tz_str: str = "UTC",
+    bodies: Optional[Sequence[str]] = None
+) -> ChartSnapshot:
+    """
+    Calcula um instantâneo diretamente pelas efemérides.
+
+    Args:
+        julian_day (float): Dia juliano (UT).
+        latitude (float): Latitude geográfica.
+        longitude (float): Longitude geográfica.
+        house_system (str): Código do sistema de casas. Padrão é "P" (Placidus).
+        name (str): Nome do mapa.
+        tz_str (str): Fuso horário do mapa.
+        bodies (Optional[Sequence[str]]): Chaves dos corpos. Padrão é DEFAULT_BODIES.
+
+    Returns:
+        ChartSnapshot: Instantâneo do mapa.
+    """
+    backend = get_backend()
+    body_positions = backend.positions_at(julian_day, bodies if bodies is not None else DEFAULT_BODIES)
+    positions = np.column_stack((body_positions.longitude, body_positions.latitude, body_positions.speed))
+    cusps = backend.houses(julian_day, latitude, longitude, house_system)
+
+    return ChartSnapshot(
+        julian_day, latitude, longitude, house_system,
+        body_positions.bodies, positions, cusps, name, tz_str
+    )
+
+def snapshot_from_subject(subject: Any, bodies: Optional[Sequence[str]] = None) -> ChartSnapshot:
+    """
+    Calcula o instantâneo de um AstrologicalSubject.
+
+    Se o subject tiver um `utc_datetime` exato (como os mapas de retorno), o
+    instantâneo usa esse instante; caso contrário, usa o dia juliano do subject.
+
+    Args:
+        subject (Any): Objeto AstrologicalSubject.
+        bodies (Optional[Sequence[str]]): Chaves dos corpos. Padrão é DEFAULT_BODIES.
+
+    Returns:
+        ChartSnapshot: Instantâneo do mapa.
+    """
+    utc_datetime = getattr(subject, "utc_datetime", None)
+    julian_day = julian_day_from_datetime(utc_datetime) if isinstance(utc_datetime, datetime) else subject.julian_day
+
+    return take_snapshot(
+        julian_day,
+        subject.lat,
+        subject.lng,
+        getattr(subject, "houses_system_identifier", "P"),
+        subject.name,
+        subject.tz_str,
+        bodies
+    )
+
+def sign_of(longitude: float) -> Tuple[str, int]:
+    """Retorna o nome original e o número (1-12) do signo de uma longitude."""
+    sign_num = int(longitude % 360.0 // 30) + 1
+    return ZODIAC_SIGNS[sign_num - 1], sign_num
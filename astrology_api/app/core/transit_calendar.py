@@ -0,0 +1,291 @@
+"""
+Módulo do calendário de trânsitos sobre um mapa natal.
+
+Em vez de calcular um mapa de trânsito por dia, as longitudes dos corpos em
+trânsito são amostradas em uma grade (com passo suficiente para que nenhum corpo
+ande mais que alguns graus entre duas amostras, avaliada de uma vez pelo
+backend de efemérides) e comparadas, de uma só vez com
+NumPy, com a longitude de cada aspecto a cada ponto natal. Cada troca de sinal
+delimita um instante (aspecto exato, entrada ou saída do orbe), refinado com o
+método de Brent. Perto das estações, em que o corpo pode tocar a mesma longitude
+duas vezes entre amostras, o mínimo da distância é procurado explicitamente, o
+que captura os retornos por movimento retrógrado.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.optimize import brentq, minimize_scalar
+
+from ..core.aspects import MAJOR_ASPECTS, AspectTable
+from ..core.ephemeris import BODY_IDS
+from ..core.ephemeris_backends import EphemerisBackend, get_backend
+
+# Corpos em trânsito considerados por padrão (a Lua gera eventos demais para um calendário)
+DEFAULT_TRANSIT_BODIES: Tuple[str, ...] = (
+    "sun", "mercury", "venus", "mars", "jupiter", "saturn", "uranus", "neptune", "pluto"
+)
+
+# Velocidade máxima aproximada de cada corpo em graus/dia, usada para escolher o passo
+MAX_SPEEDS: Dict[str, float] = {
+    "sun": 1.02,
+    "moon": 15.4,
+    "mercury": 2.2,
+    "venus": 1.26,
+    "mars": 0.8,
+    "jupiter": 0.25,
+    "saturn": 0.13,
+    "uranus": 0.07,
+    "neptune": 0.04,
+    "pluto": 0.04,
+    "mean_node": 0.06,
+    "true_node": 0.25,
+    "chiron": 0.15,
+    "mean_lilith": 0.12,
+}
+
+# Passo padrão da grade em dias e deslocamento máximo de um corpo entre duas amostras
+DEFAULT_STEP_DAYS = 1.0
+MAX_STEP_DEGREES = 2.0
+
+# Tolerância das raízes em dias (1 segundo)
+ROOT_TOLERANCE_DAYS = 1.0 / 86400
+
+# Distância (em graus) abaixo da qual um mínimo perto de uma estação é investigado
+STATION_MARGIN_DEGREES = 1.0
+
+# Tamanho dos blocos em que o calendário é calculado e enviado
+CALENDAR_CHUNK_DAYS = 30.0
+
+# Tipos de evento
+EVENT_ACTIVE = "active"
+EVENT_ENTER = "enter"
+EVENT_EXACT = "exact"
+EVENT_EXIT = "exit"
+
+def _wrap(values: np.ndarray) -> np.ndarray:
+    """Normaliza ângulos para [-180, 180)."""
+    return (values + 180.0) % 360.0 - 180.0
+
+def aspect_targets(
+    natal_points: Sequence[float],
+    table: AspectTable = MAJOR_ASPECTS
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Lista as longitudes em que um corpo em trânsito forma cada aspecto com cada ponto natal.
+
+    Aspectos de 0° e 180° têm uma longitude por ponto; os demais têm duas (antes e
+    depois do ponto).
+
+    Args:
+        natal_points (Sequence[float]): Longitudes dos pontos natais.
+        table (AspectTable): Tabela de aspectos e orbes.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Longitude alvo, índice do
+            ponto natal, índice do aspecto e orbe de cada alvo.
+    """
+    longitudes: List[float] = []
+    points: List[int] = []
+    aspects: List[int] = []
+    for point, natal_longitude in enumerate(natal_points):
+        for aspect, angle in enumerate(table.angles):
+            sides = (angle,) if angle % 180.0 == 0 else (angle, -angle)
+            for side in sides:
+                longitudes.append((natal_longitude + side) % 360.0)
+                points.append(point)
+                aspects.append(aspect)
+
+    aspects_array = np.asarray(aspects, dtype=np.int64)
+    return (
+        np.asarray(longitudes, dtype=np.float64),
+        np.asarray(points, dtype=np.int64),
+        aspects_array,
+        table.orbs[aspects_array] if len(aspects_array) else np.zeros(0)
+    )
+
+def scan_step(bodies: Sequence[str], step_days: float = DEFAULT_STEP_DAYS) -> float:
+    """Passo da grade: no máximo `step_days` e sem que o corpo mais rápido ande mais que MAX_STEP_DEGREES."""
+    fastest = max(MAX_SPEEDS.get(body, 1.0) for body in bodies)
+    return min(step_days, MAX_STEP_DEGREES / fastest)
+
+def _offset(jd: float, backend: EphemerisBackend, body: str, target: float, level: float) -> float:
+    """Distância do corpo à longitude alvo, em [-180, 180), menos o nível procurado."""
+    longitude, _ = backend.longitude(jd, body)
+    return (longitude - target + 180.0) % 360.0 - 180.0 - level
+
+def find_transit_events(
+    natal_points: Sequence[float],
+    jd_start: float,
+    jd_end: float,
+    bodies: Sequence[str] = DEFAULT_TRANSIT_BODIES,
+    table: AspectTable = MAJOR_ASPECTS,
+    step_days: float = DEFAULT_STEP_DAYS,
+    include_active: bool = True
+) -> List[Dict[str, float]]:
+    """
+    Encontra os aspectos exatos e as entradas e saídas de orbe em um intervalo.
+
+    Args:
+        natal_points (Sequence[float]): Longitudes dos pontos natais.
+        jd_start (float): Dia juliano (UT) inicial.
+        jd_end (float): Dia juliano (UT) final.
+        bodies (Sequence[str]): Chaves dos corpos em trânsito. Padrão é DEFAULT_TRANSIT_BODIES.
+        table (AspectTable): Tabela de aspectos e orbes. Padrão é MAJOR_ASPECTS.
+        step_days (float): Passo máximo da grade em dias. Padrão é 1.
+        include_active (bool): Se True, inclui um evento "active" em `jd_start` para cada
+            aspecto que já está dentro do orbe no início do intervalo.
+
+    Returns:
+        List[Dict[str, float]]: Eventos ordenados pelo instante, com as chaves "jd", "event",
+            "body", "point", "aspect", "longitude" e "speed".
+    """
+    bodies = tuple(bodies)
+    for body in bodies:
+        if body not in BODY_IDS:
+            raise ValueError(f"Corpo não suportado: {body}")
+    if jd_end <= jd_start or not bodies or not len(natal_points):
+        return []
+
+    targets, target_points, target_aspects, target_orbs = aspect_targets(natal_points, table)
+
+    # Grade de amostras, incluindo o instante final
+    step = scan_step(bodies, step_days)
+    count = int(np.ceil((jd_end - jd_start) / step)) + 1
+    grid = np.linspace(jd_start, jd_end, count)
+    backend = get_backend()
+    longitudes, _, speeds = backend.positions(grid, bodies)
+
+    # Níveis procurados em cada alvo: aspecto exato e as duas bordas do orbe
+    levels = np.stack((np.zeros_like(target_orbs), target_orbs, -target_orbs))
+
+    events: List[Dict[str, float]] = []
+    for b, body in enumerate(bodies):
+        distances = _wrap(longitudes[:, b, np.newaxis] - targets[np.newaxis, :])
+
+        if include_active:
+            for target in np.flatnonzero(np.abs(distances[0]) <= target_orbs):
+                events.append(_event(
+                    jd_start, EVENT_ACTIVE, body, int(target_points[target]), int(target_aspects[target]),
+                    float(longitudes[0, b]), float(speeds[0, b])
+                ))
+
+        # Instantes candidatos: cada troca de sinal de (distância - nível) entre duas amostras
+        roots: List[Tuple[float, int, int]] = []
+        for level_num, level in enumerate(levels):
+            values = distances - level[np.newaxis, :]
+            near = np.abs(values) < 90.0
+            crossing = ((values[:-1] < 0) != (values[1:] < 0)) & near[:-1] & near[1:]
+            for i, target in zip(*np.nonzero(crossing)):
+                jd = _refine(backend, body, float(targets[target]), float(level[target]), grid[i], grid[i + 1])
+                if jd is not None:
+                    roots.append((jd, level_num, int(target)))
+
+            # Perto das estações o corpo pode cruzar o nível e voltar entre duas amostras
+            for i in np.flatnonzero(np.sign(speeds[:-1, b]) != np.sign(speeds[1:, b])):
+                low, high = max(0, i - 1), min(len(grid) - 1, i + 2)
+                window = values[low:high + 1]
+                quiet = ~np.any((window[:-1] < 0) != (window[1:] < 0), axis=0)
+                candidates = np.flatnonzero(quiet & (np.min(np.abs(window), axis=0) < STATION_MARGIN_DEGREES))
+                for target in candidates:
+                    roots.extend(
+                        (jd, level_num, int(target))
+                        for jd in _station_roots(backend, body, float(targets[target]), float(level[target]), grid[low], grid[high], window[0, target])
+                    )
+
+        for jd, level_num, target in roots:
+            longitude, speed = backend.longitude(jd, body)
+            if level_num == 0:
+                event = EVENT_EXACT
+            else:
+                # A distância entra no orbe quando seu módulo diminui ao cruzar a borda
+                moving_up = speed > 0
+                entering = (level_num == 1 and not moving_up) or (level_num == 2 and moving_up)
+                event = EVENT_ENTER if entering else EVENT_EXIT
+            events.append(_event(jd, event, body, int(target_points[target]), int(target_aspects[target]), longitude, speed))
+
+    events.sort(key=lambda event: (event["jd"], event["body"], event["point"]))
+    return events
+
+def _refine(backend: EphemerisBackend, body: str, target: float, level: float, low: float, high: float) -> Optional[float]:
+    """
+    Refina com o método de Brent um cruzamento detectado na grade.
+
+    As amostras da grade podem vir de efemérides pré-calculadas; se o cruzamento não
+    se confirmar ao recalcular as pontas (nível tocado a menos do erro delas), é descartado.
+    """
+    args = (backend, body, target, level)
+    if (_offset(low, *args) < 0) == (_offset(high, *args) < 0):
+        return None
+    return brentq(_offset, low, high, args=args, xtol=ROOT_TOLERANCE_DAYS)
+
+def _station_roots(backend: EphemerisBackend, body: str, target: float, level: float, low: float, high: float, first_value: float) -> List[float]:
+    """
+    Procura, perto de uma estação, dois cruzamentos do nível entre amostras sem troca de sinal.
+
+    O mínimo de |distância - nível| no intervalo é localizado; se a função trocar de
+    sinal nele, há uma raiz de cada lado.
+    """
+    sign = 1.0 if first_value >= 0 else -1.0
+    found = minimize_scalar(
+        lambda jd: sign * _offset(jd, backend, body, target, level),
+        bounds=(low, high), method="bounded", options={"xatol": ROOT_TOLERANCE_DAYS}
+    )
+    if found.fun >= 0:
+        return []
+
+    args = (backend, body, target, level)
+    return [
+        brentq(_offset, low, found.x, args=args, xtol=ROOT_TOLERANCE_DAYS),
+        brentq(_offset, found.x, high, args=args, xtol=ROOT_TOLERANCE_DAYS),
+    ]
+
+def _event(jd: float, event: str, body: str, point: int, aspect: int, longitude: float, speed: float) -> Dict[str, float]:
+    """Monta um evento do calendário."""
+    return {
+        "jd": float(jd),
+        "event": event,
+        "body": body,
+        "point": point,
+        "aspect": aspect,
+        "longitude": float(longitude),
+        "speed": float(speed),
+    }
+
+def calendar_chunks(jd_start: float, jd_end: float, chunk_days: float) -> List[Tuple[float, float]]:
+    """
+    Divide o intervalo em blocos consecutivos, calculados e enviados em sequência.
+
+    Args:
+        jd_start (float): Dia juliano (UT) inicial.
+        jd_end (float): Dia juliano (UT) final.
+        chunk_days (float): Tamanho de cada bloco em dias.
+
+    Returns:
+        List[Tuple[float, float]]: Início e fim de cada bloco.
+    """
+    chunks = []
+    start = jd_start
+    while start < jd_end:
+        end = min(jd_end, start + chunk_days)
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+def natal_points_from_positions(
+    jd: float,
+    bodies: Sequence[str],
+    angles: Optional[Sequence[float]] = None
+) -> List[float]:
+    """
+    Longitudes dos pontos natais: os corpos e, opcionalmente, ângulos (Ascendente, Meio-do-Céu).
+
+    Args:
+        jd (float): Dia juliano (UT) do nascimento.
+        bodies (Sequence[str]): Chaves dos corpos natais.
+        angles (Optional[Sequence[float]]): Longitudes de pontos adicionais.
+
+    Returns:
+        List[float]: Longitudes, na ordem dos corpos seguidos dos ângulos.
+    """
+    points = [float(longitude) for longitude in get_backend().positions_at(jd, bodies).longitude]
+    return points + [float(angle) for angle in (angles or ())]
@@ -0,0 +1,88 @@
+"""
+Comando de construção offline do índice de interpretações.
+
+Uso (a partir do diretório astrology_api):
+    python -m app.interpretations.build_index [--texts-dir DIR] [--output ARQUIVO] [--table ARQUIVO] [--full] [--no-table]
+
+Lê e tokeniza os textos processados uma única vez e grava o índice binário que
+os workers mapeiam em memória ao iniciar. Se o arquivo já existir, apenas os
+textos adicionados, alterados ou removidos são reindexados (use --full para
+reconstruir tudo). Em seguida, resolve todas as consultas de interpretação em
+todos os idiomas e grava a tabela de interpretações pré-calculadas.
+"""
+from typing import List, Optional
+import argparse
+import os
+import time
+
+from ..interpretations.index_store import load_index, write_index
+from ..interpretations.lookup_table import load_table, write_table
+from ..interpretations.text_search import (
+    INTERPRETATION_TABLE_PATH, PROCESSED_TEXTS_DIR, SEARCH_INDEX_PATH,
+    build_search_index, precompute_interpretations, sources_fingerprint, update_search_index
+)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Constrói o índice e grava o arquivo binário.
+
+    Args:
+        argv (Optional[List[str]]): Argumentos da linha de comando. Padrão é sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Constrói o índice binário de busca das interpretações.")
+    parser.add_argument("--texts-dir", default=PROCESSED_TEXTS_DIR, help="Diretório dos textos processados")
+    parser.add_argument("--output", default=SEARCH_INDEX_PATH, help="Arquivo do índice a gravar")
+    parser.add_argument("--table", default=INTERPRETATION_TABLE_PATH, help="Arquivo da tabela de interpretações a gravar")
+    parser.add_argument("--full", action="store_true", help="Reconstrói o índice inteiro, mesmo que o arquivo exista")
+    parser.add_argument("--no-table", action="store_true", help="Não constrói a tabela de interpretações")
+    args = parser.parse_args(argv)
+
+    started_at = time.perf_counter()
+    update = None
+    loaded = None
+    if os.path.exists(args.output) and not args.full:
+        try:
+            loaded = load_index(args.output)
+        except ValueError as e:
+            # Arquivos de outra versão do formato são reconstruídos
+            print(f"{str(e)}; reconstruindo o índice")
+    if loaded is not None:
+        index, metadata = loaded
+        update = update_search_index(index, metadata, args.texts_dir)
+    else:
+        update = build_search_index(args.texts_dir)
+
+    if update is None:
+        print(f"Índice {args.output} já está atualizado")
+    else:
+        index, metadata = update
+        write_index(args.output, index, metadata)
+        print(
+            f"Índice gravado em {args.output}: {len(index)} parágrafos, {len(index.terms)} termos, "
+            f"{len(index.posting_docs)} ocorrências ({time.perf_counter() - started_at:.2f}s)"
+        )
+
+    if args.no_table:
+        return
+
+    # Reconstruir a tabela se ela não existir ou tiver sido feita com outros textos
+    fingerprint = sources_fingerprint(metadata)
+    if not args.full and os.path.exists(args.table):
+        try:
+            if load_table(args.table).metadata.get("sources_fingerprint") == fingerprint:
+                print(f"Tabela {args.table} já está atualizada")
+                return
+        except ValueError:
+            pass
+
+    started_at = time.perf_counter()
+    entries = precompute_interpretations(index)
+    write_table(args.table, entries, {"sources_fingerprint": fingerprint})
+    found = sum(1 for text in entries.values() if text is not None)
+    print(
+        f"Tabela gravada em {args.table}: {len(entries)} consultas, {found} com interpretação "
+        f"({time.perf_counter() - started_at:.2f}s)"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Módulo de gravação e leitura do índice de interpretações em disco.
+
+O índice é gravado em um único arquivo binário (construído offline com
+`python -m app.interpretations.build_index`) e lido com mmap: os vetores do
+índice, o dicionário de termos e a tabela de parágrafos são usados diretamente
+do arquivo, sem cópia. Todos os processos que abrem o mesmo arquivo compartilham
+as mesmas páginas físicas, e a primeira busca de um processo não precisa ler nem
+tokenizar os textos.
+
+Formato (little-endian):
+    cabeçalho     magic, versão, k1, b e o tamanho dos metadados
+    seções        tabela com início e tamanho, em bytes, de cada seção de SECTIONS
+    metadados     JSON com os arquivos de origem (tamanho e data de modificação)
+    dados         seções alinhadas em 8 bytes
+"""
+from typing import Any, Dict, Optional, Sequence, Tuple
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from ..interpretations.inverted_index import InvertedIndex
+
+INDEX_MAGIC = b"AIDX"
+INDEX_VERSION = 2
+
+_HEADER = struct.Struct("<4sHddQ")
+
+# Seções do arquivo, na ordem em que são gravadas, e o tipo de cada uma
+# (None indica uma seção de bytes com texto UTF-8 concatenado)
+SECTIONS: Tuple[Tuple[str, Optional[str]], ...] = (
+    ("offsets", "<i8"),
+    ("posting_docs", "<i4"),
+    ("posting_freqs", "<i4"),
+    ("doc_lengths", "<i4"),
+    ("doc_norms", "<f8"),
+    ("idf", "<f8"),
+    ("max_scores", "<f8"),
+    ("term_offsets", "<i8"),
+    ("term_blob", None),
+    ("doc_id_offsets", "<i8"),
+    ("doc_id_blob", None),
+    ("text_offsets", "<i8"),
+    ("text_blob", None),
+    ("token_terms", "<i4"),
+    ("token_starts", "<i4"),
+    ("token_ends", "<i4"),
+)
+
+_SECTION_TABLE = struct.Struct("<" + "QQ" * len(SECTIONS))
+
+class MappedStrings(Sequence[str]):
+    """
+    Sequência de textos lidos sob demanda de um bloco de bytes.
+
+    O texto `i` ocupa os bytes `offsets[i]` a `offsets[i + 1]` de `blob`.
+    """
+    __slots__ = ("offsets", "blob")
+
+    def __init__(self, offsets: np.ndarray, blob: memoryview) -> None:
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]  # type: ignore[return-value]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+def _pack_strings(values: Sequence[str]) -> Tuple[np.ndarray, bytes]:
+    """Concatena textos em um bloco UTF-8 e retorna a tabela de posições."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, b"".join(encoded)
+
+def write_index(path: str, index: InvertedIndex, metadata: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Grava o índice no formato binário.
+
+    O arquivo é gravado ao lado do destino e renomeado no final, então processos
+    que já mapearam a versão anterior continuam lendo-a sem interrupção.
+
+    Args:
+        path (str): Caminho do arquivo do índice.
+        index (InvertedIndex): Índice a gravar; precisa ter os textos dos parágrafos.
+        metadata (Optional[Dict[str, Any]]): Metadados gravados junto com o índice.
+    """
+    if index.texts is None:
+        raise ValueError("O índice precisa ter os textos dos parágrafos para ser gravado")
+
+    term_offsets, term_blob = _pack_strings(index.terms)
+    doc_id_offsets, doc_id_blob = _pack_strings(index.doc_ids)
+    text_offsets, text_blob = _pack_strings(index.texts)
+
+    sections = {
+        "offsets": index.offsets,
+        "posting_docs": index.posting_docs,
+        "posting_freqs": index.posting_freqs,
+        "doc_lengths": index.doc_lengths,
+        "doc_norms": index.doc_norms,
+        "idf": index.idf,
+        "max_scores": index.max_scores,
+        "term_offsets": term_offsets,
+        "term_blob": term_blob,
+        "doc_id_offsets": doc_id_offsets,
+        "doc_id_blob": doc_id_blob,
+        "text_offsets": text_offsets,
+        "text_blob": text_blob,
+        # Índices sem as posições dos termos gravam seções vazias
+        "token_terms": index.token_terms if index.token_terms is not None else [],
+        "token_starts": index.token_starts if index.token_starts is not None else [],
+        "token_ends": index.token_ends if index.token_ends is not None else [],
+    }
+    metadata_bytes = json.dumps(metadata or {}).encode("utf-8")
+
+    # Calcular a posição de cada seção, alinhada em 8 bytes
+    payloads = []
+    table = []
+    position = _HEADER.size + _SECTION_TABLE.size + len(metadata_bytes)
+    for name, dtype in SECTIONS:
+        value = sections[name]
+        data = value if dtype is None else np.ascontiguousarray(value, dtype=dtype).tobytes()
+        padding = -position % 8
+        position += padding
+        payloads.append(b"\0" * padding + data)
+        table.extend((position, len(data)))
+        position += len(data)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp.{os.getpid()}"
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, index.k1, index.b, len(metadata_bytes)))
+        f.write(_SECTION_TABLE.pack(*table))
+        f.write(metadata_bytes)
+        for payload in payloads:
+            f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def load_index(path: str) -> Tuple[InvertedIndex, Dict[str, Any]]:
+    """
+    Abre um índice gravado com write_index, mapeando o arquivo em memória.
+
+    Args:
+        path (str): Caminho do arquivo do índice.
+
+    Returns:
+        Tuple[InvertedIndex, Dict[str, Any]]: Índice (com os vetores apontando para o
+            arquivo mapeado) e metadados gravados com ele.
+
+    Raises:
+        ValueError: Se o arquivo não for um índice ou tiver outra versão do formato.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, k1, b, metadata_size = _HEADER.unpack_from(mapped)
+    if magic != INDEX_MAGIC:
+        raise ValueError(f"Arquivo não é um índice de interpretações: {path}")
+    if version != INDEX_VERSION:
+        raise ValueError(f"Versão de índice não suportada: {version}")
+
+    table = _SECTION_TABLE.unpack_from(mapped, _HEADER.size)
+    metadata_start = _HEADER.size + _SECTION_TABLE.size
+    metadata = json.loads(bytes(mapped[metadata_start:metadata_start + metadata_size]).decode("utf-8"))
+
+    buffer = memoryview(mapped)
+    sections: Dict[str, Any] = {}
+    for i, (name, dtype) in enumerate(SECTIONS):
+        start, size = table[2 * i], table[2 * i + 1]
+        if dtype is None:
+            sections[name] = buffer[start:start + size]
+        else:
+            sections[name] = np.frombuffer(mapped, dtype=dtype, count=size // np.dtype(dtype).itemsize, offset=start)
+
+    has_positions = len(sections["token_terms"]) == int(sections["doc_lengths"].sum())
+
+    index = InvertedIndex(
+        doc_ids=MappedStrings(sections["doc_id_offsets"], sections["doc_id_blob"]),
+        terms=MappedStrings(sections["term_offsets"], sections["term_blob"]),
+        offsets=sections["offsets"],
+        posting_docs=sections["posting_docs"],
+        posting_freqs=sections["posting_freqs"],
+        doc_lengths=sections["doc_lengths"],
+        k1=k1,
+        b=b,
+        texts=MappedStrings(sections["text_offsets"], sections["text_blob"]),
+        doc_norms=sections["doc_norms"],
+        idf=sections["idf"],
+        max_scores=sections["max_scores"],
+        token_terms=sections["token_terms"] if has_positions else None,
+        token_starts=sections["token_starts"] if has_positions else None,
+        token_ends=sections["token_ends"] if has_positions else None
+    )
+    return index, metadata
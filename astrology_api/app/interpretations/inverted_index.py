@@ -0,0 +1,486 @@
+"""
+Módulo de índice invertido para a busca nos textos de interpretação.
+
+O índice guarda, para cada termo, a lista de parágrafos em que ele aparece
+(ordenada pelo número do parágrafo) com a frequência do termo, além dos
+comprimentos normalizados dos parágrafos e de um limite superior da pontuação
+BM25 de cada termo. A busca dos k melhores resultados usa WAND: só os parágrafos
+que ainda podem entrar no resultado são pontuados, então o custo de uma consulta
+acompanha o tamanho das listas dos termos consultados, e não o do corpus.
+
+Opcionalmente, o índice também guarda a sequência de termos de cada parágrafo
+com a posição (em caracteres) de cada ocorrência no texto, usada para destacar
+os termos da consulta e recortar trechos sem reprocessar o parágrafo.
+"""
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import bisect
+import heapq
+
+import numpy as np
+
+# Parâmetros padrão do BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+class _PostingCursor:
+    """Cursor sobre a lista de parágrafos de um termo da consulta."""
+    __slots__ = ("docs", "freqs", "pos", "doc", "weight", "upper")
+
+    def __init__(self, docs: np.ndarray, freqs: np.ndarray, weight: float, upper: float) -> None:
+        self.docs = docs
+        self.freqs = freqs
+        self.pos = 0
+        self.doc = int(docs[0])
+        self.weight = weight
+        self.upper = upper
+
+    @property
+    def exhausted(self) -> bool:
+        return self.pos >= len(self.docs)
+
+    @property
+    def freq(self) -> int:
+        return int(self.freqs[self.pos])
+
+    def next(self) -> None:
+        """Avança para o próximo parágrafo da lista."""
+        self.pos += 1
+        if self.pos < len(self.docs):
+            self.doc = int(self.docs[self.pos])
+
+    def advance(self, target: int) -> None:
+        """Avança até o primeiro parágrafo com número maior ou igual a `target`."""
+        self.pos += int(np.searchsorted(self.docs[self.pos:], target))
+        if self.pos < len(self.docs):
+            self.doc = int(self.docs[self.pos])
+
+class InvertedIndex:
+    """
+    Índice invertido com pontuação BM25.
+
+    As listas de todos os termos ficam concatenadas em dois vetores
+    (`posting_docs` e `posting_freqs`); a lista do termo `t` ocupa as posições
+    `offsets[t]` a `offsets[t + 1]`.
+
+    Attributes:
+        doc_ids (Sequence[str]): Identificador de cada parágrafo ("arquivo:índice").
+        terms (Sequence[str]): Termos do índice, em ordem alfabética.
+        offsets (np.ndarray): Início da lista de cada termo (tamanho len(terms) + 1).
+        posting_docs (np.ndarray): Números dos parágrafos, ordenados dentro de cada lista.
+        posting_freqs (np.ndarray): Frequência do termo em cada parágrafo.
+        doc_lengths (np.ndarray): Número de termos de cada parágrafo.
+        texts (Optional[Sequence[str]]): Texto de cada parágrafo, se guardado no índice.
+        doc_norms (np.ndarray): Fator de normalização BM25 de cada parágrafo, k1 * (1 - b + b * dl / avgdl).
+        idf (np.ndarray): IDF BM25 de cada termo.
+        max_scores (np.ndarray): Maior pontuação que cada termo atribui a um parágrafo.
+        token_terms (Optional[np.ndarray]): Termo de cada ocorrência, parágrafo por parágrafo, na
+            ordem do texto; as ocorrências do parágrafo `d` ocupam as posições
+            `token_offsets[d]` a `token_offsets[d + 1]`.
+        token_starts (Optional[np.ndarray]): Posição inicial de cada ocorrência no texto do parágrafo.
+        token_ends (Optional[np.ndarray]): Posição final de cada ocorrência no texto do parágrafo.
+        k1 (float): Parâmetro k1 do BM25.
+        b (float): Parâmetro b do BM25.
+    """
+
+    def __init__(
+        self,
+        doc_ids: Sequence[str],
+        terms: Sequence[str],
+        offsets: np.ndarray,
+        posting_docs: np.ndarray,
+        posting_freqs: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+        texts: Optional[Sequence[str]] = None,
+        doc_norms: Optional[np.ndarray] = None,
+        idf: Optional[np.ndarray] = None,
+        max_scores: Optional[np.ndarray] = None,
+        token_terms: Optional[np.ndarray] = None,
+        token_starts: Optional[np.ndarray] = None,
+        token_ends: Optional[np.ndarray] = None
+    ) -> None:
+        self.doc_ids = doc_ids
+        self.terms = terms
+        self.offsets = offsets
+        self.posting_docs = posting_docs
+        self.posting_freqs = posting_freqs
+        self.doc_lengths = doc_lengths
+        self.texts = texts
+        self.k1 = k1
+        self.b = b
+
+        # Normas dos parágrafos, IDF e limites superiores são calculados uma única vez
+        # (ou lidos prontos de um índice gravado em disco)
+        doc_count = len(doc_ids)
+        if doc_norms is None:
+            avg_length = float(doc_lengths.mean()) if doc_count else 0.0
+            if avg_length > 0:
+                doc_norms = k1 * (1.0 - b + b * doc_lengths / avg_length)
+            else:
+                doc_norms = np.full(doc_count, k1)
+        self.doc_norms = doc_norms
+
+        if idf is None:
+            doc_freqs = np.diff(offsets)
+            idf = np.log1p((doc_count - doc_freqs + 0.5) / (doc_freqs + 0.5))
+        self.idf = idf
+
+        if max_scores is None:
+            if len(posting_docs):
+                freqs = posting_freqs.astype(np.float64)
+                contributions = freqs * (k1 + 1.0) / (freqs + doc_norms[posting_docs])
+                max_scores = np.maximum.reduceat(contributions, offsets[:-1]) * idf
+            else:
+                max_scores = np.zeros(len(terms))
+        self.max_scores = max_scores
+
+        # As ocorrências de cada parágrafo são contíguas, e há doc_lengths[d] delas
+        self.token_terms = token_terms
+        self.token_starts = token_starts
+        self.token_ends = token_ends
+        self.token_offsets = None
+        if token_terms is not None:
+            self.token_offsets = np.zeros(doc_count + 1, dtype=np.int64)
+            np.cumsum(doc_lengths, out=self.token_offsets[1:])
+
+    @classmethod
+    def build(
+        cls,
+        documents: Iterable[Tuple[str, Sequence[str]]],
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+        texts: Optional[Sequence[str]] = None,
+        spans: Optional[Sequence[Sequence[Tuple[int, int]]]] = None
+    ) -> "InvertedIndex":
+        """
+        Constrói o índice a partir dos termos de cada parágrafo.
+
+        Args:
+            documents (Iterable[Tuple[str, Sequence[str]]]): Pares (identificador, termos) de cada parágrafo.
+            k1 (float): Parâmetro k1 do BM25.
+            b (float): Parâmetro b do BM25.
+            texts (Optional[Sequence[str]]): Texto de cada parágrafo, na mesma ordem de `documents`.
+            spans (Optional[Sequence[Sequence[Tuple[int, int]]]]): Posições (início, fim) de cada
+                termo no texto do parágrafo, na mesma ordem dos termos.
+
+        Returns:
+            InvertedIndex: Índice construído.
+        """
+        doc_ids: List[str] = []
+        doc_lengths: List[int] = []
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        doc_tokens: List[Sequence[str]] = []
+
+        # Os parágrafos são numerados na ordem de chegada, então cada lista já fica ordenada
+        for doc_id, tokens in documents:
+            doc_num = len(doc_ids)
+            doc_ids.append(doc_id)
+            doc_lengths.append(len(tokens))
+            if spans is not None:
+                if len(spans[doc_num]) != len(tokens):
+                    raise ValueError(f"Parágrafo {doc_id}: número de posições diferente do número de termos")
+                doc_tokens.append(tokens)
+            for term, freq in Counter(tokens).items():
+                docs, freqs = postings.setdefault(term, ([], []))
+                docs.append(doc_num)
+                freqs.append(freq)
+
+        terms = sorted(postings)
+        sizes = [len(postings[term][0]) for term in terms]
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+
+        posting_docs = np.fromiter(
+            (doc for term in terms for doc in postings[term][0]), dtype=np.int32, count=int(offsets[-1])
+        )
+        posting_freqs = np.fromiter(
+            (freq for term in terms for freq in postings[term][1]), dtype=np.int32, count=int(offsets[-1])
+        )
+
+        token_terms = token_starts = token_ends = None
+        if spans is not None:
+            positions = {term: i for i, term in enumerate(terms)}
+            token_count = sum(doc_lengths)
+            token_terms = np.fromiter(
+                (positions[token] for tokens in doc_tokens for token in tokens), dtype=np.int32, count=token_count
+            )
+            flat_spans = np.fromiter(
+                (bound for doc_spans in spans for span in doc_spans for bound in span), dtype=np.int32, count=2 * token_count
+            ).reshape(-1, 2)
+            token_starts = np.ascontiguousarray(flat_spans[:, 0])
+            token_ends = np.ascontiguousarray(flat_spans[:, 1])
+
+        return cls(
+            doc_ids, terms, offsets, posting_docs, posting_freqs,
+            np.asarray(doc_lengths, dtype=np.int32), k1, b, texts,
+            token_terms=token_terms, token_starts=token_starts, token_ends=token_ends
+        )
+
+    def updated(
+        self,
+        removed_docs: np.ndarray,
+        documents: Sequence[Tuple[str, Sequence[str]]],
+        texts: Optional[Sequence[str]] = None,
+        spans: Optional[Sequence[Sequence[Tuple[int, int]]]] = None
+    ) -> "InvertedIndex":
+        """
+        Cria uma nova versão do índice sem alguns parágrafos e com outros adicionados.
+
+        Só os parágrafos novos são contados; as listas existentes são filtradas,
+        renumeradas e intercaladas com as novas, e as normas, o IDF e os limites
+        superiores são recalculados sobre os vetores. O índice atual não é alterado,
+        então buscas em andamento continuam usando-o.
+
+        Args:
+            removed_docs (np.ndarray): Números dos parágrafos a remover.
+            documents (Sequence[Tuple[str, Sequence[str]]]): Pares (identificador, termos) dos parágrafos novos.
+            texts (Optional[Sequence[str]]): Textos dos parágrafos novos, se o índice guardar textos.
+            spans (Optional[Sequence[Sequence[Tuple[int, int]]]]): Posições dos termos dos parágrafos
+                novos, se o índice guardar as posições.
+
+        Returns:
+            InvertedIndex: Nova versão do índice; os parágrafos novos ficam no final.
+        """
+        keep_docs = np.ones(len(self), dtype=bool)
+        keep_docs[removed_docs] = False
+        renumbered = np.cumsum(keep_docs) - 1
+        base = int(keep_docs.sum())
+
+        keep_positions = self.token_terms is not None and spans is not None
+        added = InvertedIndex.build(documents, self.k1, self.b, spans=spans if keep_positions else None)
+
+        # Ocorrências mantidas, com o termo e o parágrafo já renumerado
+        old_term_ids = np.repeat(np.arange(len(self.terms)), np.diff(self.offsets))
+        keep_postings = keep_docs[self.posting_docs]
+        old_term_ids = old_term_ids[keep_postings]
+        old_docs = renumbered[self.posting_docs[keep_postings]]
+        old_freqs = self.posting_freqs[keep_postings]
+
+        # Dicionário da nova versão: termos que ainda têm ocorrências e termos novos
+        remaining_terms = [self.terms[term_id] for term_id in np.unique(old_term_ids)]
+        terms = sorted(set(remaining_terms).union(added.terms))
+        positions = {term: i for i, term in enumerate(terms)}
+        old_map = np.full(len(self.terms), -1, dtype=np.int64)
+        old_map[np.unique(old_term_ids)] = [positions[term] for term in remaining_terms]
+        added_map = np.array([positions[term] for term in added.terms], dtype=np.int64)
+
+        all_terms = np.concatenate((old_map[old_term_ids], np.repeat(added_map, np.diff(added.offsets))))
+        all_docs = np.concatenate((old_docs, added.posting_docs + base))
+        all_freqs = np.concatenate((old_freqs, added.posting_freqs))
+
+        # Ordenar por termo e, dentro de cada lista, pelo número do parágrafo
+        order = np.lexsort((all_docs, all_terms))
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(all_terms, minlength=len(terms)), out=offsets[1:])
+
+        kept = np.flatnonzero(keep_docs)
+        doc_ids = [self.doc_ids[i] for i in kept] + list(added.doc_ids)
+        new_texts = None
+        if self.texts is not None and texts is not None:
+            new_texts = [self.texts[i] for i in kept] + list(texts)
+
+        # Ocorrências dos parágrafos mantidos (com os termos renumerados) seguidas das novas
+        token_terms = token_starts = token_ends = None
+        if keep_positions:
+            keep_tokens = np.repeat(keep_docs, self.doc_lengths)
+            token_terms = np.concatenate((
+                old_map[self.token_terms[keep_tokens]], added_map[added.token_terms]
+            )).astype(np.int32)
+            token_starts = np.concatenate((self.token_starts[keep_tokens], added.token_starts)).astype(np.int32)
+            token_ends = np.concatenate((self.token_ends[keep_tokens], added.token_ends)).astype(np.int32)
+
+        return InvertedIndex(
+            doc_ids, terms, offsets,
+            all_docs[order].astype(np.int32), all_freqs[order].astype(np.int32),
+            np.concatenate((self.doc_lengths[keep_docs], added.doc_lengths)).astype(np.int32),
+            self.k1, self.b, new_texts,
+            token_terms=token_terms, token_starts=token_starts, token_ends=token_ends
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def term_id(self, term: str) -> Optional[int]:
+        """
+        Localiza um termo por busca binária no dicionário ordenado.
+
+        Args:
+            term (str): Termo já pré-processado.
+
+        Returns:
+            Optional[int]: Posição do termo, ou None se ele não estiver no índice.
+        """
+        term_id = bisect.bisect_left(self.terms, term)
+        if term_id < len(self.terms) and self.terms[term_id] == term:
+            return term_id
+        return None
+
+    def doc_tokens(self, doc_num: int) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Retorna as ocorrências de termos de um parágrafo, na ordem do texto.
+
+        Args:
+            doc_num (int): Número do parágrafo.
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]: Termo, início e fim de cada
+                ocorrência, ou None se o índice não guardar as posições.
+        """
+        if self.token_offsets is None:
+            return None
+        start, end = self.token_offsets[doc_num], self.token_offsets[doc_num + 1]
+        return self.token_terms[start:end], self.token_starts[start:end], self.token_ends[start:end]
+
+    def postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Retorna a lista de parágrafos de um termo.
+
+        Args:
+            term (str): Termo já pré-processado.
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray]]: Números dos parágrafos e frequências,
+                ou None se o termo não estiver no índice.
+        """
+        term_id = self.term_id(term)
+        if term_id is None:
+            return None
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.posting_docs[start:end], self.posting_freqs[start:end]
+
+    def search(self, query_terms: Sequence[str], limit: int = 5, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """
+        Retorna os parágrafos com maior pontuação BM25 para os termos da consulta.
+
+        Args:
+            query_terms (Sequence[str]): Termos já pré-processados; termos repetidos pesam mais.
+            limit (int): Número máximo de resultados.
+            min_score (float): Pontuação que um parágrafo precisa superar para ser incluído.
+
+        Returns:
+            List[Tuple[int, float]]: Pares (número do parágrafo, pontuação), do mais ao menos relevante.
+        """
+        if limit <= 0:
+            return []
+
+        cursors: List[_PostingCursor] = []
+        for term, query_freq in Counter(query_terms).items():
+            term_id = self.term_id(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            cursors.append(_PostingCursor(
+                self.posting_docs[start:end],
+                self.posting_freqs[start:end],
+                float(self.idf[term_id]) * query_freq,
+                float(self.max_scores[term_id]) * query_freq
+            ))
+
+        k1_plus_one = self.k1 + 1.0
+        top: List[Tuple[float, int]] = []
+        threshold = min_score
+
+        while cursors:
+            cursors.sort(key=lambda cursor: cursor.doc)
+
+            # Pivô: primeiro parágrafo em que a soma dos limites superiores supera o limiar
+            upper_bound = 0.0
+            pivot = -1
+            for i, cursor in enumerate(cursors):
+                upper_bound += cursor.upper
+                if upper_bound > threshold:
+                    pivot = i
+                    break
+            if pivot < 0:
+                break
+
+            pivot_doc = cursors[pivot].doc
+            if cursors[0].doc == pivot_doc:
+                # Todos os cursores até o pivô estão no mesmo parágrafo: pontuá-lo
+                norm = float(self.doc_norms[pivot_doc])
+                score = 0.0
+                for cursor in cursors:
+                    if cursor.doc != pivot_doc:
+                        break
+                    freq = cursor.freq
+                    score += cursor.weight * freq * k1_plus_one / (freq + norm)
+                    cursor.next()
+
+                if score > threshold:
+                    if len(top) < limit:
+                        heapq.heappush(top, (score, -pivot_doc))
+                    else:
+                        heapq.heapreplace(top, (score, -pivot_doc))
+                    if len(top) == limit:
+                        threshold = max(min_score, top[0][0])
+            else:
+                # Nenhum parágrafo antes do pivô pode entrar no resultado: saltar até ele
+                for cursor in cursors[:pivot]:
+                    if cursor.doc < pivot_doc:
+                        cursor.advance(pivot_doc)
+
+            cursors = [cursor for cursor in cursors if not cursor.exhausted]
+
+        return [(-neg_doc, score) for score, neg_doc in sorted(top, key=lambda item: (-item[0], -item[1]))]
+
+    def search_batch(
+        self,
+        queries: Sequence[Sequence[str]],
+        limit: int = 5,
+        min_score: float = 0.0
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Pontua várias consultas de uma vez.
+
+        A contribuição BM25 de cada termo é calculada uma única vez para todas as
+        consultas do lote; cada consulta só soma as contribuições dos seus termos.
+
+        Args:
+            queries (Sequence[Sequence[str]]): Termos já pré-processados de cada consulta.
+            limit (int): Número máximo de resultados por consulta.
+            min_score (float): Pontuação que um parágrafo precisa superar para ser incluído.
+
+        Returns:
+            List[List[Tuple[int, float]]]: Para cada consulta, na mesma ordem, pares
+                (número do parágrafo, pontuação) do mais ao menos relevante.
+        """
+        query_counts = [Counter(query_terms) for query_terms in queries]
+
+        # Percorrer a lista de cada termo distinto do lote uma única vez
+        contributions: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term in set().union(*query_counts):
+            term_id = self.term_id(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.posting_docs[start:end]
+            freqs = self.posting_freqs[start:end].astype(np.float64)
+            contributions[term] = (
+                docs,
+                self.idf[term_id] * freqs * (self.k1 + 1.0) / (freqs + self.doc_norms[docs])
+            )
+
+        results: List[List[Tuple[int, float]]] = []
+        for counts in query_counts:
+            parts = [
+                (contributions[term][0], contributions[term][1] * query_freq)
+                for term, query_freq in counts.items() if term in contributions
+            ]
+            if not parts or limit <= 0:
+                results.append([])
+                continue
+
+            if len(parts) == 1:
+                docs, scores = parts[0]
+            else:
+                docs, inverse = np.unique(np.concatenate([part[0] for part in parts]), return_inverse=True)
+                scores = np.bincount(inverse, weights=np.concatenate([part[1] for part in parts]))
+
+            matches = scores > min_score
+            docs, scores = docs[matches], scores[matches]
+            order = np.lexsort((docs, -scores))[:limit]
+            results.append([(int(docs[i]), float(scores[i])) for i in order])
+
+        return results
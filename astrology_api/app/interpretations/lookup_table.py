@@ -0,0 +1,182 @@
+"""
+Módulo da tabela de interpretações pré-calculadas.
+
+As consultas de interpretação que a API monta (planeta em signo e casa, aspecto
+entre dois planetas, casas) formam um conjunto finito. A tabela guarda, para cada
+idioma e consulta, o melhor parágrafo já traduzido, em uma tabela hash de
+endereçamento aberto gravada em um arquivo binário e lida com mmap. A consulta em
+tempo de requisição é um acesso O(1); consultas fora da tabela continuam sendo
+resolvidas pela busca textual.
+
+Formato (little-endian):
+    cabeçalho     magic, versão, número de posições, de entradas e tamanho dos metadados
+    metadados     JSON (ex: impressão digital dos textos usados na construção)
+    dados         hashes das posições, parágrafo de cada posição e tabela de parágrafos
+"""
+from typing import Any, Dict, Mapping, Optional, Tuple
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from ..interpretations.index_store import MappedStrings
+
+TABLE_MAGIC = b"AITB"
+TABLE_VERSION = 1
+
+_HEADER = struct.Struct("<4sHQQQ")
+
+# Valor das posições cuja consulta não tem parágrafo correspondente
+NO_PASSAGE = -1
+
+def table_key_hash(language: str, query: str) -> int:
+    """
+    Calcula o hash de 64 bits de uma consulta em um idioma.
+
+    O bit mais baixo é sempre 1, para que 0 marque as posições vazias.
+    """
+    digest = hashlib.blake2b(f"{language}\0{query}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") | 1
+
+class InterpretationTable:
+    """
+    Tabela hash de consultas para parágrafos de interpretação.
+
+    Attributes:
+        hashes (np.ndarray): Hash da consulta de cada posição (0 = vazia).
+        values (np.ndarray): Parágrafo de cada posição, ou NO_PASSAGE.
+        texts (Sequence[str]): Parágrafos distintos, já traduzidos.
+        metadata (Dict[str, Any]): Metadados gravados com a tabela.
+    """
+    __slots__ = ("hashes", "values", "texts", "metadata", "_mask")
+
+    def __init__(self, hashes: np.ndarray, values: np.ndarray, texts: Any, metadata: Dict[str, Any]) -> None:
+        self.hashes = hashes
+        self.values = values
+        self.texts = texts
+        self.metadata = metadata
+        self._mask = len(hashes) - 1
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.hashes))
+
+    def find(self, language: str, query: str) -> Tuple[bool, Optional[str]]:
+        """
+        Procura a interpretação pré-calculada de uma consulta.
+
+        Args:
+            language (str): Idioma da interpretação.
+            query (str): Consulta de busca.
+
+        Returns:
+            Tuple[bool, Optional[str]]: Se a consulta está na tabela e, nesse caso, o
+                parágrafo (None se a busca não encontrou nenhum).
+        """
+        if not len(self.hashes):
+            return False, None
+
+        key_hash = table_key_hash(language, query)
+        slot = key_hash & self._mask
+        while True:
+            slot_hash = int(self.hashes[slot])
+            if slot_hash == key_hash:
+                value = int(self.values[slot])
+                return True, (None if value == NO_PASSAGE else self.texts[value])
+            if slot_hash == 0:
+                return False, None
+            slot = (slot + 1) & self._mask
+
+def write_table(path: str, entries: Mapping[Tuple[str, str], Optional[str]], metadata: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Grava a tabela de interpretações.
+
+    Parágrafos repetidos são gravados uma única vez. O arquivo é gravado ao lado do
+    destino e renomeado no final, como o índice de busca.
+
+    Args:
+        path (str): Caminho do arquivo da tabela.
+        entries (Mapping[Tuple[str, str], Optional[str]]): Parágrafo de cada par (idioma, consulta).
+        metadata (Optional[Dict[str, Any]]): Metadados gravados junto com a tabela.
+    """
+    # Tamanho em potência de 2 com ocupação de no máximo 50%
+    slot_count = 1
+    while slot_count < 2 * len(entries):
+        slot_count *= 2
+
+    hashes = np.zeros(slot_count, dtype="<u8")
+    values = np.full(slot_count, NO_PASSAGE, dtype="<i4")
+    text_ids: Dict[str, int] = {}
+    mask = slot_count - 1
+
+    for (language, query), text in entries.items():
+        key_hash = table_key_hash(language, query)
+        slot = key_hash & mask
+        while hashes[slot] != 0 and int(hashes[slot]) != key_hash:
+            slot = (slot + 1) & mask
+        hashes[slot] = key_hash
+        if text is not None:
+            values[slot] = text_ids.setdefault(text, len(text_ids))
+
+    encoded = [text.encode("utf-8") for text in text_ids]
+    text_offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    np.cumsum([len(text) for text in encoded], out=text_offsets[1:])
+    metadata_bytes = json.dumps(metadata or {}).encode("utf-8")
+
+    header = _HEADER.pack(TABLE_MAGIC, TABLE_VERSION, slot_count, len(text_ids), len(metadata_bytes))
+    padding = b"\0" * (-(len(header) + len(metadata_bytes)) % 8)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp.{os.getpid()}"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        f.write(metadata_bytes)
+        f.write(padding)
+        f.write(hashes.tobytes())
+        f.write(values.tobytes())
+        f.write(b"\0" * (-(slot_count * 4) % 8))
+        f.write(text_offsets.tobytes())
+        f.write(b"".join(encoded))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def load_table(path: str) -> InterpretationTable:
+    """
+    Abre uma tabela gravada com write_table, mapeando o arquivo em memória.
+
+    Args:
+        path (str): Caminho do arquivo da tabela.
+
+    Returns:
+        InterpretationTable: Tabela de interpretações.
+
+    Raises:
+        ValueError: Se o arquivo não for uma tabela ou tiver outra versão do formato.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, slot_count, text_count, metadata_size = _HEADER.unpack_from(mapped)
+    if magic != TABLE_MAGIC:
+        raise ValueError(f"Arquivo não é uma tabela de interpretações: {path}")
+    if version != TABLE_VERSION:
+        raise ValueError(f"Versão de tabela não suportada: {version}")
+
+    offset = _HEADER.size
+    metadata = json.loads(bytes(mapped[offset:offset + metadata_size]).decode("utf-8"))
+    offset += metadata_size
+    offset += -offset % 8
+
+    hashes = np.frombuffer(mapped, dtype="<u8", count=slot_count, offset=offset)
+    offset += slot_count * 8
+    values = np.frombuffer(mapped, dtype="<i4", count=slot_count, offset=offset)
+    offset += slot_count * 4
+    offset += -offset % 8
+    text_offsets = np.frombuffer(mapped, dtype="<i8", count=text_count + 1, offset=offset)
+    offset += (text_count + 1) * 8
+
+    texts = MappedStrings(text_offsets, memoryview(mapped)[offset:])
+    return InterpretationTable(hashes, values, texts, metadata)
@@ -0,0 +1,377 @@
+"""
+Módulo de busca semântica nos textos de interpretação.
+
+Usa o índice FAISS gerado por V3/build_vector_index_optimized.py (salvo com o
+formato do LangChain: `index.faiss` e `index.pkl`) e o mesmo modelo de embeddings.
+O índice e o modelo são carregados uma única vez por processo. As consultas de
+requisições simultâneas são agrupadas em lotes antes de passar pelo modelo, e os
+vetores de consultas repetidas ficam em um cache em memória.
+
+As dependências (faiss-cpu e sentence-transformers) são opcionais; sem elas, ou
+sem o índice, semantic_search_available() retorna False.
+"""
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import json
+import os
+import pickle
+import queue
+import threading
+import time
+
+import numpy as np
+
+from ..core.cache import create_memory_cache
+from ..interpretations.snippets import snippet
+from ..interpretations.text_search import advanced_text_search, preprocess_text, simple_text_search, tokenize_with_spans
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover - dependência opcional
+    faiss = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # pragma: no cover - dependência opcional
+    SentenceTransformer = None
+
+# Diretório do índice FAISS salvo pelo construtor do V3
+VECTOR_INDEX_PATH = os.getenv(
+    "VECTOR_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "faiss_index")
+)
+
+# Parâmetros de busca dos índices IVF e HNSW (0 usa os gravados em index_params.json)
+VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "0"))
+VECTOR_INDEX_EF_SEARCH = int(os.getenv("VECTOR_INDEX_EF_SEARCH", "0"))
+
+# Modelo de embeddings (o mesmo usado na construção do índice)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+
+# Agrupamento das consultas: tamanho máximo do lote e espera máxima para completá-lo
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_BATCH_WAIT = float(os.getenv("EMBEDDING_BATCH_WAIT", "0.005"))
+
+# Cache dos vetores de consultas repetidas
+EMBEDDING_CACHE = create_memory_cache(
+    "query_embeddings",
+    int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "10000")),
+    int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+)
+
+# Constante k da fusão por posição recíproca (RRF)
+RRF_K = 60
+
+class SemanticIndex:
+    """
+    Índice vetorial com os textos dos trechos indexados.
+
+    Attributes:
+        index (Any): Índice FAISS.
+        texts (List[str]): Texto de cada vetor do índice.
+        sources (List[str]): Arquivo de origem de cada vetor.
+    """
+    __slots__ = ("index", "texts", "sources")
+
+    def __init__(self, index: Any, texts: List[str], sources: List[str]) -> None:
+        self.index = index
+        self.texts = texts
+        self.sources = sources
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def search(self, vectors: np.ndarray, limit: int) -> List[List[Tuple[int, float]]]:
+        """
+        Busca os vetores mais próximos de cada consulta.
+
+        Args:
+            vectors (np.ndarray): Vetores das consultas (Q×D).
+            limit (int): Número de resultados por consulta.
+
+        Returns:
+            List[List[Tuple[int, float]]]: Para cada consulta, pares (posição do trecho, distância).
+        """
+        distances, ids = self.index.search(np.ascontiguousarray(vectors, dtype=np.float32), limit)
+        return [
+            [(int(doc), float(distance)) for doc, distance in zip(row_ids, row_distances) if doc >= 0]
+            for row_ids, row_distances in zip(ids, distances)
+        ]
+
+class QueryEncoder:
+    """
+    Codifica consultas em lotes.
+
+    Chamadas de várias threads entram em uma fila; uma thread de trabalho junta até
+    `batch_size` consultas (esperando no máximo `max_wait` segundos pelo lote) e as
+    codifica com uma única chamada ao modelo.
+    """
+
+    def __init__(self, model: Any, batch_size: int = EMBEDDING_BATCH_SIZE, max_wait: float = EMBEDDING_BATCH_WAIT) -> None:
+        self.model = model
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="query-encoder", daemon=True)
+        self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            by_text = dict(zip(texts, np.asarray(vectors, dtype=np.float32)))
+            for text, future in batch:
+                future.set_result(by_text[text])
+
+    def encode(self, queries: Sequence[str]) -> np.ndarray:
+        """
+        Retorna os vetores das consultas, usando o cache para as repetidas.
+
+        Args:
+            queries (Sequence[str]): Consultas.
+
+        Returns:
+            np.ndarray: Vetores das consultas (Q×D), na mesma ordem.
+        """
+        vectors: Dict[str, np.ndarray] = {}
+        pending: Dict[str, Future] = {}
+        for query in queries:
+            if query in vectors or query in pending:
+                continue
+            cached = EMBEDDING_CACHE.get(f"{EMBEDDING_MODEL}:{query}")
+            if cached is not None:
+                vectors[query] = cached
+            else:
+                future: Future = Future()
+                self._queue.put((query, future))
+                pending[query] = future
+
+        for query, future in pending.items():
+            vector = future.result()
+            EMBEDDING_CACHE.set(f"{EMBEDDING_MODEL}:{query}", vector, vector.nbytes)
+            vectors[query] = vector
+
+        return np.stack([vectors[query] for query in queries])
+
+_semantic_index: Optional[SemanticIndex] = None
+_encoder: Optional[QueryEncoder] = None
+_load_error: Optional[str] = None
+_load_lock = threading.Lock()
+
+def _read_langchain_index(path: str) -> SemanticIndex:
+    """
+    Lê um índice salvo com FAISS.save_local do LangChain.
+
+    Os textos e as origens são copiados do docstore para listas simples, e o
+    docstore é descartado. Para índices IVF e HNSW, nprobe e efSearch vêm de
+    index_params.json (gravado pelo construtor) ou das variáveis de ambiente.
+    """
+    index = faiss.read_index(os.path.join(path, "index.faiss"))
+
+    search_params: Dict[str, int] = {}
+    params_path = os.path.join(path, "index_params.json")
+    if os.path.exists(params_path):
+        with open(params_path, "r", encoding="utf-8") as f:
+            search_params.update(json.load(f).get("search_params", {}))
+    if VECTOR_INDEX_NPROBE:
+        search_params["nprobe"] = VECTOR_INDEX_NPROBE
+    if VECTOR_INDEX_EF_SEARCH:
+        search_params["efSearch"] = VECTOR_INDEX_EF_SEARCH
+    set_search_params(index, search_params)
+    with open(os.path.join(path, "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    texts = []
+    sources = []
+    for position in range(index.ntotal):
+        document = docstore.search(index_to_docstore_id[position])
+        texts.append(document.page_content)
+        sources.append(os.path.basename(document.metadata.get("source", "")))
+
+    return SemanticIndex(index, texts, sources)
+
+def set_search_params(index: Any, search_params: Dict[str, int]) -> None:
+    """
+    Ajusta os parâmetros de busca de um índice FAISS.
+
+    Args:
+        index (Any): Índice FAISS.
+        search_params (Dict[str, int]): Parâmetros (ex: {"nprobe": 16} ou {"efSearch": 64}).
+            Os que não se aplicam ao tipo do índice são ignorados.
+    """
+    parameter_space = faiss.ParameterSpace()
+    for name, value in search_params.items():
+        try:
+            parameter_space.set_index_parameter(index, name, int(value))
+        except RuntimeError:
+            pass
+
+def _load() -> Tuple[Optional[SemanticIndex], Optional[QueryEncoder]]:
+    """Carrega o índice vetorial e o modelo na primeira chamada do processo."""
+    global _semantic_index, _encoder, _load_error
+
+    if _semantic_index is not None or _load_error is not None:
+        return _semantic_index, _encoder
+
+    with _load_lock:
+        if _semantic_index is not None or _load_error is not None:
+            return _semantic_index, _encoder
+
+        if faiss is None or SentenceTransformer is None:
+            _load_error = "Busca semântica indisponível: instale faiss-cpu e sentence-transformers"
+        elif not os.path.exists(os.path.join(VECTOR_INDEX_PATH, "index.faiss")):
+            _load_error = f"Busca semântica indisponível: índice vetorial não encontrado em {VECTOR_INDEX_PATH}"
+        else:
+            try:
+                semantic_index = _read_langchain_index(VECTOR_INDEX_PATH)
+                _encoder = QueryEncoder(SentenceTransformer(EMBEDDING_MODEL, device="cpu"))
+                _semantic_index = semantic_index
+            except Exception as e:
+                _load_error = f"Erro ao carregar a busca semântica: {str(e)}"
+
+        if _load_error is not None:
+            print(_load_error)
+
+    return _semantic_index, _encoder
+
+def semantic_search_available() -> bool:
+    """Indica se o índice vetorial e o modelo de embeddings estão disponíveis."""
+    semantic_index, _ = _load()
+    return semantic_index is not None
+
+def semantic_search_error() -> Optional[str]:
+    """Retorna o motivo pelo qual a busca semântica está indisponível, se estiver."""
+    _load()
+    return _load_error
+
+def semantic_search_batch(queries: Sequence[str], limit: int = 5) -> List[List[Dict[str, Any]]]:
+    """
+    Busca os trechos semanticamente mais próximos de várias consultas.
+
+    Args:
+        queries (Sequence[str]): Consultas de busca.
+        limit (int, opcional): Número máximo de resultados por consulta. Padrão é 5.
+
+    Returns:
+        List[List[Dict[str, Any]]]: Para cada consulta, resultados com fonte, distância e trecho.
+
+    Raises:
+        RuntimeError: Se a busca semântica estiver indisponível.
+    """
+    semantic_index, encoder = _load()
+    if semantic_index is None or encoder is None:
+        raise RuntimeError(_load_error)
+
+    results = semantic_index.search(encoder.encode(queries), limit)
+    return [
+        [
+            {"source": semantic_index.sources[doc], "distance": distance, "paragraph": semantic_index.texts[doc]}
+            for doc, distance in found
+        ]
+        for found in results
+    ]
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """
+    Combina listas ordenadas por fusão por posição recíproca.
+
+    Cada item recebe a soma de 1 / (k + posição) nas listas em que aparece.
+
+    Args:
+        rankings (Sequence[Sequence[str]]): Listas de identificadores, do mais ao menos relevante.
+        k (int): Constante de suavização. Padrão é 60.
+
+    Returns:
+        List[Tuple[str, float]]: Itens e pontuações combinadas, da maior para a menor.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for position, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + position)
+    return sorted(scores.items(), key=lambda entry: -entry[1])
+
+def _result(source: str, paragraph: str, score: float, query_tokens: List[str], snippet_length: Optional[int] = None) -> Dict[str, Any]:
+    """Monta um resultado no formato da busca textual simples."""
+    query_terms = set(query_tokens)
+    tokens, spans = tokenize_with_spans(paragraph)
+    matches = [span for token, span in zip(tokens, spans) if token in query_terms]
+    present = {token for token in tokens if token in query_terms}
+    if snippet_length is not None:
+        paragraph = snippet(paragraph, [start for start, _ in matches], [end for _, end in matches], snippet_length)
+    return {
+        "source": source,
+        "matched_terms": [token for token in query_tokens if token in present],
+        "paragraphs": [paragraph],
+        "score": score
+    }
+
+def interpret_search(query: str, mode: str = "keyword", limit: int = 5, snippet_length: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Busca interpretações por palavras-chave, por semântica ou pela combinação das duas.
+
+    O modo "keyword" mantém o formato de simple_text_search. No modo "hybrid", as
+    listas da busca BM25 e da busca vetorial (com o dobro de candidatos cada) são
+    combinadas por fusão por posição recíproca. Trechos iguais nas duas listas são
+    somados.
+
+    Args:
+        query (str): Consulta de busca.
+        mode (str, opcional): "keyword", "semantic" ou "hybrid". Padrão é "keyword".
+        limit (int, opcional): Número máximo de resultados. Padrão é 5.
+        snippet_length (Optional[int], opcional): Se informado, cada resultado traz o trecho
+            destacado de até esse número de caracteres no lugar do parágrafo inteiro.
+
+    Returns:
+        List[Dict[str, Any]]: Resultados com fonte, termos encontrados e trechos (e pontuação
+            nos modos "semantic" e "hybrid").
+
+    Raises:
+        RuntimeError: Se o modo exigir a busca semântica e ela estiver indisponível.
+    """
+    if mode == "keyword":
+        return simple_text_search(query, limit, snippet_length)
+
+    query_tokens = preprocess_text(query)
+
+    if mode == "semantic":
+        return [
+            _result(result["source"], result["paragraph"], -result["distance"], query_tokens, snippet_length)
+            for result in semantic_search_batch([query], limit)[0]
+        ]
+
+    candidates = 2 * limit
+    keyword_results = advanced_text_search(query, candidates)
+    semantic_results = semantic_search_batch([query], candidates)[0]
+
+    # Identificar os trechos pelo texto normalizado, para somar os que aparecem nas duas listas
+    by_text: Dict[str, Dict[str, Any]] = {}
+    rankings = []
+    for results in (keyword_results, semantic_results):
+        ranking = []
+        for result in results:
+            text_key = " ".join(result["paragraph"].split()).lower()
+            by_text.setdefault(text_key, result)
+            ranking.append(text_key)
+        rankings.append(ranking)
+
+    return [
+        _result(by_text[text_key]["source"], by_text[text_key]["paragraph"], score, query_tokens, snippet_length)
+        for text_key, score in reciprocal_rank_fusion(rankings)[:limit]
+    ]
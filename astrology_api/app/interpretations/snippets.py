@@ -0,0 +1,115 @@
+"""
+Módulo de destaques e trechos dos resultados de busca.
+
+Trabalha sobre as posições (em caracteres) dos termos encontrados no parágrafo,
+guardadas no índice na indexação: destacar os termos e recortar um trecho em volta
+deles são apenas cortes e concatenações do texto, sem expressões regulares.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+# Marcador dos termos destacados e indicador de texto cortado
+HIGHLIGHT_MARKER = "**"
+ELLIPSIS = "…"
+
+def highlight(text: str, starts: Sequence[int], ends: Sequence[int], window_start: int = 0, window_end: Optional[int] = None) -> str:
+    """
+    Destaca (em maiúsculas, entre marcadores) os termos de um trecho do texto.
+
+    Args:
+        text (str): Texto do parágrafo.
+        starts (Sequence[int]): Início de cada termo a destacar, em ordem crescente.
+        ends (Sequence[int]): Fim de cada termo a destacar.
+        window_start (int, opcional): Início do trecho. Padrão é 0.
+        window_end (Optional[int], opcional): Fim do trecho. Padrão é o fim do texto.
+
+    Returns:
+        str: Trecho com os termos destacados.
+    """
+    if window_end is None:
+        window_end = len(text)
+
+    pieces: List[str] = []
+    position = window_start
+    for start, end in zip(starts, ends):
+        start, end = int(start), int(end)
+        if start < window_start or end > window_end:
+            continue
+        pieces.append(text[position:start])
+        pieces.append(f"{HIGHLIGHT_MARKER}{text[start:end].upper()}{HIGHLIGHT_MARKER}")
+        position = end
+    pieces.append(text[position:window_end])
+    return "".join(pieces)
+
+def snippet_window(text_length: int, starts: Sequence[int], ends: Sequence[int], max_length: int) -> Tuple[int, int]:
+    """
+    Escolhe o trecho de até `max_length` caracteres com mais termos encontrados.
+
+    Os termos são percorridos com duas posições (início e fim da janela), em tempo
+    linear no número de termos; a janela escolhida é centrada nos termos que contém.
+
+    Args:
+        text_length (int): Tamanho do texto.
+        starts (Sequence[int]): Início de cada termo encontrado, em ordem crescente.
+        ends (Sequence[int]): Fim de cada termo encontrado.
+        max_length (int): Tamanho máximo do trecho.
+
+    Returns:
+        Tuple[int, int]: Início e fim do trecho.
+    """
+    if text_length <= max_length:
+        return 0, text_length
+    if not len(starts):
+        return 0, max_length
+
+    best_first, best_last, best_count = 0, 0, 0
+    last = 0
+    for first in range(len(starts)):
+        last = max(last, first)
+        while last + 1 < len(starts) and ends[last + 1] - starts[first] <= max_length:
+            last += 1
+        if last - first + 1 > best_count:
+            best_first, best_last, best_count = first, last, last - first + 1
+
+    covered_start, covered_end = int(starts[best_first]), int(ends[best_last])
+    slack = max(0, max_length - (covered_end - covered_start))
+    window_start = max(0, covered_start - slack // 2)
+    window_end = min(text_length, window_start + max_length)
+    window_start = max(0, window_end - max_length)
+    return window_start, window_end
+
+def snippet(text: str, starts: Sequence[int], ends: Sequence[int], max_length: int) -> str:
+    """
+    Recorta o trecho do parágrafo com mais termos encontrados e os destaca.
+
+    O corte é ajustado para não partir palavras (quando há um espaço dentro do
+    trecho) e indicado com reticências.
+
+    Args:
+        text (str): Texto do parágrafo.
+        starts (Sequence[int]): Início de cada termo encontrado, em ordem crescente.
+        ends (Sequence[int]): Fim de cada termo encontrado.
+        max_length (int): Tamanho máximo do trecho, sem contar destaques e reticências.
+
+    Returns:
+        str: Trecho com os termos destacados.
+    """
+    window_start, window_end = snippet_window(len(text), starts, ends, max_length)
+
+    # Não cortar palavras nas bordas (sem perder o primeiro e o último termo do trecho)
+    inner = [(int(start), int(end)) for start, end in zip(starts, ends) if start >= window_start and end <= window_end]
+    if window_start > 0 and not text[window_start - 1].isspace():
+        limit = inner[0][0] if inner else window_end
+        space = text.find(" ", window_start, limit)
+        if space != -1:
+            window_start = space + 1
+    if window_end < len(text) and not text[window_end].isspace():
+        limit = inner[-1][1] if inner else window_start
+        space = text.rfind(" ", limit, window_end)
+        if space != -1:
+            window_end = space
+
+    return (
+        (ELLIPSIS if window_start > 0 else "")
+        + highlight(text, starts, ends, window_start, window_end).strip()
+        + (ELLIPSIS if window_end < len(text) else "")
+    )
@@ -3,21 +3,79 @@ Módulo para busca de texto e interpretações astrológicas.
 """
 import os
 import re
-import math
 import json
-from collections import Counter
-from typing import Dict, List, Any, Optional, Tuple
+import hashlib
+import threading
+from typing import Dict, Hashable, Iterable, List, Any, Mapping, Optional, Tuple, get_args
+import numpy as np
 from ..schemas.models import LanguageType
 
-from ..interpretations.translations import translate_astrological_text
+from ..core.aspects import MAJOR_ASPECTS
+from ..core.ephemeris import BODY_NAMES
+from ..core.snapshot import ZODIAC_SIGNS
+from ..interpretations.index_store import load_index, write_index
+from ..interpretations.inverted_index import InvertedIndex
+from ..interpretations.lookup_table import InterpretationTable, load_table
+from ..interpretations.snippets import highlight, snippet
+from ..interpretations.translations import translate_aspect, translate_astrological_text, translate_planet, translate_sign
 
 # Diretório onde os textos processados estão armazenados
 PROCESSED_TEXTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "processed_texts")
 
-# Cache para armazenar documentos já processados
-DOCUMENT_CACHE = {}
-TF_IDF_INDEX = None
-DOCUMENT_PARAGRAPHS = {}
+# Arquivo do índice binário construído offline (python -m app.interpretations.build_index)
+SEARCH_INDEX_PATH = os.getenv(
+    "SEARCH_INDEX_PATH",
+    os.path.join(os.path.dirname(PROCESSED_TEXTS_DIR), "index", "interpretations.idx")
+)
+
+# Tabela de interpretações pré-calculadas (construída junto com o índice)
+INTERPRETATION_TABLE_PATH = os.getenv(
+    "INTERPRETATION_TABLE_PATH",
+    os.path.join(os.path.dirname(SEARCH_INDEX_PATH), "interpretations.table")
+)
+
+# Intervalo, em segundos, entre as verificações de mudanças nos textos (0 desativa)
+SEARCH_INDEX_REFRESH_INTERVAL = float(os.getenv("SEARCH_INDEX_REFRESH_INTERVAL", "60"))
+
+# Índice de busca do processo (mapeado do arquivo ou construído em memória).
+# Cada atualização publica um novo objeto; o anterior não é alterado.
+SEARCH_INDEX: Optional[InvertedIndex] = None
+SEARCH_INDEX_METADATA: Dict[str, Any] = {}
+SEARCH_INDEX_VERSION = 0
+_search_index_file: Optional[Tuple[int, int]] = None
+_SEARCH_INDEX_LOCK = threading.Lock()
+
+# Tabela carregada e a versão do índice em que foi conferida
+_interpretation_table: Optional[InterpretationTable] = None
+_interpretation_table_version = -1
+
+_search_index_watcher: Optional[threading.Thread] = None
+_search_index_watcher_stop = threading.Event()
+
+# Stopwords simples (artigos, preposições, etc.)
+STOPWORDS = frozenset({'o', 'a', 'os', 'as', 'um', 'uma', 'uns', 'umas', 'e', 'de', 'do', 'da', 'dos', 'das', 'em', 'no', 'na', 'nos', 'nas', 'por', 'para', 'com', 'que', 'se', 'the', 'and', 'of', 'to', 'in', 'is', 'for', 'with', 'by', 'on', 'at', 'from', 'an', 'this', 'that', 'these', 'those'})
+
+_TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+def tokenize_with_spans(text: str) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Divide um texto em tokens, guardando a posição de cada um no texto original.
+    
+    Args:
+        text (str): Texto a ser pré-processado.
+        
+    Returns:
+        Tuple[List[str], List[Tuple[int, int]]]: Tokens (em minúsculas, sem stopwords) e
+            as posições (início, fim) de cada um.
+    """
+    tokens = []
+    spans = []
+    for match in _TOKEN_PATTERN.finditer(text):
+        token = match.group(0).lower()
+        if token not in STOPWORDS and len(token) > 1:
+            tokens.append(token)
+            spans.append(match.span())
+    return tokens, spans
 
 def preprocess_text(text: str) -> List[str]:
     """
@@ -29,120 +87,436 @@ def preprocess_text(text: str) -> List[str]:
     Returns:
         List[str]: Lista de tokens.
     """
-    # Converter para minúsculas
-    text = text.lower()
+    return tokenize_with_spans(text)[0]
+
+def _read_text_file(texts_dir: str, filename: str) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    Lê um arquivo de texto processado e o divide em parágrafos.
     
-    # Remover caracteres especiais e dividir em tokens
-    tokens = re.findall(r'\b\w+\b', text)
+    Args:
+        texts_dir (str): Diretório dos textos.
+        filename (str): Nome do arquivo.
+        
+    Returns:
+        Tuple[List[str], Dict[str, Any]]: Parágrafos do arquivo e seu tamanho, data de
+            modificação e hash do conteúdo.
+    """
+    filepath = os.path.join(texts_dir, filename)
+    stat = os.stat(filepath)
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    
+    # Dividir em parágrafos; cada parágrafo é um "subdocumento"
+    content = raw.decode('utf-8')
+    paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
+    
+    return paragraphs, {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": hashlib.sha256(raw).hexdigest()
+    }
+
+def read_processed_texts(
+    texts_dir: str = PROCESSED_TEXTS_DIR,
+    filenames: Optional[List[str]] = None,
+    first_doc: int = 0
+) -> Tuple[List[Tuple[str, List[str]]], List[str], List[List[Tuple[int, int]]], Dict[str, Dict[str, Any]]]:
+    """
+    Lê e tokeniza os parágrafos dos textos processados.
     
-    # Remover stopwords simples (artigos, preposições, etc.)
-    stopwords = {'o', 'a', 'os', 'as', 'um', 'uma', 'uns', 'umas', 'e', 'de', 'do', 'da', 'dos', 'das', 'em', 'no', 'na', 'nos', 'nas', 'por', 'para', 'com', 'que', 'se', 'the', 'and', 'of', 'to', 'in', 'is', 'for', 'with', 'by', 'on', 'at', 'from', 'an', 'this', 'that', 'these', 'those'}
-    tokens = [token for token in tokens if token not in stopwords and len(token) > 1]
+    Args:
+        texts_dir (str, opcional): Diretório dos textos. Padrão é PROCESSED_TEXTS_DIR.
+        filenames (Optional[List[str]], opcional): Arquivos a ler. Padrão é todos os .txt do diretório.
+        first_doc (int, opcional): Número do primeiro parágrafo lido no índice. Padrão é 0.
+        
+    Returns:
+        Tuple[List[Tuple[str, List[str]]], List[str], List[List[Tuple[int, int]]], Dict[str, Dict[str, Any]]]:
+            Pares (identificador, termos) de cada parágrafo, textos dos parágrafos,
+            posições dos termos em cada texto e, por arquivo, o tamanho, a data de
+            modificação, o hash e a faixa de parágrafos.
+    """
+    documents = []
+    texts = []
+    spans = []
+    sources = {}
     
-    return tokens
+    if filenames is None:
+        filenames = sorted(_scan_sources(texts_dir))
+    
+    for filename in filenames:
+        try:
+            paragraphs, source = _read_text_file(texts_dir, filename)
+        except Exception as e:
+            print(f"Erro ao processar arquivo {filename}: {str(e)}")
+            continue
+        
+        source["first_doc"] = first_doc + len(documents)
+        source["doc_count"] = len(paragraphs)
+        sources[filename] = source
+        
+        for i, paragraph in enumerate(paragraphs):
+            tokens, token_spans = tokenize_with_spans(paragraph)
+            documents.append((f"{filename}:{i}", tokens))
+            texts.append(paragraph)
+            spans.append(token_spans)
+    
+    return documents, texts, spans, sources
 
-def build_tf_idf_index() -> Tuple[Dict[str, Dict[str, float]], Dict[str, List[str]]]:
+def build_search_index(texts_dir: str = PROCESSED_TEXTS_DIR) -> Tuple[InvertedIndex, Dict[str, Any]]:
     """
-    Constrói um índice TF-IDF para os documentos processados.
+    Constrói em memória o índice invertido BM25 dos parágrafos dos textos processados.
     
+    Args:
+        texts_dir (str, opcional): Diretório dos textos. Padrão é PROCESSED_TEXTS_DIR.
+        
     Returns:
-        Tuple[Dict[str, Dict[str, float]], Dict[str, List[str]]]: 
-            Índice TF-IDF e dicionário de parágrafos por documento.
+        Tuple[InvertedIndex, Dict[str, Any]]: Índice construído e metadados com os arquivos de origem.
     """
-    global TF_IDF_INDEX, DOCUMENT_PARAGRAPHS
-    
-    if TF_IDF_INDEX is not None:
-        return TF_IDF_INDEX, DOCUMENT_PARAGRAPHS
+    documents, texts, spans, sources = read_processed_texts(texts_dir)
+    return InvertedIndex.build(documents, texts=texts, spans=spans), {"sources": sources}
+
+def _scan_sources(texts_dir: str = PROCESSED_TEXTS_DIR) -> Dict[str, os.stat_result]:
+    """Lista os arquivos .txt do diretório com seus atributos."""
+    if not os.path.exists(texts_dir):
+        return {}
+    return {
+        entry.name: entry.stat()
+        for entry in os.scandir(texts_dir)
+        if entry.name.endswith(".txt") and entry.is_file()
+    }
+
+def update_search_index(
+    index: InvertedIndex,
+    metadata: Dict[str, Any],
+    texts_dir: str = PROCESSED_TEXTS_DIR
+) -> Optional[Tuple[InvertedIndex, Dict[str, Any]]]:
+    """
+    Atualiza o índice com os arquivos adicionados, alterados ou removidos.
     
-    # Verificar se o diretório de textos processados existe
-    if not os.path.exists(PROCESSED_TEXTS_DIR):
-        TF_IDF_INDEX = {}
-        DOCUMENT_PARAGRAPHS = {}
-        return TF_IDF_INDEX, DOCUMENT_PARAGRAPHS
+    Um arquivo é considerado alterado quando o tamanho ou a data de modificação
+    mudam e o hash do conteúdo também; só esses arquivos são lidos e tokenizados.
     
-    # Índice invertido: termo -> documento -> frequência
-    index = {}
-    document_terms = {}
-    paragraphs_by_doc = {}
+    Args:
+        index (InvertedIndex): Versão atual do índice (não é alterada).
+        metadata (Dict[str, Any]): Metadados da versão atual.
+        texts_dir (str, opcional): Diretório dos textos. Padrão é PROCESSED_TEXTS_DIR.
+        
+    Returns:
+        Optional[Tuple[InvertedIndex, Dict[str, Any]]]: Nova versão do índice e seus
+            metadados, ou None se nenhum arquivo mudou. Se só as datas de modificação
+            mudaram, o índice retornado é o mesmo objeto, com metadados atualizados.
+    """
+    sources = metadata.get("sources", {})
+    
+    # Índices sem a faixa de parágrafos de cada arquivo ou sem as posições dos termos
+    # precisam ser reconstruídos
+    if index.token_terms is None or any("first_doc" not in source or "sha256" not in source for source in sources.values()):
+        return build_search_index(texts_dir)
+    
+    current = _scan_sources(texts_dir)
+    removed = [filename for filename in sources if filename not in current]
+    candidates = sorted(
+        filename for filename, stat in current.items()
+        if filename not in sources
+        or sources[filename]["size"] != stat.st_size
+        or sources[filename]["mtime_ns"] != stat.st_mtime_ns
+    )
+    
+    if not removed and not candidates:
+        return None
     
-    # Processar documentos
-    doc_count = 0
-    for filename in os.listdir(PROCESSED_TEXTS_DIR):
-        if not filename.endswith(".txt"):
+    # Ler os arquivos candidatos; os que têm o mesmo conteúdo só atualizam a data
+    new_sources = {filename: dict(source) for filename, source in sources.items() if filename not in removed}
+    changed = []
+    for filename in candidates:
+        source = sources.get(filename)
+        try:
+            if source is not None:
+                with open(os.path.join(texts_dir, filename), 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                if digest == source["sha256"]:
+                    stat = current[filename]
+                    new_sources[filename].update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                    continue
+        except OSError as e:
+            print(f"Erro ao processar arquivo {filename}: {str(e)}")
             continue
+        changed.append(filename)
+    
+    if not removed and not changed:
+        return index, {**metadata, "sources": new_sources}
+    
+    # Remover os parágrafos dos arquivos removidos ou alterados
+    replaced = [filename for filename in removed + changed if filename in sources]
+    removed_docs = np.concatenate([
+        np.arange(sources[filename]["first_doc"], sources[filename]["first_doc"] + sources[filename]["doc_count"])
+        for filename in replaced
+    ]) if replaced else np.zeros(0, dtype=np.int64)
+    
+    # Renumerar os arquivos mantidos, na ordem em que estão no índice
+    kept = sorted(
+        (filename for filename in new_sources if filename not in changed),
+        key=lambda filename: new_sources[filename]["first_doc"]
+    )
+    next_doc = 0
+    for filename in kept:
+        new_sources[filename]["first_doc"] = next_doc
+        next_doc += new_sources[filename]["doc_count"]
+    
+    # Tokenizar apenas os arquivos novos ou alterados, que vão para o final do índice
+    documents, texts, spans, changed_sources = read_processed_texts(texts_dir, changed, first_doc=next_doc)
+    for filename in changed:
+        new_sources.pop(filename, None)
+    new_sources.update(changed_sources)
+    
+    return index.updated(removed_docs, documents, texts, spans), {**metadata, "sources": new_sources}
+
+def _index_file_signature() -> Optional[Tuple[int, int]]:
+    """Retorna o inode e a data de modificação do arquivo do índice, se existir."""
+    try:
+        stat = os.stat(SEARCH_INDEX_PATH)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+def _load_search_index_file() -> Optional[Tuple[InvertedIndex, Dict[str, Any]]]:
+    """Mapeia o arquivo do índice, se existir e for válido."""
+    if not os.path.exists(SEARCH_INDEX_PATH):
+        return None
+    try:
+        return load_index(SEARCH_INDEX_PATH)
+    except Exception as e:
+        print(f"Erro ao carregar o índice {SEARCH_INDEX_PATH}: {str(e)}")
+        return None
+
+def _swap_search_index(index: InvertedIndex, metadata: Dict[str, Any], file_signature: Optional[Tuple[int, int]]) -> None:
+    """Publica uma nova versão do índice; buscas em andamento mantêm a anterior."""
+    global SEARCH_INDEX, SEARCH_INDEX_METADATA, SEARCH_INDEX_VERSION, _search_index_file
+    
+    SEARCH_INDEX_METADATA = metadata
+    _search_index_file = file_signature
+    if index is not SEARCH_INDEX:
+        SEARCH_INDEX_VERSION += 1
+    SEARCH_INDEX = index
+
+def _apply_source_changes(index: InvertedIndex, metadata: Dict[str, Any]) -> bool:
+    """
+    Aplica as mudanças dos textos processados ao índice e publica a nova versão.
+    
+    Se o processo usa o arquivo do índice, a nova versão é gravada nele e mapeada
+    novamente, para que os demais processos também passem a usá-la.
+    """
+    update = update_search_index(index, metadata, PROCESSED_TEXTS_DIR)
+    if update is None:
+        return False
+    
+    new_index, new_metadata = update
+    file_signature = _search_index_file
+    if file_signature is not None:
+        try:
+            write_index(SEARCH_INDEX_PATH, new_index, new_metadata)
+            file_signature = _index_file_signature()
+            if new_index is not index:
+                new_index, new_metadata = load_index(SEARCH_INDEX_PATH)
+        except Exception as e:
+            print(f"Erro ao gravar o índice {SEARCH_INDEX_PATH}: {str(e)}")
+    
+    changed = new_index is not index
+    _swap_search_index(new_index, new_metadata, file_signature)
+    return changed
+
+def get_search_index() -> InvertedIndex:
+    """
+    Retorna o índice de busca do processo.
+    
+    Se existir o arquivo SEARCH_INDEX_PATH, ele é mapeado em memória (e atualizado
+    se os textos mudaram desde a sua construção); caso contrário, o índice é
+    construído a partir dos textos processados.
+    
+    Returns:
+        InvertedIndex: Índice de busca.
+    """
+    if SEARCH_INDEX is not None:
+        return SEARCH_INDEX
+    
+    with _SEARCH_INDEX_LOCK:
+        if SEARCH_INDEX is not None:
+            return SEARCH_INDEX
         
-        filepath = os.path.join(PROCESSED_TEXTS_DIR, filename)
-        doc_id = filename
+        file_signature = _index_file_signature()
+        loaded = _load_search_index_file()
+        if loaded is None:
+            index, metadata = build_search_index(PROCESSED_TEXTS_DIR)
+            _swap_search_index(index, metadata, None)
+        else:
+            index, metadata = loaded
+            _swap_search_index(index, metadata, file_signature)
+            _apply_source_changes(index, metadata)
+    
+    return SEARCH_INDEX
+
+def refresh_search_index() -> bool:
+    """
+    Atualiza o índice de busca do processo, se necessário.
+    
+    Primeiro verifica se outro processo gravou uma nova versão do arquivo do índice
+    e, nesse caso, passa a mapeá-la; depois reindexa apenas os textos adicionados,
+    alterados ou removidos. A troca de versão é atômica: buscas em andamento
+    continuam lendo a versão anterior.
+    
+    Returns:
+        bool: True se uma nova versão do índice foi publicada.
+    """
+    if SEARCH_INDEX is None:
+        get_search_index()
+        return True
+    
+    with _SEARCH_INDEX_LOCK:
+        swapped = False
+        file_signature = _index_file_signature()
+        if _search_index_file is not None and file_signature is not None and file_signature != _search_index_file:
+            loaded = _load_search_index_file()
+            if loaded is not None:
+                _swap_search_index(loaded[0], loaded[1], file_signature)
+                swapped = True
         
+        return _apply_source_changes(SEARCH_INDEX, SEARCH_INDEX_METADATA) or swapped
+
+def get_search_index_stats() -> Dict[str, Any]:
+    """
+    Retorna informações sobre a versão atual do índice de busca.
+    
+    Returns:
+        Dict[str, Any]: Versão publicada no processo, origem (arquivo ou memória),
+            número de parágrafos, termos, ocorrências e arquivos indexados.
+    """
+    index = get_search_index()
+    return {
+        "version": SEARCH_INDEX_VERSION,
+        "source": SEARCH_INDEX_PATH if _search_index_file is not None else "memory",
+        "paragraphs": len(index),
+        "terms": len(index.terms),
+        "postings": len(index.posting_docs),
+        "files": len(SEARCH_INDEX_METADATA.get("sources", {})),
+    }
+
+def _watch_processed_texts() -> None:
+    """Verifica periodicamente se os textos processados ou o arquivo do índice mudaram."""
+    while not _search_index_watcher_stop.wait(SEARCH_INDEX_REFRESH_INTERVAL):
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-                # Dividir em parágrafos
-                paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
-                paragraphs_by_doc[doc_id] = paragraphs
-                
-                # Processar cada parágrafo como um "subdocumento"
-                for i, paragraph in enumerate(paragraphs):
-                    sub_doc_id = f"{doc_id}:{i}"
-                    DOCUMENT_CACHE[sub_doc_id] = paragraph
-                    
-                    # Pré-processar texto
-                    tokens = preprocess_text(paragraph)
-                    
-                    # Calcular frequência dos termos
-                    term_freq = Counter(tokens)
-                    document_terms[sub_doc_id] = term_freq
-                    
-                    # Atualizar índice invertido
-                    for term, freq in term_freq.items():
-                        if term not in index:
-                            index[term] = {}
-                        index[term][sub_doc_id] = freq
-                
-                doc_count += 1
+            refresh_search_index()
         except Exception as e:
-            print(f"Erro ao processar arquivo {filename}: {str(e)}")
+            print(f"Erro ao atualizar o índice de busca: {str(e)}")
+
+def start_search_index_watcher() -> None:
+    """
+    Inicia a thread que reindexa os textos processados quando eles mudam.
     
-    # Calcular IDF e TF-IDF
-    tf_idf_index = {}
-    for term, docs in index.items():
-        # IDF = log(N / df)
-        idf = math.log(doc_count / len(docs))
-        
-        for doc_id, freq in docs.items():
-            # Normalizar TF
-            tf = freq / sum(document_terms[doc_id].values())
-            
-            # TF-IDF
-            tf_idf = tf * idf
-            
-            if doc_id not in tf_idf_index:
-                tf_idf_index[doc_id] = {}
-            
-            tf_idf_index[doc_id][term] = tf_idf
+    Desativada se SEARCH_INDEX_REFRESH_INTERVAL for 0.
+    """
+    global _search_index_watcher
+    
+    if SEARCH_INDEX_REFRESH_INTERVAL <= 0:
+        return
+    if _search_index_watcher is not None and _search_index_watcher.is_alive():
+        return
     
-    TF_IDF_INDEX = tf_idf_index
-    DOCUMENT_PARAGRAPHS = paragraphs_by_doc
+    _search_index_watcher_stop.clear()
+    _search_index_watcher = threading.Thread(target=_watch_processed_texts, name="search-index-watcher", daemon=True)
+    _search_index_watcher.start()
+
+def stop_search_index_watcher() -> None:
+    """
+    Encerra a thread de reindexação dos textos processados.
+    """
+    global _search_index_watcher
     
-    return tf_idf_index, paragraphs_by_doc
+    _search_index_watcher_stop.set()
+    if _search_index_watcher is not None:
+        _search_index_watcher.join()
+        _search_index_watcher = None
 
-def advanced_text_search(query: str, limit: int = 5, min_score: float = 0.1) -> List[Dict[str, Any]]:
+def _build_search_result(
+    index: InvertedIndex,
+    doc_num: int,
+    score: float,
+    query_tokens: List[str],
+    snippet_length: Optional[int] = None
+) -> Dict[str, Any]:
     """
-    Realiza uma busca avançada de texto nos livros processados usando TF-IDF.
+    Monta um resultado de busca a partir de um parágrafo do índice.
+    
+    Os termos da consulta são localizados pelas posições gravadas no índice, sem
+    reprocessar o parágrafo.
+    
+    Args:
+        index (InvertedIndex): Índice em que o parágrafo foi encontrado.
+        doc_num (int): Número do parágrafo no índice.
+        score (float): Pontuação do parágrafo.
+        query_tokens (List[str]): Termos da consulta.
+        snippet_length (Optional[int], opcional): Tamanho máximo do trecho. Padrão é None (sem trecho).
+        
+    Returns:
+        Dict[str, Any]: Fonte, pontuação, parágrafo, parágrafo com os termos destacados,
+            termos encontrados e, se pedido, o trecho com os termos destacados.
+    """
+    # Extrair informações do doc_id (formato: "filename:paragraph_index")
+    doc_id = index.doc_ids[doc_num]
+    filename = doc_id.rsplit(":", 1)[0]
+    
+    # Recuperar parágrafo
+    paragraph = index.texts[doc_num]
+    
+    # Localizar as ocorrências dos termos da consulta
+    query_term_ids = {}
+    for token in query_tokens:
+        term_id = index.term_id(token)
+        if term_id is not None:
+            query_term_ids[token] = term_id
+    
+    doc_tokens = index.doc_tokens(doc_num)
+    if doc_tokens is None:
+        doc_terms, token_spans = tokenize_with_spans(paragraph)
+        is_match = np.array([term in query_term_ids for term in doc_terms], dtype=bool)
+        spans = np.asarray(token_spans, dtype=np.int32).reshape(-1, 2)[is_match]
+        starts, ends = spans[:, 0], spans[:, 1]
+        present = {term for term, matched in zip(doc_terms, is_match) if matched}
+    else:
+        term_ids, token_starts, token_ends = doc_tokens
+        is_match = np.isin(term_ids, np.fromiter(query_term_ids.values(), dtype=np.int32))
+        starts, ends = token_starts[is_match], token_ends[is_match]
+        present_ids = set(np.unique(term_ids[is_match]).tolist())
+        present = {token for token, term_id in query_term_ids.items() if term_id in present_ids}
+    
+    result = {
+        "source": filename,
+        "score": score,
+        "paragraph": paragraph,
+        "highlighted": highlight(paragraph, starts, ends),
+        "matched_terms": [token for token in query_tokens if token in present]
+    }
+    if snippet_length is not None:
+        result["snippet"] = snippet(paragraph, starts, ends, snippet_length)
+    return result
+
+def advanced_text_search(query: str, limit: int = 5, min_score: float = 0.1, snippet_length: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Realiza uma busca avançada de texto nos livros processados usando BM25.
     
     Args:
         query (str): Consulta de busca.
         limit (int, opcional): Número máximo de resultados. Padrão é 5.
         min_score (float, opcional): Pontuação mínima para incluir um resultado. Padrão é 0.1.
+        snippet_length (Optional[int], opcional): Se informado, cada resultado inclui em "snippet"
+            o trecho de até esse número de caracteres com mais termos da consulta.
         
     Returns:
         List[Dict[str, Any]]: Lista de resultados da busca.
     """
-    # Construir índice TF-IDF (ou recuperar do cache)
-    tf_idf_index, paragraphs_by_doc = build_tf_idf_index()
+    # Recuperar o índice invertido do processo
+    index = get_search_index()
     
-    if not tf_idf_index:
+    if not len(index):
         return []
     
     # Pré-processar a consulta
@@ -151,49 +525,212 @@ def advanced_text_search(query: str, limit: int = 5, min_score: float = 0.1) ->
     if not query_tokens:
         return []
     
-    # Pontuar documentos
-    scores = {}
-    for doc_id, terms in tf_idf_index.items():
-        score = 0
-        for token in query_tokens:
-            if token in terms:
-                score += terms[token]
+    # Recuperar os melhores parágrafos (só as listas dos termos consultados são percorridas)
+    top_docs = index.search(query_tokens, limit=limit, min_score=min_score)
+    
+    return [_build_search_result(index, doc_num, score, query_tokens, snippet_length) for doc_num, score in top_docs]
+
+def batch_text_search(queries: Iterable[str], limit: int = 5, min_score: float = 0.1) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Realiza várias buscas de uma vez, como as de todas as interpretações de um mapa.
+    
+    As consultas são tokenizadas juntas, consultas repetidas são feitas uma única vez
+    e a lista de cada termo é percorrida uma única vez para todo o lote.
+    
+    Args:
+        queries (Iterable[str]): Consultas de busca.
+        limit (int, opcional): Número máximo de resultados por consulta. Padrão é 5.
+        min_score (float, opcional): Pontuação mínima para incluir um resultado. Padrão é 0.1.
         
-        if score > min_score:
-            scores[doc_id] = score
-    
-    # Ordenar por pontuação
-    sorted_docs = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-    
-    # Preparar resultados
-    results = []
-    for doc_id, score in sorted_docs[:limit]:
-        # Extrair informações do doc_id (formato: "filename:paragraph_index")
-        parts = doc_id.split(":")
-        filename = parts[0]
-        paragraph_index = int(parts[1])
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Resultados de cada consulta, no formato de advanced_text_search.
+    """
+    return _batch_search(get_search_index(), queries, limit, min_score)
+
+def _batch_search(index: InvertedIndex, queries: Iterable[str], limit: int, min_score: float) -> Dict[str, List[Dict[str, Any]]]:
+    """Executa batch_text_search em um índice específico."""
+    unique_queries = list(dict.fromkeys(queries))
+    results: Dict[str, List[Dict[str, Any]]] = {query: [] for query in unique_queries}
+    
+    if not len(index):
+        return results
+    
+    tokenized = [(query, preprocess_text(query)) for query in unique_queries]
+    tokenized = [(query, tokens) for query, tokens in tokenized if tokens]
+    
+    top_docs = index.search_batch([tokens for _, tokens in tokenized], limit=limit, min_score=min_score)
+    for (query, tokens), found in zip(tokenized, top_docs):
+        results[query] = [_build_search_result(index, doc_num, score, tokens) for doc_num, score in found]
+    
+    return results
+
+def search_documents(query: str, limit: int = 5) -> List[str]:
+    """
+    Busca os parágrafos mais relevantes para uma consulta.
+    
+    Args:
+        query (str): Consulta de busca.
+        limit (int, opcional): Número máximo de resultados. Padrão é 5.
         
-        # Recuperar parágrafo
-        paragraph = DOCUMENT_CACHE.get(doc_id, "")
+    Returns:
+        List[str]: Parágrafos encontrados, do mais ao menos relevante.
+    """
+    return [result["paragraph"] for result in advanced_text_search(query, limit)]
+
+def planet_interpretation_query(planet_name: str, sign: str, house: int) -> str:
+    """Monta a consulta de busca da interpretação de um planeta em um signo e casa."""
+    return f"{planet_name} in {sign} in house {house}"
+
+def aspect_interpretation_query(planet1: str, planet2: str, aspect: str) -> str:
+    """Monta a consulta de busca da interpretação de um aspecto entre dois planetas."""
+    return f"{planet1} {aspect} {planet2}"
+
+def house_interpretation_query(house: int, language: str = "pt") -> str:
+    """Monta a consulta de busca da interpretação de uma casa."""
+    if language != "pt":
+        return f"house {house} astrology"
+    return f"casa {house} astrologia"
+
+def get_interpretations(queries: Mapping[Hashable, str], language: LanguageType = "pt") -> Dict[Hashable, str]:
+    """
+    Busca de uma vez as interpretações de várias consultas.
+    
+    Cada consulta é procurada primeiro na tabela de interpretações pré-calculadas;
+    as que não estão nela são resolvidas em uma única busca em lote.
+    
+    Args:
+        queries (Mapping[Hashable, str]): Consulta de cada chave (ex: montada com
+            planet_interpretation_query ou aspect_interpretation_query).
+        language (LanguageType): Idioma da interpretação. Defaults to "pt".
+    
+    Returns:
+        Dict[Hashable, str]: Interpretação de cada chave; chaves sem resultado ficam de fora.
+    """
+    interpretations = {}
+    pending = {}
+    
+    table = get_interpretation_table()
+    for key, query in queries.items():
+        found, text = table.find(language, query) if table is not None else (False, None)
+        if not found:
+            pending[key] = query
+        elif text is not None:
+            interpretations[key] = text
+    
+    if pending:
+        results = batch_text_search(pending.values(), limit=1)
+        for key, query in pending.items():
+            if results.get(query):
+                interpretations[key] = _translate_interpretation(results[query][0]["paragraph"], language)
+    
+    return interpretations
+
+def interpretation_queries(language: str) -> List[str]:
+    """
+    Lista as consultas de interpretação que a API monta em um idioma.
+    
+    Inclui planetas (com o nome traduzido e o original) em cada signo e casa, aspectos
+    entre pares de planetas nas duas formas usadas pelos endpoints, e as casas.
+    
+    Args:
+        language (str): Idioma das consultas.
         
-        # Destacar termos da consulta no parágrafo
-        highlighted = paragraph
-        for token in query_tokens:
-            pattern = re.compile(r'\b' + re.escape(token) + r'\b', re.IGNORECASE)
-            highlighted = pattern.sub(f"**{token.upper()}**", highlighted)
+    Returns:
+        List[str]: Consultas distintas.
+    """
+    planet_names = list(dict.fromkeys(
+        name for body in BODY_NAMES.values() for name in (translate_planet(body, language), body)
+    ))
+    signs = [translate_sign(sign, language) for sign in ZODIAC_SIGNS]
+    aspect_names = list(dict.fromkeys(
+        name for aspect in MAJOR_ASPECTS.names for name in (translate_aspect(aspect, language), aspect)
+    ))
+    
+    queries = []
+    for planet_name in planet_names:
+        for sign in signs:
+            for house in range(1, 13):
+                queries.append(planet_interpretation_query(planet_name, sign, house))
+    
+    for planet1 in planet_names:
+        for planet2 in planet_names:
+            for aspect in aspect_names:
+                queries.append(aspect_interpretation_query(planet1, planet2, aspect))
+                queries.append(planet_interpretation_query(f"{planet1} {aspect} {planet2}", "", 0))
+    
+    for house in range(1, 13):
+        queries.append(house_interpretation_query(house, language))
+        for sign in signs:
+            queries.append(planet_interpretation_query(f"Casa {house}", sign, 0))
+    
+    return list(dict.fromkeys(queries))
+
+def precompute_interpretations(index: InvertedIndex, languages: Optional[Iterable[str]] = None) -> Dict[Tuple[str, str], Optional[str]]:
+    """
+    Resolve o melhor parágrafo de todas as consultas de interpretação.
+    
+    Args:
+        index (InvertedIndex): Índice de busca usado.
+        languages (Optional[Iterable[str]]): Idiomas. Padrão é todos os suportados pela API.
         
-        # Adicionar resultado
-        results.append({
-            "source": filename,
-            "score": score,
-            "paragraph": paragraph,
-            "highlighted": highlighted,
-            "matched_terms": [token for token in query_tokens if token.lower() in paragraph.lower()]
-        })
+    Returns:
+        Dict[Tuple[str, str], Optional[str]]: Parágrafo traduzido (ou None) de cada par (idioma, consulta).
+    """
+    entries = {}
+    for language in languages or get_args(LanguageType):
+        queries = interpretation_queries(language)
+        results = _batch_search(index, queries, limit=1, min_score=0.1)
+        for query in queries:
+            found = results.get(query)
+            entries[(language, query)] = _translate_interpretation(found[0]["paragraph"], language) if found else None
+    return entries
+
+def sources_fingerprint(metadata: Dict[str, Any]) -> str:
+    """Calcula a impressão digital do conteúdo dos textos indexados."""
+    hashes = sorted((filename, source.get("sha256", "")) for filename, source in metadata.get("sources", {}).items())
+    return hashlib.sha256(json.dumps(hashes).encode("utf-8")).hexdigest()
+
+def get_interpretation_table() -> Optional[InterpretationTable]:
+    """
+    Retorna a tabela de interpretações pré-calculadas, se ela corresponder ao índice atual.
     
-    return results
+    A tabela é mapeada de INTERPRETATION_TABLE_PATH e conferida a cada nova versão do
+    índice de busca; se foi construída a partir de outros textos, não é usada.
+    
+    Returns:
+        Optional[InterpretationTable]: Tabela válida, ou None.
+    """
+    global _interpretation_table, _interpretation_table_version
+    
+    get_search_index()
+    if _interpretation_table_version == SEARCH_INDEX_VERSION:
+        return _interpretation_table
+    
+    with _SEARCH_INDEX_LOCK:
+        if _interpretation_table_version != SEARCH_INDEX_VERSION:
+            table = None
+            if os.path.exists(INTERPRETATION_TABLE_PATH):
+                try:
+                    table = load_table(INTERPRETATION_TABLE_PATH)
+                except Exception as e:
+                    print(f"Erro ao carregar a tabela {INTERPRETATION_TABLE_PATH}: {str(e)}")
+                
+                if table is not None and table.metadata.get("sources_fingerprint") != sources_fingerprint(SEARCH_INDEX_METADATA):
+                    print(f"Aviso: a tabela {INTERPRETATION_TABLE_PATH} não corresponde ao índice atual e será ignorada")
+                    table = None
+            
+            _interpretation_table = table
+            _interpretation_table_version = SEARCH_INDEX_VERSION
+    
+    return _interpretation_table
 
-def simple_text_search(query: str, limit: int = 5) -> List[Dict[str, Any]]:
+def _translate_interpretation(paragraph: str, language: LanguageType) -> str:
+    """Traduz um parágrafo de interpretação, se necessário."""
+    if language == "en":
+        return paragraph
+    return translate_astrological_text(paragraph, language)
+
+def simple_text_search(query: str, limit: int = 5, snippet_length: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Realiza uma busca simples de texto nos livros processados.
     Mantida por compatibilidade, internamente usa advanced_text_search.
@@ -201,11 +738,13 @@ def simple_text_search(query: str, limit: int = 5) -> List[Dict[str, Any]]:
     Args:
         query (str): Consulta de busca.
         limit (int, opcional): Número máximo de resultados. Padrão é 5.
+        snippet_length (Optional[int], opcional): Se informado, retorna o trecho destacado de até
+            esse número de caracteres no lugar do parágrafo inteiro.
         
     Returns:
         List[Dict[str, Any]]: Lista de resultados da busca.
     """
-    results = advanced_text_search(query, limit)
+    results = advanced_text_search(query, limit, snippet_length=snippet_length)
     
     # Converter para o formato antigo
     simple_results = []
@@ -213,7 +752,7 @@ def simple_text_search(query: str, limit: int = 5) -> List[Dict[str, Any]]:
         simple_results.append({
             "source": result["source"],
             "matched_terms": result["matched_terms"],
-            "paragraphs": [result["paragraph"]]
+            "paragraphs": [result["paragraph"] if snippet_length is None else result["snippet"]]
         })
     
     return simple_results
@@ -231,22 +770,8 @@ def get_planet_interpretation(planet_name: str, sign: str, house: int, language:
     Returns:
         Optional[str]: Interpretação encontrada ou None se não houver
     """
-    # Formar a consulta
-    query = f"{planet_name} in {sign} in house {house}"
-    
-    # Buscar documentos relevantes
-    results = search_documents(query)
-    if not results:
-        return None
-        
-    # Pegar o resultado mais relevante
-    best_match = results[0]
-    
-    # Traduzir se necessário
-    if language != "en":
-        best_match = translate_astrological_text(best_match, language)
-    
-    return best_match
+    query = planet_interpretation_query(planet_name, sign, house)
+    return get_interpretations({query: query}, language).get(query)
 
 def get_sign_interpretation(sign: str, language: str = "pt") -> Optional[Dict[str, Any]]:
     """
@@ -299,26 +824,24 @@ def get_house_interpretation(house: int, language: str = "pt") -> Optional[Dict[
     Returns:
         Optional[Dict[str, Any]]: Interpretação encontrada ou None.
     """
-    # Construir a consulta
-    query = f"casa {house} astrologia"
-    if language != "pt":
-        query = f"house {house} astrology"
-    
-    # Realizar a busca
-    results = advanced_text_search(query, limit=1)
+    results = advanced_text_search(house_interpretation_query(house, language), limit=1)
     
     if not results:
         return None
     
-    result = results[0]
+    return _house_interpretation_result(results[0], language)
+
+def _house_interpretation_result(result: Dict[str, Any], language: str) -> Dict[str, Any]:
+    """Formata o resultado de busca da interpretação de uma casa."""
+    paragraph = result["paragraph"]
     
     # Traduzir para o idioma solicitado, se necessário
     if language != "pt" and language != "en":
-        result["paragraph"] = translate_astrological_text(result["paragraph"], "en", language)
+        paragraph = translate_astrological_text(paragraph, "en", language)
     
     return {
         "source": result["source"],
-        "text": result["paragraph"],
+        "text": paragraph,
         "relevance": result["score"]
     }
 
@@ -335,22 +858,8 @@ def get_aspect_interpretation(planet1: str, planet2: str, aspect: str, language:
     Returns:
         Optional[str]: Interpretação encontrada ou None se não houver
     """
-    # Formar a consulta
-    query = f"{planet1} {aspect} {planet2}"
-    
-    # Buscar documentos relevantes
-    results = search_documents(query)
-    if not results:
-        return None
-        
-    # Pegar o resultado mais relevante
-    best_match = results[0]
-    
-    # Traduzir se necessário
-    if language != "en":
-        best_match = translate_astrological_text(best_match, language)
-    
-    return best_match
+    query = aspect_interpretation_query(planet1, planet2, aspect)
+    return get_interpretations({query: query}, language).get(query)
 
 def get_transit_interpretation(transit_planet: str, natal_planet: str, aspect: str, language: str = "pt") -> Optional[Dict[str, Any]]:
     """
@@ -412,6 +921,9 @@ def get_natal_chart_interpretations(natal_data: Dict[str, Any], language: str =
     """
     Obtém interpretações para um mapa natal completo.
     
+    Planetas e aspectos vêm da tabela pré-calculada; o que faltar (e as casas) é
+    buscado em lote.
+    
     Args:
         natal_data (Dict[str, Any]): Dados do mapa natal.
         language (str, opcional): Idioma para os textos. Padrão é "pt".
@@ -425,36 +937,46 @@ def get_natal_chart_interpretations(natal_data: Dict[str, Any], language: str =
         "aspects": []
     }
     
+    planet_queries = {
+        planet_key: planet_interpretation_query(planet_data["name"], planet_data["sign"], planet_data["house"])
+        for planet_key, planet_data in natal_data["planets"].items()
+    }
+    aspect_queries = [
+        aspect_interpretation_query(aspect_data["p1_name"], aspect_data["p2_name"], aspect_data["aspect"])
+        for aspect_data in natal_data["aspects"]
+    ]
+    house_queries = {
+        house_key: house_interpretation_query(int(house_key), language)
+        for house_key in natal_data["houses"]
+    }
+    
+    # Planetas e aspectos vêm da tabela pré-calculada (ou de uma única busca em lote)
+    texts = get_interpretations(
+        {**{("planets", key): query for key, query in planet_queries.items()},
+         **{("aspects", i): query for i, query in enumerate(aspect_queries)}},
+        language
+    )
+    house_results = batch_text_search(house_queries.values(), limit=1)
+    
     # Interpretações dos planetas
-    for planet_key, planet_data in natal_data["planets"].items():
-        planet_name = planet_data["name"]
-        sign = planet_data["sign"]
-        house = planet_data["house"]
-        
-        interp = get_planet_interpretation(planet_name, sign, house, language)
+    for planet_key in planet_queries:
+        interp = texts.get(("planets", planet_key))
         if interp:
             interpretations["planets"][planet_key] = interp
     
     # Interpretações das casas
-    for house_key, house_data in natal_data["houses"].items():
-        house_num = int(house_key)
-        
-        interp = get_house_interpretation(house_num, language)
-        if interp:
-            interpretations["houses"][house_key] = interp
+    for house_key, query in house_queries.items():
+        if house_results.get(query):
+            interpretations["houses"][house_key] = _house_interpretation_result(house_results[query][0], language)
     
     # Interpretações dos aspectos
-    for aspect_data in natal_data["aspects"]:
-        p1_name = aspect_data["p1_name"]
-        p2_name = aspect_data["p2_name"]
-        aspect = aspect_data["aspect"]
-        
-        interp = get_aspect_interpretation(p1_name, p2_name, aspect, language)
+    for i, aspect_data in enumerate(natal_data["aspects"]):
+        interp = texts.get(("aspects", i))
         if interp:
             interpretations["aspects"].append({
-                "p1": p1_name,
-                "p2": p2_name,
-                                "aspect": aspect,
+                "p1": aspect_data["p1_name"],
+                "p2": aspect_data["p2_name"],
+                "aspect": aspect_data["aspect"],
                 "interpretation": interp
             })
     
@@ -3,12 +3,17 @@ Módulo para traduções astrológicas.
 
 Este módulo fornece funções e constantes para tradução de termos astrológicos.
 """
-from typing import Dict, Any, Optional, Literal, List
+from functools import lru_cache
+from typing import Dict, Any, Optional, Literal, List, Tuple
+import os
 import re
 
 # Tipo para idiomas suportados
 LanguageType = Literal["pt", "en", "es", "fr", "it", "de"]
 
+# Número de textos traduzidos mantidos em cache
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "8192"))
+
 # Mapeamento de planetas
 PLANETS_TRANSLATION = {
     "pt": {
@@ -417,9 +422,36 @@ def get_all_translation_terms(language: LanguageType) -> Dict[str, str]:
     
     return translations
 
+@lru_cache(maxsize=None)
+def _text_translator(target_language: LanguageType) -> Tuple[Optional["re.Pattern[str]"], Dict[str, str]]:
+    """
+    Compila, uma vez por idioma, a expressão com todos os termos a traduzir.
+
+    Os termos formam uma única alternação (os mais longos primeiro), e o dicionário
+    leva cada termo em minúsculas à sua tradução. Se um termo aparecer em mais de
+    uma categoria, vale a primeira (planetas, signos, aspectos, casas).
+    """
+    replacements: Dict[str, str] = {}
+    for translations in (PLANETS_TRANSLATION, SIGNS_TRANSLATION, ASPECTS_TRANSLATION):
+        for en_name, trans_name in translations.get(target_language, {}).items():
+            replacements.setdefault(en_name.lower(), trans_name)
+    for num, trans_name in HOUSES_TRANSLATION.get(target_language, {}).items():
+        replacements.setdefault(f"house {num}", trans_name)
+
+    if not replacements:
+        return None, replacements
+
+    alternation = "|".join(re.escape(term) for term in sorted(replacements, key=len, reverse=True))
+    return re.compile(fr"\b(?:{alternation})\b", re.IGNORECASE), replacements
+
+@lru_cache(maxsize=TRANSLATION_CACHE_SIZE)
 def translate_astrological_text(text: str, target_language: LanguageType, source_language: LanguageType = "en") -> str:
     """
     Traduz um texto astrológico do idioma fonte para o idioma alvo.
+
+    O texto é percorrido uma única vez, e cada termo é substituído no máximo uma
+    vez (um termo já traduzido não é traduzido de novo). Os textos mais frequentes
+    ficam em cache.
     
     Args:
         text (str): Texto a ser traduzido
@@ -431,24 +463,12 @@ def translate_astrological_text(text: str, target_language: LanguageType, source
     """
     if target_language == source_language:
         return text
-        
-    # Traduzir planetas
-    for en_name, trans_name in PLANETS_TRANSLATION.get(target_language, {}).items():
-        text = re.sub(fr"\b{en_name}\b", trans_name, text, flags=re.IGNORECASE)
-        
-    # Traduzir signos
-    for en_name, trans_name in SIGNS_TRANSLATION.get(target_language, {}).items():
-        text = re.sub(fr"\b{en_name}\b", trans_name, text, flags=re.IGNORECASE)
-        
-    # Traduzir aspectos
-    for en_name, trans_name in ASPECTS_TRANSLATION.get(target_language, {}).items():
-        text = re.sub(fr"\b{en_name}\b", trans_name, text, flags=re.IGNORECASE)
-        
-    # Traduzir casas
-    for num, trans_name in HOUSES_TRANSLATION.get(target_language, {}).items():
-        text = re.sub(fr"\bHouse {num}\b", trans_name, text, flags=re.IGNORECASE)
-        
-    return text
+
+    pattern, replacements = _text_translator(target_language)
+    if pattern is None:
+        return text
+
+    return pattern.sub(lambda match: replacements[match.group(0).lower()], text)
 
 def get_supported_languages() -> List[Dict[str, str]]:
     """
@@ -76,6 +76,22 @@ class TransitsToNatalRequest(BaseModel):
     transit: TransitRequest = Field(..., description="Dados do trânsito")
     include_interpretations: bool = Field(False, description="Se deve incluir interpretações textuais na resposta")
 
+class TransitCalendarRequest(BaseModel):
+    """
+    Modelo para requisição do calendário de trânsitos sobre um mapa natal.
+    """
+    natal: NatalChartRequest = Field(..., description="Dados do mapa natal")
+    start_year: int = Field(..., description="Ano de início do calendário")
+    start_month: int = Field(..., ge=1, le=12, description="Mês de início do calendário (1-12)")
+    start_day: int = Field(..., ge=1, le=31, description="Dia de início do calendário (1-31)")
+    days: int = Field(90, ge=1, le=366, description="Duração do calendário em dias")
+    tz_str: Optional[str] = Field(None, description="Fuso horário do calendário (padrão: o do mapa natal)")
+    transit_bodies: Optional[List[str]] = Field(None, description="Corpos em trânsito (padrão: Sol a Plutão, sem a Lua)")
+    natal_bodies: Optional[List[str]] = Field(None, description="Corpos natais (padrão: Sol a Plutão)")
+    include_angles: bool = Field(True, description="Se deve incluir o Ascendente e o Meio-do-Céu natais")
+    step_days: float = Field(1.0, gt=0, le=5, description="Passo máximo da varredura em dias")
+    language: Optional[LanguageType] = Field("pt", description="Idioma para textos na resposta")
+
 class SVGChartRequest(BaseModel):
     """
     Modelo para requisição de gráfico SVG.
@@ -143,6 +159,23 @@ class AspectData(BaseModel):
     diff: float = Field(..., description="Diferença em graus")
     applying: bool = Field(..., description="Se o aspecto está se aplicando (true) ou separando (false)")
 
+class TransitCalendarEvent(BaseModel):
+    """
+    Modelo para um evento do calendário de trânsitos (uma linha da resposta).
+    """
+    date_utc: str = Field(..., description="Data e hora do evento em UTC (ISO 8601)")
+    date_local: str = Field(..., description="Data e hora do evento no fuso do calendário (ISO 8601)")
+    event: Literal["active", "enter", "exact", "exit"] = Field(..., description="Tipo do evento: já ativo no início, entrada no orbe, aspecto exato ou saída do orbe")
+    transit_planet: str = Field(..., description="Nome do planeta em trânsito")
+    transit_planet_original: str = Field(..., description="Nome original do planeta em trânsito em inglês")
+    natal_point: str = Field(..., description="Nome do planeta/ponto natal")
+    natal_point_original: str = Field(..., description="Nome original do planeta/ponto natal em inglês")
+    aspect: str = Field(..., description="Nome do aspecto")
+    aspect_original: str = Field(..., description="Nome original do aspecto em inglês")
+    aspect_degrees: float = Field(..., description="Graus do aspecto")
+    transit_longitude: float = Field(..., description="Longitude do planeta em trânsito no instante do evento")
+    retrograde: bool = Field(..., description="Se o planeta em trânsito está retrógrado no instante do evento")
+
 # Classes para respostas
 
 class NatalChartResponse(BaseModel):
@@ -158,6 +191,28 @@ class NatalChartResponse(BaseModel):
     house_system: HouseSystemType = Field(..., description="Sistema de casas utilizado")
     interpretations: Optional[Dict[str, Any]] = Field(None, description="Interpretações textuais (opcional)")
 
+class NatalChartBatchRequest(BaseModel):
+    """
+    Modelo para requisição de mapas natais em lote.
+    """
+    items: List[NatalChartRequest] = Field(..., min_length=1, description="Dados dos mapas natais a calcular")
+
+class NatalChartBatchItem(BaseModel):
+    """
+    Modelo para o resultado de um item de um lote de mapas natais.
+    """
+    index: int = Field(..., description="Posição do item na requisição")
+    result: Optional[NatalChartResponse] = Field(None, description="Mapa natal calculado (ausente em caso de erro)")
+    error: Optional[str] = Field(None, description="Mensagem de erro do item (ausente em caso de sucesso)")
+
+class NatalChartBatchResponse(BaseModel):
+    """
+    Modelo para resposta de mapas natais em lote.
+    """
+    results: List[NatalChartBatchItem] = Field(..., description="Resultados, na mesma ordem da requisição")
+    succeeded: int = Field(..., description="Número de itens calculados com sucesso")
+    failed: int = Field(..., description="Número de itens com erro")
+
 class TransitResponse(BaseModel):
     """
     Modelo para resposta de trânsitos.
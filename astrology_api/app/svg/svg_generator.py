@@ -22,7 +22,9 @@ class SVGChartGenerator:
 
     def __init__(self, natal_subject: AstrologicalSubject, transit_subject: Optional[AstrologicalSubject] = None) -> None:
         self.natal_subject = natal_subject
-        self.transit_subject = transit_subject    def get_svg_content(self, chart: Any, temp_file: str) -> str:
+        self.transit_subject = transit_subject
+
+    def get_svg_content(self, chart: Any, temp_file: str) -> str:
         """
         Tenta obter o conteúdo SVG do gráfico usando diferentes métodos disponíveis.
         """
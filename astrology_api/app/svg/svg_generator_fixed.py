@@ -37,7 +37,9 @@ class SVGChartGenerator:
             transit_subject: O objeto AstrologicalSubject do trânsito (opcional)
         """
         self.natal_subject = natal_subject
-        self.transit_subject = transit_subject    def get_svg_content(self, chart: Any, temp_file: str) -> str:
+        self.transit_subject = transit_subject
+
+    def get_svg_content(self, chart: Any, temp_file: str) -> str:
         """
         Tenta obter o conteúdo SVG do gráfico usando diferentes métodos disponíveis.
         
@@ -17,6 +17,10 @@ from app.api.progression_router import router as progression_router
 from app.api.return_router import router as return_router
 from app.api.direction_router import router as direction_router
 from app.api.interpret_router import router as interpret_router
+from app.api.system_router import router as system_router
+from app.core.executor import shutdown_pools
+from app.core.cache import start_cache_maintenance, stop_cache_maintenance
+from app.interpretations.text_search import get_search_index, start_search_index_watcher, stop_search_index_watcher
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -46,6 +50,26 @@ app.include_router(progression_router)
 app.include_router(return_router)
 app.include_router(direction_router)
 app.include_router(interpret_router)
+app.include_router(system_router)
+
+@app.on_event("startup")
+async def startup_event():
+    """
+    Inicia a limpeza periódica do cache em memória, carrega o índice de interpretações
+    e inicia a verificação de mudanças nos textos processados.
+    """
+    start_cache_maintenance()
+    get_search_index()
+    start_search_index_watcher()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Encerra os pools de execução, a limpeza do cache e a verificação do índice ao desligar a aplicação.
+    """
+    shutdown_pools()
+    stop_cache_maintenance()
+    stop_search_index_watcher()
 
 @app.get("/")
 async def read_root():
@@ -4,15 +4,20 @@ Testes para a API de Astrologia.
 Este módulo contém testes para os endpoints da API de Astrologia.
 """
 import pytest
+import json
 from fastapi.testclient import TestClient
 import os
 import sys
+import threading
 
 # Adicionar o diretório raiz ao path para importação
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from main import app
 from app.schemas.models import NatalChartRequest, TransitRequest, SVGChartRequest
+from app.api import interpret_router
+from app.core.ephemeris_backends import SwissBackend, register_backend
+from app.interpretations.semantic_search import semantic_search_available
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -315,3 +320,156 @@ def test_interpret_text():
         assert "source" in data[0]
         assert "matched_terms" in data[0]
         assert "paragraphs" in data[0]
+
+@pytest.mark.skipif(semantic_search_available(), reason="Índice vetorial disponível")
+def test_interpret_text_without_vector_index():
+    """Sem o índice vetorial, o modo semântico retorna 503 e o híbrido usa a busca por palavras-chave."""
+    headers = {"X-API-KEY": os.getenv("API_KEY_ASTROLOGIA", "dev_key")}
+
+    response = client.get("/api/v1/interpret?query=Sol em Peixes&mode=semantic", headers=headers)
+    assert response.status_code == 503
+
+    hybrid = client.get("/api/v1/interpret?query=Sol em Peixes&mode=hybrid", headers=headers)
+    keyword = client.get("/api/v1/interpret?query=Sol em Peixes", headers=headers)
+    assert hybrid.status_code == 200
+    assert hybrid.json() == keyword.json()
+
+def test_interpret_semantic_check_runs_in_pool(monkeypatch):
+    """A verificação da busca semântica (que carrega o índice) não roda no loop de eventos."""
+    headers = {"X-API-KEY": os.getenv("API_KEY_ASTROLOGIA", "dev_key")}
+    threads = []
+
+    def fake_available():
+        threads.append(threading.current_thread().name)
+        return False
+
+    monkeypatch.setattr(interpret_router, "semantic_search_available", fake_available)
+    response = client.get("/api/v1/interpret?query=Lua em Touro&mode=hybrid", headers=headers)
+
+    assert response.status_code == 200
+    assert len(threads) == 1
+    assert threads[0].startswith("astro-compute")
+
+# Testes para o endpoint de mapas natais em lote
+def test_natal_chart_batch():
+    """Testa o endpoint de mapas natais em lote, com um item inválido."""
+    invalid = dict(EINSTEIN_DATA, tz_str="Invalid/Zone")
+    items = [EINSTEIN_DATA, invalid, dict(EINSTEIN_DATA, name="Segundo")]
+
+    response = client.post(
+        "/api/v1/natal_chart/batch",
+        json={"items": items},
+        headers={"X-API-KEY": os.getenv("API_KEY_ASTROLOGIA", "dev_key")}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+
+    # Os resultados voltam na ordem da requisição
+    assert [item["index"] for item in data["results"]] == [0, 1, 2]
+    assert data["succeeded"] == 2 and data["failed"] == 1
+
+    # Os itens válidos trazem o mapa completo
+    for index in (0, 2):
+        item = data["results"][index]
+        assert item["error"] is None
+        assert item["result"]["planets"]["sun"]["sign"] in ["Peixes", "Pisces"]
+        assert len(item["result"]["houses"]) == 12
+    assert data["results"][2]["result"]["input_data"]["name"] == "Segundo"
+
+    # O item inválido é reportado sem falhar o lote
+    assert data["results"][1]["result"] is None
+    assert data["results"][1]["error"] == "Fuso horário inválido"
+
+# Testes para o endpoint de calendário de trânsitos
+def test_transit_calendar():
+    """Testa se o calendário de trânsitos retorna eventos em NDJSON, em ordem cronológica."""
+    response = client.post(
+        "/api/v1/transits_to_natal/calendar",
+        json={
+            "natal": EINSTEIN_DATA,
+            "start_year": 2025,
+            "start_month": 1,
+            "start_day": 1,
+            "days": 60,
+            "transit_bodies": ["sun", "mercury", "mars"]
+        },
+        headers={"X-API-KEY": os.getenv("API_KEY_ASTROLOGIA", "dev_key")}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+
+    assert events and "error" not in events[-1]
+    assert [event["date_utc"] for event in events] == sorted(event["date_utc"] for event in events)
+    assert {event["event"] for event in events} >= {"enter", "exact", "exit"}
+    assert {event["transit_planet_original"] for event in events} <= {"Sun", "Mercury", "Mars"}
+    assert any(event["natal_point_original"] == "Ascendant" for event in events)
+
+    invalid = client.post(
+        "/api/v1/transits_to_natal/calendar",
+        json={"natal": EINSTEIN_DATA, "start_year": 2025, "start_month": 2, "start_day": 30},
+        headers={"X-API-KEY": os.getenv("API_KEY_ASTROLOGIA", "dev_key")}
+    )
+    assert invalid.status_code == 400
+
+def test_transit_calendar_without_house_system():
+    """Sem sistema de casas, os ângulos natais do calendário usam Placidus."""
+    response = client.post(
+        "/api/v1/transits_to_natal/calendar",
+        json={
+            "natal": {**EINSTEIN_DATA, "house_system": None},
+            "start_year": 2025,
+            "start_month": 1,
+            "start_day": 1,
+            "days": 30,
+            "include_angles": True
+        },
+        headers={"X-API-KEY": os.getenv("API_KEY_ASTROLOGIA", "dev_key")}
+    )
+
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events and "error" not in events[-1]
+
+def test_transit_calendar_natal_points_use_endpoint_backend(monkeypatch):
+    """Os pontos natais do calendário são calculados no pool, com o backend do endpoint."""
+    threads = []
+
+    class RecordingBackend(SwissBackend):
+        name = "recording_calendar"
+
+        def houses(self, jd, latitude, longitude, house_system="P"):
+            threads.append(threading.current_thread().name)
+            return super().houses(jd, latitude, longitude, house_system)
+
+    register_backend(RecordingBackend.name, RecordingBackend)
+    monkeypatch.setenv("EPHEMERIS_BACKEND_TRANSIT_CALENDAR", RecordingBackend.name)
+
+    response = client.post(
+        "/api/v1/transits_to_natal/calendar",
+        json={"natal": EINSTEIN_DATA, "start_year": 2025, "start_month": 1, "start_day": 1, "days": 5},
+        headers={"X-API-KEY": os.getenv("API_KEY_ASTROLOGIA", "dev_key")}
+    )
+
+    assert response.status_code == 200
+    assert threads and all(name.startswith("astro-compute") for name in threads)
+
+# Testes para o endpoint de métricas de execução
+def test_executor_metrics():
+    """Testa se os cálculos passam pela camada de execução e geram métricas."""
+    headers = {"X-API-KEY": os.getenv("API_KEY_ASTROLOGIA", "dev_key")}
+    client.get("/api/v1/interpret?query=Sol em Peixes", headers=headers)
+
+    response = client.get("/api/v1/system/executor", headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["thread_pool_workers"] > 0
+    metrics = data["endpoints"]["interpret"]
+    assert metrics["pool"] == "thread"
+    assert metrics["completed"] >= 1
+    assert metrics["queued"] == 0
+    assert metrics["running"] == 0
@@ -0,0 +1,179 @@
+"""
+Testes para o módulo de cache da API de Astrologia.
+"""
+import pytest
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Adicionar o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core import cache as cache_module
+from app.core.cache import DISK_CACHE, DiskCache, MemoryCache, SingleFlight, get_cache_key, get_or_compute, save_to_cache
+from app.core.executor import get_executor_metrics, run_compute
+
+def test_memory_cache_evicts_least_recently_used():
+    """Ao exceder o limite de entradas, a entrada usada há mais tempo é removida."""
+    cache = MemoryCache(max_entries=2, max_bytes=1000, expiration=60)
+    cache.set("a", 1, 10)
+    cache.set("b", 2, 10)
+
+    # Usar "a" torna "b" a entrada menos recente
+    assert cache.get("a") == 1
+    cache.set("c", 3, 10)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_memory_cache_respects_byte_budget():
+    """O total de bytes nunca excede o limite, e valores maiores que ele são ignorados."""
+    cache = MemoryCache(max_entries=100, max_bytes=100, expiration=60)
+    for i in range(5):
+        cache.set(str(i), i, 30)
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 100
+    assert stats["entries"] == 3
+
+    cache.set("big", "x", 101)
+    assert "big" not in cache
+
+def test_memory_cache_expiration_and_counters():
+    """Entradas expiradas contam como falha e são removidas pela limpeza."""
+    cache = MemoryCache(max_entries=10, max_bytes=1000, expiration=0.05)
+    cache.set("a", 1, 10)
+    cache.set("b", 2, 10)
+    assert cache.get("a") == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.expire() == 1
+
+    stats = cache.stats()
+    assert stats["entries"] == 0
+    assert stats["bytes"] == 0
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["expirations"] == 2
+
+def test_disk_cache_batches_writes_and_expires(tmp_path):
+    """As gravações ficam pendentes até o lote encher, e a expiração usa o índice."""
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), expiration=60, batch_size=3, flush_interval=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+
+    # Entradas pendentes já são visíveis para leitura
+    assert cache.get("a") == b"1"
+    assert cache.stats()["pending_writes"] == 2
+
+    cache.set("c", b"3")
+    assert cache.stats()["pending_writes"] == 0
+    assert cache.stats()["writes"] == 3
+
+    # Uma nova instância lê o mesmo arquivo
+    other = DiskCache(cache.path, expiration=60, batch_size=1, flush_interval=60)
+    assert other.get("c") == b"3"
+
+    cache.expiration = -1
+    cache.set("d", b"4")
+    cache.flush()
+    assert cache.get("d") is None
+    assert cache.expire() == 1
+    assert cache.compact()
+
+def test_single_flight_runs_identical_calls_once():
+    """Chamadas simultâneas com a mesma chave compartilham um único cálculo."""
+    flights = SingleFlight()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "resultado"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do("k", compute)))
+    leader.start()
+    started.wait(5)
+
+    followers = [threading.Thread(target=lambda: results.append(flights.do("k", compute))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    # Dar tempo para os seguidores encontrarem o cálculo em andamento
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ["resultado"] * 5
+    assert flights.stats()["in_flight"] == 0
+
+def test_run_compute_coalesces_identical_keys():
+    """Tarefas asyncio com a mesma chave aguardam o mesmo cálculo no pool."""
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        time.sleep(0.05)
+        return value * 2
+
+    async def scenario():
+        return await asyncio.gather(*(
+            run_compute("test_coalesce", compute, 21, pool="thread", key="same") for _ in range(5)
+        ))
+
+    assert asyncio.run(scenario()) == [42] * 5
+    assert calls == [21]
+    assert get_executor_metrics()["endpoints"]["test_coalesce"]["coalesced"] == 4
+
+def test_pool_process_writes_reach_disk():
+    """Gravações feitas em um processo do pool ficam visíveis no disco para os outros processos."""
+    key = get_cache_key("test_pool_process", nonce=time.time())
+    asyncio.run(run_compute("test_pool_process", save_to_cache, key, {"value": 42}, pool="process"))
+
+    assert DISK_CACHE.get(key) is not None
+    DISK_CACHE.delete(key)
+
+def test_thread_saves_wait_for_the_batch(monkeypatch):
+    """Nos threads do processo principal, get_or_compute grava em disco apenas quando o lote enche."""
+    DISK_CACHE.flush()
+    monkeypatch.setattr(DISK_CACHE, "batch_size", 2)
+    monkeypatch.setattr(DISK_CACHE, "flush_interval", 3600.0)
+    other = DiskCache(DISK_CACHE.path, DISK_CACHE.expiration, DISK_CACHE.batch_size, DISK_CACHE.flush_interval)
+    first = get_cache_key("test_thread_batch", nonce=time.time(), item=1)
+    second = get_cache_key("test_thread_batch", nonce=time.time(), item=2)
+
+    async def compute(key):
+        return await run_compute("test_cache_batch", get_or_compute, key, dict, pool="thread")
+
+    asyncio.run(compute(first))
+    assert first in DISK_CACHE._pending
+    assert other.get(first) is None
+
+    asyncio.run(compute(second))
+    assert not DISK_CACHE._pending
+    assert other.get(first) is not None and other.get(second) is not None
+    DISK_CACHE.delete(first)
+    DISK_CACHE.delete(second)
+
+@pytest.mark.skipif(cache_module.fcntl is None, reason="Locks entre processos exigem fcntl")
+def test_process_locks_flush_computed_values(monkeypatch, tmp_path):
+    """Com CACHE_PROCESS_LOCKS ativo, o valor calculado já está no arquivo quando a chamada retorna."""
+    monkeypatch.setattr(cache_module, "CACHE_PROCESS_LOCKS", True)
+    monkeypatch.setattr(cache_module, "CACHE_LOCK_DIR", str(tmp_path))
+    key = get_cache_key("test_get_or_compute_disk", nonce=time.time())
+    assert get_or_compute(key, lambda: {"value": 7}) == {"value": 7}
+
+    # Outra conexão ao mesmo arquivo, como a de outro processo do pool
+    other = DiskCache(DISK_CACHE.path, DISK_CACHE.expiration, DISK_CACHE.batch_size, DISK_CACHE.flush_interval)
+    assert other.get(key) is not None
+    DISK_CACHE.delete(key)
@@ -0,0 +1,427 @@
+"""
+Testes para os módulos de cálculo da API de Astrologia.
+
+Este módulo contém testes unitários para as funções de cálculo que não dependem
+dos endpoints HTTP.
+"""
+import pytest
+import os
+import sys
+
+# Adicionar o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.ephemeris import (
+    BODY_IDS, positions_at, positions_grid, body_longitude, datetime_from_julian_day, julian_day_from_datetime
+)
+from app.core.returns import RETURN_BODIES, find_return_julian_day, return_search_start
+from app.core.aspects import MAJOR_ASPECTS, find_aspects
+from app.core.transit_calendar import find_transit_events
+from app.core.build_ephemeris_table import build_series
+from app.core.build_chebyshev_ephemeris import fit_series, validate_ephemeris
+from app.core.chebyshev import load_chebyshev_ephemeris, write_chebyshev_ephemeris
+from app.core.ephemeris_table import load_ephemeris_table, write_ephemeris_table
+from app.core import ephemeris as ephemeris_module
+from app.core import calculations as calculations_module
+from app.core import returns as returns_module
+from app.core.ephemeris_backends import EphemerisBackend, SwissBackend, available_backends, get_backend, register_backend
+from app.core.executor import run_compute, shutdown_pools
+from app.core.sky import SKY_FLIGHTS, get_sky, sky_snapshot
+from app.core.snapshot import ChartSnapshot, snapshot_from_subject
+from app.core.calculations import (
+    create_astrological_subject, get_return_chart, get_return_chart_cached, get_aspects_data, get_synastry_aspects_data,
+    get_snapshot_planet_data, get_snapshot_houses_data, get_natal_subject
+)
+import numpy as np
+import asyncio
+import pickle
+import threading
+
+@pytest.fixture(scope="module")
+def einstein():
+    """Mapa natal de Albert Einstein."""
+    return create_astrological_subject(
+        "Albert Einstein", 1879, 3, 14, 11, 30, 10.0, 48.4, "Europe/Berlin"
+    )
+
+# Testes para a busca de retornos
+@pytest.mark.parametrize("return_type,return_month", [("solar", None), ("lunar", 5), ("lunar", 2)])
+def test_return_is_exact(einstein, return_type, return_month):
+    """O corpo do retorno deve coincidir com a posição natal em menos de um segundo de arco."""
+    body = RETURN_BODIES[return_type]
+    natal_longitude, _ = body_longitude(einstein.julian_day, body)
+    jd_start = return_search_start(
+        return_type, 3, 14, 11, 30, "Europe/Berlin", 2025, return_month or 1, "Europe/Berlin"
+    )
+
+    return_jd = find_return_julian_day(natal_longitude, jd_start, return_type)
+    longitude, _ = body_longitude(return_jd, body)
+
+    assert abs((longitude - natal_longitude + 180) % 360 - 180) < 1 / 3600
+    if return_type == "solar":
+        assert abs(return_jd - jd_start) < 2
+    else:
+        assert jd_start <= return_jd < jd_start + 28
+
+def test_return_bracket_found_on_last_expansion(monkeypatch):
+    """O retorno é encontrado quando só a última expansão do intervalo delimita a raiz."""
+    class SlowBackend(EphemerisBackend):
+        # Anda 1°/dia mas informa 10°/dia, então a estimativa fica 81 dias antes do cruzamento
+        def longitude(self, jd, body):
+            return jd % 360, 10.0
+
+    monkeypatch.setattr(returns_module, "get_backend", SlowBackend)
+    monkeypatch.setattr(returns_module, "MAX_BRACKET_EXPANSIONS", 80)
+    assert abs(find_return_julian_day(100.0, 0.0, "solar") - 100.0) < 1e-6
+
+    monkeypatch.setattr(returns_module, "MAX_BRACKET_EXPANSIONS", 79)
+    with pytest.raises(ValueError):
+        find_return_julian_day(100.0, 0.0, "solar")
+
+def test_return_chart_keeps_seconds(einstein):
+    """O mapa de retorno expõe o instante exato e fica a menos de um minuto dele."""
+    subject = get_return_chart(einstein, 2025, return_type="solar")
+
+    assert subject.utc_datetime.year == 2025
+    assert abs(subject.julian_day - julian_day_from_datetime(subject.utc_datetime)) <= 30 / 86400
+
+def test_cached_return_chart_skips_subject(einstein, monkeypatch):
+    """O instantâneo do retorno sai direto das efemérides, sem construir um AstrologicalSubject."""
+    expected = snapshot_from_subject(get_return_chart(einstein, 2025, return_month=5, return_type="lunar"))
+
+    def no_subject(*args, **kwargs):
+        raise AssertionError("AstrologicalSubject construído no retorno em cache")
+
+    monkeypatch.setattr(calculations_module, "AstrologicalSubject", no_subject)
+    monkeypatch.setattr(calculations_module, "get_or_compute", lambda key, compute: compute())
+    snapshot = get_return_chart_cached(einstein, 2025, 5, "lunar")
+
+    assert abs(snapshot.julian_day - expected.julian_day) < 1 / 86400
+    assert snapshot.name == expected.name and snapshot.tz_str == expected.tz_str
+    assert snapshot.positions[:, 0] == pytest.approx(expected.positions[:, 0], abs=1e-3)
+    assert snapshot.cusps == pytest.approx(expected.cusps, abs=1e-2)
+
+def test_julian_day_round_trip():
+    """A conversão entre datetime e dia juliano preserva os segundos."""
+    jd = 2460748.3429282406
+    assert abs(julian_day_from_datetime(datetime_from_julian_day(jd)) - jd) < 1 / 86400
+
+# Testes para o caminho rápido de posições
+def test_positions_at_matches_subject(einstein):
+    """As posições calculadas diretamente coincidem com as do Kerykeion."""
+    positions = positions_at(einstein.julian_day)
+
+    assert len(positions) == 13
+    for body in ("sun", "moon", "mercury", "saturn", "pluto"):
+        longitude, _, speed = positions[body]
+        planet = getattr(einstein, body)
+        assert abs(longitude - planet.abs_pos) < 1e-9
+        assert (speed < 0) == planet.retrograde
+
+def test_positions_at_in_worker_thread():
+    """Threads novas (como as do pool) encontram os arquivos de efemérides, inclusive o de Quíron."""
+    expected = positions_at(2451545.0)
+    results = []
+    worker = threading.Thread(target=lambda: results.append(positions_at(2451545.0)))
+    worker.start()
+    worker.join()
+
+    assert len(results) == 1
+    assert results[0].longitude.tolist() == expected.longitude.tolist()
+    assert results[0].bodies == expected.bodies and "chiron" in expected.bodies
+
+def test_positions_at_rejects_unknown_body():
+    """Corpos desconhecidos geram ValueError."""
+    with pytest.raises(ValueError):
+        positions_at(2451545.0, ["vulcan"])
+
+# Testes para o motor vetorizado de aspectos
+def test_find_aspects_matches_pairwise_loop():
+    """O motor vetorizado encontra os mesmos aspectos que o laço par a par."""
+    rng = np.random.default_rng(42)
+    lon1 = rng.uniform(0, 360, 40)
+    lon2 = rng.uniform(0, 360, 30)
+
+    expected = set()
+    for i, a in enumerate(lon1):
+        for j, b in enumerate(lon2):
+            diff = abs(a - b)
+            if diff > 180:
+                diff = 360 - diff
+            for k, (angle, orb) in enumerate(zip(MAJOR_ASPECTS.angles, MAJOR_ASPECTS.orbs)):
+                if abs(diff - angle) <= orb:
+                    expected.add((i, j, k))
+
+    hits = find_aspects(lon1, lon2)
+    assert {(int(h["i"]), int(h["j"]), int(h["aspect"])) for h in hits} == expected
+
+def test_find_aspects_applying():
+    """Um ponto rápido atrás do ângulo exato está se aplicando; à frente, separando."""
+    # Conjunção: o ponto 1 está 2° atrás do ponto 2 e é mais rápido
+    hits = find_aspects([10.0], [12.0], speed1=[1.0], speed2=[0.1])
+    assert hits["applying"][0]
+
+    # Quadratura a 92°: aumentar a distância afasta do ângulo exato
+    hits = find_aspects([0.0], [92.0], speed1=[0.0], speed2=[1.0])
+    assert MAJOR_ASPECTS.names[hits["aspect"][0]] == "Square"
+    assert not hits["applying"][0]
+
+    # Oposição através de 0°/360°
+    hits = find_aspects([355.0], [173.0], speed1=[0.0], speed2=[1.0])
+    assert MAJOR_ASPECTS.names[hits["aspect"][0]] == "Opposition"
+    assert hits["applying"][0]
+
+def test_find_aspects_unique_pairs():
+    """Aspectos dentro de um mesmo mapa não repetem pares nem comparam um ponto consigo."""
+    lon = np.array([0.0, 1.0, 120.0])
+    hits = find_aspects(lon, lon, unique_pairs=True)
+    assert all(h["i"] < h["j"] for h in hits)
+    assert len(hits) == 3
+
+def test_aspect_call_sites_share_engine(einstein):
+    """Aspectos natais e de sinastria usam o mesmo motor e o mesmo formato."""
+    natal = get_aspects_data(einstein, language="en")
+    synastry = get_synastry_aspects_data(einstein, einstein, "en")
+
+    assert natal
+    natal_pairs = {(a.p1_name_original, a.p2_name_original, a.aspect_original) for a in natal}
+    synastry_pairs = {(a.p1_name_original, a.p2_name_original, a.aspect_original) for a in synastry}
+    assert natal_pairs <= synastry_pairs
+
+# Testes para os instantâneos compactos de mapas
+def test_snapshot_matches_subject(einstein):
+    """O instantâneo reproduz as posições e cúspides do Kerykeion."""
+    snapshot = snapshot_from_subject(einstein)
+    planets = get_snapshot_planet_data(snapshot, "en")
+    houses = get_snapshot_houses_data(snapshot, "en")
+
+    assert abs(planets["sun"].longitude - einstein.sun.abs_pos) < 1e-9
+    assert planets["sun"].sign_original == "Pisces"
+    assert planets["sun"].house == 10
+    assert abs(houses["1"].longitude - einstein.first_house.abs_pos) < 1e-9
+    assert abs(houses["10"].longitude - einstein.tenth_house.abs_pos) < 1e-9
+
+def test_snapshot_round_trip_is_compact(einstein):
+    """O formato binário preserva os valores e é muito menor que o subject serializado."""
+    snapshot = snapshot_from_subject(einstein)
+    restored = pickle.loads(pickle.dumps(snapshot))
+
+    assert restored.bodies == snapshot.bodies
+    assert np.array_equal(restored.positions, snapshot.positions)
+    assert np.array_equal(restored.cusps, snapshot.cusps)
+    assert (restored.name, restored.tz_str, restored.house_system) == ("Albert Einstein", "Europe/Berlin", "P")
+    assert len(pickle.dumps(snapshot)) * 5 < len(pickle.dumps(einstein))
+
+def test_snapshot_rejects_other_versions(einstein):
+    """Instantâneos de outra versão do formato não são lidos."""
+    data = bytearray(snapshot_from_subject(einstein).to_bytes())
+    data[0] += 1
+    with pytest.raises(ValueError):
+        ChartSnapshot.from_bytes(bytes(data))
+
+# Testes para o cache de mapas natais
+def test_natal_subject_is_memoized():
+    """Os mesmos dados de nascimento reaproveitam o mesmo objeto; outro sistema de casas não."""
+    args = ("Albert Einstein", 1879, 3, 14, 11, 30, 10.0, 48.4, "Europe/Berlin")
+
+    subject = get_natal_subject(*args)
+    assert get_natal_subject(*args, house_system="Placidus") is subject
+    assert get_natal_subject("Albert Einstein ", 1879, 3, 14, 11, 30, 10.0000000001, 48.4, "Europe/Berlin") is subject
+
+    koch = get_natal_subject(*args, house_system="Koch")
+    assert koch is not subject
+    assert koch.houses_system_identifier == "K"
+
+def test_transit_calendar_finds_retrograde_hits():
+    """O calendário encontra os três toques de um aspecto com retrogradação e os instantes são exatos."""
+    # Longitude de Mercúrio no meio da retrogradação de março de 2025
+    jd_start = 2460735.5
+    target, _ = body_longitude(jd_start + 27, BODY_IDS["mercury"])
+
+    events = find_transit_events([target], jd_start, jd_start + 60, bodies=("mercury",))
+    exact = [event for event in events if event["event"] == "exact" and event["aspect"] == 0]
+
+    assert len(exact) == 3
+    assert [event["speed"] > 0 for event in exact] == [True, False, True]
+    for event in exact:
+        longitude, _ = body_longitude(event["jd"], BODY_IDS["mercury"])
+        assert abs((longitude - target + 180) % 360 - 180) < 1e-4
+
+    # Cada toque exato fica entre uma entrada e uma saída do orbe
+    kinds = [event["event"] for event in events if event["aspect"] == 0]
+    assert kinds[0] in ("enter", "active") and kinds[-1] == "exit"
+    assert [event["jd"] for event in events] == sorted(event["jd"] for event in events)
+
+# Testes para a tabela de efemérides pré-calculada
+@pytest.mark.parametrize("dtype", ["<f8", "<f4"])
+def test_ephemeris_table_interpolation(tmp_path, monkeypatch, dtype):
+    """A tabela mapeada interpola as posições dentro do erro medido e respeita a tolerância."""
+    jd_start = 2460676.5
+    series = {body: build_series(body, jd_start, jd_start + 40, 1 / 24 if body == "moon" else 1.0, dtype) for body in ("sun", "moon", "mercury")}
+    path = str(tmp_path / "ephemeris.table")
+    write_ephemeris_table(path, series, dtype)
+    table = load_ephemeris_table(path)
+
+    assert not table.series["moon"].values.flags.owndata
+    rng = np.random.default_rng(1)
+    rounding = 360 * np.finfo(dtype).eps
+    for body in ("sun", "moon", "mercury"):
+        body_series = table.series[body]
+        assert body_series.errors.max() < 1 / 3600
+        jds = jd_start + rng.uniform(0, 40, 200)
+        longitudes, _, speeds, errors = body_series.interpolate(jds)
+        for jd, longitude, speed, error in zip(jds, longitudes, speeds, errors):
+            expected, expected_speed = body_longitude(jd, BODY_IDS[body], tolerance=0)
+            assert abs((longitude - expected + 180) % 360 - 180) <= max(2 * error, 1e-6) + rounding
+            assert abs(speed - expected_speed) < 1e-3
+            assert table.lookup(body, jd, 1.0) == pytest.approx((longitude, body_series.lookup(jd, 1.0)[1], speed))
+
+    # Fora do intervalo, de outros corpos ou acima da tolerância, a tabela não responde
+    assert table.lookup("sun", jd_start - 1, 1.0) is None
+    assert table.lookup("mars", jd_start + 1, 1.0) is None
+    assert table.lookup("sun", jd_start + 1.5, 0.0) is None
+
+    # As funções de posições usam a tabela quando ela está disponível
+    monkeypatch.setattr(ephemeris_module, "_ephemeris_table", table)
+    monkeypatch.setattr(ephemeris_module, "_ephemeris_table_checked", True)
+    jd = jd_start + 10.3
+    positions = positions_at(jd, ("sun", "moon", "mars"))
+    assert positions["sun"][0] == table.lookup("sun", jd, 1.0)[0]
+    assert positions["mars"][0] == body_longitude(jd, BODY_IDS["mars"], tolerance=0)[0]
+    assert body_longitude(jd, BODY_IDS["moon"])[0] == positions["moon"][0]
+
+# Testes para as efemérides de Chebyshev
+def test_chebyshev_ephemeris_matches_swiss(tmp_path, monkeypatch):
+    """As séries avaliadas em lote coincidem com o Swiss Ephemeris e positions_grid as usa."""
+    jd_start = 2460676.5
+    series = {
+        "sun": fit_series("sun", jd_start, jd_start + 64, 16.0, 12),
+        "moon": fit_series("moon", jd_start, jd_start + 64, 4.0, 13),
+    }
+    path = str(tmp_path / "chebyshev.ephem")
+    write_chebyshev_ephemeris(path, series)
+    ephemeris = load_chebyshev_ephemeris(path)
+
+    assert len(ephemeris.series["moon"].coefficients) == 16
+    jds = np.linspace(jd_start, jd_start + 64, 1001)
+    for body in ("sun", "moon"):
+        longitudes, latitudes, speeds, errors = ephemeris.series[body].evaluate(jds)
+        expected = positions_grid(jds, (body,), tolerance=0)
+        assert np.all(errors < 0.001 / 3600)
+        assert np.abs((longitudes - expected[0][:, 0] + 180) % 360 - 180).max() < 0.001 / 3600
+        assert np.abs(latitudes - expected[1][:, 0]).max() < 0.001 / 3600
+        assert np.abs(speeds - expected[2][:, 0]).max() < 1e-3
+
+    report = validate_ephemeris(ephemeris, samples=200)
+    assert report["sun"]["max_arcsec"] < 0.001 and report["moon"]["served_fraction"] == 1.0
+
+    with pytest.raises(ValueError):
+        ephemeris.series["sun"].evaluate([jd_start - 1])
+
+    # positions_grid avalia as séries e calcula um a um os corpos fora delas
+    monkeypatch.setattr(ephemeris_module, "_chebyshev_ephemeris", ephemeris)
+    monkeypatch.setattr(ephemeris_module, "_chebyshev_ephemeris_checked", True)
+    longitudes, _, _ = positions_grid(jds[:50], ("sun", "mars"))
+    assert longitudes[:, 0].tolist() == ephemeris.series["sun"].evaluate(jds[:50])[0].tolist()
+    assert longitudes[:, 1].tolist() == [body_longitude(jd, BODY_IDS["mars"])[0] for jd in jds[:50]]
+
+# Testes para os backends de efemérides
+def test_ephemeris_backends_agree_with_swiss(monkeypatch):
+    """Todos os backends seguem o mesmo contrato e coincidem com o Swiss Ephemeris dentro da tolerância."""
+    jd_start = 2460676.5
+    table = {body: build_series(body, jd_start, jd_start + 32, 1 / 24 if body == "moon" else 1.0, "<f8") for body in ("sun", "moon")}
+    series = {body: fit_series(body, jd_start, jd_start + 32, 4.0 if body == "moon" else 16.0, 13 if body == "moon" else 12) for body in ("sun", "moon")}
+    monkeypatch.setattr(ephemeris_module, "_ephemeris_table", ephemeris_module.EphemerisTable(table, {}))
+    monkeypatch.setattr(ephemeris_module, "_ephemeris_table_checked", True)
+    monkeypatch.setattr(ephemeris_module, "_chebyshev_ephemeris", ephemeris_module.ChebyshevEphemeris(series, {}))
+    monkeypatch.setattr(ephemeris_module, "_chebyshev_ephemeris_checked", True)
+
+    bodies = ("sun", "moon", "mars")
+    jds = np.linspace(jd_start + 0.1, jd_start + 31.9, 97)
+    expected = get_backend("swiss").positions(jds, bodies)
+    assert expected[0].shape == (97, 3)
+    assert expected[0][:, 2].tolist() == [body_longitude(jd, BODY_IDS["mars"], tolerance=0)[0] for jd in jds]
+
+    for name in ("swiss", "table", "chebyshev", "auto"):
+        backend = get_backend(name)
+        longitudes, latitudes, speeds = backend.positions(jds, bodies)
+        assert np.abs((longitudes - expected[0] + 180) % 360 - 180).max() < 0.1 / 3600
+        assert np.abs(latitudes - expected[1]).max() < 0.1 / 3600
+        assert np.abs(speeds - expected[2]).max() < 1e-3
+
+        # O instante isolado pode vir de outra fonte ("auto": tabela em vez das séries)
+        positions = backend.positions_at(float(jds[5]), bodies)
+        assert positions.bodies == bodies
+        assert positions.longitude == pytest.approx(longitudes[5], abs=0.1 / 3600)
+        assert backend.longitude(float(jds[5]), "moon") == pytest.approx((longitudes[5, 1], speeds[5, 1]), abs=1e-4)
+        assert backend.houses(float(jds[5]), 48.4, 10.0, "P").tolist() == ephemeris_module.houses_at(float(jds[5]), 48.4, 10.0, "P").tolist()
+
+    # Os backends aproximados usam os arquivos; o "swiss" nunca
+    assert get_backend("chebyshev").positions(jds, ("sun",))[0][:, 0].tolist() == series["sun"].evaluate(jds)[0].tolist()
+    assert get_backend("table").positions(jds, ("sun",))[0][:, 0].tolist() == table["sun"].interpolate(jds)[0].tolist()
+
+    with pytest.raises(ValueError):
+        get_backend("swiss").positions(jds, ("vulcan",))
+
+def test_ephemeris_backend_registry_and_endpoint_selection(monkeypatch):
+    """O backend vem do registro e pode ser trocado por endpoint dentro de run_compute."""
+    assert {"swiss", "table", "chebyshev", "auto"} <= set(available_backends())
+    assert isinstance(get_backend("swiss"), SwissBackend)
+    with pytest.raises(ValueError):
+        get_backend("vsop87")
+
+    class FixedBackend(EphemerisBackend):
+        name = "fixed"
+
+        def positions(self, jds, bodies=None):
+            shape = (len(jds), len(bodies))
+            return np.full(shape, 123.0), np.zeros(shape), np.ones(shape)
+
+    register_backend("fixed", FixedBackend)
+    monkeypatch.setenv("EPHEMERIS_BACKEND_TEST_BACKEND", "fixed")
+
+    def backend_name():
+        return get_backend().name
+
+    async def scenario():
+        return await run_compute("test_backend", backend_name, pool="thread"), await run_compute("other_backend", backend_name, pool="thread")
+
+    assert asyncio.run(scenario()) == ("fixed", get_backend().name)
+    assert get_backend("fixed").positions_at(2451545.0, ("sun",))["sun"] == (123.0, 0.0, 1.0)
+
+# Testes para o céu compartilhado entre requisições de trânsito
+def test_sky_is_shared_per_ut_minute():
+    """Instantes do mesmo minuto UT reaproveitam os planetas; só as casas dependem do local."""
+    jd = 2460676.5 + 613 / 1440
+    leaders = SKY_FLIGHTS.leaders
+    sky = get_sky(jd + 1e-9)
+    assert get_sky(jd - 1e-9) is sky
+    assert SKY_FLIGHTS.leaders == leaders + 1
+    assert sky.jd == pytest.approx(jd, abs=1e-9)
+    assert sky.longitude.tolist() == positions_at(sky.jd).longitude.tolist()
+    assert get_sky(jd + 1 / 1440) is not sky
+
+    rio = sky_snapshot(jd, -22.9, -43.2, "P", "Rio", "America/Sao_Paulo")
+    tokyo = sky_snapshot(jd, 35.7, 139.7, "W", "Tokyo", "Asia/Tokyo")
+    assert SKY_FLIGHTS.leaders == leaders + 2
+    assert rio.positions.tolist() == tokyo.positions.tolist()
+    assert rio.cusps.tolist() == ephemeris_module.houses_at(sky.jd, -22.9, -43.2, "P").tolist()
+    assert tokyo.cusps.tolist() == ephemeris_module.houses_at(sky.jd, 35.7, 139.7, "W").tolist()
+    assert rio.body_houses().tolist() != tokyo.body_houses().tolist()
+
+def test_sky_stage_runs_in_pool_threads():
+    """O céu e as casas são calculados nas threads do pool, sem depender de um AstrologicalSubject anterior."""
+    shutdown_pools()
+    jd = 2460676.5 + 1201 / 1440
+
+    async def scenario():
+        return await asyncio.gather(*(
+            run_compute("transit_chart", sky_snapshot, jd, latitude, 10.0, "P", "", "UTC", pool="thread")
+            for latitude in (-30.0, 0.0, 45.0)
+        ))
+
+    snapshots = asyncio.run(scenario())
+    shutdown_pools()
+    assert "chiron" in snapshots[0].bodies
+    assert all(snapshot.positions.tolist() == snapshots[0].positions.tolist() for snapshot in snapshots)
+    assert snapshots[2].cusps.tolist() == ephemeris_module.houses_at(snapshots[2].julian_day, 45.0, 10.0, "P").tolist()
@@ -0,0 +1,253 @@
+"""
+Testes para a busca nos textos de interpretação.
+"""
+import pytest
+import math
+import os
+import random
+import sys
+
+# Adicionar o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.interpretations.index_store import load_index, write_index
+from app.interpretations.inverted_index import InvertedIndex
+from app.interpretations.lookup_table import load_table, write_table
+from app.interpretations.semantic_search import reciprocal_rank_fusion
+from app.interpretations.translations import translate_astrological_text
+from app.interpretations import text_search, translations
+from app.interpretations.text_search import (
+    advanced_text_search, batch_text_search, build_search_index, search_documents, update_search_index
+)
+
+def brute_force_bm25(documents, query_terms, k1=1.2, b=0.75):
+    """Pontua todos os parágrafos, sem índice, para comparação."""
+    doc_count = len(documents)
+    avg_length = sum(len(tokens) for _, tokens in documents) / doc_count
+    scores = {}
+    for doc_num, (_, tokens) in enumerate(documents):
+        score = 0.0
+        for term in query_terms:
+            freq = tokens.count(term)
+            if not freq:
+                continue
+            doc_freq = sum(1 for _, other in documents if term in other)
+            idf = math.log1p((doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+            norm = k1 * (1 - b + b * len(tokens) / avg_length)
+            score += idf * freq * (k1 + 1) / (freq + norm)
+        if score > 0:
+            scores[doc_num] = score
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+def test_inverted_index_postings_are_sorted():
+    """As listas de cada termo ficam ordenadas e guardam as frequências."""
+    index = InvertedIndex.build([
+        ("a:0", ["sol", "peixes", "sol"]),
+        ("a:1", ["lua", "peixes"]),
+        ("a:2", ["sol"]),
+    ])
+
+    docs, freqs = index.postings("sol")
+    assert docs.tolist() == [0, 2]
+    assert freqs.tolist() == [2, 1]
+    assert index.postings("marte") is None
+
+def test_wand_matches_exhaustive_bm25():
+    """A busca com poda retorna os mesmos k melhores que a pontuação exaustiva."""
+    rng = random.Random(42)
+    vocabulary = [f"t{i}" for i in range(40)]
+    documents = [
+        (f"doc:{i}", [rng.choice(vocabulary[:10] if rng.random() < 0.5 else vocabulary) for _ in range(rng.randint(1, 30))])
+        for i in range(300)
+    ]
+    index = InvertedIndex.build(documents)
+
+    for _ in range(25):
+        query = rng.sample(vocabulary, rng.randint(1, 4))
+        expected = brute_force_bm25(documents, query)[:7]
+        found = index.search(query, limit=7)
+
+        assert [doc for doc, _ in found] == [doc for doc, _ in expected]
+        assert [score for _, score in found] == pytest.approx([score for _, score in expected])
+
+def test_batch_search_matches_single_searches():
+    """A busca em lote retorna, para cada consulta, o mesmo que a busca individual."""
+    rng = random.Random(7)
+    vocabulary = [f"t{i}" for i in range(30)]
+    documents = [(f"doc:{i}", [rng.choice(vocabulary) for _ in range(rng.randint(1, 20))]) for i in range(200)]
+    index = InvertedIndex.build(documents)
+    queries = [rng.sample(vocabulary, rng.randint(1, 4)) for _ in range(20)] + [["ausente"]]
+
+    for query, found in zip(queries, index.search_batch(queries, limit=5)):
+        expected = index.search(query, limit=5)
+        assert [doc for doc, _ in found] == [doc for doc, _ in expected]
+        assert [score for _, score in found] == pytest.approx([score for _, score in expected])
+
+def test_batch_text_search_is_keyed_by_query():
+    """Os resultados do lote são indexados pela consulta e iguais aos da busca individual."""
+    queries = ["Lua em Peixes", "Marte na casa 1", "Lua em Peixes", "xyz"]
+    results = batch_text_search(queries, limit=2)
+
+    assert list(results) == ["Lua em Peixes", "Marte na casa 1", "xyz"]
+    assert results["xyz"] == []
+    for query in ("Lua em Peixes", "Marte na casa 1"):
+        assert results[query] == advanced_text_search(query, limit=2)
+
+def test_search_documents_returns_paragraphs():
+    """search_documents retorna os textos dos parágrafos encontrados."""
+    results = search_documents("Peixes", limit=2)
+
+    assert len(results) == 2
+    assert all("Peixes" in paragraph for paragraph in results)
+
+def test_binary_index_round_trip(tmp_path):
+    """O índice gravado em disco é mapeado sem cópia e retorna os mesmos resultados."""
+    index, metadata = build_search_index()
+    path = str(tmp_path / "interpretations.idx")
+    write_index(path, index, metadata)
+
+    loaded, loaded_metadata = load_index(path)
+
+    assert loaded_metadata == metadata
+    assert len(loaded) == len(index)
+    assert list(loaded.terms) == list(index.terms)
+    assert loaded.texts[3] == index.texts[3]
+    assert not loaded.posting_docs.flags.owndata
+    for query in (["peixes"], ["lua", "casa"], ["inexistente"]):
+        assert loaded.search(query, limit=5) == index.search(query, limit=5)
+
+def test_incremental_update_matches_full_rebuild(tmp_path):
+    """Reindexar só os arquivos alterados produz o mesmo resultado que reconstruir tudo."""
+    (tmp_path / "a.txt").write_text("Sol em Leão\n\nLua em Câncer", encoding="utf-8")
+    (tmp_path / "b.txt").write_text("Marte em Áries\n\nVênus em Touro", encoding="utf-8")
+    (tmp_path / "c.txt").write_text("Saturno em Capricórnio", encoding="utf-8")
+    index, metadata = build_search_index(str(tmp_path))
+
+    # Um arquivo só tocado não é reindexado
+    os.utime(tmp_path / "c.txt", ns=(1, 1))
+    touched_index, metadata = update_search_index(index, metadata, str(tmp_path))
+    assert touched_index is index
+    assert update_search_index(index, metadata, str(tmp_path)) is None
+
+    (tmp_path / "a.txt").unlink()
+    (tmp_path / "b.txt").write_text("Marte em Escorpião\n\nVênus em Touro\n\nMarte e Vênus", encoding="utf-8")
+    (tmp_path / "d.txt").write_text("Júpiter em Sagitário com Marte", encoding="utf-8")
+    updated, updated_metadata = update_search_index(index, metadata, str(tmp_path))
+    rebuilt, _ = build_search_index(str(tmp_path))
+
+    # A versão anterior continua intacta para as buscas em andamento
+    assert len(index) == 5 and "sol" in index.terms
+
+    assert sorted(updated.doc_ids) == sorted(rebuilt.doc_ids)
+    assert list(updated.terms) == list(rebuilt.terms)
+    assert sorted(updated_metadata["sources"]) == ["b.txt", "c.txt", "d.txt"]
+    for filename, source in updated_metadata["sources"].items():
+        docs = updated.doc_ids[source["first_doc"]:source["first_doc"] + source["doc_count"]]
+        assert all(doc_id.startswith(filename + ":") for doc_id in docs)
+    for query in (["marte"], ["vênus", "touro"], ["saturno", "marte"]):
+        found = {updated.doc_ids[doc]: score for doc, score in updated.search(query, limit=10)}
+        expected = {rebuilt.doc_ids[doc]: score for doc, score in rebuilt.search(query, limit=10)}
+        assert found == pytest.approx(expected)
+
+    # As posições dos termos acompanham os parágrafos renumerados
+    rebuilt_docs = {doc_id: doc for doc, doc_id in enumerate(rebuilt.doc_ids)}
+    for doc, doc_id in enumerate(updated.doc_ids):
+        terms, starts, ends = updated.doc_tokens(doc)
+        expected_terms, expected_starts, expected_ends = rebuilt.doc_tokens(rebuilt_docs[doc_id])
+        assert [updated.terms[t] for t in terms] == [rebuilt.terms[t] for t in expected_terms]
+        assert starts.tolist() == expected_starts.tolist() and ends.tolist() == expected_ends.tolist()
+
+def test_lookup_table_round_trip(tmp_path):
+    """A tabela distingue consultas sem interpretação de consultas ausentes."""
+    entries = {("pt", f"consulta {i}"): (f"texto {i % 3}" if i % 4 else None) for i in range(100)}
+    path = str(tmp_path / "interpretations.table")
+    write_table(path, entries, {"sources_fingerprint": "abc"})
+
+    table = load_table(path)
+
+    assert table.metadata == {"sources_fingerprint": "abc"}
+    assert len(table) == 100
+    for (language, query), text in entries.items():
+        assert table.find(language, query) == (True, text)
+    assert table.find("en", "consulta 1") == (False, None)
+
+def test_interpretations_use_precomputed_table(tmp_path, monkeypatch):
+    """Com a tabela, as interpretações são as mesmas da busca, e tabelas desatualizadas são ignoradas."""
+    index = text_search.get_search_index()
+    queries = {
+        "sun": text_search.planet_interpretation_query("Sol", "Peixes", 12),
+        "moon": text_search.planet_interpretation_query("Lua", "Áries", 1),
+        "free": "Lua em Peixes no Ascendente",
+    }
+    expected = text_search.get_interpretations(queries, "pt")
+
+    path = str(tmp_path / "interpretations.table")
+    entries = text_search.precompute_interpretations(index, ["pt"])
+    assert ("pt", queries["sun"]) in entries
+    monkeypatch.setattr(text_search, "INTERPRETATION_TABLE_PATH", path)
+    monkeypatch.setattr(text_search, "_interpretation_table_version", -1)
+
+    write_table(path, entries, {"sources_fingerprint": text_search.sources_fingerprint(text_search.SEARCH_INDEX_METADATA)})
+    assert text_search.get_interpretation_table() is not None
+    assert text_search.get_interpretations(queries, "pt") == expected
+
+    write_table(path, entries, {"sources_fingerprint": "outros textos"})
+    monkeypatch.setattr(text_search, "_interpretation_table_version", -1)
+    assert text_search.get_interpretation_table() is None
+
+def test_reciprocal_rank_fusion():
+    """Itens presentes nas duas listas somam as contribuições e sobem na ordem."""
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d", "a"]], k=60)
+
+    assert [item for item, _ in fused] == ["a", "c", "b", "d"]
+    assert dict(fused)["a"] == pytest.approx(1 / 61 + 1 / 63)
+    assert dict(fused)["d"] == pytest.approx(1 / 62)
+
+def test_translate_astrological_text_single_pass():
+    """A tradução troca cada termo uma vez, sem confundir termos que contêm outros."""
+    text = "The SUN in Aries trine Moon, Semisextile Mars in House 10 and house 1."
+
+    assert translate_astrological_text(text, "pt") == (
+        "The Sol in Áries Trígono Lua, Semisextil Marte in Décima Casa and Primeira Casa."
+    )
+    assert translate_astrological_text(text, "en") == text
+
+@pytest.fixture
+def fresh_translations():
+    """Limpa os caches de tradução antes e depois do teste."""
+    translations._text_translator.cache_clear()
+    translate_astrological_text.cache_clear()
+    yield
+    translations._text_translator.cache_clear()
+    translate_astrological_text.cache_clear()
+
+def test_translate_astrological_text_keeps_translated_terms(monkeypatch, fresh_translations):
+    """Uma tradução que contém outro termo não é traduzida de novo, qualquer que seja a ordem das tabelas."""
+    text = "Semisextile Sun, Biquintile Moon and Sextile Venus."
+    assert translate_astrological_text(text, "fr") == "Demi-sextile Soleil, Bi-quintile Lune and Sextile Vénus."
+
+    # Com "Semisextile" antes de "Trine", a tradução em sequência trocava o "Trine"
+    # de "Semi Trine" e produzia "Semi Trigone"
+    monkeypatch.setitem(translations.ASPECTS_TRANSLATION, "fr", {"Semisextile": "Semi Trine", "Trine": "Trigone"})
+    translations._text_translator.cache_clear()
+    translate_astrological_text.cache_clear()
+
+    assert translate_astrological_text("Semisextile and Trine", "fr") == "Semi Trine and Trigone"
+
+def test_snippets_use_indexed_positions(tmp_path):
+    """Destaques e trechos vêm das posições gravadas no índice, também após gravar e reabrir."""
+    paragraph = "Intro " + "palavra " * 40 + "O Sol em Peixes traz sensibilidade; Peixes amplia. " + "fim " * 40
+    (tmp_path / "a.txt").write_text(paragraph, encoding="utf-8")
+    index, metadata = build_search_index(str(tmp_path))
+    path = str(tmp_path / "interpretations.idx")
+    write_index(path, index, metadata)
+    loaded, _ = load_index(path)
+
+    for current in (index, loaded):
+        result = text_search._build_search_result(current, 0, 1.0, ["sol", "peixes", "lua"], snippet_length=60)
+
+        assert result["matched_terms"] == ["sol", "peixes"]
+        assert "**SOL** em **PEIXES** traz sensibilidade; **PEIXES**" in result["highlighted"]
+        assert result["snippet"].startswith("…") and result["snippet"].endswith("…")
+        assert "**SOL**" in result["snippet"] and result["snippet"].count("**PEIXES**") == 2
+        assert len(result["snippet"].replace("**", "")) <= 62